@@ -0,0 +1,161 @@
+"""Cost of ``AuthorizationEngine.decide`` and ``capabilities``.
+
+Compares the former set-based evaluation (rebuilt here on the frozenset policy
+tables) with the bitmask engine for a waiter holding an access group.
+
+    uv run python -m benchmarks.authorization_engine
+"""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from timeit import repeat
+from uuid import uuid4
+
+from core.authorization.actions import AuthorizationAction
+from core.authorization.engine import AuthorizationEngine
+from core.authorization.models import (
+    AuthorizationDecision,
+    AuthorizationEnvironment,
+    AuthorizationRequest,
+    AuthorizationResource,
+    AuthorizationSubject,
+)
+from core.authorization.policies import (
+    DELEGABLE_ACTIONS,
+    TENANT_ACTIONS,
+    actions_mask,
+    capabilities_for_role,
+)
+from core.models.enums import AccountType, TenantStatus
+
+_NUMBER = 20_000
+_REPEAT = 5
+
+
+class _SetBasedEngine(AuthorizationEngine):
+    def decide(self, request: AuthorizationRequest) -> AuthorizationDecision:  # noqa: PLR0911
+        subject = request.subject
+        resource = request.resource
+
+        if request.action == AuthorizationAction.TENANT_LIST:
+            return AuthorizationDecision(
+                True, "account.authenticated", "Authenticated account may list tenants"
+            )
+
+        if request.action == AuthorizationAction.TENANT_CREATE:
+            membership_roles = subject.attributes.get("membership_roles", ())
+            if not membership_roles or AccountType.OWNER in membership_roles:
+                return AuthorizationDecision(
+                    True,
+                    "tenant.create.owner_or_unassigned",
+                    "Account may create a tenant",
+                )
+            return AuthorizationDecision(
+                False,
+                "tenant.create.owner_or_unassigned",
+                "Only an owner or unassigned account may create a tenant",
+            )
+
+        if resource.tenant_id is None:
+            return AuthorizationDecision(
+                False, "resource.tenant.required", "Tenant resource required"
+            )
+
+        subject_tenant_id = subject.attributes.get("tenant_id")
+        if subject_tenant_id != resource.tenant_id:
+            return AuthorizationDecision(
+                False, "tenant.boundary", "Subject and resource tenants differ"
+            )
+
+        if subject.tenant_role is None:
+            return AuthorizationDecision(False, "membership.required", "Tenant membership required")
+
+        base_grant = request.action in capabilities_for_role(subject.tenant_role)
+        custom_capabilities = subject.attributes.get("custom_capabilities", frozenset())
+        custom_grant = request.action in DELEGABLE_ACTIONS and request.action in custom_capabilities
+        if not base_grant and not custom_grant:
+            return AuthorizationDecision(
+                False,
+                "capability.required",
+                f"Tenant attributes do not grant {request.action.value}",
+            )
+
+        lifecycle_actions = {
+            AuthorizationAction.TENANT_VIEW,
+            AuthorizationAction.TENANT_UPDATE,
+            AuthorizationAction.TENANT_DELETE,
+        }
+        if (
+            resource.tenant_status != TenantStatus.ACTIVE
+            and request.action not in lifecycle_actions
+        ):
+            return AuthorizationDecision(False, "tenant.active", "Tenant is not active")
+
+        if custom_grant and not base_grant:
+            return AuthorizationDecision(
+                True,
+                "tenant.access_group",
+                "Assigned access group grants action",
+            )
+        return AuthorizationDecision(True, "tenant.capability", "Tenant attributes grant action")
+
+    def capabilities(
+        self,
+        *,
+        subject: AuthorizationSubject,
+        resource: AuthorizationResource,
+        environment: AuthorizationEnvironment,
+    ) -> frozenset[AuthorizationAction]:
+        return frozenset(
+            action
+            for action in TENANT_ACTIONS
+            if self.decide(AuthorizationRequest(subject, action, resource, environment)).allowed
+        )
+
+
+def _report(label: str, seconds: list[float]) -> None:
+    print(f"{label:<28} {min(seconds) / _NUMBER * 1_000_000:8.2f} us/call")
+
+
+def main() -> None:
+    tenant_id = uuid4()
+    custom = frozenset({AuthorizationAction.MENU_AVAILABILITY_UPDATE})
+    subject = AuthorizationSubject(
+        account_id=uuid4(),
+        tenant_role=AccountType.WAITER,
+        attributes={
+            "tenant_id": tenant_id,
+            "custom_capabilities": custom,
+            "custom_capability_mask": actions_mask(custom),
+        },
+    )
+    resource = AuthorizationResource(
+        kind="menu", tenant_id=tenant_id, tenant_status=TenantStatus.ACTIVE
+    )
+    environment = AuthorizationEnvironment(
+        occurred_at=datetime.now(tz=UTC), method="GET", path="/bench"
+    )
+    request = AuthorizationRequest(
+        subject, AuthorizationAction.MENU_AVAILABILITY_UPDATE, resource, environment
+    )
+
+    for label, engine in (("set-based", _SetBasedEngine()), ("bitmask", AuthorizationEngine())):
+        _report(
+            f"{label} decide",
+            repeat(lambda e=engine: e.decide(request), number=_NUMBER, repeat=_REPEAT),
+        )
+        _report(
+            f"{label} capabilities",
+            repeat(
+                lambda e=engine: e.capabilities(
+                    subject=subject, resource=resource, environment=environment
+                ),
+                number=_NUMBER,
+                repeat=_REPEAT,
+            ),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Round-trip latency of a favicon upload (presign + finalize) against a slow bucket.
+
+Every backend call sleeps ``_ROUND_TRIP_MS`` to stand in for a MinIO round trip.
+Compares the former per-request ``_ensure_bucket`` (``bucket_exists`` plus
+``set_bucket_policy`` on every presign and finalize) with provisioning once at
+startup via ``ObjectStorage.bootstrap_bucket``.
+
+    uv run python -m benchmarks.bucket_bootstrap
+"""
+
+from __future__ import annotations
+
+import asyncio
+from io import BytesIO
+import logging
+from statistics import median, quantiles
+import time
+from time import perf_counter
+from uuid import uuid4
+
+from PIL import Image
+
+from core.exceptions import ServiceUnavailableError
+from core.foundation.object_storage import MemoryObjectStorageBackend, ObjectStorage
+from services.tenant_mobile_favicon_storage_service import TenantMobileFaviconStorageService
+
+_ROUND_TRIP_MS = 2.0
+_WARMUP = 20
+_ITERATIONS = 300
+
+
+class _SlowBackend(MemoryObjectStorageBackend):
+    """Round trips as MinIO makes them; presigning is signed locally and stays free."""
+
+    def __init__(self) -> None:
+        super().__init__("bench")
+        self.calls = 0
+
+    def _round_trips(self, count: int) -> None:
+        self.calls += count
+        time.sleep(count * _ROUND_TRIP_MS / 1_000)
+
+    def bucket_exists(self) -> bool:
+        self._round_trips(1)
+        return super().bucket_exists()
+
+    def ensure_public_bucket(self) -> None:
+        self._round_trips(2)  # bucket_exists + set_bucket_policy
+        super().ensure_public_bucket()
+
+    def stat_size(self, key: str) -> int:
+        self._round_trips(1)
+        return super().stat_size(key)
+
+    def get_bytes(self, key: str) -> bytes:
+        self._round_trips(1)
+        return super().get_bytes(key)
+
+    def put_bytes(self, key: str, data: bytes, content_type: str) -> None:
+        self._round_trips(1)
+        super().put_bytes(key, data, content_type)
+
+    def remove(self, key: str) -> None:
+        self._round_trips(1)
+        super().remove(key)
+
+
+class _LegacyFaviconStorageService(TenantMobileFaviconStorageService):
+    async def _ensure_bucket(self) -> None:
+        storage_unavailable_message = "Object storage is unavailable"
+
+        try:
+            await self._storage.ensure_public_bucket()
+        except Exception as exc:
+            raise ServiceUnavailableError(storage_unavailable_message) from exc
+
+
+def _favicon() -> bytes:
+    out = BytesIO()
+    Image.new("RGBA", (32, 32), (200, 20, 20, 255)).save(out, format="ICO", sizes=[(32, 32)])
+    return out.getvalue()
+
+
+async def _measure(*, legacy: bool) -> tuple[list[float], float]:
+    backend = _SlowBackend()
+    storage = ObjectStorage(backend, max_workers=8)
+    service_cls = _LegacyFaviconStorageService if legacy else TenantMobileFaviconStorageService
+    service = service_cls(storage)
+    if not legacy:
+        await storage.bootstrap_bucket()
+    icon = _favicon()
+    samples: list[float] = []
+    calls_before = 0
+    try:
+        for index in range(_WARMUP + _ITERATIONS):
+            if index == _WARMUP:
+                calls_before = backend.calls
+            tenant_id = uuid4()
+            start = perf_counter()
+            _, object_key = await service.create_presigned_upload(tenant_id, "image/x-icon")
+            await storage.put_bytes(object_key, icon, "image/x-icon")  # the client's PUT
+            await service.finalize_upload(tenant_id, object_key)
+            if index >= _WARMUP:
+                samples.append((perf_counter() - start) * 1_000)
+    finally:
+        storage.shutdown()
+    return samples, (backend.calls - calls_before) / _ITERATIONS
+
+
+def _report(label: str, samples: list[float], calls: float) -> None:
+    p99 = quantiles(samples, n=100)[98]
+    print(
+        f"{label:<26} median {median(samples):7.2f} ms   p99 {p99:7.2f} ms"
+        f"   {calls:4.1f} round trips/upload"
+    )
+
+
+async def main() -> None:
+    logging.disable(logging.INFO)
+    _report("ensure bucket per request", *await _measure(legacy=True))
+    _report("bootstrap at startup", *await _measure(legacy=False))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,142 @@
+"""Throughput of ``JsonLogFormatter`` on the lines every request writes.
+
+Compares the former formatter (rebuilt here on the same redaction helpers)
+with the current one on a ``request_completed`` line and an authorization
+audit line.
+
+    uv run python -m benchmarks.log_formatter
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from datetime import UTC, datetime
+import json
+import logging
+from timeit import repeat
+import traceback
+from typing import Any
+
+from core.foundation.infra.config import settings
+from core.foundation.logging import logger as log_module
+from core.foundation.logging.logger import (
+    _SAFE_EXTRA_FIELDS,
+    JsonLogFormatter,
+    bind_request_context,
+    reset_request_context,
+)
+
+_NUMBER = 20_000
+_REPEAT = 5
+
+
+def _legacy_redact(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return {
+            str(key): "[REDACTED]"
+            if log_module._is_sensitive_key(str(key))
+            else _legacy_redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list | tuple | set | frozenset):
+        return [_legacy_redact(item) for item in value]
+    if isinstance(value, str):
+        return _legacy_redact_text(value)
+    return value
+
+
+def _legacy_redact_text(value: str) -> str:
+    value = log_module._SENSITIVE_VALUE_PATTERN.sub(
+        lambda match: f"{match.group(1)}=[REDACTED]", value
+    )
+    return log_module._BEARER_TOKEN_PATTERN.sub("Bearer [REDACTED]", value)
+
+
+class _LegacyJsonLogFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload: dict[str, Any] = {
+            "timestamp": datetime.now(UTC)
+            .isoformat(timespec="milliseconds")
+            .replace("+00:00", "Z"),
+            "level": record.levelname,
+            "service": settings.LOG_SERVICE_NAME,
+            "environment": settings.ENV,
+            "version": settings.VERSION,
+            "git_sha": settings.GIT_SHA,
+            "message": _legacy_redact_text(record.getMessage()),
+        }
+        payload.update(
+            {
+                key: value
+                for key, value in (log_module._REQUEST_CONTEXT.get() or {}).items()
+                if value is not None
+            }
+        )
+        payload.update(
+            {
+                key: _legacy_redact(value)
+                for key, value in record.__dict__.items()
+                if key in _SAFE_EXTRA_FIELDS and value is not None
+            }
+        )
+        if record.exc_info:
+            payload["exception"] = {
+                "type": record.exc_info[0].__name__ if record.exc_info[0] else "Exception",
+                "message": _legacy_redact_text(str(record.exc_info[1])),
+                "stacktrace": _legacy_redact_text(
+                    "".join(traceback.format_exception(*record.exc_info))
+                ),
+            }
+        return json.dumps(payload, default=str, separators=(",", ":"), sort_keys=True)
+
+
+def _record(msg: str, extra: dict[str, Any]) -> logging.LogRecord:
+    record = logging.LogRecord("restorio", logging.INFO, __file__, 1, msg, (), None)
+    record.__dict__.update(extra)
+    return record
+
+
+def main() -> None:
+    records = {
+        "request_completed": _record(
+            "request_completed",
+            {"duration_ms": 12.4, "http_method": "GET", "http_status": 200},
+        ),
+        "authorization_decision": _record(
+            "audit_event",
+            {
+                "event": "authorization_decision",
+                "request_id": "0f5b6a0e6c3d4b2a9e1f",
+                "route": "/api/v1/tenants/{tenant_id}/orders",
+                "user_id": "5a8e2f9c-7b1d-4e3a-9c6f-2d4b8a1e7f30",
+                "tenant_id": "b7d3c1e9-2a4f-4c8b-9e6d-1f3a5c7e9b20",
+                "action": "order:read",
+                "allowed": True,
+                "policy_id": "2026-08-tenant-abac-v1",
+                "reason": "Tenant attributes grant action",
+            },
+        ),
+    }
+    token = bind_request_context(
+        request_id="0f5b6a0e6c3d4b2a9e1f", trace_id=None, route="/api/v1/orders"
+    )
+    try:
+        for name, record in records.items():
+            for label, formatter in (
+                ("legacy", _LegacyJsonLogFormatter()),
+                ("current", JsonLogFormatter()),
+            ):
+                seconds = min(
+                    repeat(
+                        lambda f=formatter, r=record: f.format(r), number=_NUMBER, repeat=_REPEAT
+                    )
+                )
+                print(f"{name:<24} {label:<8} {_NUMBER / seconds:12,.0f} records/s")
+    finally:
+        reset_request_context(token)
+    serializer = "orjson" if log_module.orjson is not None else "json"
+    print(f"serializer: {serializer}")
+
+
+if __name__ == "__main__":
+    main()
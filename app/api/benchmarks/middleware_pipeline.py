@@ -0,0 +1,108 @@
+"""Latency of a no-op route behind the request pipeline.
+
+Compares the former stack of four ``BaseHTTPMiddleware`` layers (rebuilt here
+on top of the same stage functions) with ``RequestPipelineMiddleware``.
+
+    uv run python -m benchmarks.middleware_pipeline
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import logging
+from statistics import median, quantiles
+from time import perf_counter
+
+from fastapi import FastAPI, Request, Response
+from httpx import ASGITransport, AsyncClient
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from core.middleware import RequestPipelineMiddleware
+from core.middleware.csrf import check_csrf, ensure_csrf_cookie
+from core.middleware.rate_limit import check_rate_limit
+from core.middleware.timing import request_identifiers
+from core.middleware.unauthorized import authenticate_request
+
+CallNext = Callable[[Request], Awaitable[Response]]
+
+_WARMUP = 200
+_ITERATIONS = 3000
+
+
+class _LegacyRateLimit(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next: CallNext) -> Response:
+        rejection, headers = await check_rate_limit(request)
+        if rejection is not None:
+            return rejection
+        response = await call_next(request)
+        response.headers.update(headers)
+        return response
+
+
+class _LegacyCSRF(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next: CallNext) -> Response:
+        needs_cookie, rejection = check_csrf(request)
+        response = rejection or await call_next(request)
+        if needs_cookie:
+            ensure_csrf_cookie(request, response.headers)
+        return response
+
+
+class _LegacyUnauthorized(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next: CallNext) -> Response:
+        return authenticate_request(request) or await call_next(request)
+
+
+class _LegacyTiming(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next: CallNext) -> Response:
+        request_id, _ = request_identifiers(request)
+        request.state.request_id = request_id
+        start = perf_counter()
+        response = await call_next(request)
+        response.headers["X-Process-Time"] = str(perf_counter() - start)
+        response.headers["X-Request-ID"] = request_id
+        return response
+
+
+def _app(*, legacy: bool) -> FastAPI:
+    app = FastAPI()
+    if legacy:
+        app.add_middleware(_LegacyRateLimit)
+        app.add_middleware(_LegacyCSRF)
+        app.add_middleware(_LegacyUnauthorized)
+        app.add_middleware(_LegacyTiming)
+    else:
+        app.add_middleware(RequestPipelineMiddleware)
+
+    @app.get("/api/v1/public/noop")
+    async def noop() -> Response:
+        return Response(status_code=204)
+
+    return app
+
+
+async def _measure(app: FastAPI) -> list[float]:
+    samples: list[float] = []
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        for index in range(_WARMUP + _ITERATIONS):
+            start = perf_counter()
+            await client.get("/api/v1/public/noop", cookies={"csrf_token": "bench"})
+            if index >= _WARMUP:
+                samples.append((perf_counter() - start) * 1_000_000)
+    return samples
+
+
+def _report(label: str, samples: list[float]) -> None:
+    p99 = quantiles(samples, n=100)[98]
+    print(f"{label:<22} median {median(samples):8.1f} us   p99 {p99:8.1f} us")
+
+
+async def main() -> None:
+    logging.disable(logging.INFO)
+    _report("BaseHTTPMiddleware x4", await _measure(_app(legacy=True)))
+    _report("RequestPipeline", await _measure(_app(legacy=False)))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
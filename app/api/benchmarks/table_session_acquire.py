@@ -0,0 +1,260 @@
+"""Guests scanning the same table QR code at the same instant.
+
+``_GUESTS`` concurrent ``acquire_mobile_session`` calls race for one table,
+``_ROUNDS`` times. A fake session stands in for Postgres: every statement
+sleeps ``_ROUND_TRIP_MS`` and active rows live in a shared in-memory table.
+Compares the former check-then-insert (rebuilt here), with and without the
+one-active-session-per-table index, against ``INSERT ... ON CONFLICT DO
+NOTHING``. With the index, the former path's losers fail with an integrity
+error and the app retries after ``_RETRY_BACKOFF_MS``; latency is measured
+until each guest gets a definitive answer.
+
+The fake implements ``ON CONFLICT DO NOTHING`` itself: an INSERT returns no row
+when the table already has an active one. The zero duplicates reported for that
+path are therefore guaranteed by the fake, not measured against Postgres; what
+the benchmark measures is the round trips and retries each path costs. That the
+real statement targets ``uq_table_sessions_active_tenant_table`` is asserted in
+``tests/unit/services/test_table_session_service.py``.
+
+    uv run python -m benchmarks.table_session_acquire
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from datetime import UTC, datetime
+import logging
+from statistics import median, quantiles
+from time import perf_counter
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from sqlalchemy import Insert, Update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.exceptions import ConflictError
+from core.models import TableSession, TableSessionOrigin, TableSessionStatus
+from core.models.tenant import Tenant
+from services.table_identity_index import CanvasTables, table_identity_index
+from services.table_session_service import _ACTIVE_LOCK_TTL, TableSessionService
+from services.table_status_index import parse_table_elements
+from services.tenant_identity_cache import TenantIdentity
+
+_ROUND_TRIP_MS = 0.5
+_RETRY_BACKOFF_MS = 50.0
+_GUESTS = 20
+_ROUNDS = 50
+
+
+class _LegacyTableSessionService(TableSessionService):
+    async def acquire_mobile_session(  # noqa: PLR0913
+        self,
+        session: AsyncSession,
+        db: AsyncIOMotorDatabase,
+        *,
+        tenant: Tenant | TenantIdentity,
+        table_number: int,
+        table_ref: str | None,
+        lock_token: str | None,
+        session_id: str | None,
+        client_ip: str | None,
+        client_fingerprint: str | None,
+    ) -> TableSession:
+        table_identity = await self.resolve_table_identity(
+            session, tenant.id, table_number=table_number, table_ref=table_ref
+        )
+        await self.expire_stale_sessions(
+            session, tenant_id=tenant.id, table_ref=table_identity.table_ref
+        )
+        active_session = await self._get_active_session(
+            session, tenant_id=tenant.id, table_ref=table_identity.table_ref
+        )
+        if active_session is not None:
+            if lock_token and active_session.lock_token == lock_token:
+                return await self._refresh_existing_session(
+                    session,
+                    active_session,
+                    session_id=session_id,
+                    client_ip=client_ip,
+                    client_fingerprint=client_fingerprint,
+                )
+            msg = "This table is temporarily unavailable"
+            raise ConflictError(msg)
+        if await self._has_active_waiter_order(db, tenant.public_id, table_identity.table_ref):
+            msg = "This table is currently being served by staff"
+            raise ConflictError(msg)
+        now = datetime.now(UTC)
+        created = TableSession(
+            tenant_id=tenant.id,
+            tenant_public_id=tenant.public_id,
+            tenant_slug=tenant.slug,
+            table_ref=table_identity.table_ref,
+            table_number=table_identity.table_number,
+            table_label=table_identity.table_label,
+            lock_token=await self._resolve_new_lock_token(session, lock_token),
+            origin=TableSessionOrigin.MOBILE,
+            status=TableSessionStatus.ACTIVE,
+            session_id=session_id,
+            acquired_at=now,
+            last_seen_at=now,
+            expires_at=now + _ACTIVE_LOCK_TTL,
+        )
+        session.add(created)
+        await session.flush()
+        self._track(session, created)
+        return created
+
+
+class _Database:
+    """Active table sessions by table ref, shared by every guest's session."""
+
+    def __init__(self, *, unique_index: bool) -> None:
+        self.unique_index = unique_index
+        self.active: dict[str, list[Any]] = {}
+        self.integrity_errors = 0
+
+
+class _Session:
+    def __init__(self, database: _Database, table_ref: str) -> None:
+        self._database = database
+        self._table_ref = table_ref
+        self._pending: list[Any] = []
+        self.info: dict[str, Any] = {}
+
+    async def _round_trip(self) -> None:
+        await asyncio.sleep(_ROUND_TRIP_MS / 1_000)
+
+    async def execute(self, statement: Any) -> MagicMock:
+        await self._round_trip()
+        rows = self._database.active.setdefault(self._table_ref, [])
+        result = MagicMock()
+        if isinstance(statement, Update):
+            result.all.return_value = []
+        elif isinstance(statement, Insert):
+            # ON CONFLICT DO NOTHING, emulated: no row when the table is already taken.
+            created = None
+            if not rows:
+                created = SimpleNamespace(
+                    tenant_public_id="bench",
+                    table_ref=self._table_ref,
+                    status=TableSessionStatus.ACTIVE,
+                    origin=TableSessionOrigin.MOBILE,
+                    lock_token=str(uuid4()),
+                    expires_at=datetime.now(UTC) + _ACTIVE_LOCK_TTL,
+                )
+                rows.append(created)
+            result.scalar_one_or_none.return_value = created
+        else:
+            result.scalar_one_or_none.return_value = rows[0] if rows else None
+        return result
+
+    def add(self, instance: Any) -> None:
+        self._pending.append(instance)
+
+    async def flush(self) -> None:
+        await self._round_trip()
+        rows = self._database.active.setdefault(self._table_ref, [])
+        for instance in self._pending:
+            if rows and self._database.unique_index:
+                self._database.integrity_errors += 1
+                statement = "INSERT INTO table_sessions"
+                raise IntegrityError(statement, {}, Exception("duplicate key"))
+            rows.append(instance)
+        self._pending.clear()
+
+
+class _KitchenOrders:
+    async def find_one(self, *_: object, **__: object) -> None:
+        await asyncio.sleep(_ROUND_TRIP_MS / 1_000)
+
+
+async def _guest(
+    service: TableSessionService, database: _Database, tenant: SimpleNamespace, table_ref: str
+) -> float:
+    db = MagicMock()
+    db.__getitem__.return_value = _KitchenOrders()
+    start = perf_counter()
+    while True:
+        try:
+            await service.acquire_mobile_session(
+                _Session(database, table_ref),  # type: ignore[arg-type]
+                db,
+                tenant=tenant,  # type: ignore[arg-type]
+                table_number=1,
+                table_ref=table_ref,
+                lock_token=None,
+                session_id=None,
+                client_ip=None,
+                client_fingerprint=None,
+            )
+        except IntegrityError:
+            await asyncio.sleep(_RETRY_BACKOFF_MS / 1_000)
+            continue
+        except ConflictError:
+            pass
+        return (perf_counter() - start) * 1_000
+
+
+async def _measure(
+    service: TableSessionService, *, unique_index: bool
+) -> tuple[list[float], int, int]:
+    tenant = SimpleNamespace(id=uuid4(), public_id="bench", slug="bench")
+    table_refs = [f"t-{index}" for index in range(_ROUNDS)]
+    table_identity_index.store(
+        tenant.id,
+        {
+            uuid4(): CanvasTables(
+                version=1,
+                tables=parse_table_elements([{"type": "table", "id": ref} for ref in table_refs]),
+            )
+        },
+    )
+    database = _Database(unique_index=unique_index)
+    samples: list[float] = []
+    for table_ref in table_refs:
+        samples.extend(
+            await asyncio.gather(
+                *(_guest(service, database, tenant, table_ref) for _ in range(_GUESTS))
+            )
+        )
+    duplicates = sum(
+        count - 1
+        for count in Counter({ref: len(rows) for ref, rows in database.active.items()}).values()
+    )
+    return samples, duplicates, database.integrity_errors
+
+
+def _report(label: str, samples: list[float], duplicates: int, errors: int) -> None:
+    p99 = quantiles(samples, n=100)[98]
+    print(
+        f"{label:<34} median {median(samples):6.2f} ms   p99 {p99:6.2f} ms"
+        f"   {duplicates:4d} duplicate locks   {errors:4d} integrity errors"
+    )
+
+
+async def main() -> None:
+    logging.disable(logging.INFO)
+    try:
+        _report(
+            "check-then-insert, no index",
+            *await _measure(_LegacyTableSessionService(), unique_index=False),
+        )
+        _report(
+            "check-then-insert, unique index",
+            *await _measure(_LegacyTableSessionService(), unique_index=True),
+        )
+        _report(
+            "insert on conflict do nothing",
+            *await _measure(TableSessionService(), unique_index=True),
+        )
+    finally:
+        table_identity_index.clear()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
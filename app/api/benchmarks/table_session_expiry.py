@@ -0,0 +1,140 @@
+"""Database round trips of ``TableSessionService.expire_stale_sessions``.
+
+A fake session charges ``_ROUND_TRIP_MS`` per statement. The former
+implementation (rebuilt here) selected the active sessions as ORM objects and
+flushed one UPDATE per lapsed row; the set-based one issues a single
+``UPDATE ... RETURNING``. The per-table sweep (run before every acquire and
+release) holds at most one active row; the all-tenant sweep of the scheduler
+may find many.
+
+    uv run python -m benchmarks.table_session_expiry
+"""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+from statistics import median, quantiles
+from time import perf_counter
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import MagicMock
+from uuid import UUID, uuid4
+
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.models import TableSession, TableSessionStatus
+from services.table_session_service import TableSessionService
+
+_ROUND_TRIP_MS = 0.5
+_WARMUP = 10
+_ITERATIONS = 200
+
+
+class _LegacyTableSessionService(TableSessionService):
+    async def expire_stale_sessions(
+        self,
+        session: AsyncSession,
+        *,
+        tenant_id: UUID | None = None,
+        table_ref: str | None = None,
+    ) -> int:
+        result = await session.execute(
+            select(TableSession).where(
+                TableSession.status == TableSessionStatus.ACTIVE,
+                TableSession.expires_at <= datetime.now(UTC),
+                *([TableSession.tenant_id == tenant_id] if tenant_id else []),
+                *([TableSession.table_ref == table_ref] if table_ref else []),
+            )
+        )
+        expired = 0
+        for table_session in result.scalars().all():
+            if table_session.expires_at <= datetime.now(UTC):
+                await self._set_terminal_status(session, table_session, TableSessionStatus.EXPIRED)
+                expired += 1
+        return expired
+
+
+class _Session:
+    """Charges one round trip per executed statement or flushed row."""
+
+    def __init__(self, lapsed: int) -> None:
+        self.lapsed = lapsed
+        self.statements = 0
+
+    async def _round_trip(self) -> None:
+        self.statements += 1
+        await asyncio.sleep(_ROUND_TRIP_MS / 1_000)
+
+    async def execute(self, statement: Any) -> MagicMock:
+        await self._round_trip()
+        result = MagicMock()
+        past = datetime.now(UTC) - timedelta(minutes=1)
+        rows = [
+            SimpleNamespace(
+                status=TableSessionStatus.ACTIVE,
+                expires_at=past,
+                tenant_public_id="bench",
+                table_ref=f"t-{index}",
+            )
+            for index in range(self.lapsed)
+        ]
+        if isinstance(statement, Select):
+            result.scalars.return_value.all.return_value = rows
+        else:
+            result.all.return_value = [(row.tenant_public_id, row.table_ref) for row in rows]
+        return result
+
+    async def flush(self) -> None:
+        await self._round_trip()
+
+
+async def _measure(
+    service: TableSessionService, *, lapsed: int, table_ref: str | None
+) -> tuple[list[float], float]:
+    samples: list[float] = []
+    statements = 0
+    tenant_id = uuid4()
+    for index in range(_WARMUP + _ITERATIONS):
+        session = _Session(lapsed)
+        start = perf_counter()
+        await service.expire_stale_sessions(
+            session,  # type: ignore[arg-type]
+            tenant_id=None if table_ref is None else tenant_id,
+            table_ref=table_ref,
+        )
+        if index >= _WARMUP:
+            samples.append((perf_counter() - start) * 1_000)
+            statements += session.statements
+    return samples, statements / _ITERATIONS
+
+
+def _report(label: str, samples: list[float], statements: float) -> None:
+    p99 = quantiles(samples, n=100)[98]
+    print(
+        f"{label:<36} median {median(samples):6.2f} ms   p99 {p99:6.2f} ms"
+        f"   {statements:5.1f} statements"
+    )
+
+
+async def main() -> None:
+    scenarios = (
+        ("per table, lock still held", 0, "t-1"),
+        ("per table, lock lapsed", 1, "t-1"),
+        ("scheduler sweep, 25 lapsed", 25, None),
+        ("scheduler sweep, 200 lapsed", 200, None),
+    )
+    for label, lapsed, table_ref in scenarios:
+        _report(
+            f"select + flush: {label}",
+            *await _measure(_LegacyTableSessionService(), lapsed=lapsed, table_ref=table_ref),
+        )
+        _report(
+            f"update returning: {label}",
+            *await _measure(TableSessionService(), lapsed=lapsed, table_ref=table_ref),
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
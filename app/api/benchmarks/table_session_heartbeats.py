@@ -0,0 +1,126 @@
+"""Postgres writes caused by table session heartbeats.
+
+``_TABLES`` seated guests each call ``refresh_mobile_session`` every
+``_HEARTBEAT_SECONDS``; a minute of traffic is replayed back to back. A fake
+session charges ``_ROUND_TRIP_MS`` per statement and counts the UPDATEs that
+reach the database. Compares writing every heartbeat through with buffering
+them and flushing every ``_FLUSH_SECONDS`` in one batched UPDATE.
+
+    uv run python -m benchmarks.table_session_heartbeats
+"""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+import logging
+from statistics import median, quantiles
+from time import perf_counter
+from typing import Any
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+from core.models import TableSession, TableSessionOrigin, TableSessionStatus
+from services.table_session_heartbeats import TableSessionHeartbeats
+from services.table_session_service import TableSessionService
+
+_ROUND_TRIP_MS = 0.5
+_TABLES = 40
+_HEARTBEAT_SECONDS = 15
+_FLUSH_SECONDS = 5
+_MINUTE = 60
+
+
+class _Database:
+    def __init__(self) -> None:
+        self.writes = 0
+
+
+class _Session:
+    """Charges a round trip per statement; an UPDATE (flush or batch) counts as one write."""
+
+    def __init__(self, database: _Database, row: TableSession | None = None) -> None:
+        self._database = database
+        self._row = row
+        self.info: dict[str, Any] = {}
+
+    async def __aenter__(self) -> _Session:
+        return self
+
+    async def __aexit__(self, *_: object) -> None:
+        return None
+
+    async def _round_trip(self) -> None:
+        await asyncio.sleep(_ROUND_TRIP_MS / 1_000)
+
+    async def execute(self, _statement: Any, _params: Any = None) -> MagicMock:
+        await self._round_trip()
+        if self._row is None:
+            self._database.writes += 1
+        result = MagicMock()
+        result.scalar_one_or_none.return_value = self._row
+        return result
+
+    async def flush(self) -> None:
+        await self._round_trip()
+        self._database.writes += 1
+
+    async def commit(self) -> None:
+        await self._round_trip()
+
+
+def _row() -> TableSession:
+    return TableSession(
+        id=uuid4(),
+        tenant_public_id="bench",
+        table_ref=f"t-{uuid4()}",
+        lock_token=str(uuid4()),
+        origin=TableSessionOrigin.MOBILE,
+        status=TableSessionStatus.ACTIVE,
+        expires_at=datetime.now(UTC) + timedelta(minutes=10),
+    )
+
+
+async def _measure(flush_seconds: float) -> tuple[list[float], int]:
+    database = _Database()
+    heartbeats = TableSessionHeartbeats(
+        flush_seconds=flush_seconds,
+        session_factory=lambda: _Session(database),  # type: ignore[arg-type]
+    )
+    service = TableSessionService()
+    rows = [_row() for _ in range(_TABLES)]
+    samples: list[float] = []
+    with patch("services.table_session_service.table_session_heartbeats", heartbeats):
+        for second in range(_MINUTE):
+            for index, row in enumerate(rows):
+                if (second + index) % _HEARTBEAT_SECONDS:
+                    continue
+                start = perf_counter()
+                await service.refresh_mobile_session(
+                    _Session(database, row),  # type: ignore[arg-type]
+                    lock_token=row.lock_token,
+                    client_ip="10.0.0.1",
+                    client_fingerprint="fp",
+                )
+                samples.append((perf_counter() - start) * 1_000)
+            if heartbeats.enabled and second % _FLUSH_SECONDS == _FLUSH_SECONDS - 1:
+                await heartbeats.flush()
+    return samples, database.writes
+
+
+def _report(label: str, samples: list[float], writes: int) -> None:
+    p99 = quantiles(samples, n=100)[98]
+    print(
+        f"{label:<24} median {median(samples):5.2f} ms   p99 {p99:5.2f} ms"
+        f"   {len(samples):4d} heartbeats   {writes:4d} UPDATEs/min"
+    )
+
+
+async def main() -> None:
+    logging.disable(logging.INFO)
+    _report("write through", *await _measure(0))
+    _report(f"buffer, flush every {_FLUSH_SECONDS}s", *await _measure(_FLUSH_SECONDS))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
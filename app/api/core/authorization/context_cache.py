@@ -0,0 +1,134 @@
+"""Cache of the database attributes behind tenant authorization decisions.
+
+``authorize_tenant_action`` needs the tenant, the caller's membership in it and
+the capabilities of the caller's access groups. Those change rarely, so they
+are cached per (account, tenant public id) in a ``TenantCache`` and dropped
+whenever memberships, access groups or the tenant status change.
+
+``AuthorizationContextCache`` is process-local; ``RedisAuthorizationContextCache``
+shares entries and invalidations across workers. Select it with
+``AUTHZ_CONTEXT_CACHE=redis``.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass, field
+import json
+from time import monotonic
+from uuid import UUID
+
+from redis.asyncio import Redis
+
+from core.authorization.actions import AuthorizationAction
+from core.authorization.policies import actions_mask
+from core.foundation.database.connection import get_redis_client
+from core.foundation.infra.config import Settings, settings
+from core.foundation.tenant_cache import RedisTenantCache, TenantCache, TenantCacheBackend
+from core.models.enums import AccountType, TenantStatus
+
+
+@dataclass(frozen=True, slots=True)
+class AuthorizationContext:
+    tenant_id: UUID
+    tenant_public_id: str
+    tenant_status: TenantStatus
+    tenant_role: AccountType | None
+    custom_capabilities: frozenset[AuthorizationAction]
+    custom_capability_mask: int = field(init=False, default=0)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "custom_capability_mask", actions_mask(self.custom_capabilities))
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "tenant_id": str(self.tenant_id),
+                "tenant_public_id": self.tenant_public_id,
+                "tenant_status": self.tenant_status.value,
+                "tenant_role": self.tenant_role.value if self.tenant_role else None,
+                "custom_capabilities": sorted(c.value for c in self.custom_capabilities),
+            }
+        )
+
+    @classmethod
+    def from_json(cls, raw: str | bytes) -> AuthorizationContext:
+        data = json.loads(raw)
+        return cls(
+            tenant_id=UUID(data["tenant_id"]),
+            tenant_public_id=data["tenant_public_id"],
+            tenant_status=TenantStatus(data["tenant_status"]),
+            tenant_role=AccountType(data["tenant_role"]) if data["tenant_role"] else None,
+            custom_capabilities=frozenset(
+                AuthorizationAction(value) for value in data["custom_capabilities"]
+            ),
+        )
+
+
+class AuthorizationContextCache:
+    """Contexts keyed by (account, tenant public id), in process unless given a backend."""
+
+    def __init__(
+        self,
+        entries: TenantCacheBackend[AuthorizationContext] | None = None,
+        *,
+        ttl_seconds: float = 60,
+        max_entries: int = 10_000,
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        if entries is None:
+            entries = TenantCache(ttl_seconds=ttl_seconds, max_entries=max_entries, clock=clock)
+        self._entries = entries
+
+    async def get(self, account_id: UUID, tenant_public_id: str) -> AuthorizationContext | None:
+        return await self._entries.get(_key(account_id, tenant_public_id))
+
+    async def set(self, account_id: UUID, context: AuthorizationContext) -> None:
+        await self._entries.set(
+            context.tenant_id, [_key(account_id, context.tenant_public_id)], context
+        )
+
+    async def invalidate_account(self, tenant_id: UUID, account_id: UUID) -> None:
+        suffix = f":{account_id}"
+        await self._entries.invalidate(tenant_id, lambda key: key.endswith(suffix))
+
+    async def invalidate_tenant(self, tenant_id: UUID) -> None:
+        await self._entries.invalidate(tenant_id)
+
+    async def clear(self) -> None:
+        await self._entries.clear()
+
+
+class RedisAuthorizationContextCache(AuthorizationContextCache):
+    """Authorization contexts shared by every worker through Redis."""
+
+    def __init__(
+        self,
+        client: Redis,
+        ttl_seconds: int = 60,
+        key_prefix: str = "authz:ctx:",
+    ) -> None:
+        super().__init__(
+            RedisTenantCache(
+                client,
+                ttl_seconds=ttl_seconds,
+                key_prefix=key_prefix,
+                encode=AuthorizationContext.to_json,
+                decode=AuthorizationContext.from_json,
+                name="Authorization context",
+            )
+        )
+
+
+def _key(account_id: UUID, tenant_public_id: str) -> str:
+    return f"{tenant_public_id}:{account_id}"
+
+
+def build_authorization_context_cache(app_settings: Settings) -> AuthorizationContextCache:
+    ttl_seconds = app_settings.AUTHZ_CONTEXT_CACHE_TTL_SECONDS
+    if app_settings.AUTHZ_CONTEXT_CACHE.strip().lower() == "redis":
+        return RedisAuthorizationContextCache(get_redis_client(), ttl_seconds=ttl_seconds)
+    return AuthorizationContextCache(ttl_seconds=ttl_seconds)
+
+
+authorization_context_cache = build_authorization_context_cache(settings)
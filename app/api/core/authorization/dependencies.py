@@ -9,6 +9,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.authorization.actions import AuthorizationAction
+from core.authorization.context_cache import AuthorizationContext, authorization_context_cache
 from core.authorization.engine import authorization_engine
 from core.authorization.models import (
     AuthorizationEnvironment,
@@ -89,14 +90,16 @@ def require_account_action(action: AuthorizationAction):
     return dependency
 
 
-async def authorize_tenant_action(
-    *,
-    action: AuthorizationAction,
+async def load_authorization_context(
+    account_id: UUID,
     tenant_public_id: str,
-    request: Request,
     session: AsyncSession,
-) -> TenantAuthorization:
-    account_id = authenticated_account_id(request)
+) -> AuthorizationContext | None:
+    """Tenant, membership and access-group attributes of ``account_id``, cached."""
+    cached = await authorization_context_cache.get(account_id, tenant_public_id)
+    if cached is not None:
+        return cached
+
     row = (
         await session.execute(
             select(Tenant, TenantRole)
@@ -107,18 +110,8 @@ async def authorize_tenant_action(
             .where(Tenant.public_id == tenant_public_id)
         )
     ).one_or_none()
-
     if row is None:
-        audit.authorization_decision(
-            request=request,
-            user_id=str(account_id),
-            tenant_id=tenant_public_id,
-            action=action.value,
-            allowed=False,
-            policy_id="tenant.lookup",
-            reason="Tenant not found",
-        )
-        raise ForbiddenError(message="Access denied to this tenant")
+        return None
 
     tenant, tenant_role = row
     raw_custom_capabilities = tuple(
@@ -146,19 +139,54 @@ async def authorize_tenant_action(
                 custom_capabilities.add(AuthorizationAction(raw_capability))
             except ValueError:
                 continue
+
+    context = AuthorizationContext(
+        tenant_id=tenant.id,
+        tenant_public_id=tenant.public_id,
+        tenant_status=tenant.status,
+        tenant_role=tenant_role.account_type if tenant_role is not None else None,
+        custom_capabilities=frozenset(custom_capabilities),
+    )
+    await authorization_context_cache.set(account_id, context)
+    return context
+
+
+async def authorize_tenant_action(
+    *,
+    action: AuthorizationAction,
+    tenant_public_id: str,
+    request: Request,
+    session: AsyncSession,
+) -> TenantAuthorization:
+    account_id = authenticated_account_id(request)
+    context = await load_authorization_context(account_id, tenant_public_id, session)
+
+    if context is None:
+        audit.authorization_decision(
+            request=request,
+            user_id=str(account_id),
+            tenant_id=tenant_public_id,
+            action=action.value,
+            allowed=False,
+            policy_id="tenant.lookup",
+            reason="Tenant not found",
+        )
+        raise ForbiddenError(message="Access denied to this tenant")
+
     subject = AuthorizationSubject(
         account_id=account_id,
-        tenant_role=tenant_role.account_type if tenant_role is not None else None,
+        tenant_role=context.tenant_role,
         attributes={
-            "tenant_id": tenant.id,
-            "custom_capabilities": frozenset(custom_capabilities),
+            "tenant_id": context.tenant_id,
+            "custom_capabilities": context.custom_capabilities,
+            "custom_capability_mask": context.custom_capability_mask,
         },
     )
     resource = AuthorizationResource(
         kind=action.value.split(".", maxsplit=1)[0],
-        tenant_id=tenant.id,
+        tenant_id=context.tenant_id,
         resource_id=tenant_public_id,
-        tenant_status=tenant.status,
+        tenant_status=context.tenant_status,
     )
     environment = AuthorizationEnvironment(
         occurred_at=datetime.now(tz=UTC),
@@ -186,8 +214,8 @@ async def authorize_tenant_action(
         raise ForbiddenError(message="Insufficient permissions")
 
     return TenantAuthorization(
-        tenant_id=tenant.id,
-        tenant_public_id=tenant.public_id,
+        tenant_id=context.tenant_id,
+        tenant_public_id=context.tenant_public_id,
         subject=subject,
         resource=resource,
         environment=environment,
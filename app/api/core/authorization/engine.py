@@ -8,55 +8,59 @@ from core.authorization.models import (
     AuthorizationResource,
     AuthorizationSubject,
 )
-from core.authorization.policies import DELEGABLE_ACTIONS, TENANT_ACTIONS, capabilities_for_role
+from core.authorization.policies import (
+    ACCOUNT_ACTIONS_MASK,
+    ACTION_BITS,
+    DELEGABLE_MASK,
+    LIFECYCLE_MASK,
+    TENANT_ACTIONS_MASK,
+    actions_from_mask,
+    actions_mask,
+    mask_for_role,
+)
 from core.models.enums import AccountType, TenantStatus
 
+_TENANT_RESOURCE_REQUIRED = AuthorizationDecision(
+    False, "resource.tenant.required", "Tenant resource required"
+)
+_TENANT_BOUNDARY = AuthorizationDecision(
+    False, "tenant.boundary", "Subject and resource tenants differ"
+)
+_MEMBERSHIP_REQUIRED = AuthorizationDecision(
+    False, "membership.required", "Tenant membership required"
+)
+_TENANT_INACTIVE = AuthorizationDecision(False, "tenant.active", "Tenant is not active")
+_ACCESS_GROUP_GRANT = AuthorizationDecision(
+    True, "tenant.access_group", "Assigned access group grants action"
+)
+_CAPABILITY_GRANT = AuthorizationDecision(
+    True, "tenant.capability", "Tenant attributes grant action"
+)
+
 
 class AuthorizationEngine:
-    """Deterministic, deny-by-default ABAC policy evaluator."""
+    """Deterministic, deny-by-default ABAC policy evaluator.
+
+    Role and access-group capabilities are compared as the integer bitmasks
+    compiled in ``core.authorization.policies``.
+    """
 
     policy_version = "2026-08-tenant-abac-v1"
 
-    def decide(self, request: AuthorizationRequest) -> AuthorizationDecision:  # noqa: PLR0911
+    def decide(self, request: AuthorizationRequest) -> AuthorizationDecision:
         subject = request.subject
         resource = request.resource
+        action_bit = ACTION_BITS[request.action]
 
-        if request.action == AuthorizationAction.TENANT_LIST:
-            return AuthorizationDecision(
-                True, "account.authenticated", "Authenticated account may list tenants"
-            )
-
-        if request.action == AuthorizationAction.TENANT_CREATE:
-            membership_roles = subject.attributes.get("membership_roles", ())
-            if not membership_roles or AccountType.OWNER in membership_roles:
-                return AuthorizationDecision(
-                    True,
-                    "tenant.create.owner_or_unassigned",
-                    "Account may create a tenant",
-                )
-            return AuthorizationDecision(
-                False,
-                "tenant.create.owner_or_unassigned",
-                "Only an owner or unassigned account may create a tenant",
-            )
-
-        if resource.tenant_id is None:
-            return AuthorizationDecision(
-                False, "resource.tenant.required", "Tenant resource required"
-            )
-
-        subject_tenant_id = subject.attributes.get("tenant_id")
-        if subject_tenant_id != resource.tenant_id:
-            return AuthorizationDecision(
-                False, "tenant.boundary", "Subject and resource tenants differ"
-            )
+        if action_bit & ACCOUNT_ACTIONS_MASK:
+            return self._decide_account_action(request)
 
-        if subject.tenant_role is None:
-            return AuthorizationDecision(False, "membership.required", "Tenant membership required")
+        denial = self._tenant_denial(subject, resource)
+        if denial is not None:
+            return denial
 
-        base_grant = request.action in capabilities_for_role(subject.tenant_role)
-        custom_capabilities = subject.attributes.get("custom_capabilities", frozenset())
-        custom_grant = request.action in DELEGABLE_ACTIONS and request.action in custom_capabilities
+        base_grant = mask_for_role(subject.tenant_role) & action_bit
+        custom_grant = _custom_capability_mask(subject) & DELEGABLE_MASK & action_bit
         if not base_grant and not custom_grant:
             return AuthorizationDecision(
                 False,
@@ -64,44 +68,68 @@ class AuthorizationEngine:
                 f"Tenant attributes do not grant {request.action.value}",
             )
 
-        lifecycle_actions = {
-            AuthorizationAction.TENANT_VIEW,
-            AuthorizationAction.TENANT_UPDATE,
-            AuthorizationAction.TENANT_DELETE,
-        }
-        if (
-            resource.tenant_status != TenantStatus.ACTIVE
-            and request.action not in lifecycle_actions
-        ):
-            return AuthorizationDecision(False, "tenant.active", "Tenant is not active")
+        if resource.tenant_status != TenantStatus.ACTIVE and not action_bit & LIFECYCLE_MASK:
+            return _TENANT_INACTIVE
 
         if custom_grant and not base_grant:
-            return AuthorizationDecision(
-                True,
-                "tenant.access_group",
-                "Assigned access group grants action",
-            )
-        return AuthorizationDecision(True, "tenant.capability", "Tenant attributes grant action")
+            return _ACCESS_GROUP_GRANT
+        return _CAPABILITY_GRANT
 
     def capabilities(
         self,
         *,
         subject: AuthorizationSubject,
         resource: AuthorizationResource,
-        environment: AuthorizationEnvironment,
+        environment: AuthorizationEnvironment,  # noqa: ARG002
     ) -> frozenset[AuthorizationAction]:
-        return frozenset(
-            action
-            for action in TENANT_ACTIONS
-            if self.decide(
-                AuthorizationRequest(
-                    subject=subject,
-                    action=action,
-                    resource=resource,
-                    environment=environment,
-                )
-            ).allowed
+        """Tenant actions ``decide`` would allow for this subject and resource."""
+        if self._tenant_denial(subject, resource) is not None:
+            return frozenset()
+        granted = mask_for_role(subject.tenant_role) | (
+            _custom_capability_mask(subject) & DELEGABLE_MASK
+        )
+        if resource.tenant_status != TenantStatus.ACTIVE:
+            granted &= LIFECYCLE_MASK
+        return actions_from_mask(granted & TENANT_ACTIONS_MASK)
+
+    @staticmethod
+    def _decide_account_action(request: AuthorizationRequest) -> AuthorizationDecision:
+        if request.action == AuthorizationAction.TENANT_LIST:
+            return AuthorizationDecision(
+                True, "account.authenticated", "Authenticated account may list tenants"
+            )
+
+        membership_roles = request.subject.attributes.get("membership_roles", ())
+        if not membership_roles or AccountType.OWNER in membership_roles:
+            return AuthorizationDecision(
+                True,
+                "tenant.create.owner_or_unassigned",
+                "Account may create a tenant",
+            )
+        return AuthorizationDecision(
+            False,
+            "tenant.create.owner_or_unassigned",
+            "Only an owner or unassigned account may create a tenant",
         )
 
+    @staticmethod
+    def _tenant_denial(
+        subject: AuthorizationSubject, resource: AuthorizationResource
+    ) -> AuthorizationDecision | None:
+        if resource.tenant_id is None:
+            return _TENANT_RESOURCE_REQUIRED
+        if subject.attributes.get("tenant_id") != resource.tenant_id:
+            return _TENANT_BOUNDARY
+        if subject.tenant_role is None:
+            return _MEMBERSHIP_REQUIRED
+        return None
+
+
+def _custom_capability_mask(subject: AuthorizationSubject) -> int:
+    mask = subject.attributes.get("custom_capability_mask")
+    if mask is None:
+        return actions_mask(subject.attributes.get("custom_capabilities", ()))
+    return mask
+
 
 authorization_engine = AuthorizationEngine()
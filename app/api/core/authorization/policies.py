@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+from collections.abc import Iterable
+from functools import lru_cache
+
 from core.authorization.actions import AuthorizationAction
 from core.models.enums import AccountType
 
@@ -20,6 +23,15 @@ NON_DELEGABLE_ACTIONS = ACCOUNT_ACTIONS | {
 }
 DELEGABLE_ACTIONS = TENANT_ACTIONS - NON_DELEGABLE_ACTIONS
 
+# Tenant lifecycle actions stay available while a tenant is not active.
+LIFECYCLE_ACTIONS = frozenset(
+    {
+        AuthorizationAction.TENANT_VIEW,
+        AuthorizationAction.TENANT_UPDATE,
+        AuthorizationAction.TENANT_DELETE,
+    }
+)
+
 COMMON_READ_ACTIONS = frozenset(
     {
         AuthorizationAction.TENANT_VIEW,
@@ -99,3 +111,36 @@ ROLE_ACTIONS: dict[AccountType, frozenset[AuthorizationAction]] = {
 
 def capabilities_for_role(role: AccountType) -> frozenset[AuthorizationAction]:
     return ROLE_ACTIONS.get(role, frozenset())
+
+
+# Bitmask form of the tables above. Bit positions follow the declaration order
+# of ``AuthorizationAction`` and are only meaningful within one process, so
+# masks must never be persisted; store action values instead.
+ACTION_BITS: dict[AuthorizationAction, int] = {
+    action: 1 << index for index, action in enumerate(AuthorizationAction)
+}
+
+
+def actions_mask(actions: Iterable[AuthorizationAction]) -> int:
+    mask = 0
+    for action in actions:
+        mask |= ACTION_BITS.get(action, 0)
+    return mask
+
+
+@lru_cache(maxsize=256)
+def actions_from_mask(mask: int) -> frozenset[AuthorizationAction]:
+    return frozenset(action for action, bit in ACTION_BITS.items() if mask & bit)
+
+
+ACCOUNT_ACTIONS_MASK = actions_mask(ACCOUNT_ACTIONS)
+TENANT_ACTIONS_MASK = actions_mask(TENANT_ACTIONS)
+DELEGABLE_MASK = actions_mask(DELEGABLE_ACTIONS)
+LIFECYCLE_MASK = actions_mask(LIFECYCLE_ACTIONS)
+ROLE_MASKS: dict[AccountType, int] = {
+    role: actions_mask(actions) for role, actions in ROLE_ACTIONS.items()
+}
+
+
+def mask_for_role(role: AccountType) -> int:
+    return ROLE_MASKS.get(role, 0)
@@ -17,6 +17,11 @@ class MenuItemDTO(BaseDTO):
     image_url: str | None = Field(
         default=None, alias="imageUrl", description="Public image URL when set"
     )
+    image_variants: dict[int, str] | None = Field(
+        default=None,
+        alias="imageVariants",
+        description="WebP derivatives of the image keyed by bounding-box size in px",
+    )
 
 
 class MenuCategoryDTO(BaseDTO):
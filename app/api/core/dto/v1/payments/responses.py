@@ -1,6 +1,6 @@
 from datetime import datetime
 from decimal import Decimal
-from typing import Any
+from typing import Any, Literal
 from uuid import UUID
 
 from pydantic import Field
@@ -32,6 +32,10 @@ class TransactionListItemDTO(BaseDTO):
 
 
 class TransactionsReconcileResponseDTO(BaseDTO):
+    run_id: str
+    status: Literal["queued", "running", "completed", "failed", "cancelled"]
+    started_at: datetime
+    finished_at: datetime | None
     scanned: int = Field(..., ge=0)
     updated: int = Field(..., ge=0)
     failed: int = Field(..., ge=0)
@@ -101,3 +101,4 @@ class MenuImageFinalizeRequestDTO(BaseDTO):
 
 class MenuImageFinalizeResponseDTO(BaseDTO):
     image_url: str = Field(..., alias="imageUrl")
+    image_variants: dict[int, str] = Field(default_factory=dict, alias="imageVariants")
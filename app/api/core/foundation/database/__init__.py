@@ -1,3 +1,3 @@
-from core.foundation.database import connection, database
+from core.foundation.database import connection, database, hooks
 
-__all__ = ["connection", "database"]
+__all__ = ["connection", "database", "hooks"]
@@ -1,4 +1,5 @@
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from redis.asyncio import Redis
 
 from core.foundation.infra.config import settings
 
@@ -16,6 +17,24 @@ class DatabaseConnections:
             )
         return cls._mongo_client
 
+    _redis_client: Redis | None = None
+
+    @classmethod
+    def get_redis_client(cls) -> Redis:
+        if cls._redis_client is None:
+            cls._redis_client = Redis.from_url(
+                settings.REDIS_URL,
+                socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+                socket_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+            )
+        return cls._redis_client
+
+    @classmethod
+    async def close_redis_client(cls) -> None:
+        if cls._redis_client is not None:
+            await cls._redis_client.aclose()
+            cls._redis_client = None
+
 
 def get_mongo_client() -> AsyncIOMotorClient:
     return DatabaseConnections.get_mongo_client()
@@ -24,3 +43,7 @@ def get_mongo_client() -> AsyncIOMotorClient:
 def get_mongo_db() -> AsyncIOMotorDatabase:
     client = get_mongo_client()
     return client[settings.DATABASE_NAME]
+
+
+def get_redis_client() -> Redis:
+    return DatabaseConnections.get_redis_client()
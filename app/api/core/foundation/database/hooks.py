@@ -0,0 +1,56 @@
+"""Callbacks that run once the surrounding transaction has committed.
+
+Caches and in-memory indexes must not change while the write behind them is
+still uncommitted: a concurrent request would read the old rows and put them
+back. ``after_commit`` queues a callback on the session and runs it when the
+outermost transaction commits; a rollback discards it. Coroutine callbacks are
+scheduled on the running loop, so the commit itself never waits on them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import inspect
+import logging
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, SessionTransaction
+
+logger = logging.getLogger(__name__)
+
+_CALLBACKS = "after_commit_callbacks"
+_tasks: set[asyncio.Future[None]] = set()
+
+AfterCommitCallback = Callable[[], Awaitable[None] | None]
+
+
+def after_commit(session: AsyncSession, callback: AfterCommitCallback) -> None:
+    session.info.setdefault(_CALLBACKS, []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_callbacks(session: Session) -> None:
+    for callback in session.info.pop(_CALLBACKS, ()):
+        try:
+            result = callback()
+        except Exception:
+            logger.exception("After-commit callback %r failed", callback)
+            continue
+        if inspect.isawaitable(result):
+            task = asyncio.ensure_future(result)
+            _tasks.add(task)
+            task.add_done_callback(_task_done)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_callbacks(session: Session, previous_transaction: SessionTransaction) -> None:
+    if previous_transaction.parent is None:
+        session.info.pop(_CALLBACKS, None)
+
+
+def _task_done(task: asyncio.Future[None]) -> None:
+    _tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("After-commit callback failed", exc_info=task.exception())
@@ -9,9 +9,10 @@ from core.foundation.database.database import get_db_session
 from core.foundation.security import SecurityService, security_service
 from services.auth_service import AuthService
 from services.email_service import EmailService
-from services.external_client_service import ExternalClient
+from services.external_client_service import ExternalClient, external_client
 from services.floor_canvas_service import FloorCanvasService
 from services.order_service import OrderService
+from services.payment_reconciliation import PaymentReconciler, payment_reconciler
 from services.payment_service import P24Service
 from services.table_session_service import TableSessionService, table_session_service
 from services.tenant_logo_storage_service import (
@@ -69,6 +70,10 @@ def get_p24_service() -> P24Service:
     return P24Service()
 
 
+def get_payment_reconciler() -> PaymentReconciler:
+    return payment_reconciler
+
+
 def get_tenant_profile_service() -> TenantProfileService:
     return TenantProfileService()
 
@@ -98,7 +103,7 @@ def get_table_session_service() -> TableSessionService:
 
 
 def get_external_client() -> ExternalClient:
-    return ExternalClient()
+    return external_client
 
 
 SecurityServiceDep = Annotated[SecurityService, Depends(get_security_service)]
@@ -107,6 +112,7 @@ EmailServiceDep = Annotated[EmailService, Depends(get_email_service)]
 TenantServiceDep = Annotated[TenantService, Depends(get_tenant_service)]
 FloorCanvasServiceDep = Annotated[FloorCanvasService, Depends(get_floor_canvas_service)]
 P24ServiceDep = Annotated[P24Service, Depends(get_p24_service)]
+PaymentReconcilerDep = Annotated[PaymentReconciler, Depends(get_payment_reconciler)]
 TenantLogoStorageServiceDep = Annotated[
     TenantLogoStorageService, Depends(get_tenant_logo_storage_service)
 ]
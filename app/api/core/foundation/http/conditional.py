@@ -0,0 +1,53 @@
+"""Validators for conditional GET responses."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from email.utils import format_datetime, parsedate_to_datetime
+import hashlib
+
+
+def strong_etag(body: bytes) -> str:
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison of an ``If-None-Match`` header against ``etag`` (RFC 9110 13.1.2)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(",")
+    )
+
+
+def http_date(value: datetime) -> str:
+    """``value`` as an IMF-fixdate, e.g. ``Sun, 06 Nov 1994 08:49:37 GMT``."""
+    return format_datetime(value.astimezone(UTC), usegmt=True)
+
+
+def not_modified(
+    if_none_match: str | None,
+    if_modified_since: str | None,
+    *,
+    etag: str,
+    last_modified: datetime,
+) -> bool:
+    """Whether a GET may be answered with 304 (RFC 9110 13.2.2).
+
+    ``If-Modified-Since`` is only evaluated when ``If-None-Match`` is absent;
+    an unparsable date is ignored.
+    """
+    if if_none_match:
+        return etag_matches(if_none_match, etag)
+    if not if_modified_since:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=UTC)
+    return last_modified.replace(microsecond=0) <= since
@@ -0,0 +1,228 @@
+"""Validation, re-encoding and resizing of uploaded images off the event loop.
+
+Decoding, converting and re-encoding a 16 MP upload takes hundreds of
+milliseconds of CPU, most of it under the GIL, so neither the event loop nor
+a thread is a good place for it. ``ImageProcessor`` runs ``process_image`` in
+a pool of ``IMAGE_PROCESS_WORKERS`` processes and admits at most
+``IMAGE_PROCESS_MAX_PENDING`` jobs at once; further uploads are refused with
+``ImageProcessorUnavailableError`` instead of queueing behind large images.
+``IMAGE_PROCESS_WORKERS=0`` runs jobs on a thread of this process instead
+(tests, hosts where spawning processes is not allowed).
+
+``process_image`` decodes an upload once and produces the normalized
+original plus WebP derivatives bounded to each requested size, each one
+resized from the next larger one.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from io import BytesIO
+import multiprocessing
+from typing import Literal
+
+from PIL import Image, UnidentifiedImageError
+
+from core.foundation.infra.config import settings
+
+INVALID_IMAGE_MESSAGE = "Uploaded file is not a valid image"
+
+_OUTPUT_FORMATS = {
+    "JPEG": ("JPEG", "jpg", "image/jpeg", "RGB"),
+    "WEBP": ("WEBP", "webp", "image/webp", "RGBA"),
+    "PNG": ("PNG", "png", "image/png", "RGBA"),
+}
+
+
+class InvalidImageError(ValueError):
+    """The upload was rejected; the message is safe to show to the client."""
+
+
+class ImageProcessorUnavailableError(RuntimeError):
+    """Too many images are being processed, or the worker pool died."""
+
+
+@dataclass(frozen=True)
+class ImageSpec:
+    """What an upload must look like and what to produce from it."""
+
+    allowed_formats: frozenset[str]
+    max_pixels: int
+    invalid_type_message: str
+    too_large_message: str
+    min_square_ratio: float | None = None
+    aspect_message: str = ""
+    # "keep" re-encodes in the upload's own format, "png" always emits PNG.
+    output: Literal["keep", "png"] = "keep"
+    derivative_sizes: tuple[int, ...] = ()
+
+
+@dataclass(frozen=True)
+class EncodedImage:
+    data: bytes
+    extension: str
+    content_type: str
+    width: int
+    height: int
+
+
+@dataclass(frozen=True)
+class ProcessedImage:
+    original: EncodedImage
+    derivatives: dict[int, EncodedImage] = field(default_factory=dict)
+
+
+def _encode(image: Image.Image, fmt: str) -> EncodedImage:
+    save_format, extension, content_type, mode = _OUTPUT_FORMATS[fmt]
+    converted = image if image.mode == mode else image.convert(mode)
+    output = BytesIO()
+    if save_format == "JPEG":
+        converted.save(output, format="JPEG", quality=90, optimize=True)
+    elif save_format == "WEBP":
+        converted.save(output, format="WEBP", quality=90)
+    else:
+        converted.save(output, format="PNG", optimize=True)
+    return EncodedImage(
+        data=output.getvalue(),
+        extension=extension,
+        content_type=content_type,
+        width=image.width,
+        height=image.height,
+    )
+
+
+def _derivatives(image: Image.Image, sizes: tuple[int, ...]) -> dict[int, EncodedImage]:
+    derivatives: dict[int, EncodedImage] = {}
+    source = image
+    for size in sorted(set(sizes), reverse=True):
+        scale = min(1.0, size / max(source.width, source.height))
+        if scale < 1.0:
+            target = (max(1, round(source.width * scale)), max(1, round(source.height * scale)))
+            source = source.resize(target, Image.Resampling.LANCZOS, reducing_gap=3.0)
+        output = BytesIO()
+        source.save(output, format="WEBP", quality=80)
+        derivatives[size] = EncodedImage(
+            data=output.getvalue(),
+            extension="webp",
+            content_type="image/webp",
+            width=source.width,
+            height=source.height,
+        )
+    return derivatives
+
+
+def process_image(content: bytes, spec: ImageSpec) -> ProcessedImage:
+    """Validate ``content`` against ``spec`` and encode its outputs.
+
+    Runs in a worker process, so it only takes and returns picklable values.
+    """
+    try:
+        with Image.open(BytesIO(content)) as image:
+            image.verify()
+
+        with Image.open(BytesIO(content)) as image:
+            if image.format not in spec.allowed_formats:
+                raise InvalidImageError(spec.invalid_type_message)
+
+            width, height = image.width, image.height
+            if width * height > spec.max_pixels:
+                raise InvalidImageError(spec.too_large_message)
+
+            if (
+                spec.min_square_ratio is not None
+                and min(width, height) / max(width, height) < spec.min_square_ratio
+            ):
+                raise InvalidImageError(spec.aspect_message)
+
+            fmt = "PNG" if spec.output == "png" else image.format or "PNG"
+            decoded = image.convert(_OUTPUT_FORMATS.get(fmt, _OUTPUT_FORMATS["PNG"])[3])
+    except Image.DecompressionBombError as exc:
+        raise InvalidImageError(spec.too_large_message) from exc
+    except (UnidentifiedImageError, OSError) as exc:
+        raise InvalidImageError(INVALID_IMAGE_MESSAGE) from exc
+
+    return ProcessedImage(
+        original=_encode(decoded, fmt),
+        derivatives=_derivatives(decoded, spec.derivative_sizes),
+    )
+
+
+@dataclass(frozen=True)
+class ImageProcessorStats:
+    max_workers: int
+    max_pending: int
+    pending: int
+    completed: int
+    rejected: int
+
+
+class ImageProcessor:
+    """Runs ``process_image`` on a bounded process pool."""
+
+    def __init__(self, *, max_workers: int = 2, max_pending: int = 8) -> None:
+        self._max_workers = max_workers
+        self._max_pending = max_pending
+        self._executor: ProcessPoolExecutor | None = None
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+
+    async def process(self, content: bytes, spec: ImageSpec) -> ProcessedImage:
+        """Process one upload; raises ``InvalidImageError`` for rejected images."""
+        busy_message = "Image processing is busy. Please try again later."
+        broken_message = "Image processing is unavailable"
+
+        if self._pending >= self._max_pending:
+            self._rejected += 1
+            raise ImageProcessorUnavailableError(busy_message)
+
+        self._pending += 1
+        try:
+            if self._max_workers <= 0:
+                result = await asyncio.to_thread(process_image, content, spec)
+            else:
+                result = await asyncio.get_running_loop().run_in_executor(
+                    self._pool(), process_image, content, spec
+                )
+        except BrokenProcessPool as exc:
+            # A worker died (e.g. killed for memory); start a fresh pool next time.
+            self.shutdown()
+            raise ImageProcessorUnavailableError(broken_message) from exc
+        finally:
+            self._pending -= 1
+        self._completed += 1
+        return result
+
+    def stats(self) -> ImageProcessorStats:
+        return ImageProcessorStats(
+            max_workers=self._max_workers,
+            max_pending=self._max_pending,
+            pending=self._pending,
+            completed=self._completed,
+            rejected=self._rejected,
+        )
+
+    def shutdown(self) -> None:
+        """Stop the worker processes; a later call starts a new pool."""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Spawned rather than forked: the API process runs threads (object
+            # storage, logging) whose locks a forked child would inherit.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+
+image_processor = ImageProcessor(
+    max_workers=settings.IMAGE_PROCESS_WORKERS,
+    max_pending=settings.IMAGE_PROCESS_MAX_PENDING,
+)
@@ -1,19 +1,38 @@
-"""JSON logging configuration for the API."""
+"""JSON logging configuration for the API.
+
+Loggers hand records to a bounded queue; a writer thread formats them and
+writes each batch to stdout with one ``write``. The event loop never blocks on
+formatting or on a slow stdout, and when the queue is full records are
+dropped and counted instead.
+"""
 
 from __future__ import annotations
 
+import atexit
 from collections.abc import Mapping
 from contextvars import ContextVar, Token
+import copy
+from dataclasses import dataclass
 from datetime import UTC, datetime
+from functools import lru_cache
 import json
 import logging
+from logging.handlers import QueueHandler
+import queue
 import re
 import sys
+import threading
+import time
 import traceback
-from typing import Any
+from typing import Any, TextIO
 
 from core.foundation.infra.config import settings
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 _REQUEST_CONTEXT: ContextVar[dict[str, str | None] | None] = ContextVar(
     "request_context", default=None
 )
@@ -58,6 +77,9 @@ _SENSITIVE_VALUE_PATTERN = re.compile(
 )
 _BEARER_TOKEN_PATTERN = re.compile(r"(?i)\bbearer\s+[a-z0-9._~+/=-]+")
 _REDACTED = "[REDACTED]"
+_WRITE_BATCH_SIZE = 256
+_STOP_TIMEOUT_SECONDS = 5.0
+_STOP = object()
 
 
 def bind_request_context(
@@ -87,6 +109,10 @@ def reset_request_context(token: Token[dict[str, str | None]]) -> None:
 
 
 def redact(value: Any) -> Any:
+    if isinstance(value, str):
+        return _redact_text(value)
+    if value is None or isinstance(value, int | float):
+        return value
     if isinstance(value, Mapping):
         return {
             str(key): _REDACTED if _is_sensitive_key(str(key)) else redact(item)
@@ -94,8 +120,6 @@ def redact(value: Any) -> Any:
         }
     if isinstance(value, list | tuple | set | frozenset):
         return [redact(item) for item in value]
-    if isinstance(value, str):
-        return _redact_text(value)
     return value
 
 
@@ -105,6 +129,10 @@ def _is_sensitive_key(key: str) -> bool:
 
 
 def _redact_text(value: str) -> str:
+    # Both patterns need a ``:``/``=`` separator or the word "bearer"; constant
+    # messages such as "request_completed" skip the regexes entirely.
+    if "=" not in value and ":" not in value and "bearer" not in value.lower():
+        return value
     value = _SENSITIVE_VALUE_PATTERN.sub(lambda match: f"{match.group(1)}={_REDACTED}", value)
     return _BEARER_TOKEN_PATTERN.sub(f"Bearer {_REDACTED}", value)
 
@@ -113,25 +141,53 @@ def _timestamp() -> str:
     return datetime.now(UTC).isoformat(timespec="milliseconds").replace("+00:00", "Z")
 
 
+def _record_timestamp(record: logging.LogRecord) -> str:
+    return f"{_utc_second(int(record.created))}.{int(record.msecs):03d}Z"
+
+
+@lru_cache(maxsize=8)
+def _utc_second(seconds: int) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds))
+
+
+if orjson is not None:
+
+    def _dumps(payload: dict[str, Any]) -> str:
+        return orjson.dumps(payload, default=str).decode()
+
+else:
+    _dumps = json.JSONEncoder(default=str, separators=(",", ":")).encode
+
+
 class JsonLogFormatter(logging.Formatter):
+    """Serializes records as one JSON object per line.
+
+    The deployment fields never change, so they are serialized once into a
+    prefix that every line starts with.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        static_fields = _dumps(
+            {
+                "environment": settings.ENV,
+                "git_sha": settings.GIT_SHA,
+                "service": settings.LOG_SERVICE_NAME,
+                "version": settings.VERSION,
+            }
+        )
+        self._prefix = f"{static_fields[:-1]},"
+
     def format(self, record: logging.LogRecord) -> str:
         try:
             payload: dict[str, Any] = {
-                "timestamp": _timestamp(),
+                "timestamp": _record_timestamp(record),
                 "level": record.levelname,
-                "service": settings.LOG_SERVICE_NAME,
-                "environment": settings.ENV,
-                "version": settings.VERSION,
-                "git_sha": settings.GIT_SHA,
                 "message": _redact_text(record.getMessage()),
             }
-            payload.update(
-                {
-                    key: value
-                    for key, value in (_REQUEST_CONTEXT.get() or {}).items()
-                    if value is not None
-                }
-            )
+            context = _record_context(record)
+            if context:
+                payload.update((key, value) for key, value in context.items() if value is not None)
             payload.update(self._safe_extras(record))
 
             if record.exc_info:
@@ -143,7 +199,7 @@ class JsonLogFormatter(logging.Formatter):
                     ),
                 }
 
-            return json.dumps(payload, default=str, separators=(",", ":"), sort_keys=True)
+            return self._prefix + _dumps(payload)[1:]
         except Exception:
             return json.dumps(
                 {
@@ -161,32 +217,169 @@ class JsonLogFormatter(logging.Formatter):
 
     @staticmethod
     def _safe_extras(record: logging.LogRecord) -> dict[str, Any]:
+        fields = record.__dict__
         return {
-            key: redact(value)
-            for key, value in record.__dict__.items()
-            if key in _SAFE_EXTRA_FIELDS and value is not None
+            key: redact(fields[key]) for key in _SAFE_EXTRA_FIELDS if fields.get(key) is not None
         }
 
 
+def _record_context(record: logging.LogRecord) -> dict[str, str | None] | None:
+    """Request context captured on the emitting task, else the current one."""
+    if hasattr(record, "request_context"):
+        return record.request_context
+    return _REQUEST_CONTEXT.get()
+
+
 class SafeStreamHandler(logging.StreamHandler):
     def handleError(self, _record: logging.LogRecord) -> None:  # noqa: N802
         return None
 
 
+@dataclass(frozen=True)
+class LoggingStats:
+    queued: int
+    dropped: int
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Hands records to the writer thread without formatting them.
+
+    The request context lives in a ``ContextVar`` of the emitting task, so it
+    is copied onto the record here; the message is interpolated eagerly so
+    mutable arguments are captured as they were when logged.
+    """
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        try:
+            record.msg = record.getMessage()
+            record.args = None
+        except Exception:
+            pass  # Left for the formatter, which emits its fallback line.
+        record.request_context = _REQUEST_CONTEXT.get()
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def handleError(self, _record: logging.LogRecord) -> None:  # noqa: N802
+        return None
+
+
+class BatchingLogWriter:
+    """Drains the log queue on a daemon thread, one ``write`` per batch."""
+
+    def __init__(
+        self,
+        log_queue: queue.Queue,
+        stream: TextIO,
+        formatter: logging.Formatter,
+        *,
+        batch_size: int = _WRITE_BATCH_SIZE,
+    ) -> None:
+        self._queue = log_queue
+        self._stream = stream
+        self._formatter = formatter
+        self._batch_size = batch_size
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = _STOP_TIMEOUT_SECONDS) -> None:
+        """Write everything queued so far and stop the thread."""
+        thread, self._thread = self._thread, None
+        if thread is None or not thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self._batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            records = [record for record in batch if record is not _STOP]
+            if records:
+                self._write(records)
+            if len(records) != len(batch):
+                return
+
+    def _write(self, records: list[logging.LogRecord]) -> None:
+        text = "".join(f"{self._formatter.format(record)}\n" for record in records)
+        try:
+            self._stream.write(text)
+            self._stream.flush()
+        except Exception:
+            return  # Logging must never fail the process, same as SafeStreamHandler.
+
+
+_queue_handler: NonBlockingQueueHandler | None = None
+_writer: BatchingLogWriter | None = None
+
+
 def configure_logging() -> None:
+    global _queue_handler, _writer  # noqa: PLW0603
+
     root_logger = logging.getLogger()
     root_logger.setLevel(logging.DEBUG if settings.DEBUG else logging.INFO)
 
+    if _writer is not None:
+        _writer.stop()
     for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
 
-    handler = SafeStreamHandler(sys.stdout)
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    formatter = JsonLogFormatter()
+    handler = NonBlockingQueueHandler(log_queue)
     handler.setLevel(logging.DEBUG if settings.DEBUG else logging.INFO)
-    handler.setFormatter(JsonLogFormatter())
+    handler.setFormatter(formatter)
+    _writer = BatchingLogWriter(log_queue, sys.stdout, formatter)
+    _writer.start()
+    _queue_handler = handler
     root_logger.addHandler(handler)
     logging.raiseExceptions = False
 
 
+def shutdown_logging() -> None:
+    """Flush queued records and log synchronously from then on.
+
+    Runs on application shutdown and at interpreter exit, so records emitted
+    while the process winds down are still written.
+    """
+    global _queue_handler, _writer  # noqa: PLW0603
+
+    if _writer is None or _queue_handler is None:
+        return
+    root_logger = logging.getLogger()
+    root_logger.removeHandler(_queue_handler)
+    _writer.stop()
+
+    handler = SafeStreamHandler(sys.stdout)
+    handler.setLevel(_queue_handler.level)
+    handler.setFormatter(_queue_handler.formatter)
+    root_logger.addHandler(handler)
+    _queue_handler = None
+    _writer = None
+
+
+def logging_stats() -> LoggingStats:
+    if _queue_handler is None:
+        return LoggingStats(queued=0, dropped=0)
+    return LoggingStats(queued=_queue_handler.queue.qsize(), dropped=_queue_handler.dropped)
+
+
 def setup_logger(name: str = "restorio") -> logging.Logger:
     configure_logging()
     log = logging.getLogger(name)
@@ -196,3 +389,4 @@ def setup_logger(name: str = "restorio") -> logging.Logger:
 
 
 logger = setup_logger()
+atexit.register(shutdown_logging)
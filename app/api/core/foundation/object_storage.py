@@ -0,0 +1,408 @@
+"""Async access to the media bucket shared by every storage service.
+
+The MinIO SDK is blocking. ``ObjectStorage`` runs each call of a backend on
+one bounded thread pool, so a slow bucket can occupy at most
+``OBJECT_STORAGE_MAX_WORKERS`` threads and never the event loop, and records
+the latency of every operation for ``/health/storage``.
+
+``MinioObjectStorageBackend`` builds the internal and the public client once,
+on a single urllib3 connection pool sized to the thread pool.
+``MemoryObjectStorageBackend`` keeps objects in a dict; select it with
+``OBJECT_STORAGE_BACKEND=memory`` for tests and local runs without MinIO.
+
+The bucket and its public-read policy are provisioned once, by
+``bootstrap_bucket`` in a background task the application lifespan starts, so
+an unreachable MinIO never delays startup. Services call
+``ensure_bucket_ready``, which only talks to the bucket until provisioning has
+succeeded; a ``NoSuchBucket`` error or ``invalidate_bucket`` makes the next
+call provision it again.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from io import BytesIO
+import json
+import logging
+from threading import Lock
+from time import perf_counter
+from typing import Protocol, TypeVar
+from urllib.parse import quote
+
+from minio import Minio
+import urllib3
+
+from core.foundation.infra.config import Settings, settings
+
+_T = TypeVar("_T")
+
+logger = logging.getLogger(__name__)
+
+PUBLIC_READ_PREFIXES = ("tenant-logos", "tenant-mobile-favicons", "menu-items")
+# Presigned uploads land here until finalized; leftovers are swept by the scheduler.
+TEMP_UPLOAD_PREFIX = "tmp/"
+
+
+def public_read_policy(bucket: str) -> str:
+    """Bucket policy that lets anyone list the bucket and read the public prefixes."""
+    return json.dumps(
+        {
+            "Version": "2012-10-17",
+            "Statement": [
+                {
+                    "Effect": "Allow",
+                    "Principal": {"AWS": "*"},
+                    "Action": ["s3:GetBucketLocation", "s3:ListBucket"],
+                    "Resource": f"arn:aws:s3:::{bucket}",
+                },
+                {
+                    "Effect": "Allow",
+                    "Principal": {"AWS": "*"},
+                    "Action": "s3:GetObject",
+                    "Resource": [
+                        f"arn:aws:s3:::{bucket}/{prefix}/*" for prefix in PUBLIC_READ_PREFIXES
+                    ],
+                },
+            ],
+        }
+    )
+
+
+class ObjectStorageBackend(Protocol):
+    """Blocking operations on one bucket."""
+
+    def bucket_exists(self) -> bool: ...
+
+    def ensure_public_bucket(self) -> None: ...
+
+    def stat_size(self, key: str) -> int: ...
+
+    def get_bytes(self, key: str) -> bytes: ...
+
+    def put_bytes(self, key: str, data: bytes, content_type: str) -> None: ...
+
+    def remove(self, key: str) -> None: ...
+
+    def list_keys(self, prefix: str) -> list[str]: ...
+
+    def list_keys_modified_before(self, prefix: str, cutoff: datetime) -> list[str]: ...
+
+    def presigned_put_url(self, key: str, expires: timedelta) -> str: ...
+
+    def presigned_get_url(self, key: str, expires: timedelta) -> str: ...
+
+
+class MinioObjectStorageBackend:
+    """One bucket reached through an internal client and a public (presigning) client."""
+
+    def __init__(self, internal: Minio, public: Minio, bucket: str) -> None:
+        self._internal = internal
+        self._public = public
+        self._bucket = bucket
+
+    @classmethod
+    def from_settings(cls, app_settings: Settings) -> MinioObjectStorageBackend:
+        http_client = urllib3.PoolManager(
+            maxsize=app_settings.OBJECT_STORAGE_MAX_WORKERS,
+            timeout=urllib3.Timeout(connect=5, read=60),
+            retries=urllib3.Retry(
+                total=5, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504]
+            ),
+        )
+        internal = Minio(
+            app_settings.MINIO_ENDPOINT,
+            access_key=app_settings.MINIO_ACCESS_KEY,
+            secret_key=app_settings.MINIO_SECRET_KEY,
+            secure=app_settings.MINIO_SECURE,
+            region=app_settings.MINIO_REGION,
+            http_client=http_client,
+        )
+        public = Minio(
+            app_settings.MINIO_PUBLIC_ENDPOINT,
+            access_key=app_settings.MINIO_ACCESS_KEY,
+            secret_key=app_settings.MINIO_SECRET_KEY,
+            secure=app_settings.MINIO_PUBLIC_SECURE,
+            region=app_settings.MINIO_REGION,
+            http_client=http_client,
+        )
+        return cls(internal, public, app_settings.MINIO_BUCKET)
+
+    def bucket_exists(self) -> bool:
+        return self._internal.bucket_exists(self._bucket)
+
+    def ensure_public_bucket(self) -> None:
+        if not self._internal.bucket_exists(self._bucket):
+            self._internal.make_bucket(self._bucket)
+        self._internal.set_bucket_policy(self._bucket, public_read_policy(self._bucket))
+
+    def stat_size(self, key: str) -> int:
+        return int(self._internal.stat_object(self._bucket, key).size)
+
+    def get_bytes(self, key: str) -> bytes:
+        response = self._internal.get_object(self._bucket, key)
+        try:
+            return response.read()
+        finally:
+            response.close()
+            response.release_conn()
+
+    def put_bytes(self, key: str, data: bytes, content_type: str) -> None:
+        self._internal.put_object(
+            self._bucket, key, BytesIO(data), len(data), content_type=content_type
+        )
+
+    def remove(self, key: str) -> None:
+        self._internal.remove_object(self._bucket, key)
+
+    def list_keys(self, prefix: str) -> list[str]:
+        return [
+            obj.object_name
+            for obj in self._internal.list_objects(self._bucket, prefix=prefix, recursive=True)
+        ]
+
+    def list_keys_modified_before(self, prefix: str, cutoff: datetime) -> list[str]:
+        return [
+            obj.object_name
+            for obj in self._internal.list_objects(self._bucket, prefix=prefix, recursive=True)
+            if obj.last_modified is not None and obj.last_modified < cutoff
+        ]
+
+    def presigned_put_url(self, key: str, expires: timedelta) -> str:
+        return self._public.presigned_put_object(self._bucket, key, expires=expires)
+
+    def presigned_get_url(self, key: str, expires: timedelta) -> str:
+        return self._public.presigned_get_object(self._bucket, key, expires=expires)
+
+
+class MemoryObjectStorageBackend:
+    """Objects kept in a dict; presigned URLs use a ``memory://`` scheme."""
+
+    def __init__(self, bucket: str = "memory") -> None:
+        self._bucket = bucket
+        self._bucket_ready = False
+        self._objects: dict[str, tuple[bytes, str, datetime]] = {}
+        self._lock = Lock()
+
+    def bucket_exists(self) -> bool:
+        return self._bucket_ready
+
+    def ensure_public_bucket(self) -> None:
+        self._bucket_ready = True
+
+    def stat_size(self, key: str) -> int:
+        return len(self._object(key)[0])
+
+    def get_bytes(self, key: str) -> bytes:
+        return self._object(key)[0]
+
+    def put_bytes(self, key: str, data: bytes, content_type: str) -> None:
+        with self._lock:
+            self._objects[key] = (bytes(data), content_type, datetime.now(UTC))
+
+    def remove(self, key: str) -> None:
+        with self._lock:
+            self._objects.pop(key, None)
+
+    def list_keys(self, prefix: str) -> list[str]:
+        with self._lock:
+            return sorted(key for key in self._objects if key.startswith(prefix))
+
+    def list_keys_modified_before(self, prefix: str, cutoff: datetime) -> list[str]:
+        with self._lock:
+            return sorted(
+                key
+                for key, (_, _, modified) in self._objects.items()
+                if key.startswith(prefix) and modified < cutoff
+            )
+
+    def presigned_put_url(self, key: str, expires: timedelta) -> str:
+        return self._url(key, expires)
+
+    def presigned_get_url(self, key: str, expires: timedelta) -> str:
+        return self._url(key, expires)
+
+    def _object(self, key: str) -> tuple[bytes, str, datetime]:
+        with self._lock:
+            entry = self._objects.get(key)
+        if entry is None:
+            raise KeyError(key)
+        return entry
+
+    def _url(self, key: str, expires: timedelta) -> str:
+        seconds = int(expires.total_seconds())
+        return f"memory://{self._bucket}/{quote(key, safe='/')}?expires={seconds}"
+
+
+@dataclass(frozen=True)
+class OperationStats:
+    calls: int
+    errors: int
+    total_ms: float
+    max_ms: float
+
+
+@dataclass(frozen=True)
+class ObjectStorageStats:
+    max_workers: int
+    bucket_ready: bool
+    operations: dict[str, OperationStats]
+
+
+class ObjectStorage:
+    """Async facade over an ``ObjectStorageBackend`` with a bounded thread pool."""
+
+    def __init__(
+        self,
+        backend: ObjectStorageBackend,
+        *,
+        max_workers: int = 8,
+        bootstrap_attempts: int = 5,
+        bootstrap_backoff_seconds: float = 0.5,
+    ) -> None:
+        self.backend = backend
+        self._max_workers = max_workers
+        self._bootstrap_attempts = bootstrap_attempts
+        self._bootstrap_backoff_seconds = bootstrap_backoff_seconds
+        self._executor: ThreadPoolExecutor | None = None
+        self._latency: dict[str, tuple[int, int, float, float]] = {}
+        self._lock = Lock()
+        self._bucket_ready = False
+
+    @property
+    def bucket_ready(self) -> bool:
+        return self._bucket_ready
+
+    async def bootstrap_bucket(self) -> bool:
+        """Provision the bucket and policy, retrying with exponential backoff.
+
+        Returns whether it succeeded; when it did not, the first request that
+        needs the bucket tries again.
+        """
+        for attempt in range(1, self._bootstrap_attempts + 1):
+            try:
+                await self.ensure_bucket_ready(force=True)
+            except Exception:
+                logger.warning(
+                    "Object storage bucket bootstrap failed (attempt %d of %d)",
+                    attempt,
+                    self._bootstrap_attempts,
+                    exc_info=True,
+                )
+                if attempt < self._bootstrap_attempts:
+                    await asyncio.sleep(self._bootstrap_backoff_seconds * 2 ** (attempt - 1))
+            else:
+                return True
+        return False
+
+    async def ensure_bucket_ready(self, *, force: bool = False) -> None:
+        """Create the bucket and apply its policy unless that already succeeded."""
+        if self._bucket_ready and not force:
+            return
+        await self.ensure_public_bucket()
+        self._bucket_ready = True
+
+    def invalidate_bucket(self) -> None:
+        """Verify the bucket and policy again on the next ``ensure_bucket_ready``."""
+        self._bucket_ready = False
+
+    async def bucket_exists(self) -> bool:
+        return await self._run("bucket_exists", self.backend.bucket_exists)
+
+    async def ensure_public_bucket(self) -> None:
+        await self._run("ensure_public_bucket", self.backend.ensure_public_bucket)
+
+    async def stat_size(self, key: str) -> int:
+        return await self._run("stat_size", self.backend.stat_size, key)
+
+    async def get_bytes(self, key: str) -> bytes:
+        return await self._run("get_bytes", self.backend.get_bytes, key)
+
+    async def put_bytes(self, key: str, data: bytes, content_type: str) -> None:
+        await self._run("put_bytes", self.backend.put_bytes, key, data, content_type)
+
+    async def remove(self, key: str) -> None:
+        await self._run("remove", self.backend.remove, key)
+
+    async def list_keys(self, prefix: str) -> list[str]:
+        return await self._run("list_keys", self.backend.list_keys, prefix)
+
+    async def list_keys_modified_before(self, prefix: str, cutoff: datetime) -> list[str]:
+        return await self._run(
+            "list_keys_modified_before", self.backend.list_keys_modified_before, prefix, cutoff
+        )
+
+    async def presigned_put_url(self, key: str, expires: timedelta) -> str:
+        return await self._run("presigned_put_url", self.backend.presigned_put_url, key, expires)
+
+    async def presigned_get_url(self, key: str, expires: timedelta) -> str:
+        return await self._run("presigned_get_url", self.backend.presigned_get_url, key, expires)
+
+    def stats(self) -> ObjectStorageStats:
+        with self._lock:
+            operations = {
+                name: OperationStats(
+                    calls=calls,
+                    errors=errors,
+                    total_ms=round(total * 1_000, 3),
+                    max_ms=round(peak * 1_000, 3),
+                )
+                for name, (calls, errors, total, peak) in sorted(self._latency.items())
+            }
+        return ObjectStorageStats(
+            max_workers=self._max_workers, bucket_ready=self._bucket_ready, operations=operations
+        )
+
+    def shutdown(self) -> None:
+        """Stop the worker threads; a later call starts a new pool."""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _run(self, operation: str, func: Callable[..., _T], *args: object) -> _T:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._max_workers, thread_name_prefix="object-storage"
+            )
+        started = perf_counter()
+        failed = True
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        except Exception as exc:
+            if getattr(exc, "code", None) == "NoSuchBucket":
+                self.invalidate_bucket()
+            raise
+        else:
+            failed = False
+            return result
+        finally:
+            self._record(operation, perf_counter() - started, failed=failed)
+
+    def _record(self, operation: str, elapsed: float, *, failed: bool) -> None:
+        with self._lock:
+            calls, errors, total, peak = self._latency.get(operation, (0, 0, 0.0, 0.0))
+            self._latency[operation] = (
+                calls + 1,
+                errors + int(failed),
+                total + elapsed,
+                max(peak, elapsed),
+            )
+
+
+def build_object_storage(app_settings: Settings) -> ObjectStorage:
+    if app_settings.OBJECT_STORAGE_BACKEND.strip().lower() == "memory":
+        backend: ObjectStorageBackend = MemoryObjectStorageBackend(app_settings.MINIO_BUCKET)
+    else:
+        backend = MinioObjectStorageBackend.from_settings(app_settings)
+    return ObjectStorage(
+        backend,
+        max_workers=app_settings.OBJECT_STORAGE_MAX_WORKERS,
+        bootstrap_attempts=app_settings.OBJECT_STORAGE_BOOTSTRAP_ATTEMPTS,
+        bootstrap_backoff_seconds=app_settings.OBJECT_STORAGE_BOOTSTRAP_BACKOFF_SECONDS,
+    )
+
+
+object_storage = build_object_storage(settings)
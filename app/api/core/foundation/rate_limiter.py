@@ -0,0 +1,98 @@
+"""Bounded in-memory GCRA rate limiter.
+
+Each key stores a single theoretical arrival time, so a check is O(1) no
+matter how large the limit is. The key table is capped. When it is full, keys
+whose allowance has already refilled are dropped first (they lose nothing and
+count as expirations). If none has, the least recently used key is evicted and
+counted as an eviction: a new client is never denied because the table is full,
+and a client that keeps hitting its limit keeps its key recently used.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from time import monotonic
+
+_EPSILON = 1e-9
+# A full table of throttled keys is swept at most this often, so a flood of new
+# keys evicts in O(1) instead of rescanning the table on every request.
+_SWEEP_INTERVAL_SECONDS = 1.0
+
+
+@dataclass(frozen=True)
+class RateLimiterStats:
+    keys: int
+    evictions: int
+    expirations: int
+
+
+class GcraRateLimiter:
+    def __init__(
+        self,
+        *,
+        max_keys: int = 10_000,
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        self._tats: OrderedDict[str, float] = OrderedDict()
+        self._max_keys = max_keys
+        self._clock = clock
+        self._evictions = 0
+        self._expirations = 0
+        self._last_sweep: float | None = None
+
+    def hit(self, key: str, *, limit: int, window_seconds: float) -> tuple[bool, int]:
+        """Count one request for ``key``.
+
+        Allows a burst of ``limit`` requests per ``window_seconds`` and returns
+        ``(limited, remaining)``. Limited requests do not consume allowance.
+        """
+        now = self._clock()
+        interval = window_seconds / limit
+        known = key in self._tats
+        if known:
+            self._tats.move_to_end(key)
+        tat = max(self._tats.get(key, now), now)
+        new_tat = tat + interval
+        if new_tat - now > window_seconds + _EPSILON:
+            return True, 0
+        if not known:
+            self._make_room(now)
+
+        self._tats[key] = new_tat
+        return False, int((window_seconds - (new_tat - now)) / interval + _EPSILON)
+
+    def sweep(self) -> int:
+        """Drop every key whose allowance has fully refilled."""
+        now = self._clock()
+        self._last_sweep = now
+        expired = [key for key, tat in self._tats.items() if tat <= now]
+        for key in expired:
+            del self._tats[key]
+        self._expirations += len(expired)
+        return len(expired)
+
+    def clear(self) -> None:
+        self._tats.clear()
+
+    def stats(self) -> RateLimiterStats:
+        return RateLimiterStats(
+            keys=len(self._tats),
+            evictions=self._evictions,
+            expirations=self._expirations,
+        )
+
+    def _make_room(self, now: float) -> None:
+        if len(self._tats) < self._max_keys:
+            return
+        oldest_key, oldest_tat = next(iter(self._tats.items()))
+        if oldest_tat <= now:
+            del self._tats[oldest_key]
+            self._expirations += 1
+            return
+        if self._last_sweep is None or now - self._last_sweep >= _SWEEP_INTERVAL_SECONDS:
+            self.sweep()
+        while self._tats and len(self._tats) >= self._max_keys:
+            self._tats.popitem(last=False)
+            self._evictions += 1
@@ -0,0 +1,395 @@
+"""Periodic background jobs run from the application lifespan.
+
+Jobs fire on an ``IntervalTrigger`` (every N seconds) or a ``CronTrigger``
+(five-field cron expression in UTC: minute, hour, day of month, month, day of
+week). Every run is delayed by a random ``jitter_seconds`` so workers started
+together do not hit the database at the same instant, and a job never
+overlaps itself.
+
+Every worker runs the scheduler, but jobs registered with ``leader_only``
+(the default) only execute on the worker that holds the leader lock: a
+Postgres session-level advisory lock kept on one dedicated connection
+(``SCHEDULER_LEADER_LOCK=postgres``). When that connection drops, another
+worker takes over at its next due run. ``SCHEDULER_LEADER_LOCK=local`` makes
+every process its own leader, for single-worker and local runs. Jobs that
+clean up per-process state register with ``leader_only=False``.
+
+Per-job run counts, durations and last outcome are exposed on
+``/health/scheduler``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from contextlib import suppress
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+import logging
+import random
+from time import perf_counter
+from typing import Protocol
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from core.foundation.infra.config import Settings
+
+logger = logging.getLogger(__name__)
+
+# (low, high) of minute, hour, day of month, month, day of week; 7 is also Sunday.
+_CRON_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+_CRON_FIELD_COUNT = len(_CRON_RANGES)
+# A cron expression that has not matched within this horizon never will (e.g. 30 February).
+_CRON_HORIZON = timedelta(days=366 * 4)
+
+
+class Trigger(Protocol):
+    def next_after(self, moment: datetime) -> datetime: ...
+
+
+@dataclass(frozen=True)
+class IntervalTrigger:
+    seconds: float
+
+    def next_after(self, moment: datetime) -> datetime:
+        return moment + timedelta(seconds=self.seconds)
+
+    def __str__(self) -> str:
+        return f"every {self.seconds:g}s"
+
+
+def _parse_cron_field(field: str, low: int, high: int) -> frozenset[int]:
+    invalid_message = f"Invalid cron field: {field!r}"
+
+    values: set[int] = set()
+    for part in field.split(","):
+        expression, _, step_text = part.partition("/")
+        try:
+            step = int(step_text) if step_text else 1
+            if expression == "*":
+                start, end = low, high
+            elif "-" in expression:
+                first, last = expression.split("-", 1)
+                start, end = int(first), int(last)
+            else:
+                start = int(expression)
+                end = high if step_text else start
+        except ValueError as exc:
+            raise ValueError(invalid_message) from exc
+        if step < 1 or start < low or end > high or start > end:
+            raise ValueError(invalid_message)
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+@dataclass(frozen=True)
+class CronTrigger:
+    expression: str
+    minutes: frozenset[int]
+    hours: frozenset[int]
+    days: frozenset[int]
+    months: frozenset[int]
+    weekdays: frozenset[int]
+
+    @classmethod
+    def parse(cls, expression: str) -> CronTrigger:
+        fields = expression.split()
+        if len(fields) != _CRON_FIELD_COUNT:
+            msg = f"Cron expression needs {_CRON_FIELD_COUNT} fields: {expression!r}"
+            raise ValueError(msg)
+        minutes, hours, days, months, weekdays = (
+            _parse_cron_field(field, low, high)
+            for field, (low, high) in zip(fields, _CRON_RANGES, strict=True)
+        )
+        return cls(
+            expression=expression,
+            minutes=minutes,
+            hours=hours,
+            days=days,
+            months=months,
+            weekdays=frozenset(day % 7 for day in weekdays),
+        )
+
+    def next_after(self, moment: datetime) -> datetime:
+        never_message = f"Cron expression never fires: {self.expression!r}"
+
+        candidate = moment.astimezone(UTC).replace(second=0, microsecond=0)
+        candidate += timedelta(minutes=1)
+        horizon = candidate + _CRON_HORIZON
+        while candidate < horizon:
+            if candidate.month not in self.months:
+                candidate = (candidate.replace(day=1) + timedelta(days=32)).replace(
+                    day=1, hour=0, minute=0
+                )
+            elif not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+            elif candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(never_message)
+
+    def _day_matches(self, moment: datetime) -> bool:
+        in_days = moment.day in self.days
+        in_weekdays = (moment.weekday() + 1) % 7 in self.weekdays
+        # As in cron: when both day fields are restricted, either one matching is enough.
+        if len(self.days) < len(range(1, 32)) and len(self.weekdays) < len(range(7)):
+            return in_days or in_weekdays
+        return in_days and in_weekdays
+
+    def __str__(self) -> str:
+        return f"cron {self.expression}"
+
+
+class LeaderLock(Protocol):
+    async def is_leader(self) -> bool: ...
+
+    async def release(self) -> None: ...
+
+
+class LocalLeaderLock:
+    """Every process is the leader."""
+
+    async def is_leader(self) -> bool:
+        return True
+
+    async def release(self) -> None:
+        return None
+
+
+class PostgresLeaderLock:
+    """Leadership is a session-level advisory lock held on one dedicated connection."""
+
+    def __init__(self, engine: AsyncEngine, lock_id: int) -> None:
+        self._engine = engine
+        self._lock_id = lock_id
+        self._connection: AsyncConnection | None = None
+        self._guard = asyncio.Lock()
+
+    async def is_leader(self) -> bool:
+        async with self._guard:
+            if self._connection is not None:
+                try:
+                    await self._connection.execute(text("SELECT 1"))
+                except Exception:
+                    logger.warning("Scheduler lost its leader connection")
+                    await self._discard()
+                else:
+                    return True
+            return await self._try_acquire()
+
+    async def release(self) -> None:
+        async with self._guard:
+            if self._connection is not None:
+                with suppress(Exception):
+                    await self._connection.execute(
+                        text("SELECT pg_advisory_unlock(:lock_id)"), {"lock_id": self._lock_id}
+                    )
+                await self._discard()
+
+    async def _try_acquire(self) -> bool:
+        try:
+            connection = await self._engine.connect()
+        except Exception:
+            logger.warning("Scheduler could not connect to elect a leader")
+            return False
+        try:
+            # Autocommit, so holding the lock does not leave a transaction open.
+            await connection.execution_options(isolation_level="AUTOCOMMIT")
+            result = await connection.execute(
+                text("SELECT pg_try_advisory_lock(:lock_id)"), {"lock_id": self._lock_id}
+            )
+            acquired = bool(result.scalar())
+        except Exception:
+            logger.warning("Scheduler leader election failed")
+            acquired = False
+        if not acquired:
+            await connection.close()
+            return False
+        logger.info("Scheduler acquired leadership")
+        self._connection = connection
+        return True
+
+    async def _discard(self) -> None:
+        connection, self._connection = self._connection, None
+        if connection is not None:
+            with suppress(Exception):
+                await connection.close()
+
+
+@dataclass(frozen=True)
+class JobStats:
+    trigger: str
+    leader_only: bool
+    running: bool
+    runs: int
+    successes: int
+    failures: int
+    skipped: int
+    last_started_at: str | None
+    last_success_at: str | None
+    last_failure_at: str | None
+    last_error: str | None
+    last_duration_ms: float | None
+    max_duration_ms: float
+    next_run_at: str | None
+
+
+@dataclass(frozen=True)
+class SchedulerStats:
+    running: bool
+    jobs: dict[str, JobStats]
+
+
+def _iso(moment: datetime | None) -> str | None:
+    return moment.isoformat() if moment else None
+
+
+class _Job:
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], Awaitable[object]],
+        trigger: Trigger,
+        *,
+        jitter_seconds: float,
+        leader_only: bool,
+    ) -> None:
+        self.name = name
+        self.func = func
+        self.trigger = trigger
+        self.jitter_seconds = jitter_seconds
+        self.leader_only = leader_only
+        self.running = False
+        self.runs = 0
+        self.successes = 0
+        self.failures = 0
+        self.skipped = 0
+        self.last_started_at: datetime | None = None
+        self.last_success_at: datetime | None = None
+        self.last_failure_at: datetime | None = None
+        self.last_error: str | None = None
+        self.last_duration_ms: float | None = None
+        self.max_duration_ms = 0.0
+        self.next_run_at: datetime | None = None
+
+    def stats(self) -> JobStats:
+        return JobStats(
+            trigger=str(self.trigger),
+            leader_only=self.leader_only,
+            running=self.running,
+            runs=self.runs,
+            successes=self.successes,
+            failures=self.failures,
+            skipped=self.skipped,
+            last_started_at=_iso(self.last_started_at),
+            last_success_at=_iso(self.last_success_at),
+            last_failure_at=_iso(self.last_failure_at),
+            last_error=self.last_error,
+            last_duration_ms=self.last_duration_ms,
+            max_duration_ms=self.max_duration_ms,
+            next_run_at=_iso(self.next_run_at),
+        )
+
+
+class Scheduler:
+    """Runs each registered job in its own task until ``stop``."""
+
+    def __init__(
+        self,
+        *,
+        leader: LeaderLock | None = None,
+        clock: Callable[[], datetime] = lambda: datetime.now(UTC),
+        jitter: Callable[[float], float] = lambda bound: random.uniform(0, bound),
+    ) -> None:
+        self._leader = leader or LocalLeaderLock()
+        self._clock = clock
+        self._jitter = jitter
+        self._jobs: dict[str, _Job] = {}
+        self._tasks: list[asyncio.Task[None]] = []
+
+    def add_job(
+        self,
+        name: str,
+        func: Callable[[], Awaitable[object]],
+        trigger: Trigger,
+        *,
+        jitter_seconds: float = 0.0,
+        leader_only: bool = True,
+    ) -> None:
+        if name in self._jobs:
+            msg = f"Job {name!r} is already scheduled"
+            raise ValueError(msg)
+        self._jobs[name] = _Job(
+            name, func, trigger, jitter_seconds=jitter_seconds, leader_only=leader_only
+        )
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._loop(job)) for job in self._jobs.values()]
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            with suppress(asyncio.CancelledError):
+                await task
+        await self._leader.release()
+
+    async def run_job(self, name: str) -> bool:
+        """Run ``name`` now, unless it is leader-only and this worker is not the leader."""
+        job = self._jobs[name]
+        if job.leader_only and not await self._leader.is_leader():
+            job.skipped += 1
+            return False
+        await self._execute(job)
+        return True
+
+    def stats(self) -> SchedulerStats:
+        return SchedulerStats(
+            running=bool(self._tasks),
+            jobs={name: job.stats() for name, job in self._jobs.items()},
+        )
+
+    async def _loop(self, job: _Job) -> None:
+        while True:
+            now = self._clock()
+            delay = (job.trigger.next_after(now) - now).total_seconds()
+            if job.jitter_seconds > 0:
+                delay += self._jitter(job.jitter_seconds)
+            job.next_run_at = now + timedelta(seconds=delay)
+            await asyncio.sleep(max(0.0, delay))
+            await self.run_job(job.name)
+
+    async def _execute(self, job: _Job) -> None:
+        job.running = True
+        job.runs += 1
+        job.last_started_at = self._clock()
+        start = perf_counter()
+        try:
+            await job.func()
+        except Exception as exc:
+            logger.exception("Scheduled job %s failed", job.name)
+            job.failures += 1
+            job.last_failure_at = self._clock()
+            job.last_error = str(exc) or type(exc).__name__
+        else:
+            job.successes += 1
+            job.last_success_at = self._clock()
+        finally:
+            job.running = False
+            job.last_duration_ms = (perf_counter() - start) * 1_000
+            job.max_duration_ms = max(job.max_duration_ms, job.last_duration_ms)
+
+
+def build_leader_lock(
+    app_settings: Settings, engine: AsyncEngine, lock_id: int | None = None
+) -> LeaderLock:
+    """Lock ``lock_id`` (the scheduler's leader lock by default) as ``SCHEDULER_LEADER_LOCK`` says."""
+    if app_settings.SCHEDULER_LEADER_LOCK.strip().lower() == "postgres":
+        return PostgresLeaderLock(engine, lock_id or app_settings.SCHEDULER_LEADER_LOCK_ID)
+    return LocalLeaderLock()
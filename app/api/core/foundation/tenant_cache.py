@@ -0,0 +1,176 @@
+"""TTL caches whose entries are grouped by the tenant they describe.
+
+Values are cached under string keys and indexed by tenant, so everything
+cached for a tenant (or the subset a predicate picks) can be dropped in one
+call when that tenant changes. Callers invalidate explicitly on every write
+they know about; the TTL bounds how long any other write path can leave a
+stale entry behind.
+
+``TenantCache`` is an in-process LRU; ``RedisTenantCache`` shares entries and
+invalidations across workers.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+import logging
+from time import monotonic
+from typing import Protocol
+from uuid import UUID
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+
+class TenantCacheBackend[V](Protocol):
+    async def get(self, key: str) -> V | None: ...
+
+    async def set(self, tenant_id: UUID, keys: Iterable[str], value: V) -> None: ...
+
+    async def invalidate(
+        self, tenant_id: UUID, matches: Callable[[str], bool] | None = None
+    ) -> None: ...
+
+    async def clear(self) -> None: ...
+
+
+class TenantCache[V]:
+    """In-process LRU with a TTL and a per-tenant key index for invalidation."""
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float,
+        max_entries: int = 10_000,
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        self._entries: OrderedDict[str, tuple[float, UUID, V]] = OrderedDict()
+        self._keys_by_tenant: dict[UUID, set[str]] = {}
+        self._ttl = ttl_seconds
+        self._max_entries = max_entries
+        self._clock = clock
+
+    async def get(self, key: str) -> V | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, _, value = entry
+        if expires_at <= self._clock():
+            self._discard(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, tenant_id: UUID, keys: Iterable[str], value: V) -> None:
+        expires_at = self._clock() + self._ttl
+        for key in keys:
+            self._discard(key)
+            while self._entries and len(self._entries) >= self._max_entries:
+                self._discard(next(iter(self._entries)))
+            self._entries[key] = (expires_at, tenant_id, value)
+            self._keys_by_tenant.setdefault(tenant_id, set()).add(key)
+
+    async def invalidate(
+        self, tenant_id: UUID, matches: Callable[[str], bool] | None = None
+    ) -> None:
+        for key in list(self._keys_by_tenant.get(tenant_id, ())):
+            if matches is None or matches(key):
+                self._discard(key)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+        self._keys_by_tenant.clear()
+
+    def _discard(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        tenant_id = entry[1]
+        keys = self._keys_by_tenant.get(tenant_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_tenant[tenant_id]
+
+
+class RedisTenantCache[V]:
+    """Entries shared by every worker through Redis.
+
+    Each entry is a string with a native TTL; a set per tenant indexes its keys,
+    so an invalidation is one ``SMEMBERS`` and one ``DEL``. Redis errors read as
+    cache misses.
+    """
+
+    def __init__(
+        self,
+        client: Redis,
+        *,
+        ttl_seconds: int,
+        key_prefix: str,
+        encode: Callable[[V], str],
+        decode: Callable[[str | bytes], V],
+        name: str,
+    ) -> None:
+        self._client = client
+        self._ttl = ttl_seconds
+        self._key_prefix = key_prefix
+        self._encode = encode
+        self._decode = decode
+        self._name = name
+
+    def _index_key(self, tenant_id: UUID) -> str:
+        return f"{self._key_prefix}tenant:{tenant_id}"
+
+    async def get(self, key: str) -> V | None:
+        try:
+            raw = await self._client.get(f"{self._key_prefix}{key}")
+        except RedisError:
+            logger.warning("%s cache unavailable, loading from database", self._name)
+            return None
+        return self._decode(raw) if raw is not None else None
+
+    async def set(self, tenant_id: UUID, keys: Iterable[str], value: V) -> None:
+        stored_keys = [f"{self._key_prefix}{key}" for key in keys]
+        index_key = self._index_key(tenant_id)
+        raw = self._encode(value)
+        try:
+            async with self._client.pipeline(transaction=True) as pipe:
+                for key in stored_keys:
+                    pipe.set(key, raw, ex=self._ttl)
+                pipe.sadd(index_key, *stored_keys)
+                pipe.expire(index_key, self._ttl)
+                await pipe.execute()
+        except RedisError:
+            logger.warning("%s cache unavailable, entry not stored", self._name)
+
+    async def invalidate(
+        self, tenant_id: UUID, matches: Callable[[str], bool] | None = None
+    ) -> None:
+        index_key = self._index_key(tenant_id)
+        prefix_length = len(self._key_prefix)
+        try:
+            members = await self._client.smembers(index_key)
+            keys = [
+                key
+                for key in (as_text(member) for member in members)
+                if matches is None or matches(key[prefix_length:])
+            ]
+            if not keys:
+                return
+            async with self._client.pipeline(transaction=True) as pipe:
+                pipe.delete(*keys)
+                pipe.srem(index_key, *keys)
+                await pipe.execute()
+        except RedisError:
+            logger.exception("%s cache invalidation failed for %s", self._name, tenant_id)
+
+    async def clear(self) -> None:
+        """Nothing to do: entries expire natively."""
+
+
+def as_text(value: bytes | str) -> str:
+    """A Redis reply as text, whether or not the client decodes responses."""
+    return value.decode() if isinstance(value, bytes) else value
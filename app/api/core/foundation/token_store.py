@@ -1,4 +1,4 @@
-"""In-memory refresh-token rotation store.
+"""Refresh-token rotation store.
 
 Tracks token families to detect replay attacks.  Each refresh token
 carries a ``jti`` (unique id) and a ``family`` id.  When a token is
@@ -6,15 +6,25 @@ refreshed the old ``jti`` is revoked.  If a revoked ``jti`` is
 presented again the entire family is invalidated, forcing the real
 user to re-authenticate.
 
-The store is process-local.  In a multi-process deployment swap this
-for a Redis-backed implementation keyed on the same interface.
+``RefreshTokenStore`` is process-local.  ``RedisRefreshTokenStore``
+implements the same interface on Redis so replay detection works across
+workers; select it with ``REFRESH_TOKEN_STORE=redis``.
 """
 
 from __future__ import annotations
 
 from dataclasses import dataclass, field
+from enum import StrEnum
 import secrets
 import time
+from typing import Protocol
+
+from redis.asyncio import Redis
+
+from core.foundation.database.connection import get_redis_client
+from core.foundation.infra.config import Settings, settings
+
+_FAMILY_REVOKED_MARKER = "*"
 
 
 def generate_jti() -> str:
@@ -25,6 +35,26 @@ def generate_family() -> str:
     return secrets.token_urlsafe(16)
 
 
+class RefreshTokenRotation(StrEnum):
+    ROTATED = "rotated"
+    REUSED = "reused"
+    FAMILY_REVOKED = "family_revoked"
+
+
+class RefreshTokenStoreBackend(Protocol):
+    async def rotate(self, family: str, jti: str) -> RefreshTokenRotation: ...
+
+    async def revoke(self, family: str, jti: str) -> None: ...
+
+    async def is_revoked(self, family: str, jti: str) -> bool: ...
+
+    async def revoke_family(self, family: str) -> None: ...
+
+    async def is_family_revoked(self, family: str) -> bool: ...
+
+    async def cleanup_expired(self) -> None: ...
+
+
 @dataclass
 class _FamilyRecord:
     revoked_jtis: set[str] = field(default_factory=set)
@@ -36,28 +66,38 @@ class RefreshTokenStore:
         self._families: dict[str, _FamilyRecord] = {}
         self._family_ttl = family_ttl_seconds
 
-    def revoke(self, family: str, jti: str) -> None:
+    async def rotate(self, family: str, jti: str) -> RefreshTokenRotation:
+        """Revoke ``jti`` unless it was already used, in which case revoke the family."""
+        if await self.is_family_revoked(family):
+            return RefreshTokenRotation.FAMILY_REVOKED
+        if await self.is_revoked(family, jti):
+            await self.revoke_family(family)
+            return RefreshTokenRotation.REUSED
+        await self.revoke(family, jti)
+        return RefreshTokenRotation.ROTATED
+
+    async def revoke(self, family: str, jti: str) -> None:
         record = self._families.setdefault(family, _FamilyRecord())
         record.revoked_jtis.add(jti)
 
-    def is_revoked(self, family: str, jti: str) -> bool:
+    async def is_revoked(self, family: str, jti: str) -> bool:
         record = self._families.get(family)
         if record is None:
             return False
         return jti in record.revoked_jtis
 
-    def revoke_family(self, family: str) -> None:
+    async def revoke_family(self, family: str) -> None:
         self._families.pop(family, None)
         self._families[family] = _FamilyRecord()
-        self._families[family].revoked_jtis.add("*")
+        self._families[family].revoked_jtis.add(_FAMILY_REVOKED_MARKER)
 
-    def is_family_revoked(self, family: str) -> bool:
+    async def is_family_revoked(self, family: str) -> bool:
         record = self._families.get(family)
         if record is None:
             return False
-        return "*" in record.revoked_jtis
+        return _FAMILY_REVOKED_MARKER in record.revoked_jtis
 
-    def cleanup_expired(self) -> None:
+    async def cleanup_expired(self) -> None:
         now = time.monotonic()
         expired = [
             fam for fam, rec in self._families.items() if now - rec.created_at > self._family_ttl
@@ -66,4 +106,88 @@ class RefreshTokenStore:
             del self._families[fam]
 
 
-refresh_token_store = RefreshTokenStore()
+# Returns 0 (rotated), 1 (reused: family now revoked) or 2 (family already revoked).
+_ROTATE_SCRIPT = """
+if redis.call('SISMEMBER', KEYS[1], ARGV[2]) == 1 then
+    return 2
+end
+if redis.call('SISMEMBER', KEYS[1], ARGV[1]) == 1 then
+    redis.call('DEL', KEYS[1])
+    redis.call('SADD', KEYS[1], ARGV[2])
+    redis.call('EXPIRE', KEYS[1], ARGV[3])
+    return 1
+end
+redis.call('SADD', KEYS[1], ARGV[1])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return 0
+"""
+
+_ROTATION_RESULTS = (
+    RefreshTokenRotation.ROTATED,
+    RefreshTokenRotation.REUSED,
+    RefreshTokenRotation.FAMILY_REVOKED,
+)
+
+
+class RedisRefreshTokenStore:
+    """Refresh-token store shared by every worker through Redis.
+
+    Each family is one set of revoked JTIs whose TTL is renewed on every
+    write, so records expire natively once no token of the family can still
+    be valid. ``rotate`` is a single script round trip.
+    """
+
+    def __init__(
+        self,
+        client: Redis,
+        family_ttl_seconds: int = 14 * 24 * 3600,
+        key_prefix: str = "rt:family:",
+    ) -> None:
+        self._client = client
+        self._family_ttl = family_ttl_seconds
+        self._key_prefix = key_prefix
+        self._rotate_script = client.register_script(_ROTATE_SCRIPT)
+
+    def _key(self, family: str) -> str:
+        return f"{self._key_prefix}{family}"
+
+    async def rotate(self, family: str, jti: str) -> RefreshTokenRotation:
+        result = await self._rotate_script(
+            keys=[self._key(family)],
+            args=[jti, _FAMILY_REVOKED_MARKER, self._family_ttl],
+        )
+        return _ROTATION_RESULTS[int(result)]
+
+    async def revoke(self, family: str, jti: str) -> None:
+        key = self._key(family)
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.sadd(key, jti)
+            pipe.expire(key, self._family_ttl)
+            await pipe.execute()
+
+    async def is_revoked(self, family: str, jti: str) -> bool:
+        return bool(await self._client.sismember(self._key(family), jti))
+
+    async def revoke_family(self, family: str) -> None:
+        key = self._key(family)
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            pipe.sadd(key, _FAMILY_REVOKED_MARKER)
+            pipe.expire(key, self._family_ttl)
+            await pipe.execute()
+
+    async def is_family_revoked(self, family: str) -> bool:
+        return bool(await self._client.sismember(self._key(family), _FAMILY_REVOKED_MARKER))
+
+    async def cleanup_expired(self) -> None:
+        """Nothing to do: Redis expires family keys natively."""
+
+
+def build_refresh_token_store(app_settings: Settings) -> RefreshTokenStoreBackend:
+    family_ttl_seconds = app_settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 3600
+    if app_settings.REFRESH_TOKEN_STORE.strip().lower() == "redis":
+        return RedisRefreshTokenStore(get_redis_client(), family_ttl_seconds=family_ttl_seconds)
+    return RefreshTokenStore(family_ttl_seconds=family_ttl_seconds)
+
+
+refresh_token_store = build_refresh_token_store(settings)
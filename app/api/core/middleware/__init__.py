@@ -1,15 +1,9 @@
 from __future__ import annotations
 
 from core.middleware.cors import setup_cors
-from core.middleware.csrf import CSRFMiddleware
-from core.middleware.rate_limit import RateLimitMiddleware
-from core.middleware.timing import TimingMiddleware
-from core.middleware.unauthorized import UnauthorizedMiddleware
+from core.middleware.pipeline import RequestPipelineMiddleware
 
 __all__ = [
-    "CSRFMiddleware",
-    "RateLimitMiddleware",
-    "TimingMiddleware",
-    "UnauthorizedMiddleware",
+    "RequestPipelineMiddleware",
     "setup_cors",
 ]
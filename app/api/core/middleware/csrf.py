@@ -1,4 +1,4 @@
-"""CSRF protection middleware for cookie-authenticated routes.
+"""CSRF protection for cookie-authenticated routes.
 
 Validates CSRF tokens for state-changing requests (POST, PUT, PATCH, DELETE)
 when authentication is provided via cookies. Bearer token requests bypass
@@ -7,13 +7,12 @@ CSRF validation since they are not vulnerable to CSRF attacks.
 
 from __future__ import annotations
 
-from collections.abc import Awaitable, Callable
+from http.cookies import SimpleCookie
 import secrets
 
 from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
 from starlette.responses import JSONResponse
-from starlette.types import ASGIApp
 
 from core.foundation.infra.config import settings
 
@@ -79,62 +78,54 @@ def _validate_csrf_token(request: Request) -> bool:
     return secrets.compare_digest(cookie_token, header_token)
 
 
-class CSRFMiddleware(BaseHTTPMiddleware):
-    """Middleware that enforces CSRF protection for cookie-authenticated requests."""
-
-    def __init__(self, app: ASGIApp) -> None:
-        super().__init__(app)
-
-    async def dispatch(
-        self, request: Request, call_next: Callable[[Request], Awaitable[Response]]
-    ) -> Response:
-        if request.method == "OPTIONS":
-            return await call_next(request)
-
-        if request.method not in STATE_CHANGING_METHODS:
-            response = await call_next(request)
-            return self._ensure_csrf_cookie(request, response)
-
-        if _is_csrf_exempt(request.url.path):
-            response = await call_next(request)
-            return self._ensure_csrf_cookie(request, response)
-
-        if _uses_bearer_auth(request):
-            return await call_next(request)
-
-        if _uses_cookie_auth(request) and not _validate_csrf_token(request):
-            response = JSONResponse(
-                status_code=403,
-                content={"message": "CSRF token validation failed"},
-            )
-            return self._ensure_csrf_cookie(request, response)
-
-        response = await call_next(request)
-        return self._ensure_csrf_cookie(request, response)
-
-    def _ensure_csrf_cookie(self, request: Request, response: Response) -> Response:
-        """Ensure CSRF token cookie is set if not present."""
-        cookie_name = _csrf_token_cookie_name()
-        token = request.cookies.get(cookie_name)
-        if token is None:
-            token = generate_csrf_token()
-            hostname = request.url.hostname
-            secure = request.url.scheme == "https"
-
-            if hostname in {"localhost", "127.0.0.1"}:
-                secure = False
-
-            response.set_cookie(
-                key=cookie_name,
-                value=token,
-                httponly=False,
-                secure=secure,
-                samesite="lax",
-                max_age=settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60,
-                path="/",
-                domain=None,
-            )
-
-        response.headers[CSRF_TOKEN_HEADER_NAME] = token
-
-        return response
+def check_csrf(request: Request) -> tuple[bool, Response | None]:
+    """Evaluate CSRF protection for a request.
+
+    Returns whether the response should carry the CSRF cookie and header, and
+    a 403 response when a cookie-authenticated state-changing request fails
+    token validation.
+    """
+    if request.method == "OPTIONS":
+        return False, None
+
+    if request.method not in STATE_CHANGING_METHODS or _is_csrf_exempt(request.url.path):
+        return True, None
+
+    if _uses_bearer_auth(request):
+        return False, None
+
+    if _uses_cookie_auth(request) and not _validate_csrf_token(request):
+        return True, JSONResponse(
+            status_code=403,
+            content={"message": "CSRF token validation failed"},
+        )
+
+    return True, None
+
+
+def _csrf_cookie_header(cookie_name: str, token: str, *, secure: bool) -> str:
+    cookie: SimpleCookie = SimpleCookie()
+    cookie[cookie_name] = token
+    cookie[cookie_name]["max-age"] = settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
+    cookie[cookie_name]["path"] = "/"
+    if secure:
+        cookie[cookie_name]["secure"] = True
+    cookie[cookie_name]["samesite"] = "lax"
+    return cookie.output(header="").strip()
+
+
+def ensure_csrf_cookie(request: Request, headers: MutableHeaders) -> None:
+    """Ensure the CSRF token cookie is set if not present and echo the token header."""
+    cookie_name = _csrf_token_cookie_name()
+    token = request.cookies.get(cookie_name)
+    if token is None:
+        token = generate_csrf_token()
+        hostname = request.url.hostname
+        secure = request.url.scheme == "https"
+
+        if hostname in {"localhost", "127.0.0.1"}:
+            secure = False
+
+        headers.append("set-cookie", _csrf_cookie_header(cookie_name, token, secure=secure))
+
+    headers[CSRF_TOKEN_HEADER_NAME] = token
@@ -0,0 +1,100 @@
+"""Single-pass ASGI request pipeline.
+
+Runs request-id binding and timing, JWT authentication, CSRF validation and
+rate limiting in one pure-ASGI layer. Responses and headers match the former
+``TimingMiddleware`` -> ``UnauthorizedMiddleware`` -> ``CSRFMiddleware`` ->
+``RateLimitMiddleware`` chain, without a ``BaseHTTPMiddleware`` task and body
+stream per stage.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from time import perf_counter
+
+from fastapi import Request
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.foundation.logging.logger import bind_request_context, reset_request_context
+from core.foundation.security import security_service
+from core.middleware.csrf import check_csrf, ensure_csrf_cookie
+from core.middleware.rate_limit import check_rate_limit
+from core.middleware.timing import log_request_completed, log_request_failed, request_identifiers
+from core.middleware.unauthorized import authenticate_request
+
+
+def _on_response_start(send: Send, decorate: Callable[[MutableHeaders], None]) -> Send:
+    async def wrapped(message: Message) -> None:
+        if message["type"] == "http.response.start":
+            decorate(MutableHeaders(scope=message))
+        await send(message)
+
+    return wrapped
+
+
+class RequestPipelineMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self._security = security_service
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        request_id, trace_id = request_identifiers(request)
+        request.state.request_id = request_id
+        request.state.trace_id = trace_id
+        context_token = bind_request_context(request_id=request_id, trace_id=trace_id)
+
+        start_time = perf_counter()
+        response_started = False
+
+        async def send_timed(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+                duration_ms = round((perf_counter() - start_time) * 1000, 3)
+                log_request_completed(
+                    request, duration_ms=duration_ms, status_code=message["status"]
+                )
+                headers = MutableHeaders(scope=message)
+                headers["X-Process-Time"] = str(duration_ms / 1000)
+                headers["X-Request-ID"] = request_id
+                if trace_id:
+                    headers["X-Trace-ID"] = trace_id
+            await send(message)
+
+        try:
+            await self._dispatch(request, scope, receive, send_timed)
+        except Exception:
+            if not response_started:
+                duration_ms = round((perf_counter() - start_time) * 1000, 3)
+                log_request_failed(request, duration_ms=duration_ms)
+            raise
+        finally:
+            reset_request_context(context_token)
+
+    async def _dispatch(self, request: Request, scope: Scope, receive: Receive, send: Send) -> None:
+        rejection = authenticate_request(request, self._security)
+        if rejection is not None:
+            await rejection(scope, receive, send)
+            return
+
+        needs_csrf_cookie, rejection = check_csrf(request)
+        if needs_csrf_cookie:
+            send = _on_response_start(send, lambda headers: ensure_csrf_cookie(request, headers))
+        if rejection is not None:
+            await rejection(scope, receive, send)
+            return
+
+        rejection, rate_limit_headers = await check_rate_limit(request)
+        if rejection is not None:
+            await rejection(scope, receive, send)
+            return
+        if rate_limit_headers:
+            send = _on_response_start(send, lambda headers: headers.update(rate_limit_headers))
+
+        await self.app(scope, receive, send)
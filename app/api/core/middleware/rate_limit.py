@@ -1,20 +1,21 @@
 from __future__ import annotations
 
-from collections import defaultdict
-from collections.abc import Awaitable, Callable
-from dataclasses import dataclass, field
-import time
+from dataclasses import dataclass
+import secrets
+from time import monotonic
 from typing import Protocol
 
 from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
 from starlette.responses import JSONResponse
-from starlette.types import ASGIApp
 
 from core.foundation.client_ip import get_client_ip
-from core.foundation.infra.config import settings
+from core.foundation.database.connection import get_redis_client
+from core.foundation.infra.config import Settings, settings
 from core.foundation.logging.audit import audit
 from core.foundation.logging.logger import logger
+from core.foundation.rate_limiter import GcraRateLimiter, RateLimiterStats
 
 
 @dataclass(frozen=True)
@@ -39,46 +40,96 @@ _PRESIGN_SUFFIX = "/profile/logo/presign"
 _PRESIGN_RULE = RateRule(max_requests=10, window_seconds=60)
 
 
-def _match_rule(path: str) -> RateRule | None:
+def _match_rule(path: str) -> tuple[str, RateRule] | None:
+    """The rule for ``path`` and the scope it is counted under.
+
+    The scope is the matched prefix (or suffix), never the raw path, so a client
+    cannot mint a fresh limiter key per request by varying the rest of the path.
+    """
     if path.endswith(_PRESIGN_SUFFIX):
-        return _PRESIGN_RULE
+        return _PRESIGN_SUFFIX, _PRESIGN_RULE
 
     for prefix, rule in RATE_LIMITED_PATHS.items():
         if path == prefix or path.startswith((prefix + "/", prefix + "?")):
-            return rule
+            return prefix, rule
     return None
 
 
 class RateLimitBackend(Protocol):
-    def is_rate_limited(self, key: str, rule: RateRule) -> tuple[bool, int]: ...
-
-
-@dataclass
-class _BucketEntry:
-    timestamps: list[float] = field(default_factory=list)
+    async def is_rate_limited(self, key: str, rule: RateRule) -> tuple[bool, int]: ...
 
 
 class InMemoryBackend:
     """Default in-memory rate-limit backend.
 
-    Swap for a Redis-backed implementation by calling ``set_backend()``.
+    Limits are per process; use ``RedisBackend`` to share them across workers.
     """
 
-    def __init__(self) -> None:
-        self._buckets: dict[str, _BucketEntry] = defaultdict(_BucketEntry)
-
-    def is_rate_limited(self, key: str, rule: RateRule) -> tuple[bool, int]:
-        now = time.monotonic()
-        cutoff = now - rule.window_seconds
-        entry = self._buckets[key]
-        entry.timestamps = [ts for ts in entry.timestamps if ts > cutoff]
+    def __init__(self, *, max_keys: int = 10_000) -> None:
+        self._limiter = GcraRateLimiter(max_keys=max_keys, clock=monotonic)
+
+    async def is_rate_limited(self, key: str, rule: RateRule) -> tuple[bool, int]:
+        return self._limiter.hit(key, limit=rule.max_requests, window_seconds=rule.window_seconds)
+
+    def stats(self) -> RateLimiterStats:
+        return self._limiter.stats()
+
+
+# Sliding-window log in a sorted set, evaluated atomically on the server clock.
+# Returns {limited, remaining} with the same semantics as InMemoryBackend: a
+# limited request leaves 0 remaining.
+_SLIDING_WINDOW_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local window = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+local count = redis.call('ZCARD', KEYS[1])
+if count >= limit then
+    return {1, 0}
+end
+redis.call('ZADD', KEYS[1], now, ARGV[3])
+redis.call('PEXPIRE', KEYS[1], window)
+return {0, limit - count - 1}
+"""
+
+
+class RedisBackend:
+    """Rate-limit backend shared by every worker through Redis.
+
+    Each check is a single ``EVALSHA`` round trip. While Redis is unreachable
+    checks fall back to a local backend, and Redis is retried after
+    ``retry_seconds``.
+    """
 
-        if len(entry.timestamps) >= rule.max_requests:
-            return True, rule.max_requests
+    def __init__(
+        self,
+        client: Redis,
+        *,
+        fallback: RateLimitBackend | None = None,
+        retry_seconds: float = 30,
+    ) -> None:
+        self._script = client.register_script(_SLIDING_WINDOW_SCRIPT)
+        self._fallback = fallback or InMemoryBackend()
+        self._retry_seconds = retry_seconds
+        self._unavailable_until = 0.0
+
+    async def is_rate_limited(self, key: str, rule: RateRule) -> tuple[bool, int]:
+        now = monotonic()
+        if now < self._unavailable_until:
+            return await self._fallback.is_rate_limited(key, rule)
+
+        try:
+            limited, remaining = await self._script(
+                keys=[key],
+                args=[rule.window_seconds * 1000, rule.max_requests, secrets.token_hex(8)],
+            )
+        except RedisError:
+            self._unavailable_until = now + self._retry_seconds
+            logger.warning("Rate limit backend unavailable, using local limits")
+            return await self._fallback.is_rate_limited(key, rule)
 
-        entry.timestamps.append(now)
-        remaining = rule.max_requests - len(entry.timestamps)
-        return False, remaining
+        return bool(limited), int(remaining)
 
 
 _backend: RateLimitBackend = InMemoryBackend()
@@ -89,36 +140,50 @@ def set_backend(backend: RateLimitBackend) -> None:
     _backend = backend
 
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app: ASGIApp) -> None:
-        super().__init__(app)
-
-    async def dispatch(
-        self, request: Request, call_next: Callable[[Request], Awaitable[Response]]
-    ) -> Response:
-        if request.method == "OPTIONS":
-            return await call_next(request)
-
-        rule = _match_rule(request.url.path)
-        if rule is None:
-            return await call_next(request)
+def configure_backend(app_settings: Settings) -> None:
+    """Select the rate-limit backend named by ``RATE_LIMIT_BACKEND``."""
+    if app_settings.RATE_LIMIT_BACKEND.strip().lower() == "redis":
+        set_backend(
+            RedisBackend(
+                get_redis_client(),
+                retry_seconds=app_settings.RATE_LIMIT_REDIS_RETRY_SECONDS,
+            )
+        )
+    else:
+        set_backend(InMemoryBackend())
 
-        ip = get_client_ip(request)
-        key = f"rl:{request.url.path}:{ip}"
 
-        limited, remaining = _backend.is_rate_limited(key, rule)
+async def check_rate_limit(request: Request) -> tuple[Response | None, dict[str, str]]:
+    """Apply the matching rate rule to a request.
 
-        if limited:
-            logger.warning(
-                "Rate limit exceeded",
-                extra={"route": request.url.path},
-            )
-            audit.rate_limited(request=request)
-            rid = getattr(request.state, "request_id", None)
-            body: dict[str, str | None] = {"message": "Too many requests. Please try again later."}
-            if rid:
-                body["request_id"] = rid
-            return JSONResponse(
+    Returns a 429 response when the client is over the limit, otherwise the
+    rate-limit headers to add to the downstream response.
+    """
+    if request.method == "OPTIONS":
+        return None, {}
+
+    matched = _match_rule(request.url.path)
+    if matched is None:
+        return None, {}
+
+    scope, rule = matched
+    ip = get_client_ip(request)
+    key = f"rl:{scope}:{ip}"
+
+    limited, remaining = await _backend.is_rate_limited(key, rule)
+
+    if limited:
+        logger.warning(
+            "Rate limit exceeded",
+            extra={"route": request.url.path},
+        )
+        audit.rate_limited(request=request)
+        rid = getattr(request.state, "request_id", None)
+        body: dict[str, str | None] = {"message": "Too many requests. Please try again later."}
+        if rid:
+            body["request_id"] = rid
+        return (
+            JSONResponse(
                 status_code=429,
                 content=body,
                 headers={
@@ -126,9 +191,11 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
                     "X-RateLimit-Limit": str(rule.max_requests),
                     "X-RateLimit-Remaining": "0",
                 },
-            )
-
-        response = await call_next(request)
-        response.headers["X-RateLimit-Limit"] = str(rule.max_requests)
-        response.headers["X-RateLimit-Remaining"] = str(remaining)
-        return response
+            ),
+            {},
+        )
+
+    return None, {
+        "X-RateLimit-Limit": str(rule.max_requests),
+        "X-RateLimit-Remaining": str(remaining),
+    }
@@ -1,16 +1,12 @@
 from __future__ import annotations
 
-from collections.abc import Awaitable, Callable
-
 from fastapi import Request, Response
 from fastapi.responses import JSONResponse
 from starlette import status
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
 
 from core.foundation.auth_cookies import get_access_token_from_request
 from core.foundation.infra.config import settings
-from core.foundation.security import security_service
+from core.foundation.security import SecurityService, security_service
 from core.middleware.cors import is_origin_allowed
 
 _PUBLIC_PATH_PREFIXES: frozenset[str] = frozenset(
@@ -56,51 +52,43 @@ def _cors_headers_for_request(request: Request) -> dict[str, str]:
     return {}
 
 
-class UnauthorizedMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app: ASGIApp) -> None:
-        self._security = security_service
-        super().__init__(app)
-
-    async def dispatch(
-        self, request: Request, call_next: Callable[[Request], Awaitable[Response]]
-    ) -> Response:
-        if request.method == "OPTIONS":
-            return await call_next(request)
-
-        if _is_public_path(request.url.path):
-            return await call_next(request)
-
-        auth_header = request.headers.get("Authorization")
-        token: str | None = None
-        if auth_header and auth_header.startswith("Bearer "):
-            token = auth_header.split(" ", 1)[1]
-        else:
-            token = get_access_token_from_request(request)
-
-        rid = getattr(request.state, "request_id", None)
-
-        if token is None:
-            body: dict[str, str | None] = {"message": "Unauthorized"}
-            if rid:
-                body["request_id"] = rid
-            return JSONResponse(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                content=body,
-                headers=_cors_headers_for_request(request),
-            )
-
-        try:
-            user = self._security.decode_access_token(token)
-        except Exception:
-            body = {"message": "Unauthorized"}
-            if rid:
-                body["request_id"] = rid
-            return JSONResponse(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                content=body,
-                headers=_cors_headers_for_request(request),
-            )
-
-        request.state.user = user
-
-        return await call_next(request)
+def _unauthorized_response(request: Request) -> Response:
+    body: dict[str, str | None] = {"message": "Unauthorized"}
+    rid = getattr(request.state, "request_id", None)
+    if rid:
+        body["request_id"] = rid
+    return JSONResponse(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        content=body,
+        headers=_cors_headers_for_request(request),
+    )
+
+
+def authenticate_request(
+    request: Request, security: SecurityService = security_service
+) -> Response | None:
+    """Attach the access-token claims to ``request.state.user``.
+
+    Returns a 401 response when a protected path carries no token or an
+    invalid one, and ``None`` when the request may continue.
+    """
+    if request.method == "OPTIONS" or _is_public_path(request.url.path):
+        return None
+
+    auth_header = request.headers.get("Authorization")
+    token: str | None = None
+    if auth_header and auth_header.startswith("Bearer "):
+        token = auth_header.split(" ", 1)[1]
+    else:
+        token = get_access_token_from_request(request)
+
+    if token is None:
+        return _unauthorized_response(request)
+
+    try:
+        user = security.decode_access_token(token)
+    except Exception:
+        return _unauthorized_response(request)
+
+    request.state.user = user
+    return None
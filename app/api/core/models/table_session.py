@@ -4,7 +4,7 @@ from datetime import datetime
 from typing import TYPE_CHECKING
 from uuid import UUID, uuid4
 
-from sqlalchemy import DateTime, Enum, ForeignKey, Index, String, func
+from sqlalchemy import DateTime, Enum, ForeignKey, Index, String, func, text
 from sqlalchemy.dialects.postgresql import UUID as PGUUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -78,4 +78,12 @@ class TableSession(Base):
         Index("idx_table_sessions_tenant_table", "tenant_id", "table_ref"),
         Index("idx_table_sessions_status_expires", "status", "expires_at"),
         Index("idx_table_sessions_session_id", "session_id"),
+        # One active session per table; also serves the per-table expiry UPDATE.
+        Index(
+            "uq_table_sessions_active_tenant_table",
+            "tenant_id",
+            "table_ref",
+            unique=True,
+            postgresql_where=text("status = 'active'"),
+        ),
     )
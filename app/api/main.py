@@ -1,18 +1,52 @@
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
 from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
 
 from core.exceptions.handlers import setup_exception_handlers
+from core.foundation.database.connection import DatabaseConnections
+from core.foundation.image_processing import image_processor
 from core.foundation.infra.config import settings
-from core.middleware import (
-    CSRFMiddleware,
-    RateLimitMiddleware,
-    TimingMiddleware,
-    UnauthorizedMiddleware,
-    setup_cors,
-)
+from core.foundation.logging.logger import shutdown_logging
+from core.foundation.object_storage import object_storage
+from core.middleware import RequestPipelineMiddleware, setup_cors
+from core.middleware.rate_limit import configure_backend as configure_rate_limit_backend
 from routes import api_router as api_router_v1
 from routes.v1.health import router as health_router
 from routes.v1.ws import router as ws_router
+from services.external_client_service import external_http_clients
+from services.maintenance_jobs import scheduler
+from services.payment_reconciliation import payment_reconciler
+from services.table_session_heartbeats import table_session_heartbeats
+from services.ws_manager import build_broadcast_bus, ws_manager
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    configure_rate_limit_backend(settings)
+    ws_manager.set_bus(build_broadcast_bus(settings))
+    # Never hold up startup on MinIO: until this succeeds, requests that need the
+    # bucket provision it themselves through ``ensure_bucket_ready``.
+    bucket_bootstrap = asyncio.create_task(object_storage.bootstrap_bucket())
+    if settings.SCHEDULER_ENABLED:
+        scheduler.start()
+    try:
+        yield
+    finally:
+        bucket_bootstrap.cancel()
+        with suppress(asyncio.CancelledError):
+            await bucket_bootstrap
+        await scheduler.stop()
+        await table_session_heartbeats.close()
+        await payment_reconciler.stop()
+        await ws_manager.close()
+        await DatabaseConnections.close_redis_client()
+        await external_http_clients.aclose()
+        object_storage.shutdown()
+        image_processor.shutdown()
+        shutdown_logging()
 
 
 def create_application() -> FastAPI:
@@ -23,6 +57,7 @@ def create_application() -> FastAPI:
         docs_url="/docs" if settings.DEBUG else None,
         redoc_url="/redoc" if settings.DEBUG else None,
         openapi_url="/openapi.json" if settings.DEBUG else None,
+        lifespan=lifespan,
     )
 
     setup_exception_handlers(app=app, settings=settings)
@@ -30,10 +65,7 @@ def create_application() -> FastAPI:
     if settings.TRUST_PROXY_HEADERS:
         app.add_middleware(ProxyHeadersMiddleware, trusted_hosts="*")
 
-    app.add_middleware(RateLimitMiddleware)
-    app.add_middleware(CSRFMiddleware)
-    app.add_middleware(UnauthorizedMiddleware)
-    app.add_middleware(TimingMiddleware)
+    app.add_middleware(RequestPipelineMiddleware)
     # Keep CORS as the outermost middleware so short-circuit 401 responses
     # from auth middleware still receive CORS headers.
     setup_cors(app=app, settings=settings)
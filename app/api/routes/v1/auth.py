@@ -33,6 +33,7 @@ from core.foundation.http.responses import CreatedResponse, SuccessResponse, Una
 from core.foundation.infra.config import settings
 from core.foundation.logging.audit import audit
 from core.foundation.token_store import (
+    RefreshTokenRotation,
     generate_family,
     generate_jti,
     refresh_token_store,
@@ -393,20 +394,18 @@ async def refresh_token(
     old_jti = payload.get("jti", "")
     family = payload.get("family", "")
 
-    if family and refresh_token_store.is_family_revoked(family):
-        audit.token_reuse_detected(request=request, user_id=user_id, family=family)
-        clear_auth_cookies(response=response, request=request)
-        raise UnauthorizedError(message="Unauthorized")
+    if family and old_jti:
+        rotation = await refresh_token_store.rotate(family, old_jti)
+    elif family and await refresh_token_store.is_family_revoked(family):
+        rotation = RefreshTokenRotation.FAMILY_REVOKED
+    else:
+        rotation = RefreshTokenRotation.ROTATED
 
-    if family and old_jti and refresh_token_store.is_revoked(family, old_jti):
+    if rotation is not RefreshTokenRotation.ROTATED:
         audit.token_reuse_detected(request=request, user_id=user_id, family=family)
-        refresh_token_store.revoke_family(family)
         clear_auth_cookies(response=response, request=request)
         raise UnauthorizedError(message="Unauthorized")
 
-    if family and old_jti:
-        refresh_token_store.revoke(family, old_jti)
-
     try:
         user_uuid = UUID(user_id)
     except ValueError:
@@ -456,7 +455,7 @@ async def logout(
             payload = security_service.decode_access_token(refresh_token_value)
             family = payload.get("family", "")
             if family:
-                refresh_token_store.revoke_family(family)
+                await refresh_token_store.revoke_family(family)
         except Exception:
             pass
     user = getattr(request.state, "user", None)
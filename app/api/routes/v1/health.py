@@ -1,11 +1,17 @@
+from dataclasses import asdict
+
 from fastapi import APIRouter, status
 from fastapi.responses import JSONResponse
-from minio import Minio
 from sqlalchemy import text
 
 from core.foundation.database.connection import get_mongo_db
 from core.foundation.database.database import engine
-from core.foundation.infra.config import settings
+from core.foundation.image_processing import image_processor
+from core.foundation.logging.logger import logging_stats
+from core.foundation.object_storage import object_storage
+from services.maintenance_jobs import scheduler
+from services.payment_reconciliation import payment_reconciler
+from services.ws_manager import ws_manager
 
 router = APIRouter()
 
@@ -15,6 +21,36 @@ async def liveness() -> JSONResponse:
     return JSONResponse(status_code=status.HTTP_200_OK, content={})
 
 
+@router.get("/ws", status_code=status.HTTP_200_OK)
+async def websocket_stats() -> JSONResponse:
+    return JSONResponse(status_code=status.HTTP_200_OK, content=asdict(ws_manager.stats()))
+
+
+@router.get("/logging", status_code=status.HTTP_200_OK)
+async def log_queue_stats() -> JSONResponse:
+    return JSONResponse(status_code=status.HTTP_200_OK, content=asdict(logging_stats()))
+
+
+@router.get("/storage", status_code=status.HTTP_200_OK)
+async def object_storage_stats() -> JSONResponse:
+    return JSONResponse(status_code=status.HTTP_200_OK, content=asdict(object_storage.stats()))
+
+
+@router.get("/images", status_code=status.HTTP_200_OK)
+async def image_processing_stats() -> JSONResponse:
+    return JSONResponse(status_code=status.HTTP_200_OK, content=asdict(image_processor.stats()))
+
+
+@router.get("/reconciliation", status_code=status.HTTP_200_OK)
+async def payment_reconciliation_stats() -> JSONResponse:
+    return JSONResponse(status_code=status.HTTP_200_OK, content=asdict(payment_reconciler.stats()))
+
+
+@router.get("/scheduler", status_code=status.HTTP_200_OK)
+async def scheduler_stats() -> JSONResponse:
+    return JSONResponse(status_code=status.HTTP_200_OK, content=asdict(scheduler.stats()))
+
+
 @router.get("", status_code=status.HTTP_200_OK)
 async def health_check() -> JSONResponse:
     ok = True
@@ -27,13 +63,8 @@ async def health_check() -> JSONResponse:
 
     if ok:
         try:
-            minio = Minio(
-                settings.MINIO_ENDPOINT,
-                access_key=settings.MINIO_ACCESS_KEY,
-                secret_key=settings.MINIO_SECRET_KEY,
-                secure=settings.MINIO_SECURE,
-            )
-            minio.bucket_exists(settings.MINIO_BUCKET)
+            if not await object_storage.bucket_exists():
+                object_storage.invalidate_bucket()
         except Exception:
             ok = False
 
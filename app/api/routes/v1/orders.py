@@ -176,7 +176,7 @@ async def create_order(
     _tenant_id: OrderCreateTenantId,
 ) -> CreatedResponse[KitchenOrderResponseDTO]:
     data = payload.model_dump(by_alias=True)
-    tenant = await tenant_service.get_tenant_by_public_id(session, tenant_public_id)
+    tenant = await tenant_service.get_tenant_identity_by_public_id(session, tenant_public_id)
     request_user = getattr(request.state, "user", None)
     subject = request_user.get("sub") if isinstance(request_user, dict) else None
     waiter_user_id: UUID | None = None
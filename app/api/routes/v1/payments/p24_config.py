@@ -7,6 +7,7 @@ from core.dto.v1.tenants import TenantResponseDTO
 from core.foundation.dependencies import PostgresSession
 from core.foundation.http.responses import UpdatedResponse
 from core.models.tenant import Tenant
+from services.tenant_identity_cache import tenant_identity_cache
 
 router = APIRouter()
 
@@ -56,6 +57,7 @@ async def update_p24_config(
     tenant.p24_crc = request.p24_crc
 
     await session.commit()
+    await tenant_identity_cache.invalidate(tenant.id)
     await session.refresh(tenant)
 
     return UpdatedResponse[TenantResponseDTO](
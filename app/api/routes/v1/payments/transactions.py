@@ -1,7 +1,7 @@
 from typing import Annotated
+from uuid import UUID
 
 from fastapi import APIRouter, Depends, status
-from sqlalchemy import select
 
 from core.authorization.dependencies import PaymentReconcileTenantId, PaymentTransactionReadTenantId
 from core.dto.v1.payments import (
@@ -9,20 +9,16 @@ from core.dto.v1.payments import (
     TransactionListQueryDTO,
     TransactionsReconcileResponseDTO,
 )
-from core.foundation.dependencies import (
-    ExternalClientDep,
-    MongoDB,
-    P24ServiceDep,
-    PostgresSession,
-    TableSessionServiceDep,
-    TenantServiceDep,
-)
+from core.exceptions import NotFoundResponse
+from core.foundation.dependencies import P24ServiceDep, PaymentReconcilerDep, PostgresSession
 from core.foundation.http.responses import PaginatedResponse, SuccessResponse
-from core.models.transaction import Transaction
-from services.mobile_payment_sync import apply_mobile_payment_mongo_and_session_effects
+from core.foundation.infra.config import settings
+from services.payment_reconciliation import ReconciliationRun
 
 router = APIRouter()
 
+_RECONCILE_RUN_RESOURCE = "Reconciliation run"
+
 
 @router.get(
     "/transactions",
@@ -54,6 +50,21 @@ async def list_transactions(
     )
 
 
+def _reconcile_response(
+    run: ReconciliationRun, tenant_id: UUID
+) -> TransactionsReconcileResponseDTO:
+    counts = run.counts(tenant_id)
+    return TransactionsReconcileResponseDTO(
+        run_id=run.id,
+        status=run.status,
+        started_at=run.started_at,
+        finished_at=run.finished_at,
+        scanned=counts.scanned,
+        updated=counts.updated,
+        failed=counts.failed,
+    )
+
+
 @router.post(
     "/transactions/reconcile-pending",
     status_code=status.HTTP_200_OK,
@@ -61,49 +72,31 @@ async def list_transactions(
 )
 async def reconcile_pending_transactions(
     tenant_id: PaymentReconcileTenantId,
-    session: PostgresSession,
-    db: MongoDB,
-    p24_service: P24ServiceDep,
-    tenant_service: TenantServiceDep,
-    external_client: ExternalClientDep,
-    table_session_service: TableSessionServiceDep,
+    reconciler: PaymentReconcilerDep,
+) -> SuccessResponse[TransactionsReconcileResponseDTO]:
+    run = reconciler.start(tenant_id)
+    await reconciler.wait(settings.P24_RECONCILE_REQUEST_WAIT_SECONDS, run)
+
+    return SuccessResponse(
+        message="Reconcile completed" if run.finished_at else "Reconcile in progress",
+        data=_reconcile_response(run, tenant_id),
+    )
+
+
+@router.get(
+    "/transactions/reconcile-pending",
+    status_code=status.HTTP_200_OK,
+    response_model=SuccessResponse[TransactionsReconcileResponseDTO],
+)
+async def get_pending_transactions_reconcile(
+    tenant_id: PaymentReconcileTenantId,
+    reconciler: PaymentReconcilerDep,
 ) -> SuccessResponse[TransactionsReconcileResponseDTO]:
-    pending = await p24_service.get_transactions_pending_reconcile(session, tenant_id)
-    scanned = len(pending)
-    updated = 0
-    failed = 0
-
-    for snapshot in pending:
-        try:
-            sid = snapshot.session_id
-            row = await session.execute(select(Transaction).where(Transaction.session_id == sid))
-            transaction = row.scalar_one_or_none()
-            if transaction is None:
-                failed += 1
-                continue
-
-            tenant = await tenant_service.get_tenant(session, transaction.tenant_id)
-            await p24_service.apply_p24_lookup_to_transaction(
-                external_client,
-                transaction=transaction,
-                tenant=tenant,
-            )
-            await session.flush()
-            await apply_mobile_payment_mongo_and_session_effects(
-                db,
-                session,
-                table_session_service,
-                tenant=tenant,
-                transaction=transaction,
-                session_id_str=str(sid),
-            )
-            await session.commit()
-            updated += 1
-        except Exception:
-            await session.rollback()
-            failed += 1
+    run = await reconciler.latest(tenant_id)
+    if run is None:
+        raise NotFoundResponse(_RECONCILE_RUN_RESOURCE, str(tenant_id))
 
     return SuccessResponse(
-        message="Reconcile completed",
-        data=TransactionsReconcileResponseDTO(scanned=scanned, updated=updated, failed=failed),
+        message="Reconcile status retrieved",
+        data=_reconcile_response(run, tenant_id),
     )
@@ -32,9 +32,9 @@ from core.foundation.dependencies import (
     TenantMobileFaviconStorageServiceDep,
     TenantServiceDep,
 )
+from core.foundation.http.conditional import etag_matches, http_date, not_modified
 from core.foundation.http.responses import CreatedResponse, SuccessResponse
 from core.foundation.infra.config import settings
-from core.models import FloorCanvas
 from core.models.transaction import Transaction
 from services.mobile_payment_sync import apply_mobile_payment_mongo_and_session_effects
 from services.mongo_menu_service import MENU_COLLECTION, normalize_mongo_menu_categories
@@ -42,6 +42,8 @@ from services.payment_service import (
     MONGO_PAYMENT_STATUS_PENDING,
     resolve_mobile_payment_return_base_url,
 )
+from services.public_favicon_cache import public_favicon_cache
+from services.public_menu_cache import public_menu_cache
 from services.tenant_mobile_config_service import tenant_mobile_config_service
 
 router = APIRouter()
@@ -54,19 +56,7 @@ MONGO_ORDER_STATUS_READY = "ready_to_serve"
 
 _RESOURCE_TRANSACTION = "Transaction"
 
-
-def _coerce_float(value: object) -> float:
-    if isinstance(value, (int, float)):
-        return float(value)
-    return 0.0
-
-
-def _coerce_optional_int(value: object) -> int | None:
-    if isinstance(value, int):
-        return value
-    if isinstance(value, str) and value.strip().isdigit():
-        return int(value.strip())
-    return None
+_JSON = "application/json"
 
 
 def _extract_client_fingerprint(request: Request) -> str | None:
@@ -107,7 +97,7 @@ async def get_public_tenant_info(
     session: PostgresSession,
     tenant_service: TenantServiceDep,
 ) -> SuccessResponse[PublicTenantInfoResponseDTO]:
-    tenant = await tenant_service.get_tenant_by_slug(session, tenant_slug)
+    tenant = await tenant_service.get_tenant_identity_by_slug(session, tenant_slug)
     mc = await tenant_mobile_config_service.get_by_tenant_id(session, tenant.id)
     favicon_path = f"/public/{tenant.slug}/favicon.ico" if mc and mc.favicon_object_key else None
     landing: MobileLandingContentDTO | None = None
@@ -134,29 +124,36 @@ async def get_public_tenant_info(
 )
 async def get_public_tenant_favicon(
     tenant_slug: str,
+    request: Request,
     session: PostgresSession,
     tenant_service: TenantServiceDep,
     storage: TenantMobileFaviconStorageServiceDep,
 ) -> Response:
-    tenant = await tenant_service.get_tenant_by_slug(session, tenant_slug)
+    tenant = await tenant_service.get_tenant_identity_by_slug(session, tenant_slug)
     mc = await tenant_mobile_config_service.get_by_tenant_id(session, tenant.id)
 
     if not mc or not mc.favicon_object_key:
         msg = "Favicon"
         raise NotFoundResponse(msg, tenant_slug)
 
-    stream = storage.get_object_stream(mc.favicon_object_key)
-    try:
-        data = stream.read()
-    finally:
-        stream.close()
-        stream.release_conn()
-
-    return Response(
-        content=data,
-        media_type="image/x-icon",
-        headers={"Cache-Control": "public, max-age=86400"},
-    )
+    cached = public_favicon_cache.get(mc.favicon_object_key, mc.updated_at)
+    if cached is None:
+        body = await storage.read_object(mc.favicon_object_key)
+        cached = public_favicon_cache.store(mc.favicon_object_key, mc.updated_at, body)
+
+    headers = {
+        "Cache-Control": "public, max-age=86400",
+        "ETag": cached.etag,
+        "Last-Modified": http_date(cached.updated_at),
+    }
+    if not_modified(
+        request.headers.get("If-None-Match"),
+        request.headers.get("If-Modified-Since"),
+        etag=cached.etag,
+        last_modified=cached.updated_at,
+    ):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=cached.body, media_type="image/x-icon", headers=headers)
 
 
 @router.get(
@@ -166,31 +163,51 @@ async def get_public_tenant_favicon(
 )
 async def get_public_tenant_menu(
     tenant_slug: str,
+    request: Request,
     session: PostgresSession,
     tenant_service: TenantServiceDep,
     db: MongoDB,
-) -> SuccessResponse[TenantMenuResponseDTO]:
-    tenant = await tenant_service.get_tenant_by_slug(session, tenant_slug)
-
-    document = await db[MENU_COLLECTION].find_one({"tenantPublicId": tenant.public_id})
-    if document is None:
-        return SuccessResponse(
-            message="Menu not yet created",
-            data=TenantMenuResponseDTO(menu={}, categories=[], updatedAt=None),
+) -> Response:
+    tenant = await tenant_service.get_tenant_identity_by_slug(session, tenant_slug)
+    collection = db[MENU_COLLECTION]
+    query = {"tenantPublicId": tenant.public_id}
+
+    marker = await collection.find_one(query, {"_id": 0, "updatedAt": 1})
+    cached = (
+        public_menu_cache.get(tenant.public_id, marker.get("updatedAt"))
+        if marker is not None
+        else None
+    )
+    if cached is None:
+        document = await collection.find_one(query) if marker is not None else None
+        if document is None:
+            body = SuccessResponse(
+                message="Menu not yet created",
+                data=TenantMenuResponseDTO(menu={}, categories=[], updatedAt=None),
+            )
+            return Response(content=body.model_dump_json(by_alias=True), media_type=_JSON)
+
+        raw_menu = document.get("menu", {})
+        normalized_menu = raw_menu if isinstance(raw_menu, dict) else {}
+        categories = normalize_mongo_menu_categories(normalized_menu, active_items_only=True)
+        body = SuccessResponse(
+            message="Menu retrieved",
+            data=TenantMenuResponseDTO(
+                menu=normalized_menu,
+                categories=categories,
+                updatedAt=document.get("updatedAt"),
+            ),
+        )
+        cached = public_menu_cache.store(
+            tenant.public_id,
+            document.get("updatedAt"),
+            body.model_dump_json(by_alias=True).encode(),
         )
 
-    raw_menu = document.get("menu", {})
-    normalized_menu = raw_menu if isinstance(raw_menu, dict) else {}
-    categories = normalize_mongo_menu_categories(normalized_menu, active_items_only=True)
-
-    return SuccessResponse(
-        message="Menu retrieved",
-        data=TenantMenuResponseDTO(
-            menu=normalized_menu,
-            categories=categories,
-            updatedAt=document.get("updatedAt"),
-        ),
-    )
+    headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("If-None-Match"), cached.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=cached.body, media_type=_JSON, headers=headers)
 
 
 @router.get(
@@ -205,75 +222,34 @@ async def get_public_tables_overview(
     table_session_service: TableSessionServiceDep,
     db: MongoDB,
 ) -> SuccessResponse[PublicTablesOverviewResponseDTO]:
-    tenant = await tenant_service.get_tenant_by_slug(session, tenant_slug)
-    active_sessions = await table_session_service.list_active_sessions(session, tenant.id)
-    busy_kitchen_refs = await table_session_service.list_table_refs_with_active_kitchen_orders(
-        db,
-        tenant_public_id=tenant.public_id,
-    )
-    locked_refs = {s.table_ref for s in active_sessions} | busy_kitchen_refs
-
-    session_expires_by_ref: dict[str, datetime] = {}
-    for s in active_sessions:
-        prev = session_expires_by_ref.get(s.table_ref)
-        if prev is None or s.expires_at > prev:
-            session_expires_by_ref[s.table_ref] = s.expires_at
-
-    canvas_result = await session.execute(
-        select(FloorCanvas).where(FloorCanvas.tenant_id == tenant.id)
-    )
-    canvases = list(canvas_result.scalars().all())
-
-    overview_canvases: list[PublicFloorCanvasOverviewDTO] = []
-    for fc in canvases:
-        tables: list[PublicFloorTableStatusDTO] = []
-        raw_elements = fc.elements if isinstance(fc.elements, list) else []
-        for raw in raw_elements:
-            if not isinstance(raw, dict):
-                continue
-            if raw.get("type") != "table":
-                continue
-            tid = raw.get("id")
-            if not isinstance(tid, str) or tid.strip() == "":
-                continue
-            tn = _coerce_optional_int(raw.get("tableNumber"))
-            label_raw = raw.get("label")
-            label = label_raw.strip() if isinstance(label_raw, str) and label_raw.strip() else None
-            seats_raw = raw.get("seats")
-            seats = seats_raw if isinstance(seats_raw, int) else None
-            rotation = _coerce_float(raw["rotation"]) if "rotation" in raw else None
-
-            is_closed = tid in locked_refs
-            reserved_until: datetime | None = None
-            if is_closed:
-                reserved_until = session_expires_by_ref.get(tid)
-                if reserved_until is None:
-                    reserved_until = datetime.now(UTC) + _KITCHEN_RESERVE_FALLBACK
-
-            tables.append(
+    tenant = await tenant_service.get_tenant_identity_by_slug(session, tenant_slug)
+    state = await table_session_service.get_table_status(session, db, tenant=tenant)
+    reserved = state.reserved_until(datetime.now(UTC), _KITCHEN_RESERVE_FALLBACK)
+
+    overview_canvases = [
+        PublicFloorCanvasOverviewDTO(
+            name=canvas.name,
+            width=canvas.width,
+            height=canvas.height,
+            tables=[
                 PublicFloorTableStatusDTO(
-                    id=tid,
-                    tableNumber=tn,
-                    label=label,
-                    x=_coerce_float(raw.get("x")),
-                    y=_coerce_float(raw.get("y")),
-                    w=_coerce_float(raw.get("w")) or 1.0,
-                    h=_coerce_float(raw.get("h")) or 1.0,
-                    rotation=rotation,
-                    seats=seats,
-                    status="closed" if is_closed else "open",
-                    reserved_until=reserved_until,
+                    id=table.id,
+                    tableNumber=table.table_number,
+                    label=table.label,
+                    x=table.x,
+                    y=table.y,
+                    w=table.w,
+                    h=table.h,
+                    rotation=table.rotation,
+                    seats=table.seats,
+                    status="closed" if table.id in reserved else "open",
+                    reserved_until=reserved.get(table.id),
                 )
-            )
-
-        overview_canvases.append(
-            PublicFloorCanvasOverviewDTO(
-                name=fc.name,
-                width=fc.width,
-                height=fc.height,
-                tables=tables,
-            )
+                for table in canvas.tables
+            ],
         )
+        for canvas in state.canvases
+    ]
 
     return SuccessResponse(
         message="Tables overview retrieved",
@@ -294,7 +270,7 @@ async def acquire_public_table_session(
     table_session_service: TableSessionServiceDep,
     db: MongoDB,
 ) -> CreatedResponse[PublicTableSessionResponseDTO]:
-    tenant = await tenant_service.get_tenant_by_slug(session, payload.tenant_slug)
+    tenant = await tenant_service.get_tenant_identity_by_slug(session, payload.tenant_slug)
     table_session = await table_session_service.acquire_mobile_session(
         session,
         db,
@@ -390,7 +366,7 @@ async def create_public_order_payment(
     table_session_service: TableSessionServiceDep,
     db: MongoDB,
 ) -> CreatedResponse[PublicCreateOrderPaymentResponseDTO]:
-    tenant = await tenant_service.get_tenant_by_slug(session, request.tenant_slug)
+    tenant = await tenant_service.get_tenant_identity_by_slug(session, request.tenant_slug)
     p24_service.validate_tenant_p24_credentials(tenant)
 
     total_amount = sum(round(item.unit_price * item.quantity * 100) for item in request.items)
@@ -33,6 +33,7 @@ from services.mongo_menu_service import (
     MENU_COLLECTION,
     normalize_mongo_menu_categories,
 )
+from services.public_menu_cache import public_menu_cache
 
 router = APIRouter()
 
@@ -134,6 +135,7 @@ async def upsert_tenant_menu(
         {"$set": {"tenantPublicId": tenant_public_id, "menu": raw_menu, "updatedAt": now}},
         upsert=True,
     )
+    public_menu_cache.invalidate(tenant_public_id)
 
     return UpdatedResponse(
         message="Tenant menu saved successfully",
@@ -180,6 +182,8 @@ async def toggle_item_availability(
         },
     )
 
+    public_menu_cache.invalidate(tenant_public_id)
+
     updated_doc = await db[MENU_COLLECTION].find_one({"tenantPublicId": tenant_public_id})
     updated_menu = updated_doc.get("menu", {}) if updated_doc else {}
     normalized_menu: dict[str, Any] = updated_menu if isinstance(updated_menu, dict) else {}
@@ -204,7 +208,7 @@ async def presign_menu_item_image(
     body: MenuImagePresignRequestDTO,
     storage: TenantMenuImageStorageServiceDep,
 ) -> SuccessResponse[MenuImagePresignResponseDTO]:
-    upload_url, object_key = storage.create_presigned_upload(tenant_id, body.content_type)
+    upload_url, object_key = await storage.create_presigned_upload(tenant_id, body.content_type)
 
     return SuccessResponse(
         message="Menu image upload URL created",
@@ -222,9 +226,11 @@ async def finalize_menu_item_image(
     body: MenuImageFinalizeRequestDTO,
     storage: TenantMenuImageStorageServiceDep,
 ) -> SuccessResponse[MenuImageFinalizeResponseDTO]:
-    result = storage.finalize_upload(tenant_id, body.object_key)
+    result = await storage.finalize_upload(tenant_id, body.object_key)
 
     return SuccessResponse(
         message="Menu image saved",
-        data=MenuImageFinalizeResponseDTO(imageUrl=result.public_url),
+        data=MenuImageFinalizeResponseDTO(
+            imageUrl=result.public_url, imageVariants=result.variants
+        ),
     )
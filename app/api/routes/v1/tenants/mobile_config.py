@@ -22,6 +22,7 @@ from core.foundation.dependencies import (
 )
 from core.foundation.http.responses import SuccessResponse, UpdatedResponse
 from routes.v1.mappers.tenant_mobile_config_mappers import tenant_mobile_config_to_response
+from services.public_favicon_cache import public_favicon_cache
 
 router = APIRouter()
 
@@ -91,7 +92,7 @@ async def presign_tenant_mobile_favicon(
     body: TenantMobileFaviconPresignRequestDTO,
     storage: TenantMobileFaviconStorageServiceDep,
 ) -> SuccessResponse[TenantMobileFaviconPresignResponseDTO]:
-    upload_url, object_key = storage.create_presigned_upload(tenant_id, body.content_type)
+    upload_url, object_key = await storage.create_presigned_upload(tenant_id, body.content_type)
 
     return SuccessResponse(
         message="Favicon upload URL created",
@@ -111,9 +112,10 @@ async def finalize_tenant_mobile_favicon(
     storage: TenantMobileFaviconStorageServiceDep,
     service: TenantMobileConfigServiceDep,
 ) -> UpdatedResponse[TenantMobileConfigResponseDTO]:
-    object_key = storage.finalize_upload(tenant_id, body.object_key)
+    object_key = await storage.finalize_upload(tenant_id, body.object_key)
     row = await service.set_favicon_key(session, tenant_id, object_key)
     await session.commit()
+    public_favicon_cache.invalidate(object_key)
 
     return UpdatedResponse(
         message="Favicon saved",
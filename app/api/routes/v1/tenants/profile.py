@@ -41,7 +41,7 @@ async def create_tenant_logo_upload(
     storage: TenantLogoStorageServiceDep,
     request: TenantLogoUploadPresignRequestDTO,
 ) -> SuccessResponse[TenantLogoUploadResponseDTO]:
-    upload_url, object_key = storage.create_presigned_upload(tenant_id, request.content_type)
+    upload_url, object_key = await storage.create_presigned_upload(tenant_id, request.content_type)
     return SuccessResponse(
         message="Tenant logo upload URL created successfully",
         data=TenantLogoUploadResponseDTO(uploadUrl=upload_url, objectKey=object_key),
@@ -60,7 +60,7 @@ async def create_tenant_logo_view(
     tenant_id: ProfileLogoReadTenantId,
     storage: TenantLogoStorageServiceDep,
 ) -> SuccessResponse[TenantLogoViewPresignResponseDTO]:
-    view_url = storage.create_presigned_view(tenant_id)
+    view_url = await storage.create_presigned_view(tenant_id)
     return SuccessResponse(
         message="Tenant logo view URL created successfully",
         data=TenantLogoViewPresignResponseDTO(url=view_url),
@@ -109,7 +109,7 @@ async def upsert_tenant_profile(
     service: TenantProfileServiceDep,
 ) -> UpdatedResponse[TenantProfileResponseDTO] | CreatedResponse[TenantProfileResponseDTO]:
     if request.logo_upload_key:
-        finalized_logo = storage.finalize_upload(tenant_id, request.logo_upload_key)
+        finalized_logo = await storage.finalize_upload(tenant_id, request.logo_upload_key)
         request.logo = finalized_logo.url
 
     profile, created = await service.upsert(session, tenant_id, request)
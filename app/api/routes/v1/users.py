@@ -1,8 +1,10 @@
+from functools import partial
 from uuid import UUID
 
 from fastapi import APIRouter, Request, status
 from sqlalchemy import func, select
 
+from core.authorization.context_cache import authorization_context_cache
 from core.authorization.dependencies import (
     StaffCreateTenantId,
     StaffDeleteTenantId,
@@ -15,6 +17,7 @@ from core.dto.v1.auth import (
     StaffUserCreatedData,
 )
 from core.exceptions import ConflictError, NotFoundResponse
+from core.foundation.database.hooks import after_commit
 from core.foundation.dependencies import (
     AuthServiceDep,
     EmailServiceDep,
@@ -113,6 +116,10 @@ async def bulk_create_users(
                 surname=entry.surname,
                 force_password_change=True,
             )
+            after_commit(
+                session,
+                partial(authorization_context_cache.invalidate_account, tenant_id, created_user.id),
+            )
 
             if send_activation_email:
                 activation = await auth_service.create_activation_link(
@@ -216,6 +223,9 @@ async def create_user(
         surname=data.surname,
         force_password_change=True,
     )
+    after_commit(
+        session, partial(authorization_context_cache.invalidate_account, tenant_id, created_user.id)
+    )
 
     if send_activation_email:
         activation = await auth_service.create_activation_link(
@@ -332,6 +342,9 @@ async def delete_user(
 
     await session.delete(role)
     await session.flush()
+    after_commit(
+        session, partial(authorization_context_cache.invalidate_account, tenant_id, user_id)
+    )
 
     remaining_roles = await session.scalar(
         select(func.count()).select_from(TenantRole).where(TenantRole.account_id == user_id)
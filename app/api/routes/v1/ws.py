@@ -92,6 +92,14 @@ async def _authorize_tenant_access(user: dict, tenant_public_id: str) -> bool:
         return decision.allowed
 
 
+def _resume_sequence(websocket: WebSocket) -> int | None:
+    """Last event sequence the client saw, from the ``since`` query param."""
+    since = websocket.query_params.get("since")
+    if since is None or not since.isdigit():
+        return None
+    return int(since)
+
+
 @router.websocket("/ws/kitchen/{restaurant_id}")
 async def kitchen_websocket(websocket: WebSocket, restaurant_id: str) -> None:
     user = await _authenticate_websocket(websocket)
@@ -104,11 +112,11 @@ async def kitchen_websocket(websocket: WebSocket, restaurant_id: str) -> None:
         await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
         return
 
-    await ws_manager.connect(restaurant_id, websocket)
+    await ws_manager.connect(restaurant_id, websocket, since=_resume_sequence(websocket))
     try:
         while True:
             await websocket.receive_text()
     except WebSocketDisconnect:
-        ws_manager.disconnect(restaurant_id, websocket)
+        await ws_manager.disconnect(restaurant_id, websocket)
     except Exception:
-        ws_manager.disconnect(restaurant_id, websocket)
+        await ws_manager.disconnect(restaurant_id, websocket)
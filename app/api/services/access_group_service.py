@@ -1,12 +1,15 @@
+from functools import partial
 from uuid import UUID
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.authorization.actions import AuthorizationAction
+from core.authorization.context_cache import authorization_context_cache
 from core.authorization.policies import DELEGABLE_ACTIONS
 from core.dto.v1.access_groups import AccessGroupResponseDTO, AccessGroupUpsertDTO
 from core.exceptions import BadRequestError, ConflictError, NotFoundResponse
+from core.foundation.database.hooks import after_commit
 from core.models.access_group import AccessGroup, AccessGroupAssignment
 from core.models.enums import AccountType
 from core.models.tenant_role import TenantRole
@@ -71,6 +74,7 @@ class AccessGroupService:
         group.description = data.description
         group.capabilities = self._validate_capabilities(data.capabilities)
         await session.flush()
+        after_commit(session, partial(authorization_context_cache.invalidate_tenant, tenant_id))
         await session.refresh(group)
         member_ids = list(
             await session.scalars(
@@ -85,6 +89,7 @@ class AccessGroupService:
         group = await self._get_group(session, tenant_id, group_id)
         await session.delete(group)
         await session.flush()
+        after_commit(session, partial(authorization_context_cache.invalidate_tenant, tenant_id))
 
     async def assign_member(
         self,
@@ -115,6 +120,10 @@ class AccessGroupService:
                 )
             )
             await session.flush()
+            after_commit(
+                session,
+                partial(authorization_context_cache.invalidate_account, tenant_id, account_id),
+            )
 
     async def unassign_member(
         self,
@@ -131,6 +140,10 @@ class AccessGroupService:
         if assignment is not None:
             await session.delete(assignment)
             await session.flush()
+            after_commit(
+                session,
+                partial(authorization_context_cache.invalidate_account, tenant_id, account_id),
+            )
 
     async def _get_group(
         self, session: AsyncSession, tenant_id: UUID, group_id: UUID
@@ -10,6 +10,7 @@ from core.foundation.logging.logger import logger
 from core.models.archived_order import ArchivedOrder
 from core.models.tenant import Tenant
 from services.payment_service import build_waiter_settlement_transaction
+from services.table_status_index import table_status_index
 
 
 def _decimal_from(value: Any, default: Decimal = Decimal("0")) -> Decimal:
@@ -115,6 +116,7 @@ class ArchiveService:
         )
 
         await db[KITCHEN_ORDERS_COLLECTION].delete_one({"_id": order_doc["_id"]})
+        table_status_index.order_removed(restaurant_id, order_doc["_id"])
         logger.info(
             "Deleted Mongo kitchen_order %s after archive commit",
             order_doc["_id"],
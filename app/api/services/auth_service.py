@@ -1,10 +1,12 @@
 from datetime import UTC, datetime, timedelta
+from functools import partial
 import hashlib
 from uuid import UUID
 
 from sqlalchemy import delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.authorization.context_cache import authorization_context_cache
 from core.exceptions import (
     BadRequestError,
     ConflictError,
@@ -15,12 +17,14 @@ from core.exceptions import (
     TooManyRequestsError,
     UnauthorizedError,
 )
+from core.foundation.database.hooks import after_commit
 from core.foundation.security import SecurityService
 from core.models.activation_link import ActivationLink
 from core.models.enums import TenantStatus
 from core.models.password_reset_token import PasswordResetToken
 from core.models.tenant import Tenant
 from core.models.user import User
+from services.tenant_identity_cache import tenant_identity_cache
 
 
 class AuthService:
@@ -101,6 +105,8 @@ class AuthService:
         user.is_active = True
         if tenant is not None:
             tenant.status = TenantStatus.ACTIVE
+            after_commit(session, partial(tenant_identity_cache.invalidate, tenant.id))
+            after_commit(session, partial(authorization_context_cache.invalidate_tenant, tenant.id))
         activation_link.used_at = now
         return tenant, False
 
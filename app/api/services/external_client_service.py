@@ -1,13 +1,35 @@
+"""Outbound HTTP to third-party APIs (Przelewy24, HaveIBeenPwned).
+
+Requests reuse one keep-alive ``httpx.AsyncClient`` per upstream origin from
+``external_http_clients``, so a P24 register/verify/lookup does not pay a new
+TCP and TLS handshake each time; the clients are closed in the application
+lifespan. ``EXTERNAL_HTTP2`` negotiates HTTP/2 when the ``h2`` package is
+installed.
+
+Every URL passes ``_assert_url_safe`` first. Hosts outside ``_ALLOWED_HOSTS``
+are resolved with ``loop.getaddrinfo`` (off the event loop) through
+``host_resolver``, which caches answers for ``EXTERNAL_DNS_CACHE_TTL_SECONDS``.
+"""
+
 from __future__ import annotations
 
+import asyncio
+from collections import OrderedDict
+from collections.abc import Callable
+import importlib.util
 import ipaddress
+import logging
 import socket
+from time import monotonic
 from typing import Any
 from urllib.parse import urlparse
 
 import httpx
 
 from core.exceptions import ExternalAPIError, ServiceUnavailableError
+from core.foundation.infra.config import settings
+
+logger = logging.getLogger(__name__)
 
 _ALLOWED_SCHEMES = frozenset({"http", "https"})
 
@@ -28,7 +50,52 @@ def _is_private_ip(host: str) -> bool:
     return addr.is_private or addr.is_loopback or addr.is_link_local or addr.is_reserved
 
 
-def _assert_url_safe(url: str) -> None:
+class HostResolver:
+    """``getaddrinfo`` run off the event loop, with a per-host TTL cache."""
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float = 60.0,
+        max_hosts: int = 1_024,
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        self._ttl_seconds = ttl_seconds
+        self._max_hosts = max_hosts
+        self._clock = clock
+        self._cache: OrderedDict[str, tuple[float, tuple[str, ...]]] = OrderedDict()
+
+    async def resolve(self, hostname: str) -> tuple[str, ...]:
+        """IP addresses of ``hostname``; empty when it does not resolve."""
+        now = self._clock()
+        cached = self._cache.get(hostname)
+        if cached is not None and cached[0] > now:
+            self._cache.move_to_end(hostname)
+            return cached[1]
+
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(
+                hostname, None, proto=socket.IPPROTO_TCP
+            )
+        except socket.gaierror:
+            addresses: tuple[str, ...] = ()
+        else:
+            addresses = tuple(dict.fromkeys(str(info[4][0]) for info in infos))
+
+        self._cache[hostname] = (now + self._ttl_seconds, addresses)
+        self._cache.move_to_end(hostname)
+        while len(self._cache) > self._max_hosts:
+            self._cache.popitem(last=False)
+        return addresses
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+host_resolver = HostResolver(ttl_seconds=settings.EXTERNAL_DNS_CACHE_TTL_SECONDS)
+
+
+async def _assert_url_safe(url: str, resolver: HostResolver = host_resolver) -> None:
     parsed = urlparse(url)
 
     if parsed.scheme not in _ALLOWED_SCHEMES:
@@ -49,20 +116,67 @@ def _assert_url_safe(url: str) -> None:
         raise ExternalAPIError(message=msg)
 
     if hostname not in _ALLOWED_HOSTS:
-        try:
-            resolved = socket.getaddrinfo(hostname, None, proto=socket.IPPROTO_TCP)
-            for _, _, _, _, sockaddr in resolved:
-                ip_str = sockaddr[0]
-                if _is_private_ip(ip_str):
-                    msg = f"Blocked request: {hostname} resolves to private IP"
-                    raise ExternalAPIError(message=msg)
-        except socket.gaierror:
-            pass
+        for ip_str in await resolver.resolve(hostname):
+            if _is_private_ip(ip_str):
+                msg = f"Blocked request: {hostname} resolves to private IP"
+                raise ExternalAPIError(message=msg)
+
+
+class ExternalHttpClients:
+    """One pooled ``httpx.AsyncClient`` per upstream origin."""
+
+    def __init__(
+        self,
+        *,
+        max_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        http2: bool = False,
+    ) -> None:
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("EXTERNAL_HTTP2 is enabled but h2 is not installed; using HTTP/1.1")
+            http2 = False
+        self._http2 = http2
+        self._clients: dict[str, httpx.AsyncClient] = {}
+
+    def for_url(self, url: str) -> httpx.AsyncClient:
+        parsed = urlparse(url)
+        origin = f"{parsed.scheme}://{parsed.netloc}".lower()
+        client = self._clients.get(origin)
+        if client is None:
+            client = httpx.AsyncClient(limits=self._limits, http2=self._http2)
+            self._clients[origin] = client
+        return client
+
+    @property
+    def origins(self) -> list[str]:
+        return sorted(self._clients)
+
+    async def aclose(self) -> None:
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+
+external_http_clients = ExternalHttpClients(
+    max_connections=settings.EXTERNAL_HTTP_MAX_CONNECTIONS,
+    keepalive_expiry=settings.EXTERNAL_HTTP_KEEPALIVE_SECONDS,
+    http2=settings.EXTERNAL_HTTP2,
+)
 
 
 class ExternalClient:
-    def __init__(self) -> None:
-        self._client = httpx.AsyncClient()
+    def __init__(
+        self,
+        clients: ExternalHttpClients = external_http_clients,
+        resolver: HostResolver = host_resolver,
+    ) -> None:
+        self._clients = clients
+        self._resolver = resolver
 
     async def external_get(
         self,
@@ -73,20 +187,20 @@ class ExternalClient:
         service_name: str = "External API",
     ) -> str:
         """GET a plain-text response from an external API."""
-        _assert_url_safe(url)
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(url, headers=headers or {}, timeout=timeout)
-                response.raise_for_status()
-            except httpx.HTTPStatusError as e:
-                error_message = self._extract_error_message(e)
-                raise ExternalAPIError(message=f"{service_name} error: {error_message}") from e
-            except httpx.RequestError as e:
-                raise ServiceUnavailableError(
-                    message=f"Failed to connect to {service_name}: {e!s}",
-                ) from e
-            else:
-                return response.text
+        await _assert_url_safe(url, self._resolver)
+        client = self._clients.for_url(url)
+        try:
+            response = await client.get(url, headers=headers or {}, timeout=timeout)
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            error_message = self._extract_error_message(e)
+            raise ExternalAPIError(message=f"{service_name} error: {error_message}") from e
+        except httpx.RequestError as e:
+            raise ServiceUnavailableError(
+                message=f"Failed to connect to {service_name}: {e!s}",
+            ) from e
+        else:
+            return response.text
 
     async def external_get_json(
         self,
@@ -96,23 +210,23 @@ class ExternalClient:
         timeout: float = 30.0,
         service_name: str = "External API",
     ) -> dict[str, Any]:
-        _assert_url_safe(url)
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(url, headers=headers or {}, timeout=timeout)
-                response.raise_for_status()
-            except httpx.HTTPStatusError as e:
-                error_message = self._extract_error_message(e)
-                raise ExternalAPIError(message=f"{service_name} error: {error_message}") from e
-            except httpx.RequestError as e:
-                raise ServiceUnavailableError(
-                    message=f"Failed to connect to {service_name}: {e!s}",
-                ) from e
-            else:
-                payload = response.json()
-                if not isinstance(payload, dict):
-                    raise ExternalAPIError(message=f"{service_name} error: invalid response")
-                return payload
+        await _assert_url_safe(url, self._resolver)
+        client = self._clients.for_url(url)
+        try:
+            response = await client.get(url, headers=headers or {}, timeout=timeout)
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            error_message = self._extract_error_message(e)
+            raise ExternalAPIError(message=f"{service_name} error: {error_message}") from e
+        except httpx.RequestError as e:
+            raise ServiceUnavailableError(
+                message=f"Failed to connect to {service_name}: {e!s}",
+            ) from e
+        else:
+            payload = response.json()
+            if not isinstance(payload, dict):
+                raise ExternalAPIError(message=f"{service_name} error: invalid response")
+            return payload
 
     async def post_json(
         self,
@@ -122,9 +236,11 @@ class ExternalClient:
         headers: dict[str, str] | None = None,
         timeout: float = 30.0,
     ) -> dict[str, Any]:
-        _assert_url_safe(url)
+        await _assert_url_safe(url, self._resolver)
         merged_headers = {"Content-Type": "application/json", **(headers or {})}
-        response = await self._client.post(url, json=json, headers=merged_headers, timeout=timeout)
+        response = await self._clients.for_url(url).post(
+            url, json=json, headers=merged_headers, timeout=timeout
+        )
         response.raise_for_status()
         return response.json()
 
@@ -138,32 +254,32 @@ class ExternalClient:
         timeout: float = 30.0,
         service_name: str = "External API",
     ) -> dict[str, Any]:
-        _assert_url_safe(url)
+        await _assert_url_safe(url, self._resolver)
         merged_headers = {"Content-Type": "application/json", **(headers or {})}
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.request(
-                    method,
-                    url,
-                    json=json,
-                    headers=merged_headers,
-                    timeout=timeout,
-                )
-                response.raise_for_status()
-            except httpx.HTTPStatusError as e:
-                error_message = self._extract_error_message(e)
-                raise ExternalAPIError(message=f"{service_name} error: {error_message}") from e
-            except httpx.RequestError as e:
-                raise ServiceUnavailableError(
-                    message=f"Failed to connect to {service_name}: {e!s}",
-                ) from e
-            else:
-                if method == "PUT" and not response.text.strip():
-                    return {}
-                payload = response.json()
-                if not isinstance(payload, dict):
-                    raise ExternalAPIError(message=f"{service_name} error: invalid response")
-                return payload
+        client = self._clients.for_url(url)
+        try:
+            response = await client.request(
+                method,
+                url,
+                json=json,
+                headers=merged_headers,
+                timeout=timeout,
+            )
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            error_message = self._extract_error_message(e)
+            raise ExternalAPIError(message=f"{service_name} error: {error_message}") from e
+        except httpx.RequestError as e:
+            raise ServiceUnavailableError(
+                message=f"Failed to connect to {service_name}: {e!s}",
+            ) from e
+        else:
+            if method == "PUT" and not response.text.strip():
+                return {}
+            payload = response.json()
+            if not isinstance(payload, dict):
+                raise ExternalAPIError(message=f"{service_name} error: invalid response")
+            return payload
 
     async def external_post_json(
         self,
@@ -217,3 +333,6 @@ class ExternalClient:
             return e.response.text or str(e)
         except Exception:
             return e.response.text or str(e)
+
+
+external_client = ExternalClient()
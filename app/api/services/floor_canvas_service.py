@@ -14,6 +14,8 @@ from services.canvas_versioning import (
 from services.canvas_versioning import (
     get_canvas_version as get_archived_version,
 )
+from services.table_identity_index import table_identity_index
+from services.table_status_index import table_status_index
 
 
 class FloorCanvasService:
@@ -62,6 +64,8 @@ class FloorCanvasService:
         )
         session.add(canvas)
         await session.commit()
+        table_status_index.layout_changed(tenant_id)
+        table_identity_index.layout_changed(tenant_id)
         await session.refresh(canvas)
         return canvas
 
@@ -89,6 +93,8 @@ class FloorCanvasService:
             canvas.height = data.height
 
         await session.commit()
+        table_status_index.layout_changed(tenant_id)
+        table_identity_index.layout_changed(tenant_id)
         await session.refresh(canvas)
         return canvas
 
@@ -96,6 +102,8 @@ class FloorCanvasService:
         canvas = await self.get_canvas(session, tenant_id, canvas_id)
         await session.delete(canvas)
         await session.commit()
+        table_status_index.layout_changed(tenant_id)
+        table_identity_index.layout_changed(tenant_id)
 
     def ensure_valid_table_numeration(self, elements: list[dict[str, Any]] | None) -> None:
         if not elements:
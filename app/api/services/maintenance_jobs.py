@@ -0,0 +1,109 @@
+"""Maintenance work run by the application scheduler instead of on the request path.
+
+* ``expire-table-sessions`` marks lapsed table locks of every tenant expired;
+* ``flush-table-session-heartbeats`` writes this worker's buffered heartbeats,
+  so it runs on every worker;
+* ``reconcile-payments`` reconciles unpaid Przelewy24 transactions of every tenant;
+* ``sweep-tmp-uploads`` deletes presigned uploads that were never finalized;
+* ``cleanup-refresh-tokens`` prunes the in-process refresh-token store, so it
+  runs on every worker rather than only on the leader.
+"""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from core.foundation.database.database import AsyncSessionLocal, engine
+from core.foundation.infra.config import Settings, settings
+from core.foundation.object_storage import TEMP_UPLOAD_PREFIX, ObjectStorage, object_storage
+from core.foundation.scheduler import CronTrigger, IntervalTrigger, Scheduler, build_leader_lock
+from core.foundation.token_store import RefreshTokenStoreBackend, refresh_token_store
+from services.payment_reconciliation import PaymentReconciler, payment_reconciler
+from services.table_session_heartbeats import TableSessionHeartbeats, table_session_heartbeats
+from services.table_session_service import TableSessionService, table_session_service
+
+logger = logging.getLogger(__name__)
+
+
+async def expire_table_sessions(
+    session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+    service: TableSessionService = table_session_service,
+) -> int:
+    async with session_factory() as session:
+        expired = await service.expire_stale_sessions(session)
+        await session.commit()
+    if expired:
+        logger.info("Expired %d lapsed table sessions", expired)
+    return expired
+
+
+async def flush_table_session_heartbeats(
+    heartbeats: TableSessionHeartbeats = table_session_heartbeats,
+) -> int:
+    return await heartbeats.flush()
+
+
+async def reconcile_payments(reconciler: PaymentReconciler = payment_reconciler) -> None:
+    await reconciler.wait(run=reconciler.start())
+
+
+async def sweep_tmp_uploads(
+    storage: ObjectStorage = object_storage,
+    max_age_seconds: int = settings.UPLOAD_TMP_MAX_AGE_SECONDS,
+) -> int:
+    cutoff = datetime.now(UTC) - timedelta(seconds=max_age_seconds)
+    keys = await storage.list_keys_modified_before(TEMP_UPLOAD_PREFIX, cutoff)
+    for key in keys:
+        await storage.remove(key)
+    if keys:
+        logger.info("Removed %d abandoned uploads", len(keys))
+    return len(keys)
+
+
+async def cleanup_refresh_tokens(store: RefreshTokenStoreBackend = refresh_token_store) -> None:
+    await store.cleanup_expired()
+
+
+def build_scheduler(app_settings: Settings) -> Scheduler:
+    scheduler = Scheduler(leader=build_leader_lock(app_settings, engine))
+    jitter = app_settings.SCHEDULER_JITTER_SECONDS
+    scheduler.add_job(
+        "expire-table-sessions",
+        expire_table_sessions,
+        IntervalTrigger(app_settings.TABLE_SESSION_EXPIRY_INTERVAL_SECONDS),
+        jitter_seconds=jitter,
+    )
+    if app_settings.TABLE_SESSION_HEARTBEAT_FLUSH_SECONDS > 0:
+        scheduler.add_job(
+            "flush-table-session-heartbeats",
+            flush_table_session_heartbeats,
+            IntervalTrigger(app_settings.TABLE_SESSION_HEARTBEAT_FLUSH_SECONDS),
+            leader_only=False,
+        )
+    if app_settings.P24_RECONCILE_INTERVAL_SECONDS > 0:
+        scheduler.add_job(
+            "reconcile-payments",
+            reconcile_payments,
+            IntervalTrigger(app_settings.P24_RECONCILE_INTERVAL_SECONDS),
+            jitter_seconds=jitter,
+        )
+    scheduler.add_job(
+        "sweep-tmp-uploads",
+        sweep_tmp_uploads,
+        CronTrigger.parse(app_settings.UPLOAD_TMP_SWEEP_CRON),
+        jitter_seconds=jitter,
+    )
+    scheduler.add_job(
+        "cleanup-refresh-tokens",
+        cleanup_refresh_tokens,
+        CronTrigger.parse(app_settings.REFRESH_TOKEN_CLEANUP_CRON),
+        jitter_seconds=jitter,
+        leader_only=False,
+    )
+    return scheduler
+
+
+scheduler = build_scheduler(settings)
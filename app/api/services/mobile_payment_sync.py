@@ -19,6 +19,8 @@ from services.payment_service import (
     mongo_payment_status_from_transaction,
 )
 from services.table_session_service import TableSessionService
+from services.table_status_index import table_status_index
+from services.tenant_identity_cache import TenantIdentity
 
 MONGO_ORDER_STATUS_NEW = "new"
 
@@ -105,7 +107,7 @@ async def apply_mobile_payment_mongo_and_session_effects(
     pg_session: AsyncSession,
     table_session_service: TableSessionService,
     *,
-    tenant: Tenant,
+    tenant: Tenant | TenantIdentity,
     transaction: Transaction,
     session_id_str: str,
 ) -> None:
@@ -131,6 +133,7 @@ async def apply_mobile_payment_mongo_and_session_effects(
             )
             with suppress(DuplicateKeyError):
                 await db[KITCHEN_ORDERS_COLLECTION].insert_one(kitchen_order)
+                table_status_index.order_changed(kitchen_order)
 
         await table_session_service.mark_completed_by_session_id(
             pg_session,
@@ -1,5 +1,6 @@
 from core.constants import MENUS_COLLECTION
 from core.dto.v1.menus import MenuCategoryDTO, MenuItemDTO
+from services.tenant_menu_image_storage_service import menu_image_variants
 
 MENU_COLLECTION = MENUS_COLLECTION
 CATEGORY_META_KEY = "__category"
@@ -65,6 +66,7 @@ def normalize_mongo_menu_categories(
                     desc=desc,
                     tags=tags,
                     image_url=image_url,
+                    image_variants=menu_image_variants(image_url) if image_url else None,
                 )
             )
 
@@ -7,6 +7,7 @@ from motor.motor_asyncio import AsyncIOMotorDatabase
 
 from core.constants import KITCHEN_ORDERS_COLLECTION
 from core.exceptions import BadRequestError, NotFoundResponse
+from services.table_status_index import table_status_index
 
 INVALID_ORDER_STATUS_TRANSITION_CODE = "INVALID_ORDER_STATUS_TRANSITION"
 KITCHEN_TERMINAL_BOARD_STATUSES = frozenset({"rejected", "cancelled", "refunded"})
@@ -87,6 +88,7 @@ class OrderService:
             doc["invoiceData"] = inv
 
         await db[KITCHEN_ORDERS_COLLECTION].insert_one(doc)
+        table_status_index.order_changed(doc)
         return _serialize_order(doc, timezone_name=timezone_name)
 
     async def update_order(
@@ -142,6 +144,8 @@ class OrderService:
         )
 
         updated = await db[KITCHEN_ORDERS_COLLECTION].find_one({"_id": order_id})
+        if updated is not None:
+            table_status_index.order_changed(updated)
         return _serialize_order(updated, timezone_name=timezone_name)
 
     async def update_status(
@@ -191,6 +195,8 @@ class OrderService:
         )
 
         updated = await db[KITCHEN_ORDERS_COLLECTION].find_one({"_id": order_id})
+        if updated is not None:
+            table_status_index.order_changed(updated)
         return _serialize_order(updated, timezone_name=timezone_name)
 
     async def delete_order(
@@ -208,6 +214,7 @@ class OrderService:
             raise NotFoundResponse(msg, order_id)
 
         await db[KITCHEN_ORDERS_COLLECTION].delete_one({"_id": order_id})
+        table_status_index.order_removed(restaurant_id, order_id)
         return _serialize_order(doc, timezone_name=timezone_name)
 
     async def get_order_for_archive(
@@ -0,0 +1,519 @@
+"""Reconciliation of unpaid Przelewy24 transactions, run in the background.
+
+Payments whose status notification never reached us stay unpaid until they
+are looked up at Przelewy24. ``PaymentReconciler`` does that for every tenant
+from the scheduled ``reconcile-payments`` job and, on demand, for one tenant
+through ``POST /payments/transactions/reconcile-pending``. A run:
+
+* loads the unpaid transactions and the credentials of their tenants with one
+  query each;
+* looks the transactions up concurrently, with at most
+  ``P24_RECONCILE_MAX_CONCURRENCY`` requests in flight overall and
+  ``P24_RECONCILE_TENANT_CONCURRENCY`` per tenant;
+* applies results as they arrive in batches of ``P24_RECONCILE_BATCH_SIZE``,
+  one commit per batch, each transaction inside its own savepoint so a failing
+  one does not undo the rest of its batch.
+
+Runs execute one at a time: each holds the ``P24_RECONCILE_LOCK_ID`` advisory
+lock (see ``build_leader_lock``), so workers never reconcile concurrently.
+Starting a run returns the queued or running one that already covers the
+tenant; otherwise a new run is queued behind it. Progress is saved to a
+``ReconciliationRunStore`` as the run goes; with ``P24_RECONCILE_RUN_STORE=redis``
+every worker can report the latest run, whichever worker executed it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict, deque
+from collections.abc import Callable
+from contextlib import suppress
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+import json
+import logging
+from typing import Any, Literal, Protocol
+from uuid import UUID, uuid4
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from core.foundation.database.connection import get_mongo_db, get_redis_client
+from core.foundation.database.database import AsyncSessionLocal, engine
+from core.foundation.infra.config import Settings, settings
+from core.foundation.scheduler import LeaderLock, LocalLeaderLock, build_leader_lock
+from core.models.tenant import Tenant
+from core.models.transaction import Transaction
+from services.external_client_service import ExternalClient, external_client
+from services.mobile_payment_sync import apply_mobile_payment_mongo_and_session_effects
+from services.payment_service import P24Service
+from services.table_session_service import TableSessionService, table_session_service
+from services.tenant_identity_cache import TenantIdentity
+
+logger = logging.getLogger(__name__)
+
+_MAX_RECORDED_FAILURES = 50
+# Seconds between attempts to take the run lock while another worker holds it.
+_LOCK_RETRY_SECONDS = 1.0
+
+RunStatus = Literal["queued", "running", "completed", "failed", "cancelled"]
+
+
+@dataclass
+class ReconcileCounts:
+    scanned: int = 0
+    updated: int = 0
+    failed: int = 0
+
+
+@dataclass(frozen=True)
+class ReconcileFailure:
+    tenant_id: UUID
+    session_id: UUID
+    reason: str
+
+
+@dataclass
+class ReconciliationRun:
+    """Progress of one run; updated in place while it executes."""
+
+    id: str
+    tenant_id: UUID | None
+    started_at: datetime
+    status: RunStatus = "running"
+    finished_at: datetime | None = None
+    tenants: dict[UUID, ReconcileCounts] = field(default_factory=dict)
+    failures: list[ReconcileFailure] = field(default_factory=list)
+
+    def covers(self, tenant_id: UUID) -> bool:
+        return self.tenant_id is None or self.tenant_id == tenant_id
+
+    def counts(self, tenant_id: UUID | None = None) -> ReconcileCounts:
+        """Counters of one tenant, or summed over every tenant of the run."""
+        if tenant_id is not None:
+            return self.tenants.get(tenant_id, ReconcileCounts())
+        total = ReconcileCounts()
+        for counts in self.tenants.values():
+            total.scanned += counts.scanned
+            total.updated += counts.updated
+            total.failed += counts.failed
+        return total
+
+    def counts_for(self, tenant_id: UUID) -> ReconcileCounts:
+        return self.tenants.setdefault(tenant_id, ReconcileCounts())
+
+    def record_failure(self, tenant_id: UUID, session_id: UUID, reason: str) -> None:
+        self.counts_for(tenant_id).failed += 1
+        if len(self.failures) < _MAX_RECORDED_FAILURES:
+            self.failures.append(ReconcileFailure(tenant_id, session_id, reason))
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "id": self.id,
+                "tenant_id": str(self.tenant_id) if self.tenant_id else None,
+                "started_at": self.started_at.isoformat(),
+                "status": self.status,
+                "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+                "tenants": {
+                    str(tenant_id): [counts.scanned, counts.updated, counts.failed]
+                    for tenant_id, counts in self.tenants.items()
+                },
+                "failures": [
+                    [str(failure.tenant_id), str(failure.session_id), failure.reason]
+                    for failure in self.failures
+                ],
+            }
+        )
+
+    @classmethod
+    def from_json(cls, raw: str | bytes) -> ReconciliationRun:
+        data = json.loads(raw)
+        return cls(
+            id=data["id"],
+            tenant_id=UUID(data["tenant_id"]) if data["tenant_id"] else None,
+            started_at=datetime.fromisoformat(data["started_at"]),
+            status=data["status"],
+            finished_at=(
+                datetime.fromisoformat(data["finished_at"]) if data["finished_at"] else None
+            ),
+            tenants={
+                UUID(tenant_id): ReconcileCounts(*counts)
+                for tenant_id, counts in data["tenants"].items()
+            },
+            failures=[
+                ReconcileFailure(UUID(tenant_id), UUID(session_id), reason)
+                for tenant_id, session_id, reason in data["failures"]
+            ],
+        )
+
+
+class ReconciliationRunStore(Protocol):
+    async def save(self, run: ReconciliationRun) -> None: ...
+
+    async def latest(self, tenant_id: UUID | None = None) -> ReconciliationRun | None: ...
+
+
+class InMemoryReconciliationRunStore:
+    """The most recent runs started by this process."""
+
+    def __init__(self, history: int = 20) -> None:
+        self._runs: deque[ReconciliationRun] = deque(maxlen=history)
+
+    async def save(self, run: ReconciliationRun) -> None:
+        # Runs are updated in place; only a new one needs recording.
+        if not any(stored is run for stored in self._runs):
+            self._runs.appendleft(run)
+
+    async def latest(self, tenant_id: UUID | None = None) -> ReconciliationRun | None:
+        """The most recent run, or the most recent one that covered ``tenant_id``."""
+        for run in self._runs:
+            if tenant_id is None or run.covers(tenant_id):
+                return run
+        return None
+
+
+class RedisReconciliationRunStore:
+    """Latest runs shared by every worker through Redis.
+
+    A run is saved as JSON under the latest-run key and under the key of its
+    scope (all tenants, or its tenant), each with a TTL. The latest run that
+    covered a tenant is the newer of the all-tenants run and its own. Redis
+    errors read as misses.
+    """
+
+    def __init__(
+        self,
+        client: Redis,
+        ttl_seconds: int = 7 * 24 * 3600,
+        key_prefix: str = "p24:reconcile:",
+    ) -> None:
+        self._client = client
+        self._ttl = ttl_seconds
+        self._key_prefix = key_prefix
+
+    def _scope_key(self, tenant_id: UUID | None) -> str:
+        return f"{self._key_prefix}{tenant_id or 'all'}"
+
+    async def save(self, run: ReconciliationRun) -> None:
+        raw = run.to_json()
+        try:
+            async with self._client.pipeline(transaction=True) as pipe:
+                pipe.set(f"{self._key_prefix}latest", raw, ex=self._ttl)
+                pipe.set(self._scope_key(run.tenant_id), raw, ex=self._ttl)
+                await pipe.execute()
+        except RedisError:
+            logger.warning("Reconciliation run store unavailable, run %s not shared", run.id)
+
+    async def latest(self, tenant_id: UUID | None = None) -> ReconciliationRun | None:
+        keys = [f"{self._key_prefix}latest"]
+        if tenant_id is not None:
+            keys = [self._scope_key(None), self._scope_key(tenant_id)]
+        try:
+            values = await self._client.mget(keys)
+        except RedisError:
+            logger.warning("Reconciliation run store unavailable")
+            return None
+        runs = [ReconciliationRun.from_json(raw) for raw in values if raw is not None]
+        return max(runs, key=lambda run: run.started_at, default=None)
+
+
+def build_reconciliation_run_store(
+    app_settings: Settings,
+) -> ReconciliationRunStore:
+    if app_settings.P24_RECONCILE_RUN_STORE.strip().lower() == "redis":
+        return RedisReconciliationRunStore(get_redis_client())
+    return InMemoryReconciliationRunStore()
+
+
+@dataclass(frozen=True)
+class PaymentReconcilerStats:
+    running: bool
+    runs: int
+    scanned: int
+    updated: int
+    failed: int
+    last_status: str | None
+    last_finished_at: str | None
+
+
+def _reason(exc: Exception) -> str:
+    return str(getattr(exc, "detail", "") or exc) or type(exc).__name__
+
+
+class PaymentReconciler:
+    """Runs reconciliations as background tasks, one at a time, and records them."""
+
+    def __init__(  # noqa: PLR0913
+        self,
+        *,
+        p24_service: P24Service | None = None,
+        client: ExternalClient = external_client,
+        table_sessions: TableSessionService = table_session_service,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+        mongo: Callable[[], AsyncIOMotorDatabase] = get_mongo_db,
+        max_concurrency: int = 8,
+        tenant_concurrency: int = 2,
+        batch_size: int = 25,
+        max_transactions: int = 500,
+        hours_max_age: int = 72,
+        history: int = 20,
+        store: ReconciliationRunStore | None = None,
+        lock: LeaderLock | None = None,
+        lock_retry_seconds: float = _LOCK_RETRY_SECONDS,
+        clock: Callable[[], datetime] = lambda: datetime.now(UTC),
+    ) -> None:
+        self._p24 = p24_service or P24Service()
+        self._client = client
+        self._table_sessions = table_sessions
+        self._session_factory = session_factory
+        self._mongo = mongo
+        self._max_concurrency = max_concurrency
+        self._tenant_concurrency = tenant_concurrency
+        self._batch_size = max(1, batch_size)
+        self._max_transactions = max_transactions
+        self._hours_max_age = hours_max_age
+        self._clock = clock
+        self._history = InMemoryReconciliationRunStore(history)
+        self._store = store or self._history
+        self._lock = lock or LocalLeaderLock()
+        self._lock_retry_seconds = lock_retry_seconds
+        self._guard = asyncio.Lock()
+        self._active: dict[str, tuple[ReconciliationRun, asyncio.Task[None]]] = {}
+        self._last: ReconciliationRun | None = None
+        self._runs = 0
+        self._totals = ReconcileCounts()
+
+    @property
+    def running(self) -> ReconciliationRun | None:
+        for run, _ in self._active.values():
+            if run.status == "running":
+                return run
+        return None
+
+    def start(self, tenant_id: UUID | None = None) -> ReconciliationRun:
+        """Queue a run for one tenant (or all when None), unless one already covers it."""
+        for run, _ in self._active.values():
+            if run.tenant_id is None or run.tenant_id == tenant_id:
+                return run
+        run = ReconciliationRun(
+            id=uuid4().hex, tenant_id=tenant_id, started_at=self._clock(), status="queued"
+        )
+        self._last = run
+        self._runs += 1
+        task = asyncio.create_task(self._execute(run))
+        self._active[run.id] = (run, task)
+        task.add_done_callback(lambda _: self._active.pop(run.id, None))
+        return run
+
+    async def wait(
+        self, timeout: float | None = None, run: ReconciliationRun | None = None
+    ) -> None:
+        """Wait up to ``timeout`` seconds for ``run`` (or every queued and running one).
+
+        Runs keep going afterwards.
+        """
+        tasks = {task for active, task in self._active.values() if run is None or active is run}
+        if tasks:
+            await asyncio.wait(tasks, timeout=timeout)
+
+    async def latest(self, tenant_id: UUID | None = None) -> ReconciliationRun | None:
+        """The most recent run, or the most recent one that covered ``tenant_id``.
+
+        Runs of this process are reported live; others come from the shared store.
+        """
+        runs = [await self._history.latest(tenant_id)]
+        if self._store is not self._history:
+            runs.append(await self._store.latest(tenant_id))
+        return max(
+            (run for run in runs if run is not None),
+            key=lambda run: run.started_at,
+            default=None,
+        )
+
+    async def stop(self) -> None:
+        """Cancel queued runs and the one in progress."""
+        tasks = [task for _, task in self._active.values()]
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            with suppress(asyncio.CancelledError):
+                await task
+
+    def stats(self) -> PaymentReconcilerStats:
+        last = self._last
+        return PaymentReconcilerStats(
+            running=self.running is not None,
+            runs=self._runs,
+            scanned=self._totals.scanned,
+            updated=self._totals.updated,
+            failed=self._totals.failed,
+            last_status=last.status if last else None,
+            last_finished_at=(last.finished_at.isoformat() if last and last.finished_at else None),
+        )
+
+    async def _execute(self, run: ReconciliationRun) -> None:
+        try:
+            await self._save(run)
+            async with self._guard:
+                await self._acquire_lock()
+                try:
+                    run.status = "running"
+                    run.started_at = self._clock()
+                    await self._save(run)
+                    await self._reconcile(run)
+                finally:
+                    await self._lock.release()
+        except asyncio.CancelledError:
+            run.status = "cancelled"
+            raise
+        except Exception:
+            logger.exception("Payment reconciliation %s failed", run.id)
+            run.status = "failed"
+        else:
+            run.status = "completed"
+        finally:
+            run.finished_at = self._clock()
+            totals = run.counts()
+            self._totals.scanned += totals.scanned
+            self._totals.updated += totals.updated
+            self._totals.failed += totals.failed
+            await self._save(run)
+
+    async def _acquire_lock(self) -> None:
+        while not await self._lock.is_leader():
+            await asyncio.sleep(self._lock_retry_seconds)
+
+    async def _save(self, run: ReconciliationRun) -> None:
+        await self._history.save(run)
+        if self._store is not self._history:
+            await self._store.save(run)
+
+    async def _reconcile(self, run: ReconciliationRun) -> None:
+        db = self._mongo()
+        async with self._session_factory() as session:
+            pending = await self._p24.get_transactions_pending_reconcile(
+                session,
+                run.tenant_id,
+                hours_max_age=self._hours_max_age,
+                limit=self._max_transactions,
+            )
+            tenants = await self._load_tenants(session, {tx.tenant_id for tx in pending})
+            for transaction in pending:
+                run.counts_for(transaction.tenant_id).scanned += 1
+
+            overall = asyncio.Semaphore(self._max_concurrency)
+            per_tenant: defaultdict[UUID, asyncio.Semaphore] = defaultdict(
+                lambda: asyncio.Semaphore(self._tenant_concurrency)
+            )
+            lookups = [
+                asyncio.create_task(
+                    self._lookup(
+                        run,
+                        transaction,
+                        tenants.get(transaction.tenant_id),
+                        overall,
+                        per_tenant[transaction.tenant_id],
+                    )
+                )
+                for transaction in pending
+            ]
+            try:
+                batch: list[tuple[Transaction, dict[str, Any]]] = []
+                for next_lookup in asyncio.as_completed(lookups):
+                    result = await next_lookup
+                    if result is None:
+                        continue
+                    batch.append(result)
+                    if len(batch) >= self._batch_size:
+                        await self._apply(session, db, run, tenants, batch)
+                        batch = []
+                if batch:
+                    await self._apply(session, db, run, tenants, batch)
+            finally:
+                for task in lookups:
+                    task.cancel()
+
+    async def _load_tenants(
+        self, session: AsyncSession, tenant_ids: set[UUID]
+    ) -> dict[UUID, TenantIdentity]:
+        if not tenant_ids:
+            return {}
+        result = await session.execute(select(Tenant).where(Tenant.id.in_(tenant_ids)))
+        return {tenant.id: TenantIdentity.from_tenant(tenant) for tenant in result.scalars()}
+
+    async def _lookup(
+        self,
+        run: ReconciliationRun,
+        transaction: Transaction,
+        tenant: TenantIdentity | None,
+        overall: asyncio.Semaphore,
+        tenant_slots: asyncio.Semaphore,
+    ) -> tuple[Transaction, dict[str, Any]] | None:
+        if tenant is None:
+            run.record_failure(transaction.tenant_id, transaction.session_id, "Tenant not found")
+            return None
+        try:
+            # Take the tenant slot first so a busy tenant does not hold global slots.
+            async with tenant_slots, overall:
+                data, _ = await self._p24.lookup_p24_transaction(
+                    self._client, transaction=transaction, tenant=tenant
+                )
+        except Exception as exc:
+            run.record_failure(transaction.tenant_id, transaction.session_id, _reason(exc))
+            return None
+        return transaction, data
+
+    async def _apply(
+        self,
+        session: AsyncSession,
+        db: AsyncIOMotorDatabase,
+        run: ReconciliationRun,
+        tenants: dict[UUID, TenantIdentity],
+        batch: list[tuple[Transaction, dict[str, Any]]],
+    ) -> None:
+        applied: list[UUID] = []
+        for transaction, data in batch:
+            # Read before the savepoint: rolling it back expires the transaction.
+            tenant_id, session_id = transaction.tenant_id, transaction.session_id
+            try:
+                async with session.begin_nested():
+                    self._p24.apply_p24_lookup_data(transaction, data)
+                    await session.flush()
+                    await apply_mobile_payment_mongo_and_session_effects(
+                        db,
+                        session,
+                        self._table_sessions,
+                        tenant=tenants[tenant_id],
+                        transaction=transaction,
+                        session_id_str=str(session_id),
+                    )
+            except Exception as exc:
+                run.record_failure(tenant_id, session_id, _reason(exc))
+            else:
+                applied.append(tenant_id)
+
+        try:
+            await session.commit()
+        except Exception:
+            # The batch is lost and every loaded transaction is expired; end the run.
+            for tenant_id in applied:
+                run.counts_for(tenant_id).failed += 1
+            await session.rollback()
+            raise
+        for tenant_id in applied:
+            run.counts_for(tenant_id).updated += 1
+        await self._save(run)
+
+
+payment_reconciler = PaymentReconciler(
+    max_concurrency=settings.P24_RECONCILE_MAX_CONCURRENCY,
+    tenant_concurrency=settings.P24_RECONCILE_TENANT_CONCURRENCY,
+    batch_size=settings.P24_RECONCILE_BATCH_SIZE,
+    max_transactions=settings.P24_RECONCILE_MAX_TRANSACTIONS,
+    store=build_reconciliation_run_store(settings),
+    lock=build_leader_lock(settings, engine, settings.P24_RECONCILE_LOCK_ID),
+)
@@ -17,6 +17,7 @@ from core.models import Przelewy24RegisterRequest, Przelewy24VerifyRequest
 from core.models.tenant import Tenant
 from core.models.transaction import Transaction
 from services.external_client_service import ExternalClient
+from services.tenant_identity_cache import TenantIdentity
 
 TX_STATUS_UNPAID = 0
 TX_STATUS_PAID = 1
@@ -177,7 +178,7 @@ class P24Service:
         raise BadRequestError(message=f"Unsupported Przelewy24 transaction status: {p24_status}")
 
     @staticmethod
-    def validate_tenant_p24_credentials(tenant: Tenant) -> None:
+    def validate_tenant_p24_credentials(tenant: Tenant | TenantIdentity) -> None:
         if not all([tenant.p24_merchantid, tenant.p24_api, tenant.p24_crc]):
             raise BadRequestError(
                 message=f"Tenant '{tenant.name}' does not have Przelewy24 credentials configured"
@@ -397,13 +398,14 @@ class P24Service:
         response_code = 0 if rc is None else int(rc)
         return data, response_code
 
-    async def apply_p24_lookup_to_transaction(
+    async def lookup_p24_transaction(
         self,
         external_client: ExternalClient,
         *,
         transaction: Transaction,
-        tenant: Tenant,
+        tenant: Tenant | TenantIdentity,
     ) -> tuple[dict[str, Any], int]:
+        """Fetch ``transaction`` from Przelewy24 and check it matches; does not modify it."""
         self.validate_tenant_p24_credentials(tenant)
         data, response_code = await self.fetch_transaction_by_session_id(
             external_client,
@@ -425,10 +427,23 @@ class P24Service:
         if currency is not None and currency != transaction.currency:
             raise ConflictError(message="Transaction currency does not match Przelewy24 data")
 
-        db_status = self.map_p24_status_to_db(p24_status)
-        transaction.status = db_status
+        return data, response_code
+
+    def apply_p24_lookup_data(self, transaction: Transaction, data: dict[str, Any]) -> None:
+        transaction.status = self.map_p24_status_to_db(data["status"])
         transaction.p24_order_id = self._parse_p24_positive_int_id(data.get("orderId"))
 
+    async def apply_p24_lookup_to_transaction(
+        self,
+        external_client: ExternalClient,
+        *,
+        transaction: Transaction,
+        tenant: Tenant | TenantIdentity,
+    ) -> tuple[dict[str, Any], int]:
+        data, response_code = await self.lookup_p24_transaction(
+            external_client, transaction=transaction, tenant=tenant
+        )
+        self.apply_p24_lookup_data(transaction, data)
         return data, response_code
 
     async def get_transactions_page(
@@ -462,20 +477,18 @@ class P24Service:
     async def get_transactions_pending_reconcile(
         self,
         session: AsyncSession,
-        tenant_id: UUID,
+        tenant_id: UUID | None,
         *,
         hours_max_age: int = 72,
         limit: int = 50,
     ) -> list[Transaction]:
+        """Unpaid transactions of one tenant, or of every tenant when ``tenant_id`` is None."""
         cutoff = datetime.now(UTC) - timedelta(hours=hours_max_age)
-        stmt = (
-            select(Transaction)
-            .where(
-                Transaction.tenant_id == tenant_id,
-                Transaction.status == TX_STATUS_UNPAID,
-                Transaction.created_at >= cutoff,
-            )
-            .order_by(Transaction.created_at.desc())
-            .limit(limit)
+        stmt = select(Transaction).where(
+            Transaction.status == TX_STATUS_UNPAID,
+            Transaction.created_at >= cutoff,
         )
+        if tenant_id is not None:
+            stmt = stmt.where(Transaction.tenant_id == tenant_id)
+        stmt = stmt.order_by(Transaction.created_at.desc()).limit(limit)
         return list((await session.execute(stmt)).scalars().all())
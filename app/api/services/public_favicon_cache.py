@@ -0,0 +1,72 @@
+"""Tenant favicon bytes served to guest browsers without a storage round trip.
+
+``GET /public/{tenant_slug}/favicon.ico`` used to read the object from MinIO
+on every request. Bodies are kept per ``favicon_object_key`` together with
+the ``updated_at`` of the mobile config row they were read for; a finalized
+upload rewrites the same key but bumps ``updated_at``, so an icon replaced
+through another worker is re-read on the next request. The finalize route
+also drops this worker's entry directly.
+
+The LRU is bounded by total body size as well as by entry count.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+
+from core.foundation.http.conditional import strong_etag
+
+
+@dataclass(frozen=True, slots=True)
+class CachedFavicon:
+    updated_at: datetime
+    body: bytes
+    etag: str
+
+
+class PublicFaviconCache:
+    """In-process LRU of favicon bodies keyed by object key."""
+
+    def __init__(self, *, max_entries: int = 1_000, max_bytes: int = 16 * 1024 * 1024) -> None:
+        self._entries: OrderedDict[str, CachedFavicon] = OrderedDict()
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._size = 0
+
+    def get(self, object_key: str, updated_at: datetime) -> CachedFavicon | None:
+        entry = self._entries.get(object_key)
+        if entry is None:
+            return None
+        if entry.updated_at != updated_at:
+            self.invalidate(object_key)
+            return None
+        self._entries.move_to_end(object_key)
+        return entry
+
+    def store(self, object_key: str, updated_at: datetime, body: bytes) -> CachedFavicon:
+        entry = CachedFavicon(updated_at=updated_at, body=body, etag=strong_etag(body))
+        self.invalidate(object_key)
+        if len(body) > self._max_bytes:
+            return entry
+        while self._entries and (
+            len(self._entries) >= self._max_entries or self._size + len(body) > self._max_bytes
+        ):
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted.body)
+        self._entries[object_key] = entry
+        self._size += len(body)
+        return entry
+
+    def invalidate(self, object_key: str) -> None:
+        entry = self._entries.pop(object_key, None)
+        if entry is not None:
+            self._size -= len(entry.body)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._size = 0
+
+
+public_favicon_cache = PublicFaviconCache()
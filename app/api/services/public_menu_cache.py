@@ -0,0 +1,61 @@
+"""Serialized public menu responses, reused until the menu document changes.
+
+Every guest device polls ``GET /public/{tenant_slug}/menu``. The response
+bytes and their ETag are kept per tenant together with the ``updatedAt`` of
+the menu document they were built from. A request only fetches ``updatedAt``
+from Mongo and reuses the bytes while it matches, so a menu saved through
+another worker is picked up on the next request; the menu write routes also
+drop this worker's entry directly.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+
+from core.foundation.http.conditional import strong_etag
+
+
+@dataclass(frozen=True, slots=True)
+class CachedMenuResponse:
+    updated_at: datetime | None
+    body: bytes
+    etag: str
+
+
+class PublicMenuCache:
+    """In-process LRU of serialized menu responses keyed by tenant public id."""
+
+    def __init__(self, *, max_entries: int = 1_000) -> None:
+        self._entries: OrderedDict[str, CachedMenuResponse] = OrderedDict()
+        self._max_entries = max_entries
+
+    def get(self, tenant_public_id: str, updated_at: datetime | None) -> CachedMenuResponse | None:
+        entry = self._entries.get(tenant_public_id)
+        if entry is None:
+            return None
+        if entry.updated_at != updated_at:
+            del self._entries[tenant_public_id]
+            return None
+        self._entries.move_to_end(tenant_public_id)
+        return entry
+
+    def store(
+        self, tenant_public_id: str, updated_at: datetime | None, body: bytes
+    ) -> CachedMenuResponse:
+        entry = CachedMenuResponse(updated_at=updated_at, body=body, etag=strong_etag(body))
+        self._entries.pop(tenant_public_id, None)
+        while self._entries and len(self._entries) >= self._max_entries:
+            self._entries.popitem(last=False)
+        self._entries[tenant_public_id] = entry
+        return entry
+
+    def invalidate(self, tenant_public_id: str) -> None:
+        self._entries.pop(tenant_public_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+public_menu_cache = PublicMenuCache()
@@ -0,0 +1,103 @@
+"""Per-tenant lookup of floor tables by element id and by table number.
+
+Acquiring a table session and creating a payment resolve the table a guest
+scanned or typed. Instead of transferring and scanning every canvas'
+``elements`` on each call, a tenant's tables are compiled into two dicts once
+per canvas ``version`` and kept in memory:
+
+* ``by_ref`` maps a table element id to its identity;
+* ``by_number`` maps a table number to its identity, or to ``None`` when the
+  number is on more than one floor.
+
+Canvas writes made by this worker invalidate the tenant right away. Other
+workers' writes are picked up ``TABLE_STATUS_RESYNC_SECONDS`` after the index
+was compiled, or as soon as a lookup misses.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from uuid import UUID
+
+from core.foundation.infra.config import settings
+from services.table_status_index import TableGeometry
+from services.tenant_state_lru import TenantStateLRU
+
+
+@dataclass(frozen=True, slots=True)
+class ResolvedTableIdentity:
+    table_ref: str
+    table_number: int | None
+    table_label: str | None
+
+
+@dataclass(frozen=True, slots=True)
+class CanvasTables:
+    version: int
+    tables: tuple[TableGeometry, ...]
+
+
+@dataclass(slots=True)
+class TenantTableIdentities:
+    canvases: dict[UUID, CanvasTables]
+    by_ref: dict[str, ResolvedTableIdentity] = field(default_factory=dict)
+    by_number: dict[int, ResolvedTableIdentity | None] = field(default_factory=dict)
+    loaded_at: float = 0.0
+
+    def knows(self, *, table_number: int | None, table_ref: str | None) -> bool:
+        """Whether a lookup hits the index: by ``table_ref`` when given, else by number.
+
+        A ref this index has not seen may be a table added on another worker, so it
+        misses even when the number is known.
+        """
+        if table_ref:
+            return table_ref in self.by_ref
+        return table_number is not None and table_number in self.by_number
+
+
+def compile_table_identities(canvases: Mapping[UUID, CanvasTables]) -> TenantTableIdentities:
+    identities = TenantTableIdentities(canvases=dict(canvases))
+    for canvas in canvases.values():
+        for table in canvas.tables:
+            identities.by_ref.setdefault(
+                table.id,
+                ResolvedTableIdentity(
+                    table_ref=table.id, table_number=table.table_number, table_label=table.label
+                ),
+            )
+            if table.table_number is None:
+                continue
+            if table.table_number in identities.by_number:
+                identities.by_number[table.table_number] = None
+            else:
+                identities.by_number[table.table_number] = ResolvedTableIdentity(
+                    table_ref=table.id,
+                    table_number=table.table_number,
+                    table_label=table.label or f"Table {table.table_number}",
+                )
+    return identities
+
+
+class TableIdentityIndex(TenantStateLRU[UUID, TenantTableIdentities]):
+    """In-process LRU of ``TenantTableIdentities`` keyed by tenant id."""
+
+    def tables(self, tenant_id: UUID, canvas_id: UUID, version: int) -> CanvasTables | None:
+        """Tables parsed from an earlier load of the same canvas version, even if stale."""
+        identities = self.peek(tenant_id)
+        if identities is None:
+            return None
+        canvas = identities.canvases.get(canvas_id)
+        return canvas if canvas is not None and canvas.version == version else None
+
+    def store(
+        self, tenant_id: UUID, canvases: Mapping[UUID, CanvasTables]
+    ) -> TenantTableIdentities:
+        return self.put(tenant_id, compile_table_identities(canvases))
+
+    def layout_changed(self, tenant_id: UUID) -> None:
+        """Recompile the tenant's index on the next lookup; unchanged versions are reused."""
+        self.mark_stale(tenant_id)
+
+
+table_identity_index = TableIdentityIndex(resync_seconds=settings.TABLE_STATUS_RESYNC_SECONDS)
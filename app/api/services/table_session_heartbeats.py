@@ -0,0 +1,130 @@
+"""Write-behind buffer for table session heartbeats.
+
+Every seated guest calls ``POST /public/table-sessions/refresh`` to keep its
+table lock. Instead of writing ``last_seen_at``/``expires_at`` on each call,
+a refresh is recorded here, coalesced per session (latest wins), and written
+by the ``flush-table-session-heartbeats`` job every
+``TABLE_SESSION_HEARTBEAT_FLUSH_SECONDS`` in one batched UPDATE.
+
+The ``expiresAt`` returned to the guest is unchanged: the lock holds until
+then. Postgres trails the buffer by a flush interval (more if a flush runs
+late), so expiry only treats a session as lapsed ``grace`` (two intervals)
+after its stored ``expires_at``. The UPDATE only moves ``expires_at`` forward
+and skips sessions that are no longer active.
+
+The buffer is per process; ``0`` for the interval, or a disabled scheduler,
+writes every heartbeat through as before.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+import logging
+from uuid import UUID
+
+from sqlalchemy import bindparam, func, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from core.foundation.database.database import AsyncSessionLocal
+from core.foundation.infra.config import settings
+from core.models import TableSession, TableSessionStatus
+
+logger = logging.getLogger(__name__)
+
+_table = TableSession.__table__
+_FLUSH_HEARTBEATS = (
+    update(_table)
+    .where(
+        _table.c.id == bindparam("b_id"),
+        _table.c.status == TableSessionStatus.ACTIVE,
+        _table.c.expires_at < bindparam("b_expires_at"),
+    )
+    .values(
+        last_seen_at=bindparam("b_last_seen_at"),
+        expires_at=bindparam("b_expires_at"),
+        ip_hash=func.coalesce(bindparam("b_ip_hash"), _table.c.ip_hash),
+        client_fingerprint_hash=func.coalesce(
+            bindparam("b_client_fingerprint_hash"), _table.c.client_fingerprint_hash
+        ),
+    )
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Heartbeat:
+    last_seen_at: datetime
+    expires_at: datetime
+    ip_hash: str | None
+    client_fingerprint_hash: str | None
+
+
+class TableSessionHeartbeats:
+    def __init__(
+        self,
+        *,
+        flush_seconds: float,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+    ) -> None:
+        self._flush_seconds = flush_seconds
+        self._session_factory = session_factory
+        self._pending: dict[UUID, Heartbeat] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self._flush_seconds > 0
+
+    @property
+    def grace(self) -> timedelta:
+        """How far stored ``expires_at`` may trail what guests were told; a flush may run late."""
+        return timedelta(seconds=2 * self._flush_seconds) if self.enabled else timedelta(0)
+
+    def record(self, table_session_id: UUID, heartbeat: Heartbeat) -> None:
+        self._pending[table_session_id] = heartbeat
+
+    def pending(self, table_session_id: UUID) -> Heartbeat | None:
+        return self._pending.get(table_session_id)
+
+    def discard(self, table_session_id: UUID) -> None:
+        self._pending.pop(table_session_id, None)
+
+    async def flush(self) -> int:
+        """Write buffered heartbeats in one batched UPDATE; on failure they are kept."""
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        try:
+            async with self._session_factory() as session:
+                await session.execute(
+                    _FLUSH_HEARTBEATS,
+                    [
+                        {
+                            "b_id": table_session_id,
+                            "b_last_seen_at": heartbeat.last_seen_at,
+                            "b_expires_at": heartbeat.expires_at,
+                            "b_ip_hash": heartbeat.ip_hash,
+                            "b_client_fingerprint_hash": heartbeat.client_fingerprint_hash,
+                        }
+                        for table_session_id, heartbeat in pending.items()
+                    ],
+                )
+                await session.commit()
+        except Exception:
+            for table_session_id, heartbeat in pending.items():
+                self._pending.setdefault(table_session_id, heartbeat)
+            raise
+        return len(pending)
+
+    async def close(self) -> None:
+        """Flush what is left at shutdown; a failure is logged, not raised."""
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception("Could not flush %d table session heartbeats", len(self._pending))
+
+
+table_session_heartbeats = TableSessionHeartbeats(
+    flush_seconds=settings.TABLE_SESSION_HEARTBEAT_FLUSH_SECONDS
+    if settings.SCHEDULER_ENABLED
+    else 0
+)
@@ -1,38 +1,41 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
+from functools import partial
 import hashlib
 import secrets
 from uuid import UUID
 
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from sqlalchemy import select
+from sqlalchemy import select, text, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 
 from core.constants import KITCHEN_ORDERS_COLLECTION
 from core.exceptions import BadRequestError, ConflictError, NotFoundResponse
+from core.foundation.database.hooks import after_commit
 from core.models import AuditLog, FloorCanvas, TableSession, TableSessionOrigin, TableSessionStatus
 from core.models.tenant import Tenant
+from services.table_identity_index import (
+    CanvasTables,
+    ResolvedTableIdentity,
+    TenantTableIdentities,
+    table_identity_index,
+)
+from services.table_session_heartbeats import Heartbeat, table_session_heartbeats
+from services.table_status_index import (
+    ACTIVE_KITCHEN_ORDER_STATUSES,
+    CanvasLayout,
+    TenantTableState,
+    parse_table_elements,
+    table_status_index,
+)
+from services.tenant_identity_cache import TenantIdentity
 
 _ACTIVE_LOCK_TTL = timedelta(minutes=10)
-_ACTIVE_WAITER_STATUSES = {
-    "new",
-    "pending",
-    "confirmed",
-    "placed",
-    "preparing",
-    "ready",
-    "ready_to_serve",
-    "delivered",
-}
-
-
-@dataclass(slots=True)
-class ResolvedTableIdentity:
-    table_ref: str
-    table_number: int | None
-    table_label: str | None
+# Rounds of read-then-insert before giving up on a table whose lock keeps changing hands.
+_ACQUIRE_ATTEMPTS = 3
 
 
 class TableSessionService:
@@ -44,57 +47,27 @@ class TableSessionService:
         table_number: int | None = None,
         table_ref: str | None = None,
     ) -> ResolvedTableIdentity:
-        result = await session.execute(
-            select(FloorCanvas.elements).where(FloorCanvas.tenant_id == tenant_id)
-        )
+        """Table a guest scanned or typed, looked up in the tenant's compiled index.
+
+        A miss recompiles the index first, so tables added on another worker are found.
+        """
+        identities = table_identity_index.get(tenant_id)
+        if identities is None or not identities.knows(
+            table_number=table_number, table_ref=table_ref
+        ):
+            identities = await self._load_table_identities(session, tenant_id)
+
+        if table_ref and table_ref in identities.by_ref:
+            return identities.by_ref[table_ref]
 
-        elements_sets = list(result.scalars().all())
-        matched: ResolvedTableIdentity | None = None
-
-        for elements in elements_sets:
-            if not isinstance(elements, list):
-                continue
-
-            for raw_element in elements:
-                if not isinstance(raw_element, dict):
-                    continue
-
-                element_type = raw_element.get("type")
-                element_id = raw_element.get("id")
-                if not isinstance(element_id, str) or element_id.strip() == "":
-                    continue
-
-                candidate_number = raw_element.get("tableNumber")
-                if element_type == "table":
-                    if table_ref and table_ref == element_id:
-                        label = raw_element.get("label")
-                        return ResolvedTableIdentity(
-                            table_ref=element_id,
-                            table_number=candidate_number
-                            if isinstance(candidate_number, int)
-                            else None,
-                            table_label=label.strip()
-                            if isinstance(label, str) and label.strip()
-                            else None,
-                        )
-                    if table_number is not None and candidate_number == table_number:
-                        label = raw_element.get("label")
-                        next_identity = ResolvedTableIdentity(
-                            table_ref=element_id,
-                            table_number=table_number,
-                            table_label=label.strip()
-                            if isinstance(label, str) and label.strip()
-                            else f"Table {table_number}",
-                        )
-                        if matched is not None:
-                            msg = (
-                                "This table number exists on more than one floor; use the QR code "
-                                "for this table or choose the table from the list in the app."
-                            )
-                            raise BadRequestError(message=msg)
-                        matched = next_identity
-
-        if matched is not None:
+        if table_number is not None and table_number in identities.by_number:
+            matched = identities.by_number[table_number]
+            if matched is None:
+                msg = (
+                    "This table number exists on more than one floor; use the QR code "
+                    "for this table or choose the table from the list in the app."
+                )
+                raise BadRequestError(message=msg)
             return matched
 
         if table_ref:
@@ -105,28 +78,127 @@ class TableSessionService:
         msg = "Table" + (" " + str(table_number) if table_number is not None else "")
         raise NotFoundResponse(msg)
 
+    async def _load_table_identities(
+        self, session: AsyncSession, tenant_id: UUID
+    ) -> TenantTableIdentities:
+        """Compile the tenant's index, re-reading ``elements`` only of changed canvases."""
+        versions = (
+            await session.execute(
+                select(FloorCanvas.id, FloorCanvas.version).where(
+                    FloorCanvas.tenant_id == tenant_id
+                )
+            )
+        ).all()
+        canvases = {
+            canvas_id: table_identity_index.tables(tenant_id, canvas_id, version)
+            for canvas_id, version in versions
+        }
+        stale_ids = [canvas_id for canvas_id, tables in canvases.items() if tables is None]
+        if stale_ids:
+            result = await session.execute(
+                select(FloorCanvas.id, FloorCanvas.version, FloorCanvas.elements).where(
+                    FloorCanvas.id.in_(stale_ids)
+                )
+            )
+            for canvas_id, version, elements in result.all():
+                canvases[canvas_id] = CanvasTables(
+                    version=version, tables=parse_table_elements(elements)
+                )
+        return table_identity_index.store(
+            tenant_id,
+            {canvas_id: tables for canvas_id, tables in canvases.items() if tables is not None},
+        )
+
     async def list_active_sessions(
         self,
         session: AsyncSession,
         tenant_id: UUID,
     ) -> list[TableSession]:
-        await self._expire_stale_sessions(session, tenant_id=tenant_id)
+        """Sessions still holding a table; lapsed ones are expired by the scheduler.
+
+        A session holds its table until the heartbeat grace after ``expires_at``,
+        the same window ``expire_stale_sessions`` waits before freeing it.
+        """
         result = await session.execute(
             select(TableSession)
             .where(
                 TableSession.tenant_id == tenant_id,
                 TableSession.status == TableSessionStatus.ACTIVE,
+                TableSession.expires_at > datetime.now(UTC) - table_session_heartbeats.grace,
             )
             .order_by(TableSession.acquired_at.asc())
         )
         return list(result.scalars().all())
 
+    async def get_table_status(
+        self,
+        session: AsyncSession,
+        db: AsyncIOMotorDatabase,
+        *,
+        tenant: Tenant | TenantIdentity,
+    ) -> TenantTableState:
+        """Floor layout and occupancy of a tenant, from memory unless due for a reload."""
+        state = table_status_index.get(tenant.public_id)
+        if state is not None:
+            return state
+
+        active_sessions = await self.list_active_sessions(session, tenant.id)
+        active_orders = await self.list_active_kitchen_orders(db, tenant_public_id=tenant.public_id)
+        canvas_rows = (
+            await session.execute(
+                select(
+                    FloorCanvas.id,
+                    FloorCanvas.version,
+                    FloorCanvas.name,
+                    FloorCanvas.width,
+                    FloorCanvas.height,
+                ).where(FloorCanvas.tenant_id == tenant.id)
+            )
+        ).all()
+
+        parsed = {
+            row.id: table_status_index.geometry(tenant.public_id, row.id, row.version)
+            for row in canvas_rows
+        }
+        stale_ids = [canvas_id for canvas_id, tables in parsed.items() if tables is None]
+        if stale_ids:
+            result = await session.execute(
+                select(FloorCanvas.id, FloorCanvas.elements).where(FloorCanvas.id.in_(stale_ids))
+            )
+            for canvas_id, elements in result.all():
+                parsed[canvas_id] = parse_table_elements(elements)
+
+        session_expiry: dict[str, datetime] = {}
+        for table_session in active_sessions:
+            previous = session_expiry.get(table_session.table_ref)
+            if previous is None or table_session.expires_at > previous:
+                session_expiry[table_session.table_ref] = table_session.expires_at
+
+        return table_status_index.store(
+            tenant.public_id,
+            tenant_id=tenant.id,
+            canvases=[
+                CanvasLayout(
+                    canvas_id=row.id,
+                    version=row.version,
+                    name=row.name,
+                    width=row.width,
+                    height=row.height,
+                    tables=parsed.get(row.id) or (),
+                )
+                for row in canvas_rows
+            ],
+            session_expiry=session_expiry,
+            active_orders=active_orders,
+            lock_grace=table_session_heartbeats.grace,
+        )
+
     async def acquire_mobile_session(  # noqa: PLR0913
         self,
         session: AsyncSession,
         db: AsyncIOMotorDatabase,
         *,
-        tenant: Tenant,
+        tenant: Tenant | TenantIdentity,
         table_number: int,
         table_ref: str | None,
         lock_token: str | None,
@@ -140,56 +212,57 @@ class TableSessionService:
             table_number=table_number,
             table_ref=table_ref,
         )
-        await self._expire_stale_sessions(
+        await self.expire_stale_sessions(
             session, tenant_id=tenant.id, table_ref=table_identity.table_ref
         )
 
-        active_session = await self._get_active_session(
-            session,
-            tenant_id=tenant.id,
-            table_ref=table_identity.table_ref,
-        )
+        new_lock_token: str | None = None
+        for _ in range(_ACQUIRE_ATTEMPTS):
+            active_session = await self._get_active_session(
+                session,
+                tenant_id=tenant.id,
+                table_ref=table_identity.table_ref,
+            )
+
+            if active_session is not None:
+                if active_session.origin == TableSessionOrigin.WAITER:
+                    msg = "This table is currently being served by staff"
+                    raise ConflictError(msg)
+                if lock_token and active_session.lock_token == lock_token:
+                    return await self._refresh_existing_session(
+                        session,
+                        active_session,
+                        session_id=session_id,
+                        client_ip=client_ip,
+                        client_fingerprint=client_fingerprint,
+                    )
+                msg = "This table is temporarily unavailable"
+                raise ConflictError(msg)
 
-        if active_session is not None:
-            if active_session.origin == TableSessionOrigin.WAITER:
+            if await self._has_active_waiter_order(db, tenant.public_id, table_identity.table_ref):
                 msg = "This table is currently being served by staff"
                 raise ConflictError(msg)
-            if lock_token and active_session.lock_token == lock_token:
-                return await self._refresh_existing_session(
-                    session,
-                    active_session,
-                    session_id=session_id,
-                    client_ip=client_ip,
-                    client_fingerprint=client_fingerprint,
-                )
-            msg = "This table is temporarily unavailable"
-            raise ConflictError(msg)
 
-        if await self._has_active_waiter_order(db, tenant.public_id, table_identity.table_ref):
-            msg = "This table is currently being served by staff"
-            raise ConflictError(msg)
+            new_lock_token = new_lock_token or await self._resolve_new_lock_token(
+                session, lock_token
+            )
+            created = await self._insert_active_session(
+                session,
+                tenant=tenant,
+                table_ref=table_identity.table_ref,
+                table_number=table_identity.table_number,
+                table_label=table_identity.table_label,
+                lock_token=new_lock_token,
+                origin=TableSessionOrigin.MOBILE,
+                session_id=session_id,
+                client_fingerprint_hash=self._hash_value(client_fingerprint),
+                ip_hash=self._hash_value(client_ip),
+            )
+            if created is not None:
+                return created
 
-        now = datetime.now(UTC)
-        created = TableSession(
-            tenant_id=tenant.id,
-            tenant_public_id=tenant.public_id,
-            tenant_slug=tenant.slug,
-            table_ref=table_identity.table_ref,
-            table_number=table_identity.table_number,
-            table_label=table_identity.table_label,
-            lock_token=await self._resolve_new_lock_token(session, lock_token),
-            origin=TableSessionOrigin.MOBILE,
-            status=TableSessionStatus.ACTIVE,
-            session_id=session_id,
-            client_fingerprint_hash=self._hash_value(client_fingerprint),
-            ip_hash=self._hash_value(client_ip),
-            acquired_at=now,
-            last_seen_at=now,
-            expires_at=now + _ACTIVE_LOCK_TTL,
-        )
-        session.add(created)
-        await session.flush()
-        return created
+        msg = "This table is temporarily unavailable"
+        raise ConflictError(msg)
 
     async def refresh_mobile_session(
         self,
@@ -209,11 +282,15 @@ class TableSessionService:
             msg = "Only mobile table sessions can be refreshed"
             raise ConflictError(msg)
 
-        return await self._refresh_existing_session(
-            session,
-            table_session,
-            client_ip=client_ip,
-            client_fingerprint=client_fingerprint,
+        if not table_session_heartbeats.enabled:
+            return await self._refresh_existing_session(
+                session,
+                table_session,
+                client_ip=client_ip,
+                client_fingerprint=client_fingerprint,
+            )
+        return self._record_heartbeat(
+            table_session, client_ip=client_ip, client_fingerprint=client_fingerprint
         )
 
     async def release_mobile_session(
@@ -246,47 +323,45 @@ class TableSessionService:
         self,
         session: AsyncSession,
         *,
-        tenant: Tenant,
+        tenant: Tenant | TenantIdentity,
         table_ref: str,
         table_label: str | None,
         waiter_user_id: UUID | None,
         table_number: int | None = None,
     ) -> TableSession:
-        await self._expire_stale_sessions(session, tenant_id=tenant.id, table_ref=table_ref)
-        active_session = await self._get_active_session(
-            session, tenant_id=tenant.id, table_ref=table_ref
-        )
+        await self.expire_stale_sessions(session, tenant_id=tenant.id, table_ref=table_ref)
+        for _ in range(_ACQUIRE_ATTEMPTS):
+            active_session = await self._get_active_session(
+                session, tenant_id=tenant.id, table_ref=table_ref
+            )
 
-        if active_session is not None:
-            if active_session.origin == TableSessionOrigin.WAITER:
-                active_session.last_seen_at = datetime.now(UTC)
-                active_session.expires_at = datetime.now(UTC) + _ACTIVE_LOCK_TTL
-                if waiter_user_id is not None:
-                    active_session.waiter_user_id = waiter_user_id
-                await session.flush()
-                return active_session
-            msg = "Table is currently locked by a mobile guest"
-            raise ConflictError(msg)
+            if active_session is not None:
+                if active_session.origin == TableSessionOrigin.WAITER:
+                    active_session.last_seen_at = datetime.now(UTC)
+                    active_session.expires_at = datetime.now(UTC) + _ACTIVE_LOCK_TTL
+                    if waiter_user_id is not None:
+                        active_session.waiter_user_id = waiter_user_id
+                    await session.flush()
+                    self._track(session, active_session)
+                    return active_session
+                msg = "Table is currently locked by a mobile guest"
+                raise ConflictError(msg)
 
-        now = datetime.now(UTC)
-        created = TableSession(
-            tenant_id=tenant.id,
-            tenant_public_id=tenant.public_id,
-            tenant_slug=tenant.slug,
-            table_ref=table_ref,
-            table_number=table_number,
-            table_label=table_label,
-            lock_token=self._generate_lock_token(),
-            origin=TableSessionOrigin.WAITER,
-            status=TableSessionStatus.ACTIVE,
-            waiter_user_id=waiter_user_id,
-            acquired_at=now,
-            last_seen_at=now,
-            expires_at=now + _ACTIVE_LOCK_TTL,
-        )
-        session.add(created)
-        await session.flush()
-        return created
+            created = await self._insert_active_session(
+                session,
+                tenant=tenant,
+                table_ref=table_ref,
+                table_number=table_number,
+                table_label=table_label,
+                lock_token=self._generate_lock_token(),
+                origin=TableSessionOrigin.WAITER,
+                waiter_user_id=waiter_user_id,
+            )
+            if created is not None:
+                return created
+
+        msg = "Table is currently locked by a mobile guest"
+        raise ConflictError(msg)
 
     async def release_waiter_table(
         self,
@@ -297,7 +372,7 @@ class TableSessionService:
         actor_user_id: UUID | None,
         reason: str,
     ) -> TableSession | None:
-        await self._expire_stale_sessions(session, tenant_id=tenant_id, table_ref=table_ref)
+        await self.expire_stale_sessions(session, tenant_id=tenant_id, table_ref=table_ref)
         table_session = await self._get_active_session(
             session, tenant_id=tenant_id, table_ref=table_ref
         )
@@ -334,7 +409,7 @@ class TableSessionService:
         if not table_ref:
             return
 
-        await self._expire_stale_sessions(session, tenant_id=tenant_id, table_ref=table_ref)
+        await self.expire_stale_sessions(session, tenant_id=tenant_id, table_ref=table_ref)
         table_session = await self._get_active_session(
             session, tenant_id=tenant_id, table_ref=table_ref
         )
@@ -358,6 +433,47 @@ class TableSessionService:
         )
         return result.scalar_one_or_none()
 
+    async def _insert_active_session(
+        self,
+        session: AsyncSession,
+        *,
+        tenant: Tenant | TenantIdentity,
+        table_ref: str,
+        **values: object,
+    ) -> TableSession | None:
+        """Insert an active session, or return ``None`` when the table already has one.
+
+        ``ON CONFLICT DO NOTHING`` on the one-active-session-per-table index lets
+        concurrent acquires of a table race safely: Postgres waits for the other
+        transaction, and the loser gets ``None`` instead of an integrity error that
+        would abort its transaction.
+        """
+        now = datetime.now(UTC)
+        result = await session.execute(
+            insert(TableSession)
+            .values(
+                tenant_id=tenant.id,
+                tenant_public_id=tenant.public_id,
+                tenant_slug=tenant.slug,
+                table_ref=table_ref,
+                status=TableSessionStatus.ACTIVE,
+                acquired_at=now,
+                last_seen_at=now,
+                expires_at=now + _ACTIVE_LOCK_TTL,
+                **values,
+            )
+            .on_conflict_do_nothing(
+                index_elements=[TableSession.tenant_id, TableSession.table_ref],
+                # Literal, as in the index definition, so Postgres can infer the partial index.
+                index_where=text("status = 'active'"),
+            )
+            .returning(TableSession)
+        )
+        created = result.scalar_one_or_none()
+        if created is not None:
+            self._track(session, created)
+        return created
+
     async def _get_by_lock_token(self, session: AsyncSession, lock_token: str) -> TableSession:
         result = await session.execute(
             select(TableSession).where(TableSession.lock_token == lock_token)
@@ -381,34 +497,57 @@ class TableSessionService:
                 return preferred
         return self._generate_lock_token()
 
-    async def _expire_stale_sessions(
+    async def expire_stale_sessions(
         self,
         session: AsyncSession,
         *,
-        tenant_id: UUID,
+        tenant_id: UUID | None = None,
         table_ref: str | None = None,
-    ) -> None:
+    ) -> int:
+        """Expire lapsed active sessions of one table, one tenant or, without filters, all.
+
+        One ``UPDATE ... RETURNING`` round trip however many sessions lapsed. Stored
+        ``expires_at`` may trail buffered heartbeats by up to the heartbeat grace.
+        """
+        now = datetime.now(UTC)
         result = await session.execute(
-            select(TableSession).where(
-                TableSession.tenant_id == tenant_id,
+            update(TableSession)
+            .where(
                 TableSession.status == TableSessionStatus.ACTIVE,
+                TableSession.expires_at <= now - table_session_heartbeats.grace,
+                *([TableSession.tenant_id == tenant_id] if tenant_id else []),
                 *([TableSession.table_ref == table_ref] if table_ref else []),
             )
+            .values(status=TableSessionStatus.EXPIRED, released_at=now, last_seen_at=now)
+            .returning(TableSession.tenant_public_id, TableSession.table_ref)
         )
-        for table_session in result.scalars().all():
-            await self._expire_session_if_needed(session, table_session)
+        expired = result.all()
+        for tenant_public_id, expired_table_ref in expired:
+            after_commit(
+                session,
+                partial(
+                    table_status_index.session_changed, tenant_public_id, expired_table_ref, None
+                ),
+            )
+        return len(expired)
 
     async def _expire_session_if_needed(
         self,
         session: AsyncSession,
         table_session: TableSession,
     ) -> None:
-        if (
-            table_session.status == TableSessionStatus.ACTIVE
-            and table_session.expires_at <= datetime.now(UTC)
-        ):
+        if table_session.status == TableSessionStatus.ACTIVE and self._has_lapsed(table_session):
             await self._set_terminal_status(session, table_session, TableSessionStatus.EXPIRED)
 
+    @staticmethod
+    def _has_lapsed(table_session: TableSession) -> bool:
+        """Lapsed per Postgres, which may trail buffered heartbeats, and per this worker's buffer."""
+        now = datetime.now(UTC)
+        heartbeat = table_session_heartbeats.pending(table_session.id)
+        return table_session.expires_at <= now - table_session_heartbeats.grace and (
+            heartbeat is None or heartbeat.expires_at <= now
+        )
+
     async def _refresh_existing_session(
         self,
         session: AsyncSession,
@@ -428,6 +567,7 @@ class TableSessionService:
         if client_fingerprint:
             table_session.client_fingerprint_hash = self._hash_value(client_fingerprint)
         await session.flush()
+        self._track(session, table_session)
         return table_session
 
     async def _set_terminal_status(
@@ -440,26 +580,73 @@ class TableSessionService:
         table_session.released_at = datetime.now(UTC)
         table_session.last_seen_at = datetime.now(UTC)
         await session.flush()
+        table_session_heartbeats.discard(table_session.id)
+        self._track(session, table_session)
+
+    def _record_heartbeat(
+        self,
+        table_session: TableSession,
+        *,
+        client_ip: str | None,
+        client_fingerprint: str | None,
+    ) -> TableSession:
+        """Extend the lock in the write-behind buffer instead of writing the row now."""
+        now = datetime.now(UTC)
+        heartbeat = Heartbeat(
+            last_seen_at=now,
+            expires_at=now + _ACTIVE_LOCK_TTL,
+            ip_hash=self._hash_value(client_ip),
+            client_fingerprint_hash=self._hash_value(client_fingerprint),
+        )
+        table_session_heartbeats.record(table_session.id, heartbeat)
+        # Reflect it on the loaded row without marking it dirty, so the request writes nothing.
+        set_committed_value(table_session, "last_seen_at", heartbeat.last_seen_at)
+        set_committed_value(table_session, "expires_at", heartbeat.expires_at)
+        if heartbeat.ip_hash:
+            set_committed_value(table_session, "ip_hash", heartbeat.ip_hash)
+        if heartbeat.client_fingerprint_hash:
+            set_committed_value(
+                table_session, "client_fingerprint_hash", heartbeat.client_fingerprint_hash
+            )
+        # Nothing is written to Postgres: the buffer already holds the lock, so index it now.
+        table_status_index.session_changed(*self._index_entry(table_session))
+        return table_session
+
+    @classmethod
+    def _track(cls, session: AsyncSession, table_session: TableSession) -> None:
+        """Reflect the lock in the tables overview once the transaction commits."""
+        after_commit(
+            session, partial(table_status_index.session_changed, *cls._index_entry(table_session))
+        )
+
+    @staticmethod
+    def _index_entry(table_session: TableSession) -> tuple[str, str, datetime | None]:
+        return (
+            table_session.tenant_public_id,
+            table_session.table_ref,
+            table_session.expires_at if table_session.status == TableSessionStatus.ACTIVE else None,
+        )
 
-    async def list_table_refs_with_active_kitchen_orders(
+    async def list_active_kitchen_orders(
         self,
         db: AsyncIOMotorDatabase,
         *,
         tenant_public_id: str,
-    ) -> set[str]:
+    ) -> dict[str, str]:
+        """Table refs of the tenant's active kitchen orders, keyed by order id."""
         cursor = db[KITCHEN_ORDERS_COLLECTION].find(
             {
                 "restaurantId": tenant_public_id,
-                "status": {"$in": list(_ACTIVE_WAITER_STATUSES)},
+                "status": {"$in": list(ACTIVE_KITCHEN_ORDER_STATUSES)},
             },
             {"tableId": 1},
         )
-        refs: set[str] = set()
+        orders: dict[str, str] = {}
         async for doc in cursor:
             tid = doc.get("tableId")
             if isinstance(tid, str) and tid.strip() != "":
-                refs.add(tid)
-        return refs
+                orders[doc["_id"]] = tid
+        return orders
 
     async def _has_active_waiter_order(
         self,
@@ -471,7 +658,7 @@ class TableSessionService:
             {
                 "restaurantId": tenant_public_id,
                 "tableId": table_ref,
-                "status": {"$in": list(_ACTIVE_WAITER_STATUSES)},
+                "status": {"$in": list(ACTIVE_KITCHEN_ORDER_STATUSES)},
             },
             {"_id": 1},
         )
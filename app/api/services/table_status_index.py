@@ -0,0 +1,206 @@
+"""Per-tenant floor layout and table occupancy for the public tables overview.
+
+Guest devices poll ``GET /public/{tenant_slug}/tables-overview``. Instead of
+re-reading sessions, kitchen orders and every floor canvas on each poll, a
+tenant's state is loaded once and then kept current in memory:
+
+* table geometry is parsed once per canvas ``version`` and reused across
+  reloads while the version is unchanged;
+* table session writes and kitchen order writes made by this worker update
+  the lock and busy maps as they happen;
+* session expiry is evaluated at read time from ``expires_at``.
+
+Writes made by other API workers are picked up when the state is reloaded,
+``TABLE_STATUS_RESYNC_SECONDS`` after it was loaded.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any
+from uuid import UUID
+
+from core.foundation.infra.config import settings
+from services.tenant_state_lru import TenantStateLRU
+
+ACTIVE_KITCHEN_ORDER_STATUSES = frozenset(
+    {
+        "new",
+        "pending",
+        "confirmed",
+        "placed",
+        "preparing",
+        "ready",
+        "ready_to_serve",
+        "delivered",
+    }
+)
+
+
+@dataclass(frozen=True, slots=True)
+class TableGeometry:
+    id: str
+    table_number: int | None
+    label: str | None
+    x: float
+    y: float
+    w: float
+    h: float
+    rotation: float | None
+    seats: int | None
+
+
+@dataclass(frozen=True, slots=True)
+class CanvasLayout:
+    canvas_id: UUID
+    version: int
+    name: str
+    width: int
+    height: int
+    tables: tuple[TableGeometry, ...]
+
+
+@dataclass(slots=True)
+class TenantTableState:
+    tenant_id: UUID
+    canvases: list[CanvasLayout]
+    session_expiry: dict[str, datetime] = field(default_factory=dict)
+    active_orders: dict[str, str] = field(default_factory=dict)
+    lock_grace: timedelta = timedelta(0)
+    loaded_at: float = 0.0
+
+    def reserved_until(self, now: datetime, kitchen_fallback: timedelta) -> dict[str, datetime]:
+        """Closed table refs mapped to when they are expected to free up.
+
+        A session lock is only released ``lock_grace`` after its ``expires_at``,
+        as acquire does, since buffered heartbeats may not have reached Postgres.
+        """
+        reserved = {
+            ref: expires + self.lock_grace
+            for ref, expires in self.session_expiry.items()
+            if expires + self.lock_grace > now
+        }
+        for table_ref in self.active_orders.values():
+            reserved.setdefault(table_ref, now + kitchen_fallback)
+        return reserved
+
+
+def _coerce_float(value: object) -> float:
+    if isinstance(value, (int, float)):
+        return float(value)
+    return 0.0
+
+
+def _coerce_optional_int(value: object) -> int | None:
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value.strip())
+    return None
+
+
+def parse_table_elements(elements: object) -> tuple[TableGeometry, ...]:
+    """Table elements of a floor canvas; other and malformed elements are skipped."""
+    tables: list[TableGeometry] = []
+    for raw in elements if isinstance(elements, list) else []:
+        if not isinstance(raw, dict) or raw.get("type") != "table":
+            continue
+        table_id = raw.get("id")
+        if not isinstance(table_id, str) or table_id.strip() == "":
+            continue
+        label = raw.get("label")
+        seats = raw.get("seats")
+        tables.append(
+            TableGeometry(
+                id=table_id,
+                table_number=_coerce_optional_int(raw.get("tableNumber")),
+                label=label.strip() if isinstance(label, str) and label.strip() else None,
+                x=_coerce_float(raw.get("x")),
+                y=_coerce_float(raw.get("y")),
+                w=_coerce_float(raw.get("w")) or 1.0,
+                h=_coerce_float(raw.get("h")) or 1.0,
+                rotation=_coerce_float(raw["rotation"]) if "rotation" in raw else None,
+                seats=seats if isinstance(seats, int) else None,
+            )
+        )
+    return tuple(tables)
+
+
+class TableStatusIndex(TenantStateLRU[str, TenantTableState]):
+    """In-process LRU of ``TenantTableState`` keyed by tenant public id."""
+
+    def geometry(
+        self, tenant_public_id: str, canvas_id: UUID, version: int
+    ) -> tuple[TableGeometry, ...] | None:
+        """Tables parsed from an earlier load of the same canvas version, even if stale."""
+        state = self.peek(tenant_public_id)
+        if state is None:
+            return None
+        for canvas in state.canvases:
+            if canvas.canvas_id == canvas_id and canvas.version == version:
+                return canvas.tables
+        return None
+
+    def store(
+        self,
+        tenant_public_id: str,
+        *,
+        tenant_id: UUID,
+        canvases: list[CanvasLayout],
+        session_expiry: Mapping[str, datetime],
+        active_orders: Mapping[str, str],
+        lock_grace: timedelta = timedelta(0),
+    ) -> TenantTableState:
+        return self.put(
+            tenant_public_id,
+            TenantTableState(
+                tenant_id=tenant_id,
+                canvases=canvases,
+                session_expiry=dict(session_expiry),
+                active_orders=dict(active_orders),
+                lock_grace=lock_grace,
+            ),
+        )
+
+    def session_changed(
+        self, tenant_public_id: str, table_ref: str, expires_at: datetime | None
+    ) -> None:
+        """Record a lock on ``table_ref`` until ``expires_at``, or its release when ``None``."""
+        state = self.peek(tenant_public_id)
+        if state is None:
+            return
+        if expires_at is None:
+            state.session_expiry.pop(table_ref, None)
+        else:
+            state.session_expiry[table_ref] = expires_at
+
+    def order_changed(self, order: Mapping[str, Any]) -> None:
+        """Track a kitchen order document after it was inserted or updated."""
+        state = self.peek(order.get("restaurantId"))
+        if state is None:
+            return
+        table_ref = order.get("tableId")
+        if (
+            order.get("status") in ACTIVE_KITCHEN_ORDER_STATUSES
+            and isinstance(table_ref, str)
+            and table_ref.strip() != ""
+        ):
+            state.active_orders[order["_id"]] = table_ref
+        else:
+            state.active_orders.pop(order["_id"], None)
+
+    def order_removed(self, tenant_public_id: str, order_id: str) -> None:
+        state = self.peek(tenant_public_id)
+        if state is not None:
+            state.active_orders.pop(order_id, None)
+
+    def layout_changed(self, tenant_id: UUID) -> None:
+        """Reload the tenant's canvases on the next read; unchanged versions are reused."""
+        for tenant_public_id, state in self.states():
+            if state.tenant_id == tenant_id:
+                self.mark_stale(tenant_public_id)
+
+
+table_status_index = TableStatusIndex(resync_seconds=settings.TABLE_STATUS_RESYNC_SECONDS)
@@ -0,0 +1,145 @@
+"""Cache of the tenant columns public and guest routes resolve on every call.
+
+Public routes address a tenant by slug and some tenant routes by public id;
+both only need the identity columns below, which change about once a month.
+Entries are cached under both keys in a ``TenantCache`` and dropped whenever a
+tenant is renamed, re-slugged, re-configured for Przelewy24, activated or
+deleted.
+
+``TenantIdentityCache`` is process-local; ``RedisTenantIdentityCache`` shares
+entries and invalidations across workers. Select it with
+``TENANT_IDENTITY_CACHE=redis``.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+import json
+from time import monotonic
+from uuid import UUID
+
+from redis.asyncio import Redis
+
+from core.foundation.database.connection import get_redis_client
+from core.foundation.infra.config import Settings, settings
+from core.foundation.tenant_cache import RedisTenantCache, TenantCache, TenantCacheBackend
+from core.models.enums import TenantStatus
+from core.models.tenant import Tenant
+
+
+@dataclass(frozen=True, slots=True)
+class TenantIdentity:
+    id: UUID
+    public_id: str
+    slug: str
+    name: str
+    status: TenantStatus
+    p24_merchantid: int | None
+    p24_api: str | None
+    p24_crc: str | None
+
+    @classmethod
+    def from_tenant(cls, tenant: Tenant) -> TenantIdentity:
+        return cls(
+            id=tenant.id,
+            public_id=tenant.public_id,
+            slug=tenant.slug,
+            name=tenant.name,
+            status=tenant.status,
+            p24_merchantid=tenant.p24_merchantid,
+            p24_api=tenant.p24_api,
+            p24_crc=tenant.p24_crc,
+        )
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "id": str(self.id),
+                "public_id": self.public_id,
+                "slug": self.slug,
+                "name": self.name,
+                "status": self.status.value,
+                "p24_merchantid": self.p24_merchantid,
+                "p24_api": self.p24_api,
+                "p24_crc": self.p24_crc,
+            }
+        )
+
+    @classmethod
+    def from_json(cls, raw: str | bytes) -> TenantIdentity:
+        data = json.loads(raw)
+        return cls(
+            id=UUID(data["id"]),
+            public_id=data["public_id"],
+            slug=data["slug"],
+            name=data["name"],
+            status=TenantStatus(data["status"]),
+            p24_merchantid=data["p24_merchantid"],
+            p24_api=data["p24_api"],
+            p24_crc=data["p24_crc"],
+        )
+
+
+class TenantIdentityCache:
+    """Identities keyed by slug and by public id, in process unless given a backend."""
+
+    def __init__(
+        self,
+        entries: TenantCacheBackend[TenantIdentity] | None = None,
+        *,
+        ttl_seconds: float = 300,
+        max_entries: int = 10_000,
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        if entries is None:
+            entries = TenantCache(ttl_seconds=ttl_seconds, max_entries=max_entries, clock=clock)
+        self._entries = entries
+
+    async def get_by_slug(self, slug: str) -> TenantIdentity | None:
+        return await self._entries.get(f"slug:{slug}")
+
+    async def get_by_public_id(self, public_id: str) -> TenantIdentity | None:
+        return await self._entries.get(f"public_id:{public_id}")
+
+    async def set(self, identity: TenantIdentity) -> None:
+        await self._entries.set(
+            identity.id, [f"slug:{identity.slug}", f"public_id:{identity.public_id}"], identity
+        )
+
+    async def invalidate(self, tenant_id: UUID) -> None:
+        await self._entries.invalidate(tenant_id)
+
+    async def clear(self) -> None:
+        await self._entries.clear()
+
+
+class RedisTenantIdentityCache(TenantIdentityCache):
+    """Tenant identities shared by every worker through Redis."""
+
+    def __init__(
+        self,
+        client: Redis,
+        ttl_seconds: int = 300,
+        key_prefix: str = "tenant:identity:",
+    ) -> None:
+        super().__init__(
+            RedisTenantCache(
+                client,
+                ttl_seconds=ttl_seconds,
+                key_prefix=key_prefix,
+                encode=TenantIdentity.to_json,
+                decode=TenantIdentity.from_json,
+                name="Tenant identity",
+            )
+        )
+
+
+def build_tenant_identity_cache(app_settings: Settings) -> TenantIdentityCache:
+    ttl_seconds = app_settings.TENANT_IDENTITY_CACHE_TTL_SECONDS
+    if app_settings.TENANT_IDENTITY_CACHE.strip().lower() == "redis":
+        return RedisTenantIdentityCache(get_redis_client(), ttl_seconds=ttl_seconds)
+    return TenantIdentityCache(ttl_seconds=ttl_seconds)
+
+
+tenant_identity_cache = build_tenant_identity_cache(settings)
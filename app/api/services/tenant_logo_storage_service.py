@@ -3,23 +3,26 @@ from __future__ import annotations
 from contextlib import suppress
 from dataclasses import dataclass
 from datetime import timedelta
-from io import BytesIO
-import json
-from time import time
 from typing import ClassVar
 from urllib.parse import quote
 from uuid import UUID, uuid4
 
-from minio import Minio
-from PIL import Image, UnidentifiedImageError
-
 from core.exceptions import (
     BadRequestError,
     NotFoundResponse,
     ServiceUnavailableError,
     TooManyRequestsError,
 )
+from core.foundation.image_processing import (
+    ImageProcessor,
+    ImageProcessorUnavailableError,
+    ImageSpec,
+    InvalidImageError,
+    image_processor,
+)
 from core.foundation.infra.config import settings
+from core.foundation.object_storage import ObjectStorage, object_storage
+from core.foundation.rate_limiter import GcraRateLimiter
 
 
 @dataclass(frozen=True)
@@ -41,26 +44,26 @@ class TenantLogoStorageService:
     _TEMP_PREFIX: ClassVar[str] = "tmp/tenant-logos"
     _FINAL_PREFIX: ClassVar[str] = "tenant-logos"
     _PRESIGN_WINDOW_SECONDS: ClassVar[int] = 60
+    _PRESIGN_MAX_TENANTS: ClassVar[int] = 10_000
     _PRESIGN_MAX_REQUESTS: ClassVar[int] = 10
-    _presign_usage: ClassVar[dict[str, list[float]]] = {}
-
-    def __init__(self) -> None:
-        self._internal_client = Minio(
-            settings.MINIO_ENDPOINT,
-            access_key=settings.MINIO_ACCESS_KEY,
-            secret_key=settings.MINIO_SECRET_KEY,
-            secure=settings.MINIO_SECURE,
-            region=settings.MINIO_REGION,
-        )
-        self._public_client = Minio(
-            settings.MINIO_PUBLIC_ENDPOINT,
-            access_key=settings.MINIO_ACCESS_KEY,
-            secret_key=settings.MINIO_SECRET_KEY,
-            secure=settings.MINIO_PUBLIC_SECURE,
-            region=settings.MINIO_REGION,
-        )
-
-    def create_presigned_upload(self, tenant_id: UUID, content_type: str) -> tuple[str, str]:
+    _presign_limiter: ClassVar[GcraRateLimiter] = GcraRateLimiter(max_keys=_PRESIGN_MAX_TENANTS)
+    _IMAGE_SPEC: ClassVar[ImageSpec] = ImageSpec(
+        allowed_formats=frozenset(_ALLOWED_FORMATS),
+        max_pixels=_MAX_PIXELS,
+        invalid_type_message="Logo must be a PNG, JPEG, or WEBP image",
+        too_large_message="Logo dimensions are too large",
+        output="png",
+    )
+
+    def __init__(
+        self,
+        storage: ObjectStorage = object_storage,
+        processor: ImageProcessor = image_processor,
+    ) -> None:
+        self._storage = storage
+        self._processor = processor
+
+    async def create_presigned_upload(self, tenant_id: UUID, content_type: str) -> tuple[str, str]:
         invalid_type_message = "Logo must be a PNG, JPEG, or WEBP image"
         storage_unavailable_message = "Object storage is unavailable"
 
@@ -69,15 +72,13 @@ class TenantLogoStorageService:
 
         self._enforce_presign_rate_limit(tenant_id)
 
-        self._ensure_bucket()
+        await self._ensure_bucket()
 
         object_key = f"{self._TEMP_PREFIX}/{tenant_id}/{uuid4().hex}"
 
         try:
-            upload_url = self._public_client.presigned_put_object(
-                settings.MINIO_BUCKET,
-                object_key,
-                expires=timedelta(seconds=settings.MINIO_PRESIGN_EXPIRY_SECONDS),
+            upload_url = await self._storage.presigned_put_url(
+                object_key, timedelta(seconds=settings.MINIO_PRESIGN_EXPIRY_SECONDS)
             )
         except Exception as exc:
             raise ServiceUnavailableError(storage_unavailable_message) from exc
@@ -86,20 +87,15 @@ class TenantLogoStorageService:
 
     def _enforce_presign_rate_limit(self, tenant_id: UUID) -> None:
         too_many_requests_message = "Too many logo upload requests. Please try again later."
-        now = time()
-        window_start = now - self._PRESIGN_WINDOW_SECONDS
-
-        key = str(tenant_id)
-        timestamps = self._presign_usage.get(key, [])
-        filtered = [ts for ts in timestamps if ts >= window_start]
-
-        if len(filtered) >= self._PRESIGN_MAX_REQUESTS:
+        limited, _ = self._presign_limiter.hit(
+            str(tenant_id),
+            limit=self._PRESIGN_MAX_REQUESTS,
+            window_seconds=self._PRESIGN_WINDOW_SECONDS,
+        )
+        if limited:
             raise TooManyRequestsError(too_many_requests_message)
 
-        filtered.append(now)
-        self._presign_usage[key] = filtered
-
-    def finalize_upload(self, tenant_id: UUID, object_key: str) -> FinalizedTenantLogo:
+    async def finalize_upload(self, tenant_id: UUID, object_key: str) -> FinalizedTenantLogo:
         invalid_object_message = "Logo upload key is invalid"
         storage_unavailable_message = "Object storage is unavailable"
 
@@ -107,144 +103,78 @@ class TenantLogoStorageService:
         if not object_key.startswith(expected_prefix):
             raise BadRequestError(invalid_object_message)
 
-        self._ensure_bucket()
+        await self._ensure_bucket()
 
         try:
-            content = self._read_uploaded_object(object_key)
+            content = await self._read_uploaded_object(object_key)
         except Exception as exc:
             raise BadRequestError(invalid_object_message) from exc
 
         try:
-            output, width, height = self._normalize_image(content)
-        finally:
-            with suppress(Exception):
-                self._internal_client.remove_object(settings.MINIO_BUCKET, object_key)
-
+            processed = await self._processor.process(content, self._IMAGE_SPEC)
+        except ImageProcessorUnavailableError as exc:
+            # The upload stays in place so the same key can be finalized again.
+            raise ServiceUnavailableError(str(exc)) from exc
+        except InvalidImageError as exc:
+            await self._discard(object_key)
+            raise BadRequestError(str(exc)) from exc
+        await self._discard(object_key)
+
+        logo = processed.original
         final_key = f"{self._FINAL_PREFIX}/{tenant_id}.png"
-        output_bytes = output.getvalue()
 
         try:
-            self._internal_client.put_object(
-                settings.MINIO_BUCKET,
-                final_key,
-                BytesIO(output_bytes),
-                len(output_bytes),
-                content_type="image/png",
-            )
+            await self._storage.put_bytes(final_key, logo.data, logo.content_type)
 
-            for existing_object in self._internal_client.list_objects(
-                settings.MINIO_BUCKET,
-                prefix=f"{self._FINAL_PREFIX}/{tenant_id}/",
-                recursive=True,
-            ):
-                self._internal_client.remove_object(
-                    settings.MINIO_BUCKET, existing_object.object_name
-                )
+            for existing_key in await self._storage.list_keys(f"{self._FINAL_PREFIX}/{tenant_id}/"):
+                await self._storage.remove(existing_key)
         except Exception as exc:
             raise ServiceUnavailableError(storage_unavailable_message) from exc
 
         return FinalizedTenantLogo(
             url=self._build_public_url(final_key),
-            width=width,
-            height=height,
-            aspect_ratio=width / height,
+            width=logo.width,
+            height=logo.height,
+            aspect_ratio=logo.width / logo.height,
         )
 
-    def create_presigned_view(self, tenant_id: UUID) -> str:
+    async def create_presigned_view(self, tenant_id: UUID) -> str:
         storage_unavailable_message = "Object storage is unavailable"
 
-        self._ensure_bucket()
+        await self._ensure_bucket()
 
         object_key = f"{self._FINAL_PREFIX}/{tenant_id}.png"
 
         try:
-            self._internal_client.stat_object(settings.MINIO_BUCKET, object_key)
+            await self._storage.stat_size(object_key)
         except Exception as exc:
             msg = "Tenant logo"
             raise NotFoundResponse(msg, str(tenant_id)) from exc
 
         try:
-            return self._public_client.presigned_get_object(
-                settings.MINIO_BUCKET,
-                object_key,
-                expires=timedelta(seconds=settings.MINIO_PRESIGN_EXPIRY_SECONDS),
+            return await self._storage.presigned_get_url(
+                object_key, timedelta(seconds=settings.MINIO_PRESIGN_EXPIRY_SECONDS)
             )
         except Exception as exc:
             raise ServiceUnavailableError(storage_unavailable_message) from exc
 
-    def _read_uploaded_object(self, object_key: str) -> bytes:
+    async def _read_uploaded_object(self, object_key: str) -> bytes:
         file_too_large_message = "Logo file is too large"
-        response = None
 
-        try:
-            stat = self._internal_client.stat_object(settings.MINIO_BUCKET, object_key)
-            if stat.size > settings.TENANT_LOGO_MAX_BYTES:
-                raise BadRequestError(file_too_large_message)
-
-            response = self._internal_client.get_object(settings.MINIO_BUCKET, object_key)
-            return response.read()
-        finally:
-            if response is not None:
-                response.close()
-                response.release_conn()
-
-    def _normalize_image(self, content: bytes) -> tuple[BytesIO, int, int]:
-        invalid_type_message = "Logo must be a PNG, JPEG, or WEBP image"
-        invalid_image_message = "Uploaded file is not a valid image"
-        too_large_dimensions_message = "Logo dimensions are too large"
+        if await self._storage.stat_size(object_key) > settings.TENANT_LOGO_MAX_BYTES:
+            raise BadRequestError(file_too_large_message)
 
-        try:
-            with Image.open(BytesIO(content)) as image:
-                image.verify()
-
-            with Image.open(BytesIO(content)) as image:
-                if image.format not in self._ALLOWED_FORMATS:
-                    raise BadRequestError(invalid_type_message)
-
-                if image.width * image.height > self._MAX_PIXELS:
-                    raise BadRequestError(too_large_dimensions_message)
-
-                width = image.width
-                height = image.height
-                normalized = image.convert("RGBA")
-                output = BytesIO()
-                normalized.save(output, format="PNG", optimize=True)
-                output.seek(0)
-                return output, width, height
-        except UnidentifiedImageError as exc:
-            raise BadRequestError(invalid_image_message) from exc
-        except OSError as exc:
-            raise BadRequestError(invalid_image_message) from exc
-
-    def _ensure_bucket(self) -> None:
+        return await self._storage.get_bytes(object_key)
+
+    async def _discard(self, object_key: str) -> None:
+        with suppress(Exception):
+            await self._storage.remove(object_key)
+
+    async def _ensure_bucket(self) -> None:
         storage_unavailable_message = "Object storage is unavailable"
 
         try:
-            if not self._internal_client.bucket_exists(settings.MINIO_BUCKET):
-                self._internal_client.make_bucket(settings.MINIO_BUCKET)
-
-            policy = {
-                "Version": "2012-10-17",
-                "Statement": [
-                    {
-                        "Effect": "Allow",
-                        "Principal": {"AWS": "*"},
-                        "Action": ["s3:GetBucketLocation", "s3:ListBucket"],
-                        "Resource": f"arn:aws:s3:::{settings.MINIO_BUCKET}",
-                    },
-                    {
-                        "Effect": "Allow",
-                        "Principal": {"AWS": "*"},
-                        "Action": "s3:GetObject",
-                        "Resource": [
-                            f"arn:aws:s3:::{settings.MINIO_BUCKET}/{self._FINAL_PREFIX}/*",
-                            f"arn:aws:s3:::{settings.MINIO_BUCKET}/tenant-mobile-favicons/*",
-                            f"arn:aws:s3:::{settings.MINIO_BUCKET}/menu-items/*",
-                        ],
-                    },
-                ],
-            }
-            self._internal_client.set_bucket_policy(settings.MINIO_BUCKET, json.dumps(policy))
+            await self._storage.ensure_bucket_ready()
         except Exception as exc:
             raise ServiceUnavailableError(storage_unavailable_message) from exc
 
@@ -1,26 +1,45 @@
 from __future__ import annotations
 
+import asyncio
 from contextlib import suppress
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import timedelta
-from io import BytesIO
-import json
-from time import time
+import re
 from typing import ClassVar
 from urllib.parse import quote
 from uuid import UUID, uuid4
 
-from minio import Minio
-from PIL import Image, UnidentifiedImageError
-
 from core.exceptions import BadRequestError, ServiceUnavailableError, TooManyRequestsError
+from core.foundation.image_processing import (
+    ImageProcessor,
+    ImageProcessorUnavailableError,
+    ImageSpec,
+    InvalidImageError,
+    image_processor,
+)
 from core.foundation.infra.config import settings
+from core.foundation.object_storage import ObjectStorage, object_storage
+from core.foundation.rate_limiter import GcraRateLimiter
+
+# Bounding-box sizes (px) of the WebP derivatives stored next to each menu image.
+MENU_IMAGE_VARIANT_SIZES = (128, 256, 512, 1024)
+
+_VARIANT_SOURCE_URL = re.compile(r"/menu-items/[^/]+/[0-9a-f]{32}/original\.(?:jpg|png|webp)$")
+
+
+def menu_image_variants(image_url: str) -> dict[int, str] | None:
+    """Derivative URLs of a finalized menu image, ``None`` for images without them."""
+    if _VARIANT_SOURCE_URL.search(image_url) is None:
+        return None
+    base = image_url.rsplit("/", 1)[0]
+    return {size: f"{base}/{size}.webp" for size in MENU_IMAGE_VARIANT_SIZES}
 
 
 @dataclass(frozen=True)
 class FinalizedMenuItemImage:
     object_key: str
     public_url: str
+    variants: dict[int, str] = field(default_factory=dict)
 
 
 class TenantMenuImageStorageService:
@@ -35,26 +54,30 @@ class TenantMenuImageStorageService:
     _TEMP_PREFIX: ClassVar[str] = "tmp/menu-items"
     _FINAL_PREFIX: ClassVar[str] = "menu-items"
     _PRESIGN_WINDOW_SECONDS: ClassVar[int] = 60
+    _PRESIGN_MAX_TENANTS: ClassVar[int] = 10_000
     _PRESIGN_MAX_REQUESTS: ClassVar[int] = 20
-    _presign_usage: ClassVar[dict[str, list[float]]] = {}
-
-    def __init__(self) -> None:
-        self._internal_client = Minio(
-            settings.MINIO_ENDPOINT,
-            access_key=settings.MINIO_ACCESS_KEY,
-            secret_key=settings.MINIO_SECRET_KEY,
-            secure=settings.MINIO_SECURE,
-            region=settings.MINIO_REGION,
-        )
-        self._public_client = Minio(
-            settings.MINIO_PUBLIC_ENDPOINT,
-            access_key=settings.MINIO_ACCESS_KEY,
-            secret_key=settings.MINIO_SECRET_KEY,
-            secure=settings.MINIO_PUBLIC_SECURE,
-            region=settings.MINIO_REGION,
-        )
-
-    def create_presigned_upload(self, tenant_id: UUID, content_type: str) -> tuple[str, str]:
+    _presign_limiter: ClassVar[GcraRateLimiter] = GcraRateLimiter(max_keys=_PRESIGN_MAX_TENANTS)
+    _IMAGE_SPEC: ClassVar[ImageSpec] = ImageSpec(
+        allowed_formats=frozenset(_ALLOWED_FORMATS),
+        max_pixels=_MAX_PIXELS,
+        invalid_type_message="Menu image must be PNG, JPEG, or WEBP",
+        too_large_message="Menu image dimensions are too large",
+        min_square_ratio=_MIN_SQUARE_RATIO,
+        aspect_message=(
+            "Menu image must be square or nearly square (min side at least 95% of max side)"
+        ),
+        derivative_sizes=MENU_IMAGE_VARIANT_SIZES,
+    )
+
+    def __init__(
+        self,
+        storage: ObjectStorage = object_storage,
+        processor: ImageProcessor = image_processor,
+    ) -> None:
+        self._storage = storage
+        self._processor = processor
+
+    async def create_presigned_upload(self, tenant_id: UUID, content_type: str) -> tuple[str, str]:
         invalid_type_message = "Menu image must be PNG, JPEG, or WEBP"
         storage_unavailable_message = "Object storage is unavailable"
 
@@ -62,15 +85,13 @@ class TenantMenuImageStorageService:
             raise BadRequestError(invalid_type_message)
 
         self._enforce_presign_rate_limit(tenant_id)
-        self._ensure_bucket()
+        await self._ensure_bucket()
 
         object_key = f"{self._TEMP_PREFIX}/{tenant_id}/{uuid4().hex}"
 
         try:
-            upload_url = self._public_client.presigned_put_object(
-                settings.MINIO_BUCKET,
-                object_key,
-                expires=timedelta(seconds=settings.MINIO_PRESIGN_EXPIRY_SECONDS),
+            upload_url = await self._storage.presigned_put_url(
+                object_key, timedelta(seconds=settings.MINIO_PRESIGN_EXPIRY_SECONDS)
             )
         except Exception as exc:
             raise ServiceUnavailableError(storage_unavailable_message) from exc
@@ -79,20 +100,15 @@ class TenantMenuImageStorageService:
 
     def _enforce_presign_rate_limit(self, tenant_id: UUID) -> None:
         too_many_requests_message = "Too many menu image upload requests. Please try again later."
-        now = time()
-        window_start = now - self._PRESIGN_WINDOW_SECONDS
-
-        key = str(tenant_id)
-        timestamps = self._presign_usage.get(key, [])
-        filtered = [ts for ts in timestamps if ts >= window_start]
-
-        if len(filtered) >= self._PRESIGN_MAX_REQUESTS:
+        limited, _ = self._presign_limiter.hit(
+            str(tenant_id),
+            limit=self._PRESIGN_MAX_REQUESTS,
+            window_seconds=self._PRESIGN_WINDOW_SECONDS,
+        )
+        if limited:
             raise TooManyRequestsError(too_many_requests_message)
 
-        filtered.append(now)
-        self._presign_usage[key] = filtered
-
-    def finalize_upload(self, tenant_id: UUID, object_key: str) -> FinalizedMenuItemImage:
+    async def finalize_upload(self, tenant_id: UUID, object_key: str) -> FinalizedMenuItemImage:
         invalid_object_message = "Menu image upload key is invalid"
         storage_unavailable_message = "Object storage is unavailable"
 
@@ -100,136 +116,64 @@ class TenantMenuImageStorageService:
         if not object_key.startswith(expected_prefix):
             raise BadRequestError(invalid_object_message)
 
-        self._ensure_bucket()
+        await self._ensure_bucket()
 
         try:
-            content = self._read_uploaded_object(object_key)
+            content = await self._read_uploaded_object(object_key)
         except Exception as exc:
             raise BadRequestError(invalid_object_message) from exc
 
         try:
-            output, ext, content_type = self._normalize_image(content)
-        finally:
-            with suppress(Exception):
-                self._internal_client.remove_object(settings.MINIO_BUCKET, object_key)
-
-        final_key = f"{self._FINAL_PREFIX}/{tenant_id}/{uuid4().hex}.{ext}"
-        output_bytes = output.getvalue()
+            processed = await self._processor.process(content, self._IMAGE_SPEC)
+        except ImageProcessorUnavailableError as exc:
+            # The upload stays in place so the same key can be finalized again.
+            raise ServiceUnavailableError(str(exc)) from exc
+        except InvalidImageError as exc:
+            await self._discard(object_key)
+            raise BadRequestError(str(exc)) from exc
+        await self._discard(object_key)
+
+        base_key = f"{self._FINAL_PREFIX}/{tenant_id}/{uuid4().hex}"
+        final_key = f"{base_key}/original.{processed.original.extension}"
+        uploads = {final_key: processed.original} | {
+            f"{base_key}/{size}.{image.extension}": image
+            for size, image in processed.derivatives.items()
+        }
 
         try:
-            self._internal_client.put_object(
-                settings.MINIO_BUCKET,
-                final_key,
-                BytesIO(output_bytes),
-                len(output_bytes),
-                content_type=content_type,
+            await asyncio.gather(
+                *(
+                    self._storage.put_bytes(key, image.data, image.content_type)
+                    for key, image in uploads.items()
+                )
             )
         except Exception as exc:
             raise ServiceUnavailableError(storage_unavailable_message) from exc
 
+        public_url = self._build_public_url(final_key)
         return FinalizedMenuItemImage(
             object_key=final_key,
-            public_url=self._build_public_url(final_key),
+            public_url=public_url,
+            variants=menu_image_variants(public_url) or {},
         )
 
-    def _read_uploaded_object(self, object_key: str) -> bytes:
+    async def _read_uploaded_object(self, object_key: str) -> bytes:
         file_too_large_message = "Menu image file is too large"
-        response = None
-
-        try:
-            stat = self._internal_client.stat_object(settings.MINIO_BUCKET, object_key)
-            if stat.size > settings.TENANT_MENU_IMAGE_MAX_BYTES:
-                raise BadRequestError(file_too_large_message)
 
-            response = self._internal_client.get_object(settings.MINIO_BUCKET, object_key)
+        if await self._storage.stat_size(object_key) > settings.TENANT_MENU_IMAGE_MAX_BYTES:
+            raise BadRequestError(file_too_large_message)
 
-            return response.read()
-        finally:
-            if response is not None:
-                response.close()
-                response.release_conn()
+        return await self._storage.get_bytes(object_key)
 
-    def _normalize_image(self, content: bytes) -> tuple[BytesIO, str, str]:
-        invalid_type_message = "Menu image must be PNG, JPEG, or WEBP"
-        invalid_image_message = "Uploaded file is not a valid image"
-        too_large_dimensions_message = "Menu image dimensions are too large"
-        aspect_message = (
-            "Menu image must be square or nearly square (min side at least 95% of max side)"
-        )
+    async def _discard(self, object_key: str) -> None:
+        with suppress(Exception):
+            await self._storage.remove(object_key)
 
-        try:
-            with Image.open(BytesIO(content)) as image:
-                image.verify()
-
-            with Image.open(BytesIO(content)) as image:
-                if image.format not in self._ALLOWED_FORMATS:
-                    raise BadRequestError(invalid_type_message)
-
-                w, h = image.width, image.height
-                if w * h > self._MAX_PIXELS:
-                    raise BadRequestError(too_large_dimensions_message)
-
-                ratio = min(w, h) / max(w, h)
-                if ratio < self._MIN_SQUARE_RATIO:
-                    raise BadRequestError(aspect_message)
-
-                fmt = image.format or "PNG"
-                if fmt == "JPEG":
-                    ext = "jpg"
-                    ct = "image/jpeg"
-                    normalized = image.convert("RGB")
-                    out = BytesIO()
-                    normalized.save(out, format="JPEG", quality=90, optimize=True)
-                elif fmt == "WEBP":
-                    ext = "webp"
-                    ct = "image/webp"
-                    normalized = image.convert("RGBA")
-                    out = BytesIO()
-                    normalized.save(out, format="WEBP", quality=90)
-                else:
-                    ext = "png"
-                    ct = "image/png"
-                    normalized = image.convert("RGBA")
-                    out = BytesIO()
-                    normalized.save(out, format="PNG", optimize=True)
-
-                out.seek(0)
-
-                return out, ext, ct
-        except UnidentifiedImageError as exc:
-            raise BadRequestError(invalid_image_message) from exc
-        except OSError as exc:
-            raise BadRequestError(invalid_image_message) from exc
-
-    def _ensure_bucket(self) -> None:
+    async def _ensure_bucket(self) -> None:
         storage_unavailable_message = "Object storage is unavailable"
 
         try:
-            if not self._internal_client.bucket_exists(settings.MINIO_BUCKET):
-                self._internal_client.make_bucket(settings.MINIO_BUCKET)
-
-            policy = {
-                "Version": "2012-10-17",
-                "Statement": [
-                    {
-                        "Effect": "Allow",
-                        "Principal": {"AWS": "*"},
-                        "Action": ["s3:GetBucketLocation", "s3:ListBucket"],
-                        "Resource": f"arn:aws:s3:::{settings.MINIO_BUCKET}",
-                    },
-                    {
-                        "Effect": "Allow",
-                        "Principal": {"AWS": "*"},
-                        "Action": "s3:GetObject",
-                        "Resource": [
-                            f"arn:aws:s3:::{settings.MINIO_BUCKET}/tenant-logos/*",
-                            f"arn:aws:s3:::{settings.MINIO_BUCKET}/tenant-mobile-favicons/*",
-                            f"arn:aws:s3:::{settings.MINIO_BUCKET}/menu-items/*",
-                        ],
-                    },
-                ],
-            }
-            self._internal_client.set_bucket_policy(settings.MINIO_BUCKET, json.dumps(policy))
+            await self._storage.ensure_bucket_ready()
         except Exception as exc:
             raise ServiceUnavailableError(storage_unavailable_message) from exc
 
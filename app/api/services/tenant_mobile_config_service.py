@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from datetime import UTC, datetime
 from typing import Any
 from uuid import UUID
 
@@ -97,6 +98,8 @@ class TenantMobileConfigService:
 
         if existing:
             existing.favicon_object_key = object_key
+            # Uploads reuse the same key; the new timestamp invalidates cached bodies.
+            existing.updated_at = datetime.now(UTC)
             await session.flush()
 
             return existing
@@ -6,11 +6,13 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from core.authorization.context_cache import authorization_context_cache
 from core.dto.v1.tenants import CreateTenantDTO, UpdateTenantDTO
 from core.exceptions import NotFoundResponse
 from core.foundation.slug import normalize_slug_letters
 from core.models import Tenant, TenantRole
 from core.models.enums import AccountType
+from services.tenant_identity_cache import TenantIdentity, tenant_identity_cache
 
 
 class TenantService:
@@ -65,6 +67,31 @@ class TenantService:
 
         return tenant
 
+    async def get_tenant_identity_by_slug(self, session: AsyncSession, slug: str) -> TenantIdentity:
+        identity = await tenant_identity_cache.get_by_slug(slug)
+        if identity is None:
+            identity = TenantIdentity.from_tenant(await self.get_tenant_by_slug(session, slug))
+            await tenant_identity_cache.set(identity)
+        return identity
+
+    async def get_tenant_identity_by_public_id(
+        self, session: AsyncSession, public_id: str
+    ) -> TenantIdentity:
+        identity = await tenant_identity_cache.get_by_public_id(public_id)
+        if identity is not None:
+            return identity
+
+        query = select(Tenant).where(Tenant.public_id == public_id)
+        result = await session.execute(query)
+        tenant = result.scalar_one_or_none()
+
+        if not tenant:
+            raise NotFoundResponse(self._RESOURCE, public_id)
+
+        identity = TenantIdentity.from_tenant(tenant)
+        await tenant_identity_cache.set(identity)
+        return identity
+
     async def create_tenant(
         self, session: AsyncSession, data: CreateTenantDTO, owner_id: UUID
     ) -> Tenant:
@@ -103,6 +130,9 @@ class TenantService:
             tenant.active_layout_version_id = data.active_layout_version_id
 
         await session.commit()
+        await tenant_identity_cache.invalidate(tenant_id)
+        if data.status is not None:
+            await authorization_context_cache.invalidate_tenant(tenant_id)
         await session.refresh(tenant, attribute_names=["floor_canvases"])
         return tenant
 
@@ -110,6 +140,8 @@ class TenantService:
         tenant = await self._get_tenant_without_relations(session, tenant_id)
         await session.delete(tenant)
         await session.commit()
+        await tenant_identity_cache.invalidate(tenant_id)
+        await authorization_context_cache.invalidate_tenant(tenant_id)
 
     async def _get_tenant_without_relations(self, session: AsyncSession, tenant_id: UUID) -> Tenant:
         query = select(Tenant).where(Tenant.id == tenant_id)
@@ -0,0 +1,67 @@
+"""Per-tenant in-memory state that is reloaded once it is older than a resync interval.
+
+Shared by the table indexes: each keeps one state object per tenant, serves it
+while it is fresh, evicts the least recently used tenant when full, and can mark
+a tenant stale so the next read reloads it. A stale state stays readable through
+``peek`` so a reload can reuse what did not change (e.g. canvases whose
+``version`` is unchanged).
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from time import monotonic
+from typing import Protocol
+
+
+class TenantState(Protocol):
+    loaded_at: float
+
+
+class TenantStateLRU[K, S: TenantState]:
+    """In-process LRU of per-tenant states that expire ``resync_seconds`` after loading."""
+
+    def __init__(
+        self,
+        *,
+        resync_seconds: float = 30,
+        max_tenants: int = 1_000,
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        self._states: OrderedDict[K, S] = OrderedDict()
+        self._resync_seconds = resync_seconds
+        self._max_tenants = max_tenants
+        self._clock = clock
+
+    def get(self, key: K) -> S | None:
+        """Current state, or ``None`` when it has to be (re)loaded."""
+        state = self._states.get(key)
+        if state is None or state.loaded_at + self._resync_seconds <= self._clock():
+            return None
+        self._states.move_to_end(key)
+        return state
+
+    def peek(self, key: K) -> S | None:
+        """The stored state even if stale, without marking it recently used."""
+        return self._states.get(key)
+
+    def put(self, key: K, state: S) -> S:
+        state.loaded_at = self._clock()
+        self._states.pop(key, None)
+        while self._states and len(self._states) >= self._max_tenants:
+            self._states.popitem(last=False)
+        self._states[key] = state
+        return state
+
+    def mark_stale(self, key: K) -> None:
+        """Reload the state on the next ``get``; ``peek`` still returns it."""
+        state = self._states.get(key)
+        if state is not None:
+            state.loaded_at = float("-inf")
+
+    def states(self) -> Iterator[tuple[K, S]]:
+        return iter(list(self._states.items()))
+
+    def clear(self) -> None:
+        self._states.clear()
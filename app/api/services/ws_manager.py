@@ -1,41 +1,429 @@
-from collections import defaultdict
+"""Kitchen WebSocket connections and event fan-out.
+
+``ConnectionManager`` tracks the sockets connected to this process and hands
+every broadcast to a ``BroadcastBus``. ``LocalBroadcastBus`` delivers straight
+back to this process; ``RedisBroadcastBus`` publishes on one pub/sub channel
+per restaurant so events reach sockets held by every API worker. Each worker
+subscribes only to the restaurants it currently has sockets for.
+
+Delivery to a socket goes through its own bounded queue and writer task;
+``ConnectionManager.stats()`` reports queue depth, drops, evictions and send
+latency, and is served at ``/health/ws``.
+
+Events are numbered per restaurant and the recent ones are buffered, so a
+kitchen panel reconnecting with ``?since=<seq>`` receives only what it missed.
+Every connection opens with ``{"type": "hello", "seq": <seq>}``, the sequence
+its stream continues after, so even a panel that drops before its first event
+reconnects with ``since``.
+"""
+
+import asyncio
+from collections import deque
+from collections.abc import Awaitable, Callable
+from contextlib import suppress
+from dataclasses import dataclass, field
 import json
 import logging
-from typing import Any
+from time import perf_counter
+from typing import Any, Protocol
+
+from fastapi import WebSocket, status
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
 
-from fastapi import WebSocket
+from core.foundation.database.connection import get_redis_client
+from core.foundation.infra.config import Settings, settings
+from core.foundation.tenant_cache import as_text
 
 logger = logging.getLogger(__name__)
 
+DeliverCallback = Callable[[str, int, str], Awaitable[None]]
+
+
+class BroadcastBus(Protocol):
+    def bind(self, deliver: DeliverCallback) -> None: ...
+
+    async def next_sequence(self, restaurant_id: str) -> int: ...
+
+    async def current_sequence(self, restaurant_id: str) -> int: ...
+
+    async def publish(self, restaurant_id: str, seq: int, payload: str) -> None: ...
+
+    async def subscribe(self, restaurant_id: str) -> None: ...
+
+    async def unsubscribe(self, restaurant_id: str) -> None: ...
+
+    async def close(self) -> None: ...
+
+
+class LocalBroadcastBus:
+    """Single-process bus: published events go straight to local sockets."""
 
-class ConnectionManager:
     def __init__(self) -> None:
-        self._connections: dict[str, list[WebSocket]] = defaultdict(list)
+        self._deliver: DeliverCallback | None = None
+        self._sequences: dict[str, int] = {}
+
+    def bind(self, deliver: DeliverCallback) -> None:
+        self._deliver = deliver
+
+    async def next_sequence(self, restaurant_id: str) -> int:
+        seq = self._sequences.get(restaurant_id, 0) + 1
+        self._sequences[restaurant_id] = seq
+        return seq
+
+    async def current_sequence(self, restaurant_id: str) -> int:
+        return self._sequences.get(restaurant_id, 0)
+
+    async def publish(self, restaurant_id: str, seq: int, payload: str) -> None:
+        if self._deliver is not None:
+            await self._deliver(restaurant_id, seq, payload)
+
+    async def subscribe(self, restaurant_id: str) -> None:  # noqa: ARG002
+        return None
+
+    async def unsubscribe(self, restaurant_id: str) -> None:  # noqa: ARG002
+        return None
+
+    async def close(self) -> None:
+        return None
+
+
+class RedisBroadcastBus:
+    """Cluster bus on Redis pub/sub with one channel per restaurant.
+
+    Sequence numbers come from one ``INCR`` counter per restaurant and travel
+    with the payload as ``<seq>:<json>``. If Redis is unavailable the event is
+    still numbered and delivered locally, and clients resynchronise on the gap.
+    """
+
+    _LISTEN_TIMEOUT_SECONDS = 1.0
+    _RETRY_DELAY_SECONDS = 1.0
+
+    def __init__(self, client: Redis, channel_prefix: str = "ws:kitchen:") -> None:
+        self._client = client
+        self._pubsub = client.pubsub(ignore_subscribe_messages=True)
+        self._channel_prefix = channel_prefix
+        self._deliver: DeliverCallback | None = None
+        self._listener: asyncio.Task[None] | None = None
+        self._fallback = LocalBroadcastBus()
+
+    def bind(self, deliver: DeliverCallback) -> None:
+        self._deliver = deliver
+        self._fallback.bind(deliver)
+
+    def _channel(self, restaurant_id: str) -> str:
+        return f"{self._channel_prefix}{restaurant_id}"
+
+    def _sequence_key(self, restaurant_id: str) -> str:
+        return f"{self._channel_prefix}seq:{restaurant_id}"
+
+    async def next_sequence(self, restaurant_id: str) -> int:
+        try:
+            return int(await self._client.incr(self._sequence_key(restaurant_id)))
+        except RedisError:
+            logger.warning("WS broadcast bus unavailable, numbering event locally")
+            return await self._fallback.next_sequence(restaurant_id)
+
+    async def current_sequence(self, restaurant_id: str) -> int:
+        try:
+            return int(await self._client.get(self._sequence_key(restaurant_id)) or 0)
+        except RedisError:
+            logger.warning("WS broadcast bus unavailable, reading local sequence")
+            return await self._fallback.current_sequence(restaurant_id)
+
+    async def publish(self, restaurant_id: str, seq: int, payload: str) -> None:
+        try:
+            await self._client.publish(self._channel(restaurant_id), f"{seq}:{payload}")
+        except RedisError:
+            logger.warning("WS broadcast bus unavailable, delivering locally only")
+            await self._fallback.publish(restaurant_id, seq, payload)
 
-    async def connect(self, restaurant_id: str, websocket: WebSocket) -> None:
+    async def subscribe(self, restaurant_id: str) -> None:
+        try:
+            await self._pubsub.subscribe(self._channel(restaurant_id))
+        except RedisError:
+            logger.warning("WS broadcast bus subscribe failed for restaurant %s", restaurant_id)
+            return
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def unsubscribe(self, restaurant_id: str) -> None:
+        try:
+            await self._pubsub.unsubscribe(self._channel(restaurant_id))
+        except RedisError:
+            logger.warning("WS broadcast bus unsubscribe failed for restaurant %s", restaurant_id)
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._listener
+            self._listener = None
+        await self._pubsub.aclose()
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                message = await self._pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=self._LISTEN_TIMEOUT_SECONDS
+                )
+            except RedisError:
+                logger.warning("WS broadcast bus connection lost, retrying")
+                await asyncio.sleep(self._RETRY_DELAY_SECONDS)
+                continue
+            if message is None or message.get("type") != "message":
+                continue
+            await self._handle_message(message)
+
+    async def _handle_message(self, message: dict[str, Any]) -> None:
+        channel = as_text(message["channel"])
+        if self._deliver is None or not channel.startswith(self._channel_prefix):
+            return
+        seq, _, payload = as_text(message["data"]).partition(":")
+        try:
+            await self._deliver(channel[len(self._channel_prefix) :], int(seq), payload)
+        except Exception:
+            logger.exception("WS broadcast delivery failed")
+
+
+@dataclass(frozen=True)
+class BroadcastStats:
+    connections: int
+    queued: int
+    max_queue_depth: int
+    dropped: int
+    evicted: int
+    sent: int
+    replayed: int
+    resyncs: int
+    send_latency_avg_ms: float
+    send_latency_max_ms: float
+
+
+@dataclass(eq=False)
+class _Client:
+    restaurant_id: str
+    websocket: WebSocket
+    queue: asyncio.Queue[str]
+    writer: asyncio.Task[None] = field(init=False)
+
+
+class _ReplayBuffer:
+    """Most recent events of one restaurant, with contiguous sequence numbers."""
+
+    def __init__(self, size: int) -> None:
+        self._events: deque[tuple[int, str]] = deque(maxlen=size)
+
+    def append(self, seq: int, payload: str) -> None:
+        if self._events and seq != self._events[-1][0] + 1:
+            self._events.clear()
+        self._events.append((seq, payload))
+
+    def missed_since(self, seq: int, head: int) -> list[str] | None:
+        """Events after ``seq`` up to ``head``, or ``None`` if some are not buffered."""
+        if seq == head:
+            return []
+        if not self._events or self._events[-1][0] != head:
+            return None
+        if not self._events[0][0] - 1 <= seq < head:
+            return None
+        return [payload for event_seq, payload in self._events if event_seq > seq]
+
+
+class ConnectionManager:
+    """Per-socket bounded send queues drained by one writer task each.
+
+    Delivery only enqueues, so a slow socket never delays a broadcast or the
+    other sockets of its restaurant. A socket whose queue overflows, or whose
+    send stalls past ``send_timeout_seconds``, is closed and dropped.
+
+    Every event carries a per-restaurant ``seq``. A connection first receives a
+    ``hello`` with the ``seq`` its stream continues after. The last
+    ``replay_size`` events are kept so a client reconnecting with the last
+    ``seq`` it saw gets only what it missed, or a ``resync_required`` message
+    instead of the ``hello`` when that is no longer possible.
+
+    Bus subscriptions follow the restaurants that have sockets here. Members are
+    recorded before any await and every subscribe or unsubscribe happens under
+    one lock, so a socket leaving while another is connecting cannot leave the
+    newcomer without a subscription.
+    """
+
+    def __init__(
+        self,
+        bus: BroadcastBus | None = None,
+        *,
+        queue_size: int = 100,
+        send_timeout_seconds: float = 5.0,
+        replay_size: int = 100,
+    ) -> None:
+        self._connections: dict[str, dict[WebSocket, _Client]] = {}
+        self._members: dict[str, set[WebSocket]] = {}
+        self._subscribed: set[str] = set()
+        self._subscription_lock = asyncio.Lock()
+        self._replays: dict[str, _ReplayBuffer] = {}
+        self._queue_size = queue_size
+        self._send_timeout = send_timeout_seconds
+        self._replay_size = replay_size
+        self._evictions: set[asyncio.Task[None]] = set()
+        self._dropped = 0
+        self._evicted = 0
+        self._sent = 0
+        self._replayed = 0
+        self._resyncs = 0
+        self._send_seconds_total = 0.0
+        self._send_seconds_max = 0.0
+        self._bus: BroadcastBus = LocalBroadcastBus()
+        self.set_bus(bus or self._bus)
+
+    def set_bus(self, bus: BroadcastBus) -> None:
+        bus.bind(self._deliver)
+        self._bus = bus
+
+    async def connect(
+        self, restaurant_id: str, websocket: WebSocket, since: int | None = None
+    ) -> None:
         await websocket.accept()
-        self._connections[restaurant_id].append(websocket)
+        self._members.setdefault(restaurant_id, set()).add(websocket)
+        await self._sync_subscription(restaurant_id)
+        client = _Client(restaurant_id, websocket, asyncio.Queue(maxsize=self._queue_size))
+        head = await self._bus.current_sequence(restaurant_id)
+        if since is None:
+            client.queue.put_nowait(json.dumps({"type": "hello", "seq": head}))
+        else:
+            self._enqueue_missed(client, since, head)
+        client.writer = asyncio.create_task(self._write(client))
+        self._connections.setdefault(restaurant_id, {})[websocket] = client
         logger.info("WS client connected for restaurant %s", restaurant_id)
 
-    def disconnect(self, restaurant_id: str, websocket: WebSocket) -> None:
-        conns = self._connections.get(restaurant_id, [])
-        if websocket in conns:
-            conns.remove(websocket)
-        if not conns:
+    async def disconnect(self, restaurant_id: str, websocket: WebSocket) -> None:
+        members = self._members.get(restaurant_id)
+        if members is None or websocket not in members:
+            return
+        members.discard(websocket)
+        if not members:
+            del self._members[restaurant_id]
+        clients = self._connections.get(restaurant_id, {})
+        client = clients.pop(websocket, None)
+        if client is not None and client.writer is not asyncio.current_task():
+            client.writer.cancel()
+        if not clients:
             self._connections.pop(restaurant_id, None)
+        await self._sync_subscription(restaurant_id)
         logger.info("WS client disconnected for restaurant %s", restaurant_id)
 
     async def broadcast(self, restaurant_id: str, event: dict[str, Any]) -> None:
-        conns = self._connections.get(restaurant_id, [])
-        payload = json.dumps(event, default=str)
-        stale: list[WebSocket] = []
-        for ws in conns:
+        seq = await self._bus.next_sequence(restaurant_id)
+        payload = json.dumps({**event, "seq": seq}, default=str)
+        await self._bus.publish(restaurant_id, seq, payload)
+
+    async def close(self) -> None:
+        for clients in list(self._connections.values()):
+            for client in clients.values():
+                client.writer.cancel()
+        self._connections.clear()
+        self._members.clear()
+        self._subscribed.clear()
+        await self._bus.close()
+
+    def stats(self) -> BroadcastStats:
+        depths = [
+            client.queue.qsize()
+            for clients in self._connections.values()
+            for client in clients.values()
+        ]
+        return BroadcastStats(
+            connections=len(depths),
+            queued=sum(depths),
+            max_queue_depth=max(depths, default=0),
+            dropped=self._dropped,
+            evicted=self._evicted,
+            sent=self._sent,
+            replayed=self._replayed,
+            resyncs=self._resyncs,
+            send_latency_avg_ms=round(self._send_seconds_total / self._sent * 1000, 3)
+            if self._sent
+            else 0.0,
+            send_latency_max_ms=round(self._send_seconds_max * 1000, 3),
+        )
+
+    async def _sync_subscription(self, restaurant_id: str) -> None:
+        """Subscribe or unsubscribe ``restaurant_id`` to match its current members."""
+        async with self._subscription_lock:
+            wanted = restaurant_id in self._members
+            if wanted and restaurant_id not in self._subscribed:
+                await self._bus.subscribe(restaurant_id)
+                self._subscribed.add(restaurant_id)
+            elif not wanted and restaurant_id in self._subscribed:
+                await self._bus.unsubscribe(restaurant_id)
+                self._subscribed.discard(restaurant_id)
+
+    def _enqueue_missed(self, client: _Client, since: int, head: int) -> None:
+        buffer = self._replays.get(client.restaurant_id, _ReplayBuffer(0))
+        missed = buffer.missed_since(since, head)
+        if missed is None or len(missed) >= self._queue_size:
+            self._resyncs += 1
+            client.queue.put_nowait(json.dumps({"type": "resync_required", "seq": head}))
+            return
+        client.queue.put_nowait(json.dumps({"type": "hello", "seq": since}))
+        for payload in missed:
+            client.queue.put_nowait(payload)
+        self._replayed += len(missed)
+
+    async def _deliver(self, restaurant_id: str, seq: int, payload: str) -> None:
+        replay = self._replays.get(restaurant_id)
+        if replay is None:
+            replay = self._replays[restaurant_id] = _ReplayBuffer(self._replay_size)
+        replay.append(seq, payload)
+        for client in list(self._connections.get(restaurant_id, {}).values()):
+            try:
+                client.queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                self._dropped += 1
+                logger.warning(
+                    "WS send queue full for restaurant %s, evicting client", restaurant_id
+                )
+                self._schedule_eviction(client)
+
+    async def _write(self, client: _Client) -> None:
+        while True:
+            payload = await client.queue.get()
+            started = perf_counter()
             try:
-                await ws.send_text(payload)
+                await asyncio.wait_for(client.websocket.send_text(payload), self._send_timeout)
             except Exception:
-                stale.append(ws)
-        for ws in stale:
-            self.disconnect(restaurant_id, ws)
+                logger.warning(
+                    "WS send failed for restaurant %s, evicting client", client.restaurant_id
+                )
+                await self._evict(client)
+                return
+            elapsed = perf_counter() - started
+            self._sent += 1
+            self._send_seconds_total += elapsed
+            self._send_seconds_max = max(self._send_seconds_max, elapsed)
+
+    def _schedule_eviction(self, client: _Client) -> None:
+        self._connections[client.restaurant_id].pop(client.websocket, None)
+        client.writer.cancel()
+        task = asyncio.create_task(self._evict(client))
+        self._evictions.add(task)
+        task.add_done_callback(self._evictions.discard)
+
+    async def _evict(self, client: _Client) -> None:
+        self._evicted += 1
+        with suppress(Exception):
+            await client.websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        await self.disconnect(client.restaurant_id, client.websocket)
+
+
+def build_broadcast_bus(app_settings: Settings) -> BroadcastBus:
+    if app_settings.WS_BROADCAST_BUS.strip().lower() == "redis":
+        return RedisBroadcastBus(get_redis_client())
+    return LocalBroadcastBus()
 
 
-ws_manager = ConnectionManager()
+ws_manager = ConnectionManager(
+    queue_size=settings.WS_SEND_QUEUE_SIZE,
+    send_timeout_seconds=settings.WS_SEND_TIMEOUT_SECONDS,
+    replay_size=settings.WS_REPLAY_BUFFER_SIZE,
+)
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+
+async def commit_session(session: Any) -> None:
+    """Run the after-commit callbacks queued on a fake session, as a real commit would."""
+    committed = Session()
+    committed.info.update(session.info)
+    session.info.clear()
+    committed.commit()
+    await asyncio.sleep(0)
+
+
+class FakeClock:
+    """A monotonic clock the test moves by hand."""
+
+    def __init__(self, now: float = 0.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeRedisPipeline:
+    def __init__(self, redis: FakeRedis) -> None:
+        self._redis = redis
+        self._ops: list[tuple[str, ...]] = []
+
+    async def __aenter__(self) -> FakeRedisPipeline:
+        return self
+
+    async def __aexit__(self, *_: object) -> None:
+        return None
+
+    def set(self, key: str, value: str, ex: int) -> None:
+        self._ops.append(("set", key, value, str(ex)))
+
+    def sadd(self, key: str, *members: str) -> None:
+        self._ops.append(("sadd", key, *members))
+
+    def expire(self, key: str, ttl: int) -> None:
+        self._ops.append(("expire", key, str(ttl)))
+
+    def delete(self, *keys: str) -> None:
+        self._ops.append(("delete", *keys))
+
+    def srem(self, key: str, *members: str) -> None:
+        self._ops.append(("srem", key, *members))
+
+    async def execute(self) -> None:
+        if self._redis.error is not None:
+            raise self._redis.error
+        for op, *args in self._ops:
+            if op == "set":
+                self._redis.values[args[0]] = args[1]
+                self._redis.ttls[args[0]] = int(args[2])
+            elif op == "sadd":
+                self._redis.sets.setdefault(args[0], set()).update(args[1:])
+            elif op == "expire":
+                self._redis.ttls[args[0]] = int(args[1])
+            elif op == "delete":
+                for key in args:
+                    self._redis.values.pop(key, None)
+            else:
+                members = self._redis.sets.get(args[0], set())
+                members.difference_update(args[1:])
+                if not members:
+                    # As in Redis, an empty set is removed.
+                    self._redis.sets.pop(args[0], None)
+
+
+class FakeRedis:
+    """The Redis commands the caches and stores use, against dictionaries."""
+
+    def __init__(self) -> None:
+        self.values: dict[str, str] = {}
+        self.sets: dict[str, set[str]] = {}
+        self.ttls: dict[str, int] = {}
+        self.error: Exception | None = None
+
+    def pipeline(self, *, transaction: bool) -> FakeRedisPipeline:
+        assert transaction
+        return FakeRedisPipeline(self)
+
+    async def get(self, key: str) -> bytes | None:
+        if self.error is not None:
+            raise self.error
+        value = self.values.get(key)
+        return value.encode() if value is not None else None
+
+    async def mget(self, keys: list[str]) -> list[bytes | None]:
+        return [await self.get(key) for key in keys]
+
+    async def smembers(self, key: str) -> set[bytes]:
+        if self.error is not None:
+            raise self.error
+        return {member.encode() for member in self.sets.get(key, set())}
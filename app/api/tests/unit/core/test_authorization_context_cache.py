@@ -0,0 +1,104 @@
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+
+from core.authorization import context_cache as cc
+from core.authorization.actions import AuthorizationAction
+from core.authorization.context_cache import (
+    AuthorizationContext,
+    AuthorizationContextCache,
+    RedisAuthorizationContextCache,
+)
+from core.models.enums import AccountType, TenantStatus
+from tests.unit.conftest import FakeRedis
+
+
+def _context(tenant_id=None, public_id: str = "tenant-a") -> AuthorizationContext:
+    return AuthorizationContext(
+        tenant_id=tenant_id or uuid4(),
+        tenant_public_id=public_id,
+        tenant_status=TenantStatus.ACTIVE,
+        tenant_role=AccountType.WAITER,
+        custom_capabilities=frozenset({AuthorizationAction.MENU_AVAILABILITY_UPDATE}),
+    )
+
+
+def test_context_round_trips_through_json() -> None:
+    context = _context()
+    no_role = AuthorizationContext(
+        context.tenant_id, "tenant-a", TenantStatus.SUSPENDED, None, frozenset()
+    )
+
+    assert AuthorizationContext.from_json(context.to_json()) == context
+    assert AuthorizationContext.from_json(no_role.to_json().encode()) == no_role
+
+
+@pytest.mark.asyncio
+async def test_memory_cache_invalidates_account_and_tenant() -> None:
+    cache = AuthorizationContextCache()
+    tenant_id, other_tenant_id = uuid4(), uuid4()
+    waiter, cook = uuid4(), uuid4()
+    await cache.set(waiter, _context(tenant_id))
+    await cache.set(cook, _context(tenant_id))
+    await cache.set(waiter, _context(other_tenant_id, "tenant-b"))
+
+    await cache.invalidate_account(tenant_id, waiter)
+    assert await cache.get(waiter, "tenant-a") is None
+    assert await cache.get(cook, "tenant-a") is not None
+
+    await cache.invalidate_tenant(tenant_id)
+    assert await cache.get(cook, "tenant-a") is None
+    assert await cache.get(waiter, "tenant-b") is not None
+
+    await cache.clear()
+    assert await cache.get(waiter, "tenant-b") is None
+
+
+@pytest.mark.asyncio
+async def test_redis_cache_stores_entries_with_ttl_and_tenant_index() -> None:
+    client = FakeRedis()
+    cache = RedisAuthorizationContextCache(client, ttl_seconds=30)
+    account_id = uuid4()
+    context = _context()
+
+    await cache.set(account_id, context)
+
+    key = f"authz:ctx:tenant-a:{account_id}"
+    assert await cache.get(account_id, "tenant-a") == context
+    assert client.ttls[key] == 30  # noqa: PLR2004
+    assert client.sets[f"authz:ctx:tenant:{context.tenant_id}"] == {key}
+    assert await cache.get(uuid4(), "tenant-a") is None
+
+
+@pytest.mark.asyncio
+async def test_redis_cache_invalidates_account_and_tenant() -> None:
+    client = FakeRedis()
+    cache = RedisAuthorizationContextCache(client)
+    tenant_id = uuid4()
+    waiter, cook = uuid4(), uuid4()
+    await cache.set(waiter, _context(tenant_id))
+    await cache.set(cook, _context(tenant_id))
+
+    await cache.invalidate_account(tenant_id, waiter)
+    assert await cache.get(waiter, "tenant-a") is None
+    assert await cache.get(cook, "tenant-a") is not None
+
+    await cache.invalidate_tenant(tenant_id)
+    await cache.invalidate_tenant(uuid4())
+    await cache.clear()
+    assert await cache.get(cook, "tenant-a") is None
+
+
+def test_build_cache_selects_backend(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(cc, "get_redis_client", FakeRedis)
+
+    memory = cc.build_authorization_context_cache(
+        MagicMock(AUTHZ_CONTEXT_CACHE="memory", AUTHZ_CONTEXT_CACHE_TTL_SECONDS=60)
+    )
+    redis_cache = cc.build_authorization_context_cache(
+        MagicMock(AUTHZ_CONTEXT_CACHE=" Redis ", AUTHZ_CONTEXT_CACHE_TTL_SECONDS=60)
+    )
+
+    assert isinstance(memory, AuthorizationContextCache)
+    assert isinstance(redis_cache, RedisAuthorizationContextCache)
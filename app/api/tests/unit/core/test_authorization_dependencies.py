@@ -5,6 +5,7 @@ from fastapi import Request
 import pytest
 
 from core.authorization.actions import AuthorizationAction
+from core.authorization.context_cache import authorization_context_cache
 from core.authorization.dependencies import authorize_tenant_action
 from core.exceptions.http import ForbiddenError
 from core.models.enums import AccountType, TenantStatus
@@ -158,3 +159,40 @@ async def test_malformed_group_capabilities_are_ignored() -> None:
             request=_request(account_id),
             session=session,
         )
+
+
+@pytest.mark.asyncio
+async def test_warm_authorization_runs_no_queries_until_invalidated() -> None:
+    account_id = uuid4()
+    tenant = Tenant(
+        id=uuid4(),
+        public_id="tenant-warm",
+        name="Tenant Warm",
+        slug="tenant-warm",
+        status=TenantStatus.ACTIVE,
+    )
+    owner_membership = TenantRole(
+        account_id=account_id,
+        tenant_id=tenant.id,
+        account_type=AccountType.OWNER,
+    )
+    session = _session_row(tenant, owner_membership)
+
+    async def authorize() -> None:
+        await authorize_tenant_action(
+            action=AuthorizationAction.MENU_WRITE,
+            tenant_public_id="tenant-warm",
+            request=_request(account_id),
+            session=session,
+        )
+
+    with patch("core.authorization.dependencies.audit"):
+        await authorize()
+        await authorize()
+        assert session.execute.await_count == 1
+        assert session.scalars.await_count == 1
+
+        await authorization_context_cache.invalidate_tenant(tenant.id)
+        await authorize()
+
+    assert session.execute.await_count == 2  # noqa: PLR2004
@@ -11,6 +11,17 @@ from core.authorization.models import (
     AuthorizationResource,
     AuthorizationSubject,
 )
+from core.authorization.policies import (
+    DELEGABLE_ACTIONS,
+    DELEGABLE_MASK,
+    LIFECYCLE_ACTIONS,
+    ROLE_ACTIONS,
+    ROLE_MASKS,
+    TENANT_ACTIONS,
+    actions_from_mask,
+    actions_mask,
+    capabilities_for_role,
+)
 from core.models.enums import AccountType, TenantStatus
 
 
@@ -203,3 +214,124 @@ def test_assigned_group_cannot_add_a_non_delegable_capability() -> None:
     )
     assert decision.allowed is False
     assert decision.policy_id == "capability.required"
+
+
+def _set_based_decision(request: AuthorizationRequest) -> tuple[bool, str]:  # noqa: PLR0911
+    """Tenant-action decision of the engine before capabilities became bitmasks."""
+    subject, resource, action = request.subject, request.resource, request.action
+    if resource.tenant_id is None:
+        return False, "resource.tenant.required"
+    if subject.attributes.get("tenant_id") != resource.tenant_id:
+        return False, "tenant.boundary"
+    if subject.tenant_role is None:
+        return False, "membership.required"
+    base_grant = action in capabilities_for_role(subject.tenant_role)
+    custom = subject.attributes.get("custom_capabilities", frozenset())
+    custom_grant = action in DELEGABLE_ACTIONS and action in custom
+    if not base_grant and not custom_grant:
+        return False, "capability.required"
+    if resource.tenant_status != TenantStatus.ACTIVE and action not in LIFECYCLE_ACTIONS:
+        return False, "tenant.active"
+    if custom_grant and not base_grant:
+        return True, "tenant.access_group"
+    return True, "tenant.capability"
+
+
+_CUSTOM_CAPABILITY_SETS = [
+    frozenset(),
+    DELEGABLE_ACTIONS,
+    frozenset(AuthorizationAction),
+    frozenset({AuthorizationAction.MENU_WRITE, AuthorizationAction.TENANT_DELETE}),
+    frozenset({"order.refund", "unknown.action"}),
+]
+
+
+@pytest.mark.parametrize("role", [*AccountType, None])
+@pytest.mark.parametrize("status", list(TenantStatus))
+@pytest.mark.parametrize("custom", _CUSTOM_CAPABILITY_SETS)
+def test_bitmask_engine_matches_set_based_policy(
+    role: AccountType | None, status: TenantStatus, custom: frozenset
+) -> None:
+    engine = AuthorizationEngine()
+    tenant_id = uuid4()
+    scenarios = [
+        (tenant_id, tenant_id),
+        (tenant_id, uuid4()),
+        (tenant_id, None),
+    ]
+    for subject_tenant_id, resource_tenant_id in scenarios:
+        subject = AuthorizationSubject(
+            account_id=uuid4(),
+            tenant_role=role,
+            attributes={"tenant_id": subject_tenant_id, "custom_capabilities": custom},
+        )
+        resource = AuthorizationResource(
+            kind="test", tenant_id=resource_tenant_id, tenant_status=status
+        )
+        environment = AuthorizationEnvironment(
+            occurred_at=datetime.now(tz=UTC), method="GET", path="/test"
+        )
+        expected_capabilities = set()
+        for action in TENANT_ACTIONS:
+            request = AuthorizationRequest(subject, action, resource, environment)
+            decision = engine.decide(request)
+            assert (decision.allowed, decision.policy_id) == _set_based_decision(request)
+            if decision.allowed:
+                expected_capabilities.add(action)
+
+        assert (
+            engine.capabilities(subject=subject, resource=resource, environment=environment)
+            == expected_capabilities
+        )
+
+
+def test_precomputed_custom_capability_mask_is_used() -> None:
+    request = _request(role=AccountType.KITCHEN, action=AuthorizationAction.MENU_WRITE)
+    subject = AuthorizationSubject(
+        account_id=request.subject.account_id,
+        tenant_role=request.subject.tenant_role,
+        attributes={
+            **request.subject.attributes,
+            "custom_capability_mask": actions_mask({AuthorizationAction.MENU_WRITE}),
+        },
+    )
+
+    decision = AuthorizationEngine().decide(
+        AuthorizationRequest(subject, request.action, request.resource, request.environment)
+    )
+
+    assert decision.policy_id == "tenant.access_group"
+
+
+def test_role_masks_cover_role_tables() -> None:
+    for role, actions in ROLE_ACTIONS.items():
+        assert actions_from_mask(ROLE_MASKS[role]) == actions
+    assert actions_from_mask(DELEGABLE_MASK) == DELEGABLE_ACTIONS
+
+
+@pytest.mark.parametrize(
+    ("action", "membership_roles", "allowed"),
+    [
+        (AuthorizationAction.TENANT_LIST, (AccountType.WAITER,), True),
+        (AuthorizationAction.TENANT_CREATE, (), True),
+        (AuthorizationAction.TENANT_CREATE, (AccountType.WAITER, AccountType.OWNER), True),
+        (AuthorizationAction.TENANT_CREATE, (AccountType.KITCHEN,), False),
+    ],
+)
+def test_account_actions_do_not_need_a_tenant(
+    action: AuthorizationAction, membership_roles: tuple, allowed: bool
+) -> None:
+    decision = AuthorizationEngine().decide(
+        AuthorizationRequest(
+            subject=AuthorizationSubject(
+                account_id=uuid4(), attributes={"membership_roles": membership_roles}
+            ),
+            action=action,
+            resource=AuthorizationResource(kind="tenant_collection"),
+            environment=AuthorizationEnvironment(
+                occurred_at=datetime.now(tz=UTC), method="POST", path="/tenants"
+            ),
+        )
+    )
+
+    assert decision.allowed is allowed
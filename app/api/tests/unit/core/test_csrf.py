@@ -1,18 +1,18 @@
 from unittest.mock import MagicMock, patch
 
 from fastapi import Request, Response
-import pytest
 from starlette import status
 
 from core.middleware.csrf import (
     CSRF_TOKEN_COOKIE_NAME,
     CSRF_TOKEN_HEADER_NAME,
-    CSRFMiddleware,
     _csrf_token_cookie_name,
     _is_csrf_exempt,
     _uses_bearer_auth,
     _uses_cookie_auth,
     _validate_csrf_token,
+    check_csrf,
+    ensure_csrf_cookie,
     generate_csrf_token,
 )
 
@@ -81,12 +81,7 @@ def test_validate_csrf_token_matches_header_and_cookie() -> None:
     assert _validate_csrf_token(req) is True
 
 
-@pytest.mark.asyncio
-async def test_csrf_failure_returns_the_current_token_header() -> None:
-    async def call_next(_: Request) -> Response:
-        return Response(content="ok")
-
-    middleware = CSRFMiddleware(call_next)
+def test_csrf_failure_returns_the_current_token_header() -> None:
     token = "a" * 32
     scope = {
         "type": "http",
@@ -94,30 +89,24 @@ async def test_csrf_failure_returns_the_current_token_header() -> None:
         "path": "/api/v1/private",
         "headers": [(b"cookie", f"rat=access;{CSRF_TOKEN_COOKIE_NAME}={token}".encode())],
     }
+    request = Request(scope)
 
-    response = await middleware.dispatch(Request(scope), call_next)
+    needs_cookie, response = check_csrf(request)
+    assert response is not None
+    ensure_csrf_cookie(request, response.headers)
 
+    assert needs_cookie is True
     assert response.status_code == status.HTTP_403_FORBIDDEN
     assert response.headers[CSRF_TOKEN_HEADER_NAME] == token
+    assert "set-cookie" not in response.headers
 
 
-@pytest.mark.asyncio
-async def test_csrf_middleware_options_passthrough() -> None:
-    async def call_next(_: Request) -> Response:
-        return Response(content="ok")
-
-    middleware = CSRFMiddleware(call_next)
+def test_csrf_middleware_options_passthrough() -> None:
     scope = {"type": "http", "method": "OPTIONS", "path": "/", "headers": []}
-    response = await middleware.dispatch(Request(scope), call_next)
-    assert response.body == b"ok"
-
+    assert check_csrf(Request(scope)) == (False, None)
 
-@pytest.mark.asyncio
-async def test_csrf_middleware_get_sets_cookie_on_response() -> None:
-    async def call_next(_: Request) -> Response:
-        return Response(content="ok")
 
-    middleware = CSRFMiddleware(call_next)
+def test_csrf_middleware_get_sets_cookie_on_response() -> None:
     scope = {
         "type": "http",
         "method": "GET",
@@ -125,36 +114,32 @@ async def test_csrf_middleware_get_sets_cookie_on_response() -> None:
         "headers": [],
         "server": ("localhost", 8000),
     }
+    request = Request(scope)
+    response = Response(content="ok")
 
-    response = await middleware.dispatch(Request(scope), call_next)
+    needs_cookie, rejection = check_csrf(request)
+    ensure_csrf_cookie(request, response.headers)
 
+    assert needs_cookie is True
+    assert rejection is None
     assert CSRF_TOKEN_COOKIE_NAME in response.headers.get("set-cookie", "")
 
 
-@pytest.mark.asyncio
-async def test_csrf_middleware_blocks_cookie_post_without_csrf_header() -> None:
-    async def call_next(_: Request) -> Response:
-        return Response(content="ok")
-
-    middleware = CSRFMiddleware(call_next)
+def test_csrf_middleware_blocks_cookie_post_without_csrf_header() -> None:
     scope = {
         "type": "http",
         "method": "POST",
         "path": "/api/v1/private",
         "headers": [(b"cookie", b"rat=access")],
     }
-    response = await middleware.dispatch(Request(scope), call_next)
+    _, response = check_csrf(Request(scope))
+    assert response is not None
     assert response.status_code == status.HTTP_403_FORBIDDEN
     body = response.body.decode()
     assert "CSRF" in body
 
 
-@pytest.mark.asyncio
-async def test_csrf_middleware_bearer_bypasses_csrf() -> None:
-    async def call_next(_: Request) -> Response:
-        return Response(content="ok")
-
-    middleware = CSRFMiddleware(call_next)
+def test_csrf_middleware_bearer_bypasses_csrf() -> None:
     scope = {
         "type": "http",
         "method": "POST",
@@ -164,16 +149,10 @@ async def test_csrf_middleware_bearer_bypasses_csrf() -> None:
             (b"cookie", b"rat=access"),
         ],
     }
-    response = await middleware.dispatch(Request(scope), call_next)
-    assert response.status_code == status.HTTP_200_OK
-
+    assert check_csrf(Request(scope)) == (False, None)
 
-@pytest.mark.asyncio
-async def test_csrf_middleware_sets_cookie_on_get_for_localhost() -> None:
-    async def call_next(_: Request) -> Response:
-        return Response(content="ok")
 
-    middleware = CSRFMiddleware(MagicMock())
+def test_csrf_middleware_sets_cookie_on_get_for_localhost() -> None:
     scope = {
         "type": "http",
         "method": "GET",
@@ -185,12 +164,40 @@ async def test_csrf_middleware_sets_cookie_on_get_for_localhost() -> None:
     }
     request = Request(scope)
     response = Response(content="ok")
-    out = middleware._ensure_csrf_cookie(request, response)
-    cookie_header = out.headers.get("set-cookie", "")
+    ensure_csrf_cookie(request, response.headers)
+    cookie_header = response.headers.get("set-cookie", "")
     assert CSRF_TOKEN_COOKIE_NAME in cookie_header
     assert "Secure" not in cookie_header
 
 
+def test_csrf_cookie_matches_response_set_cookie_format() -> None:
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/x",
+        "headers": [],
+        "server": ("api.restorio.org", 443),
+        "scheme": "https",
+    }
+    response = Response(content="ok")
+    ensure_csrf_cookie(Request(scope), response.headers)
+    token = response.headers[CSRF_TOKEN_HEADER_NAME]
+
+    expected = Response()
+    expected.set_cookie(
+        key=CSRF_TOKEN_COOKIE_NAME,
+        value=token,
+        httponly=False,
+        secure=True,
+        samesite="lax",
+        max_age=14 * 24 * 60 * 60,
+        path="/",
+        domain=None,
+    )
+
+    assert response.headers["set-cookie"] == expected.headers["set-cookie"]
+
+
 def test_is_csrf_exempt_exact_match() -> None:
     assert _is_csrf_exempt("/api/v1/auth/login") is True
     assert _is_csrf_exempt("/api/v1/auth/register") is True
@@ -205,60 +212,37 @@ def test_is_csrf_exempt_not_exempt() -> None:
     assert _is_csrf_exempt("/api/v1/users") is False
 
 
-@pytest.mark.asyncio
-async def test_csrf_middleware_exempt_path_passthrough() -> None:
-    async def call_next(_: Request) -> Response:
-        return Response(content="ok")
-
-    middleware = CSRFMiddleware(call_next)
+def test_csrf_middleware_exempt_path_passthrough() -> None:
     scope = {
         "type": "http",
         "method": "POST",
         "path": "/api/v1/auth/login",
         "headers": [],
     }
-    response = await middleware.dispatch(Request(scope), call_next)
-    assert response.status_code == status.HTTP_200_OK
-
+    assert check_csrf(Request(scope)) == (True, None)
 
-@pytest.mark.asyncio
-async def test_csrf_middleware_exempt_forgot_password_with_access_cookie() -> None:
-    async def call_next(_: Request) -> Response:
-        return Response(content="ok")
 
-    middleware = CSRFMiddleware(call_next)
+def test_csrf_middleware_exempt_forgot_password_with_access_cookie() -> None:
     scope = {
         "type": "http",
         "method": "POST",
         "path": "/api/v1/auth/forgot-password",
         "headers": [(b"cookie", b"rat=access")],
     }
-    response = await middleware.dispatch(Request(scope), call_next)
-    assert response.status_code == status.HTTP_200_OK
+    assert check_csrf(Request(scope)) == (True, None)
 
 
-@pytest.mark.asyncio
-async def test_csrf_middleware_post_without_cookie_auth_passes() -> None:
-    async def call_next(_: Request) -> Response:
-        return Response(content="ok")
-
-    middleware = CSRFMiddleware(call_next)
+def test_csrf_middleware_post_without_cookie_auth_passes() -> None:
     scope = {
         "type": "http",
         "method": "POST",
         "path": "/api/v1/private",
         "headers": [],
     }
-    response = await middleware.dispatch(Request(scope), call_next)
-    assert response.status_code == status.HTTP_200_OK
-
+    assert check_csrf(Request(scope)) == (True, None)
 
-@pytest.mark.asyncio
-async def test_csrf_middleware_sets_cookie_on_post_success() -> None:
-    async def call_next(_: Request) -> Response:
-        return Response(content="ok")
 
-    middleware = CSRFMiddleware(call_next)
+def test_csrf_middleware_sets_cookie_on_post_success() -> None:
     token = "a" * 32
     scope = {
         "type": "http",
@@ -270,13 +254,10 @@ async def test_csrf_middleware_sets_cookie_on_post_success() -> None:
         ],
         "client": ("127.0.0.1", 1234),
     }
-    response = await middleware.dispatch(Request(scope), call_next)
-    assert response.status_code == status.HTTP_200_OK
+    assert check_csrf(Request(scope)) == (True, None)
 
 
-@pytest.mark.asyncio
-async def test_csrf_middleware_sets_host_only_cookie_for_restorio_domain() -> None:
-    middleware = CSRFMiddleware(MagicMock())
+def test_csrf_middleware_sets_host_only_cookie_for_restorio_domain() -> None:
     scope = {
         "type": "http",
         "method": "GET",
@@ -287,21 +268,19 @@ async def test_csrf_middleware_sets_host_only_cookie_for_restorio_domain() -> No
     }
     request = Request(scope)
     response = Response(content="ok")
-    out = middleware._ensure_csrf_cookie(request, response)
-    cookie_header = out.headers.get("set-cookie", "")
+    ensure_csrf_cookie(request, response.headers)
+    cookie_header = response.headers.get("set-cookie", "")
     assert CSRF_TOKEN_COOKIE_NAME in cookie_header
     assert "Domain=" not in cookie_header
-    assert out.headers.get(CSRF_TOKEN_HEADER_NAME)
+    assert response.headers.get(CSRF_TOKEN_HEADER_NAME)
 
 
-@pytest.mark.asyncio
 @patch("core.middleware.csrf.settings")
-async def test_preview_csrf_cookie_is_host_only(
+def test_preview_csrf_cookie_is_host_only(
     mock_settings: MagicMock,
 ) -> None:
     mock_settings.ENV = "preview"
     mock_settings.REFRESH_TOKEN_EXPIRE_DAYS = 14
-    middleware = CSRFMiddleware(MagicMock())
     scope = {
         "type": "http",
         "method": "GET",
@@ -311,16 +290,15 @@ async def test_preview_csrf_cookie_is_host_only(
         "scheme": "https",
     }
 
-    out = middleware._ensure_csrf_cookie(Request(scope), Response(content="ok"))
-    cookie_header = out.headers.get("set-cookie", "")
+    response = Response(content="ok")
+    ensure_csrf_cookie(Request(scope), response.headers)
+    cookie_header = response.headers.get("set-cookie", "")
 
     assert "preview_csrf_token" in cookie_header
     assert "Domain=" not in cookie_header
 
 
-@pytest.mark.asyncio
-async def test_csrf_middleware_sets_cookie_for_unknown_domain() -> None:
-    middleware = CSRFMiddleware(MagicMock())
+def test_csrf_middleware_sets_cookie_for_unknown_domain() -> None:
     scope = {
         "type": "http",
         "method": "GET",
@@ -331,6 +309,6 @@ async def test_csrf_middleware_sets_cookie_for_unknown_domain() -> None:
     }
     request = Request(scope)
     response = Response(content="ok")
-    out = middleware._ensure_csrf_cookie(request, response)
-    cookie_header = out.headers.get("set-cookie", "")
+    ensure_csrf_cookie(request, response.headers)
+    cookie_header = response.headers.get("set-cookie", "")
     assert CSRF_TOKEN_COOKIE_NAME in cookie_header
@@ -0,0 +1,58 @@
+import asyncio
+import logging
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.foundation.database.hooks import after_commit
+
+
+@pytest.mark.asyncio
+async def test_callbacks_run_after_commit_and_only_once() -> None:
+    session = AsyncSession()
+    invalidate = AsyncMock()
+    reindex = MagicMock(return_value=None)
+    after_commit(session, invalidate)
+    after_commit(session, reindex)
+
+    invalidate.assert_not_awaited()
+    await session.commit()
+    await asyncio.sleep(0)
+    await session.commit()
+    await asyncio.sleep(0)
+
+    invalidate.assert_awaited_once_with()
+    reindex.assert_called_once_with()
+
+
+@pytest.mark.asyncio
+async def test_rollback_discards_callbacks() -> None:
+    session = AsyncSession()
+    callback = MagicMock()
+    async with session.begin():
+        after_commit(session, callback)
+        await session.rollback()
+
+    await session.commit()
+
+    callback.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_failing_callbacks_are_logged_and_do_not_stop_the_rest(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    session = AsyncSession()
+    later = MagicMock()
+    after_commit(session, MagicMock(side_effect=RuntimeError))
+    after_commit(session, AsyncMock(side_effect=RuntimeError))
+    after_commit(session, later)
+
+    with caplog.at_level(logging.ERROR, logger="core.foundation.database.hooks"):
+        await session.commit()
+        for _ in range(2):
+            await asyncio.sleep(0)
+
+    later.assert_called_once_with()
+    assert len(caplog.records) == 2  # noqa: PLR2004
@@ -59,3 +59,32 @@ def test_get_mongo_db_returns_named_database(monkeypatch: pytest.MonkeyPatch) ->
 
     assert isinstance(database, FakeMongoDatabase)
     assert database.name is not None
+
+
+@pytest.mark.asyncio
+async def test_get_redis_client_singleton_and_close(monkeypatch: pytest.MonkeyPatch) -> None:
+    closed: list[bool] = []
+
+    class FakeRedis:
+        async def aclose(self) -> None:
+            closed.append(True)
+
+    created: list[str] = []
+
+    def fake_from_url(url: str, **_kwargs: float) -> FakeRedis:
+        created.append(url)
+        return FakeRedis()
+
+    monkeypatch.setattr(db.DatabaseConnections, "_redis_client", None)
+    monkeypatch.setattr(db.Redis, "from_url", fake_from_url)
+
+    client = db.get_redis_client()
+
+    assert db.DatabaseConnections.get_redis_client() is client
+    assert len(created) == 1
+
+    await db.DatabaseConnections.close_redis_client()
+    await db.DatabaseConnections.close_redis_client()
+
+    assert closed == [True]
+    assert db.DatabaseConnections._redis_client is None
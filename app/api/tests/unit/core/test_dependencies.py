@@ -101,10 +101,7 @@ def test_get_tenant_logo_storage_service_returns_singleton(
     assert dependencies.get_tenant_logo_storage_service() is singleton
 
 
-def test_get_external_client_returns_instance(monkeypatch: pytest.MonkeyPatch) -> None:
-    class DummyExternalClient:
-        pass
-
-    monkeypatch.setattr(dependencies, "ExternalClient", DummyExternalClient)
-    service = dependencies.get_external_client()
-    assert isinstance(service, DummyExternalClient)
+def test_get_external_client_returns_singleton(monkeypatch: pytest.MonkeyPatch) -> None:
+    singleton = object()
+    monkeypatch.setattr(dependencies, "external_client", singleton)
+    assert dependencies.get_external_client() is singleton
@@ -66,7 +66,7 @@ def test_get_table_session_service_returns_singleton() -> None:
 def test_get_external_client_returns_instance() -> None:
     a = get_external_client()
     assert isinstance(a, ExternalClient)
-    assert a is not get_external_client()
+    assert a is get_external_client()
 
 
 def test_get_tenant_profile_service_returns_instance() -> None:
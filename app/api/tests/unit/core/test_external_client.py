@@ -4,12 +4,21 @@ import httpx
 import pytest
 
 from core.exceptions import ExternalAPIError, ServiceUnavailableError
-from services.external_client_service import ExternalClient
+from services.external_client_service import ExternalClient, ExternalHttpClients
 
 HTTP_BAD_GATEWAY = 502
 HTTP_SERVICE_UNAVAILABLE = 503
 
 
+class _PublicResolver:
+    async def resolve(self, hostname: str) -> tuple[str, ...]:  # noqa: ARG002
+        return ("93.184.216.34",)
+
+
+def _client(clients: ExternalHttpClients | None = None) -> ExternalClient:
+    return ExternalClient(clients or ExternalHttpClients(), _PublicResolver())  # type: ignore[arg-type]
+
+
 @pytest.mark.asyncio
 async def test_external_post_json_success_returns_json() -> None:
     mock_response = MagicMock()
@@ -18,10 +27,9 @@ async def test_external_post_json_success_returns_json() -> None:
 
     with patch("services.external_client_service.httpx.AsyncClient") as mock_client_cls:
         mock_request = AsyncMock(return_value=mock_response)
-        mock_client_cls.return_value.__aenter__.return_value.request = mock_request
-        mock_client_cls.return_value.__aexit__ = AsyncMock(return_value=None)
+        mock_client_cls.return_value.request = mock_request
 
-        result = await ExternalClient().external_post_json(
+        result = await _client().external_post_json(
             "https://api.example.com/register",
             json={"key": "value"},
             headers={"Authorization": "Bearer x"},
@@ -57,11 +65,10 @@ async def test_external_post_json_http_status_error_raises_external_api_error()
                 response=mock_response,
             ),
         )
-        mock_client_cls.return_value.__aenter__.return_value.request = mock_request
-        mock_client_cls.return_value.__aexit__ = AsyncMock(return_value=None)
+        mock_client_cls.return_value.request = mock_request
 
         with pytest.raises(ExternalAPIError) as exc_info:
-            await ExternalClient().external_post_json(
+            await _client().external_post_json(
                 "https://api.example.com/endpoint",
                 json={},
                 service_name="Example API",
@@ -76,11 +83,10 @@ async def test_external_post_json_http_status_error_raises_external_api_error()
 async def test_external_post_json_request_error_raises_service_unavailable() -> None:
     with patch("services.external_client_service.httpx.AsyncClient") as mock_client_cls:
         mock_request = AsyncMock(side_effect=httpx.ConnectError("Connection refused"))
-        mock_client_cls.return_value.__aenter__.return_value.request = mock_request
-        mock_client_cls.return_value.__aexit__ = AsyncMock(return_value=None)
+        mock_client_cls.return_value.request = mock_request
 
         with pytest.raises(ServiceUnavailableError) as exc_info:
-            await ExternalClient().external_post_json(
+            await _client().external_post_json(
                 "https://api.example.com/endpoint",
                 json={},
                 service_name="Example API",
@@ -106,11 +112,10 @@ async def test_external_post_json_extract_error_from_body_errors_key() -> None:
                 response=mock_response,
             ),
         )
-        mock_client_cls.return_value.__aenter__.return_value.request = mock_request
-        mock_client_cls.return_value.__aexit__ = AsyncMock(return_value=None)
+        mock_client_cls.return_value.request = mock_request
 
         with pytest.raises(ExternalAPIError) as exc_info:
-            await ExternalClient().external_post_json("https://api.example.com", json={})
+            await _client().external_post_json("https://api.example.com", json={})
 
         assert "Validation failed" in exc_info.value.detail
 
@@ -130,11 +135,10 @@ async def test_external_post_json_extract_error_fallback_to_response_text() -> N
                 response=mock_response,
             ),
         )
-        mock_client_cls.return_value.__aenter__.return_value.request = mock_request
-        mock_client_cls.return_value.__aexit__ = AsyncMock(return_value=None)
+        mock_client_cls.return_value.request = mock_request
 
         with pytest.raises(ExternalAPIError) as exc_info:
-            await ExternalClient().external_post_json("https://api.example.com", json={})
+            await _client().external_post_json("https://api.example.com", json={})
 
         assert exc_info.value.status_code == HTTP_BAD_GATEWAY
         assert "Internal Server Error" in exc_info.value.detail
@@ -156,11 +160,10 @@ async def test_external_post_json_extract_error_fallback_inside_try_block() -> N
                 response=mock_response,
             ),
         )
-        mock_client_cls.return_value.__aenter__.return_value.request = mock_request
-        mock_client_cls.return_value.__aexit__ = AsyncMock(return_value=None)
+        mock_client_cls.return_value.request = mock_request
 
         with pytest.raises(ExternalAPIError) as exc_info:
-            await ExternalClient().external_post_json(
+            await _client().external_post_json(
                 "https://api.example.com/endpoint",
                 json={},
                 service_name="Example API",
@@ -178,10 +181,9 @@ async def test_external_get_success() -> None:
 
     with patch("services.external_client_service.httpx.AsyncClient") as mock_client_cls:
         mock_get = AsyncMock(return_value=mock_response)
-        mock_client_cls.return_value.__aenter__.return_value.get = mock_get
-        mock_client_cls.return_value.__aexit__ = AsyncMock(return_value=None)
+        mock_client_cls.return_value.get = mock_get
 
-        out = await ExternalClient().external_get("https://api.example.com/x")
+        out = await _client().external_get("https://api.example.com/x")
         assert out == "plain"
         mock_get.assert_awaited_once()
 
@@ -195,23 +197,19 @@ async def test_external_get_http_error_raises() -> None:
         mock_get = AsyncMock(
             side_effect=httpx.HTTPStatusError("x", request=MagicMock(), response=mock_response)
         )
-        mock_client_cls.return_value.__aenter__.return_value.get = mock_get
-        mock_client_cls.return_value.__aexit__ = AsyncMock(return_value=None)
+        mock_client_cls.return_value.get = mock_get
         with pytest.raises(ExternalAPIError):
-            await ExternalClient().external_get("https://api.example.com/x", service_name="S")
+            await _client().external_get("https://api.example.com/x", service_name="S")
 
 
 @pytest.mark.asyncio
 async def test_external_get_request_error_raises_service_unavailable() -> None:
     with patch("services.external_client_service.httpx.AsyncClient") as mock_client_cls:
         mock_get = AsyncMock(side_effect=httpx.ConnectError("connection refused"))
-        mock_client_cls.return_value.__aenter__.return_value.get = mock_get
-        mock_client_cls.return_value.__aexit__ = AsyncMock(return_value=None)
+        mock_client_cls.return_value.get = mock_get
 
         with pytest.raises(ServiceUnavailableError, match="Failed to connect to Example API"):
-            await ExternalClient().external_get(
-                "https://api.example.com/x", service_name="Example API"
-            )
+            await _client().external_get("https://api.example.com/x", service_name="Example API")
 
 
 @pytest.mark.asyncio
@@ -221,10 +219,9 @@ async def test_external_get_json_not_dict() -> None:
     mock_response.json.return_value = [1, 2]
     with patch("services.external_client_service.httpx.AsyncClient") as mock_client_cls:
         mock_get = AsyncMock(return_value=mock_response)
-        mock_client_cls.return_value.__aenter__.return_value.get = mock_get
-        mock_client_cls.return_value.__aexit__ = AsyncMock(return_value=None)
+        mock_client_cls.return_value.get = mock_get
         with pytest.raises(ExternalAPIError, match="invalid response"):
-            await ExternalClient().external_get_json("https://api.example.com/x")
+            await _client().external_get_json("https://api.example.com/x")
 
 
 @pytest.mark.asyncio
@@ -233,12 +230,9 @@ async def test_external_get_json_success_returns_mapping() -> None:
     mock_response.raise_for_status = MagicMock()
     mock_response.json.return_value = {"ok": True}
     with patch("services.external_client_service.httpx.AsyncClient") as mock_client_cls:
-        mock_client_cls.return_value.__aenter__.return_value.get = AsyncMock(
-            return_value=mock_response
-        )
-        mock_client_cls.return_value.__aexit__ = AsyncMock(return_value=None)
+        mock_client_cls.return_value.get = AsyncMock(return_value=mock_response)
 
-        result = await ExternalClient().external_get_json("https://api.example.com/x")
+        result = await _client().external_get_json("https://api.example.com/x")
 
     assert result == {"ok": True}
 
@@ -249,27 +243,25 @@ async def test_external_get_json_http_error_raises_external_api_error() -> None:
     mock_response.json.return_value = {"error": "bad response"}
     mock_response.text = "bad response"
     with patch("services.external_client_service.httpx.AsyncClient") as mock_client_cls:
-        mock_client_cls.return_value.__aenter__.return_value.get = AsyncMock(
+        mock_client_cls.return_value.get = AsyncMock(
             side_effect=httpx.HTTPStatusError(
                 "bad response", request=MagicMock(), response=mock_response
             )
         )
-        mock_client_cls.return_value.__aexit__ = AsyncMock(return_value=None)
 
         with pytest.raises(ExternalAPIError, match="bad response"):
-            await ExternalClient().external_get_json("https://api.example.com/x")
+            await _client().external_get_json("https://api.example.com/x")
 
 
 @pytest.mark.asyncio
 async def test_external_get_json_request_error_raises_service_unavailable() -> None:
     with patch("services.external_client_service.httpx.AsyncClient") as mock_client_cls:
-        mock_client_cls.return_value.__aenter__.return_value.get = AsyncMock(
+        mock_client_cls.return_value.get = AsyncMock(
             side_effect=httpx.ConnectError("connection refused")
         )
-        mock_client_cls.return_value.__aexit__ = AsyncMock(return_value=None)
 
         with pytest.raises(ServiceUnavailableError, match="Failed to connect to External API"):
-            await ExternalClient().external_get_json("https://api.example.com/x")
+            await _client().external_get_json("https://api.example.com/x")
 
 
 @pytest.mark.asyncio
@@ -277,10 +269,13 @@ async def test_post_json_uses_reusable_client() -> None:
     mock_response = MagicMock()
     mock_response.raise_for_status = MagicMock()
     mock_response.json.return_value = {"ok": True}
-    c = ExternalClient()
-    c._client.post = AsyncMock(return_value=mock_response)
+    clients = ExternalHttpClients()
+    c = _client(clients)
+    pooled = clients.for_url("https://api.example.com/other")
+    pooled.post = AsyncMock(return_value=mock_response)  # type: ignore[method-assign]
     out = await c.post_json("https://api.example.com/p", json={"a": 1})
     assert out == {"ok": True}
+    await clients.aclose()
 
 
 @pytest.mark.asyncio
@@ -291,9 +286,8 @@ async def test_external_put_json_empty_response() -> None:
     mock_response.json.side_effect = RuntimeError("no json on empty")
     with patch("services.external_client_service.httpx.AsyncClient") as mock_client_cls:
         mock_request = AsyncMock(return_value=mock_response)
-        mock_client_cls.return_value.__aenter__.return_value.request = mock_request
-        mock_client_cls.return_value.__aexit__ = AsyncMock(return_value=None)
-        out = await ExternalClient().external_put_json("https://api.example.com/u", json={})
+        mock_client_cls.return_value.request = mock_request
+        out = await _client().external_put_json("https://api.example.com/u", json={})
     assert out == {}
 
 
@@ -304,7 +298,6 @@ async def test_external_post_json_not_dict() -> None:
     mock_response.json.return_value = "list"
     with patch("services.external_client_service.httpx.AsyncClient") as mock_client_cls:
         mock_request = AsyncMock(return_value=mock_response)
-        mock_client_cls.return_value.__aenter__.return_value.request = mock_request
-        mock_client_cls.return_value.__aexit__ = AsyncMock(return_value=None)
+        mock_client_cls.return_value.request = mock_request
         with pytest.raises(ExternalAPIError, match="invalid response"):
-            await ExternalClient().external_post_json("https://api.example.com/p", json={})
+            await _client().external_post_json("https://api.example.com/p", json={})
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from unittest.mock import MagicMock
+
+from PIL import Image
+import pytest
+
+from core.foundation.image_processing import (
+    INVALID_IMAGE_MESSAGE,
+    ImageProcessor,
+    ImageProcessorUnavailableError,
+    ImageSpec,
+    InvalidImageError,
+    process_image,
+)
+
+_SPEC = ImageSpec(
+    allowed_formats=frozenset({"JPEG", "PNG", "WEBP"}),
+    max_pixels=4_000_000,
+    invalid_type_message="bad type",
+    too_large_message="too large",
+    min_square_ratio=0.95,
+    aspect_message="not square",
+    derivative_sizes=(128, 256, 512),
+)
+
+
+def _encode(size: tuple[int, int], fmt: str, mode: str = "RGB") -> bytes:
+    out = BytesIO()
+    Image.new(mode, size, (10, 120, 200)).save(out, format=fmt)
+    return out.getvalue()
+
+
+def test_process_image_keeps_format_and_bounds_each_derivative() -> None:
+    result = process_image(_encode((600, 590), "JPEG"), _SPEC)
+
+    assert result.original.extension == "jpg"
+    assert result.original.content_type == "image/jpeg"
+    assert (result.original.width, result.original.height) == (600, 590)
+    sizes = {size: (image.width, image.height) for size, image in result.derivatives.items()}
+    assert sizes == {512: (512, 503), 256: (256, 252), 128: (128, 126)}
+    for image in result.derivatives.values():
+        assert image.content_type == "image/webp"
+        with Image.open(BytesIO(image.data)) as decoded:
+            assert decoded.format == "WEBP"
+
+
+def test_process_image_never_upscales_small_images() -> None:
+    result = process_image(_encode((200, 200), "WEBP"), _SPEC)
+
+    assert result.original.extension == "webp"
+    assert {size: image.width for size, image in result.derivatives.items()} == {
+        512: 200,
+        256: 200,
+        128: 128,
+    }
+
+
+def test_process_image_png_output_converts_any_accepted_format() -> None:
+    spec = ImageSpec(
+        allowed_formats=_SPEC.allowed_formats,
+        max_pixels=_SPEC.max_pixels,
+        invalid_type_message="bad type",
+        too_large_message="too large",
+        output="png",
+    )
+
+    result = process_image(_encode((30, 10), "JPEG"), spec)
+
+    assert result.original.content_type == "image/png"
+    assert result.derivatives == {}
+    with Image.open(BytesIO(result.original.data)) as decoded:
+        assert decoded.mode == "RGBA"
+
+
+@pytest.mark.parametrize(
+    ("content", "message"),
+    [
+        (b"not an image", INVALID_IMAGE_MESSAGE),
+        (_encode((20, 20), "GIF", "P"), "bad type"),
+        (_encode((2100, 2100), "PNG"), "too large"),
+        (_encode((100, 50), "PNG"), "not square"),
+    ],
+)
+def test_process_image_rejects_invalid_uploads(content: bytes, message: str) -> None:
+    with pytest.raises(InvalidImageError, match=message):
+        process_image(content, _SPEC)
+
+
+def test_process_image_maps_decompression_bombs_to_too_large(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    content = _encode((100, 100), "PNG")
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 10)
+
+    with pytest.raises(InvalidImageError, match="too large"):
+        process_image(content, _SPEC)
+
+
+@pytest.mark.asyncio
+async def test_processor_runs_jobs_in_worker_process() -> None:
+    processor = ImageProcessor(max_workers=1, max_pending=2)
+    try:
+        result = await processor.process(_encode((64, 64), "PNG"), _SPEC)
+        with pytest.raises(InvalidImageError, match="not square"):
+            await processor.process(_encode((64, 10), "PNG"), _SPEC)
+    finally:
+        processor.shutdown()
+
+    assert result.original.content_type == "image/png"
+    assert processor.stats().completed == 1
+    assert processor.stats().pending == 0
+
+
+@pytest.mark.asyncio
+async def test_processor_refuses_jobs_beyond_pending_limit() -> None:
+    processor = ImageProcessor(max_workers=0, max_pending=0)
+
+    with pytest.raises(ImageProcessorUnavailableError, match="busy"):
+        await processor.process(_encode((10, 10), "PNG"), _SPEC)
+
+    assert processor.stats().rejected == 1
+
+
+@pytest.mark.asyncio
+async def test_processor_replaces_broken_pool() -> None:
+    processor = ImageProcessor(max_workers=1)
+    broken = MagicMock()
+    broken.submit.side_effect = BrokenProcessPool("worker died")
+    processor._executor = broken
+
+    with pytest.raises(ImageProcessorUnavailableError, match="unavailable"):
+        await processor.process(_encode((10, 10), "PNG"), _SPEC)
+
+    broken.shutdown.assert_called_once_with(wait=False, cancel_futures=True)
+    assert processor._executor is None
+    assert processor.stats().pending == 0
@@ -1,13 +1,19 @@
 from datetime import UTC, date, datetime
-from types import SimpleNamespace
-from unittest.mock import AsyncMock, MagicMock, Mock, patch
+from unittest.mock import AsyncMock, MagicMock, Mock
 from uuid import uuid4
 
 import pytest
 
 from core.dto.v1.payments import TransactionListItemDTO, TransactionListQueryDTO
+from core.exceptions import NotFoundResponse
 from core.foundation.http.responses import PaginatedResponse
-from routes.v1.payments.transactions import list_transactions, reconcile_pending_transactions
+from core.foundation.infra.config import settings
+from routes.v1.payments.transactions import (
+    get_pending_transactions_reconcile,
+    list_transactions,
+    reconcile_pending_transactions,
+)
+from services.payment_reconciliation import ReconciliationRun
 
 EXPECTED_RECONCILE_SCANNED = 3
 EXPECTED_RECONCILE_FAILED = 2
@@ -217,70 +223,67 @@ async def test_list_transactions_nullable_fields(tenant_id, mock_session, mock_p
     assert item.note is None
 
 
+def _reconcile_run(tenant_id, **overrides) -> ReconciliationRun:
+    run = ReconciliationRun(
+        id="run-1",
+        tenant_id=tenant_id,
+        started_at=datetime(2025, 6, 15, 12, 0, 0, tzinfo=UTC),
+        **overrides,
+    )
+    run.counts_for(tenant_id).scanned = EXPECTED_RECONCILE_SCANNED
+    run.counts_for(tenant_id).updated = 1
+    run.counts_for(tenant_id).failed = EXPECTED_RECONCILE_FAILED
+    run.counts_for(uuid4()).scanned = 7
+    return run
+
+
 @pytest.mark.asyncio
-async def test_reconcile_pending_transactions_tracks_success_missing_and_failure() -> None:
+async def test_reconcile_pending_transactions_starts_run_and_reports_tenant_counts() -> None:
     tenant_id = uuid4()
-    missing_id = uuid4()
-    success_id = uuid4()
-    failed_id = uuid4()
-    success_transaction = SimpleNamespace(session_id=success_id, tenant_id=tenant_id)
-    failed_transaction = SimpleNamespace(session_id=failed_id, tenant_id=tenant_id)
-
-    def result(value: object | None) -> MagicMock:
-        row = MagicMock()
-        row.scalar_one_or_none.return_value = value
-        return row
-
-    session = MagicMock()
-    session.execute = AsyncMock(
-        side_effect=[result(None), result(success_transaction), result(failed_transaction)]
-    )
-    session.flush = AsyncMock()
-    session.commit = AsyncMock()
-    session.rollback = AsyncMock()
-    p24_service = MagicMock()
-    p24_service.get_transactions_pending_reconcile = AsyncMock(
-        return_value=[
-            SimpleNamespace(session_id=missing_id),
-            SimpleNamespace(session_id=success_id),
-            SimpleNamespace(session_id=failed_id),
-        ]
-    )
-    p24_service.apply_p24_lookup_to_transaction = AsyncMock(
-        side_effect=[None, RuntimeError("lookup failed")]
+    run = _reconcile_run(
+        tenant_id, status="completed", finished_at=datetime(2025, 6, 15, 12, 1, tzinfo=UTC)
     )
-    tenant = SimpleNamespace(id=tenant_id)
-    tenant_service = MagicMock()
-    tenant_service.get_tenant = AsyncMock(return_value=tenant)
-    table_session_service = MagicMock()
-    external_client = MagicMock()
-    db = MagicMock()
-
-    with patch(
-        "routes.v1.payments.transactions.apply_mobile_payment_mongo_and_session_effects",
-        new_callable=AsyncMock,
-    ) as apply_effects:
-        response = await reconcile_pending_transactions(
-            tenant_id=tenant_id,
-            session=session,
-            db=db,
-            p24_service=p24_service,
-            tenant_service=tenant_service,
-            external_client=external_client,
-            table_session_service=table_session_service,
-        )
+    reconciler = MagicMock()
+    reconciler.start.return_value = run
+    reconciler.wait = AsyncMock()
 
+    response = await reconcile_pending_transactions(tenant_id=tenant_id, reconciler=reconciler)
+
+    reconciler.start.assert_called_once_with(tenant_id)
+    reconciler.wait.assert_awaited_once_with(settings.P24_RECONCILE_REQUEST_WAIT_SECONDS, run)
+    assert response.message == "Reconcile completed"
+    assert response.data.run_id == "run-1"
+    assert response.data.status == "completed"
     assert response.data.scanned == EXPECTED_RECONCILE_SCANNED
     assert response.data.updated == 1
     assert response.data.failed == EXPECTED_RECONCILE_FAILED
-    session.flush.assert_awaited_once()
-    session.commit.assert_awaited_once()
-    session.rollback.assert_awaited_once()
-    apply_effects.assert_awaited_once_with(
-        db,
-        session,
-        table_session_service,
-        tenant=tenant,
-        transaction=success_transaction,
-        session_id_str=str(success_id),
-    )
+
+
+@pytest.mark.asyncio
+async def test_reconcile_pending_transactions_returns_progress_of_unfinished_run() -> None:
+    tenant_id = uuid4()
+    reconciler = MagicMock()
+    reconciler.start.return_value = _reconcile_run(tenant_id)
+    reconciler.wait = AsyncMock()
+
+    response = await reconcile_pending_transactions(tenant_id=tenant_id, reconciler=reconciler)
+
+    assert response.message == "Reconcile in progress"
+    assert response.data.status == "running"
+    assert response.data.finished_at is None
+
+
+@pytest.mark.asyncio
+async def test_get_pending_transactions_reconcile_reads_latest_run() -> None:
+    tenant_id = uuid4()
+    reconciler = MagicMock()
+    reconciler.latest = AsyncMock(return_value=_reconcile_run(tenant_id))
+
+    response = await get_pending_transactions_reconcile(tenant_id=tenant_id, reconciler=reconciler)
+
+    reconciler.latest.assert_awaited_once_with(tenant_id)
+    assert response.data.scanned == EXPECTED_RECONCILE_SCANNED
+
+    reconciler.latest.return_value = None
+    with pytest.raises(NotFoundResponse):
+        await get_pending_transactions_reconcile(tenant_id=tenant_id, reconciler=reconciler)
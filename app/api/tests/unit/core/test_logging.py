@@ -1,13 +1,18 @@
 import io
 import json
 import logging
+import queue
 
 from core.foundation.logging.logger import (
+    BatchingLogWriter,
     JsonLogFormatter,
+    NonBlockingQueueHandler,
     SafeStreamHandler,
     bind_request_context,
+    logging_stats,
     reset_request_context,
     setup_logger,
+    shutdown_logging,
 )
 
 _EXPECTED_DURATION_MS = 18.3
@@ -23,9 +28,93 @@ def test_setup_logger_configures_one_json_root_handler() -> None:
 
     assert logger.propagate is True
     assert len(logging.getLogger().handlers) == 1
+    assert isinstance(logging.getLogger().handlers[0], NonBlockingQueueHandler)
     assert isinstance(logging.getLogger().handlers[0].formatter, JsonLogFormatter)
 
 
+def _record(msg: str, *args: object) -> logging.LogRecord:
+    return logging.LogRecord(
+        name="restorio-test",
+        level=logging.INFO,
+        pathname=__file__,
+        lineno=1,
+        msg=msg,
+        args=args,
+        exc_info=None,
+    )
+
+
+def test_writer_formats_queued_records_with_the_emitting_request_context() -> None:
+    log_queue: queue.Queue = queue.Queue(maxsize=10)
+    stream = io.StringIO()
+    handler = NonBlockingQueueHandler(log_queue)
+    writer = BatchingLogWriter(log_queue, stream, JsonLogFormatter(), batch_size=2)
+    token = bind_request_context(request_id="req-7", trace_id=None, route="/orders")
+    try:
+        for index in range(3):
+            handler.emit(_record("order %s", index))
+    finally:
+        reset_request_context(token)
+
+    writer.start()
+    writer.stop()
+
+    payloads = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [payload["message"] for payload in payloads] == ["order 0", "order 1", "order 2"]
+    assert all(payload["request_id"] == "req-7" for payload in payloads)
+
+
+def test_queue_handler_drops_and_counts_records_when_the_queue_is_full() -> None:
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+
+    for _ in range(3):
+        handler.emit(_record("burst"))
+
+    assert handler.dropped == 2  # noqa: PLR2004
+    assert handler.queue.qsize() == 1
+
+
+def test_queue_handler_leaves_unformattable_records_to_the_formatter_fallback() -> None:
+    log_queue: queue.Queue = queue.Queue()
+    handler = NonBlockingQueueHandler(log_queue)
+
+    handler.emit(_record("%d orders", "many"))
+
+    payload = json.loads(JsonLogFormatter().format(log_queue.get_nowait()))
+    assert payload["message"] == "Unable to format log record"
+
+
+def test_writer_suppresses_stream_failures() -> None:
+    class BrokenStream(io.StringIO):
+        def write(self, _value: str) -> int:
+            raise BrokenStreamError
+
+    log_queue: queue.Queue = queue.Queue()
+    log_queue.put(_record("This must not kill the writer"))
+    writer = BatchingLogWriter(log_queue, BrokenStream(), JsonLogFormatter())
+
+    writer.start()
+    writer.stop()
+    writer.stop()
+
+    assert log_queue.empty()
+
+
+def test_shutdown_logging_flushes_and_falls_back_to_synchronous_writes() -> None:
+    setup_logger("restorio-test-logger")
+    logging.getLogger("restorio-test-logger").info("before shutdown")
+
+    shutdown_logging()
+    try:
+        root_handlers = logging.getLogger().handlers
+        assert len(root_handlers) == 1
+        assert isinstance(root_handlers[0], SafeStreamHandler)
+        assert logging_stats().queued == 0
+        shutdown_logging()
+    finally:
+        setup_logger("restorio-test-logger")
+
+
 def test_json_formatter_includes_request_context_and_allowlisted_fields() -> None:
     formatter = JsonLogFormatter()
     record = logging.LogRecord(
@@ -80,6 +169,19 @@ def test_json_formatter_redacts_secret_bearing_messages_and_exceptions() -> None
     assert "super-secret" not in payload["exception"]["stacktrace"]
 
 
+def test_json_formatter_stamps_record_creation_time_and_redacts_bare_bearer_tokens() -> None:
+    record = _record("retrying with BEARER abc.def")
+    record.created = 1_700_000_000.25
+    record.msecs = 250.0
+
+    payload = json.loads(JsonLogFormatter().format(record))
+
+    assert payload["timestamp"] == "2023-11-14T22:13:20.250Z"
+    assert payload["message"] == "retrying with Bearer [REDACTED]"
+    assert payload["environment"]
+    assert payload["version"]
+
+
 def test_stream_handler_suppresses_write_failures() -> None:
     class BrokenStream(io.StringIO):
         def write(self, _value: str) -> int:
@@ -10,8 +10,10 @@ import pytest
 
 from core.foundation.infra.config import Settings
 from core.foundation.logging.logger import JsonLogFormatter
-from core.middleware import TimingMiddleware, UnauthorizedMiddleware, setup_cors
+from core.foundation.security import security_service
+from core.middleware import RequestPipelineMiddleware, setup_cors
 from core.middleware.cors import _build_allowed_origins, is_origin_allowed
+from core.middleware.unauthorized import authenticate_request
 
 
 def test_setup_cors_adds_middleware() -> None:
@@ -43,7 +45,7 @@ async def test_setup_cors_always_includes_local_admin_origin() -> None:
 async def test_cors_headers_present_on_unauthorized_response() -> None:
     app = FastAPI()
     settings = Settings(CORS_ORIGINS=["http://localhost:3001"])
-    app.add_middleware(UnauthorizedMiddleware)
+    app.add_middleware(RequestPipelineMiddleware)
     setup_cors(app=app, settings=settings)
 
     @app.get("/private")
@@ -55,35 +57,52 @@ async def test_cors_headers_present_on_unauthorized_response() -> None:
 
     assert response.status_code == 401  # noqa: PLR2004
     assert response.headers.get("access-control-allow-origin") == "http://localhost:3001"
+    assert response.headers["X-Request-ID"]
+    assert "set-cookie" not in response.headers
 
 
-@pytest.mark.asyncio
-async def test_timing_middleware_adds_header() -> None:
-    async def call_next(_: Request) -> Response:
+def _pipeline_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(RequestPipelineMiddleware)
+
+    @app.get("/")
+    async def root() -> Response:
         return Response(content="ok")
 
-    middleware = TimingMiddleware(call_next)
-    scope = {"type": "http", "method": "GET", "path": "/", "headers": []}
-    request = Request(scope)
+    @app.get("/api/v1/public/ping")
+    async def public_ping() -> Response:
+        return Response(content="pong")
+
+    @app.post("/api/v1/private")
+    async def private_post(request: Request) -> Response:
+        return Response(content=str(request.state.user["sub"]))
+
+    @app.post("/api/v1/auth/login")
+    async def login() -> Response:
+        return Response(content="ok")
+
+    @app.get("/api/v1/public/boom")
+    async def boom() -> Response:
+        msg = "boom"
+        raise RuntimeError(msg)
+
+    return app
+
 
-    response = await middleware.dispatch(request, call_next)
+@pytest.mark.asyncio
+async def test_timing_middleware_adds_header() -> None:
+    async with AsyncClient(
+        transport=ASGITransport(app=_pipeline_app()), base_url="http://test"
+    ) as client:
+        response = await client.get("/")
 
     assert "X-Process-Time" in response.headers
+    assert response.headers["X-Request-ID"]
+    assert "X-Trace-ID" not in response.headers
 
 
 @pytest.mark.asyncio
 async def test_timing_middleware_propagates_valid_request_and_trace_ids() -> None:
-    async def call_next(_: Request) -> Response:
-        return Response(content="ok")
-
-    middleware = TimingMiddleware(call_next)
-    scope = {
-        "type": "http",
-        "method": "GET",
-        "path": "/",
-        "headers": [(b"x-request-id", b"request-123"), (b"x-trace-id", b"trace-123")],
-    }
-    request = Request(scope)
     stream = io.StringIO()
     handler = logging.StreamHandler(stream)
     handler.setFormatter(JsonLogFormatter())
@@ -91,212 +110,231 @@ async def test_timing_middleware_propagates_valid_request_and_trace_ids() -> Non
     root_logger.addHandler(handler)
 
     try:
-        response = await middleware.dispatch(request, call_next)
+        async with AsyncClient(
+            transport=ASGITransport(app=_pipeline_app()), base_url="http://test"
+        ) as client:
+            response = await client.get(
+                "/", headers={"X-Request-ID": "request-123", "X-Trace-ID": "trace-123"}
+            )
     finally:
         root_logger.removeHandler(handler)
 
-    log_payload = json.loads(stream.getvalue())
+    log_payload = next(
+        payload
+        for payload in map(json.loads, stream.getvalue().splitlines())
+        if payload["message"] == "request_completed"
+    )
 
     assert response.headers["X-Request-ID"] == "request-123"
     assert response.headers["X-Trace-ID"] == "trace-123"
     assert log_payload["request_id"] == "request-123"
     assert log_payload["trace_id"] == "trace-123"
+    assert log_payload["route"] == "/"
+    assert log_payload["http_status"] == 200  # noqa: PLR2004
     assert log_payload["message"] == "request_completed"
 
 
 @pytest.mark.asyncio
-async def test_unauthorized_middleware_allows_options_request() -> None:
-    async def call_next(_: Request) -> Response:
-        return Response(status_code=202)
+async def test_pipeline_logs_request_failed_when_app_raises() -> None:
+    with patch("core.middleware.timing.logger") as mock_logger:
+        async with AsyncClient(
+            transport=ASGITransport(app=_pipeline_app(), raise_app_exceptions=False),
+            base_url="http://test",
+        ) as client:
+            response = await client.get("/api/v1/public/boom")
 
-    mid = UnauthorizedMiddleware(call_next)
-    scope = {"type": "http", "method": "OPTIONS", "path": "/api/v1/private", "headers": []}
-    request = Request(scope)
+    assert response.status_code == 500  # noqa: PLR2004
+    mock_logger.info.assert_called_once()
+    assert mock_logger.info.call_args.args[0] == "request_failed"
 
-    response = await mid.dispatch(request, call_next)
 
-    assert response.status_code == 202  # noqa: PLR2004
+@pytest.mark.asyncio
+async def test_pipeline_runs_auth_csrf_and_rate_limit_in_one_pass() -> None:
+    pipeline_app = _pipeline_app()
+    token = "a" * 32
+    cookies = {"rat": "access", "csrf_token": token}
+
+    with patch.object(security_service, "decode_access_token", return_value={"sub": "user-1"}):
+        async with AsyncClient(
+            transport=ASGITransport(app=pipeline_app), base_url="http://test", cookies=cookies
+        ) as client:
+            ok = await client.post("/api/v1/private", headers={"X-CSRF-Token": token})
+            rejected = await client.post("/api/v1/private")
+
+    assert ok.status_code == 200  # noqa: PLR2004
+    assert ok.text == "user-1"
+    assert ok.headers["X-CSRF-Token"] == token
+    assert rejected.status_code == 403  # noqa: PLR2004
+    assert rejected.headers["X-CSRF-Token"] == token
+    assert rejected.headers["X-Request-ID"]
 
 
 @pytest.mark.asyncio
-async def test_unauthorized_middleware_transforms_not_found() -> None:
-    async def call_next(_: Request) -> Response:
-        return Response(status_code=404)
+async def test_pipeline_sets_csrf_cookie_and_rate_headers_on_public_routes() -> None:
+    async with AsyncClient(
+        transport=ASGITransport(app=_pipeline_app()), base_url="http://test"
+    ) as client:
+        public = await client.get("/api/v1/public/ping")
+        login = await client.post("/api/v1/auth/login")
 
-    middleware = UnauthorizedMiddleware(call_next)
-    scope = {"type": "http", "method": "GET", "path": "/", "headers": []}
-    request = Request(scope)
+    assert public.status_code == 200  # noqa: PLR2004
+    assert "csrf_token=" in public.headers["set-cookie"]
+    assert "X-RateLimit-Limit" not in public.headers
+    assert login.headers["X-RateLimit-Limit"] == "10"
+    assert login.headers["X-CSRF-Token"]
 
-    response = await middleware.dispatch(request, call_next)
 
-    assert response.status_code == 404  # noqa: PLR2004
+@pytest.mark.asyncio
+async def test_pipeline_rate_limited_response_keeps_csrf_and_timing_headers() -> None:
+    class LimitedBackend:
+        async def is_rate_limited(self, _key, _rule):
+            return True, 0
 
+    with patch("core.middleware.rate_limit._backend", LimitedBackend()):
+        async with AsyncClient(
+            transport=ASGITransport(app=_pipeline_app()), base_url="http://test"
+        ) as client:
+            response = await client.post("/api/v1/auth/login")
 
-@pytest.mark.asyncio
-async def test_unauthorized_middleware_passes_other_status() -> None:
-    async def call_next(_: Request) -> Response:
-        return Response(status_code=200)
-
-    middleware = UnauthorizedMiddleware(call_next)
-    scope = {
-        "type": "http",
-        "method": "GET",
-        "path": "/private",
-        "headers": [(b"authorization", b"Bearer valid-token")],
-    }
-    request = Request(scope)
-
-    with patch.object(middleware._security, "decode_access_token", return_value={"sub": "user-1"}):
-        response = await middleware.dispatch(request, call_next)
-
-    assert response.status_code == 200  # noqa: PLR2004
-    assert request.state.user == {"sub": "user-1"}
+    assert response.status_code == 429  # noqa: PLR2004
+    assert response.headers["Retry-After"] == "60"
+    assert response.headers["X-CSRF-Token"]
+    assert response.json()["request_id"] == response.headers["X-Request-ID"]
 
 
 @pytest.mark.asyncio
-async def test_unauthorized_middleware_allows_public_routes() -> None:
-    async def call_next(_: Request) -> Response:
-        return Response(status_code=204)
+async def test_pipeline_passes_through_non_http_scopes() -> None:
+    seen: list[str] = []
 
-    middleware = UnauthorizedMiddleware(call_next)
-    scope = {"type": "http", "method": "GET", "path": "/docs", "headers": []}
-    request = Request(scope)
+    async def inner(scope, _receive, _send) -> None:
+        seen.append(scope["type"])
 
-    response = await middleware.dispatch(request, call_next)
+    await RequestPipelineMiddleware(inner)({"type": "lifespan"}, None, None)
 
-    assert response.status_code == 204  # noqa: PLR2004
+    assert seen == ["lifespan"]
 
 
-@pytest.mark.asyncio
-async def test_unauthorized_middleware_allows_public_auth_login_route() -> None:
-    async def call_next(_: Request) -> Response:
-        return Response(status_code=204)
+def _request(scope: dict) -> Request:
+    return Request({"type": "http", "headers": [], **scope})
 
-    middleware = UnauthorizedMiddleware(call_next)
-    scope = {"type": "http", "method": "POST", "path": "/api/v1/auth/login", "headers": []}
-    request = Request(scope)
 
-    response = await middleware.dispatch(request, call_next)
+def test_unauthorized_middleware_allows_options_request() -> None:
+    request = _request({"method": "OPTIONS", "path": "/api/v1/private"})
 
-    assert response.status_code == 204  # noqa: PLR2004
+    assert authenticate_request(request) is None
 
 
-@pytest.mark.asyncio
-async def test_unauthorized_middleware_allows_public_auth_forgot_password_route() -> None:
-    async def call_next(_: Request) -> Response:
-        return Response(status_code=204)
+def test_unauthorized_middleware_rejects_missing_token_on_root_subpath() -> None:
+    request = _request({"method": "GET", "path": "/private"})
 
-    middleware = UnauthorizedMiddleware(call_next)
-    scope = {
-        "type": "http",
-        "method": "POST",
-        "path": "/api/v1/auth/forgot-password",
-        "headers": [],
-    }
-    request = Request(scope)
+    response = authenticate_request(request)
 
-    response = await middleware.dispatch(request, call_next)
+    assert response is not None
+    assert response.status_code == 401  # noqa: PLR2004
 
-    assert response.status_code == 204  # noqa: PLR2004
 
+def test_unauthorized_middleware_passes_other_status() -> None:
+    request = _request(
+        {
+            "method": "GET",
+            "path": "/private",
+            "headers": [(b"authorization", b"Bearer valid-token")],
+        }
+    )
 
-@pytest.mark.asyncio
-async def test_unauthorized_middleware_allows_public_auth_reset_password_route() -> None:
-    async def call_next(_: Request) -> Response:
-        return Response(status_code=204)
+    with patch.object(security_service, "decode_access_token", return_value={"sub": "user-1"}):
+        response = authenticate_request(request)
 
-    middleware = UnauthorizedMiddleware(call_next)
-    scope = {"type": "http", "method": "POST", "path": "/api/v1/auth/reset-password", "headers": []}
-    request = Request(scope)
+    assert response is None
+    assert request.state.user == {"sub": "user-1"}
 
-    response = await middleware.dispatch(request, call_next)
 
-    assert response.status_code == 204  # noqa: PLR2004
+def test_unauthorized_middleware_allows_public_routes() -> None:
+    assert authenticate_request(_request({"method": "GET", "path": "/docs"})) is None
+    assert authenticate_request(_request({"method": "GET", "path": "/"})) is None
 
 
-@pytest.mark.asyncio
-async def test_unauthorized_middleware_returns_401_on_invalid_token() -> None:
-    async def call_next(_: Request) -> Response:
-        return Response(status_code=200)
-
-    middleware = UnauthorizedMiddleware(call_next)
-    scope = {
-        "type": "http",
-        "method": "GET",
-        "path": "/private",
-        "headers": [(b"authorization", b"Bearer invalid-token")],
-    }
-    request = Request(scope)
-
-    with patch.object(
-        middleware._security, "decode_access_token", side_effect=Exception("bad token")
-    ):
-        response = await middleware.dispatch(request, call_next)
+def test_unauthorized_middleware_allows_public_auth_login_route() -> None:
+    request = _request({"method": "POST", "path": "/api/v1/auth/login"})
 
-    assert response.status_code == 401  # noqa: PLR2004
+    assert authenticate_request(request) is None
 
 
-@pytest.mark.asyncio
-async def test_unauthorized_middleware_accepts_access_token_cookie() -> None:
-    async def call_next(_: Request) -> Response:
-        return Response(status_code=200)
+def test_unauthorized_middleware_allows_public_auth_forgot_password_route() -> None:
+    request = _request({"method": "POST", "path": "/api/v1/auth/forgot-password"})
 
-    middleware = UnauthorizedMiddleware(call_next)
-    scope = {
-        "type": "http",
-        "method": "GET",
-        "path": "/",
-        "headers": [(b"cookie", b"rat=valid-token")],
-    }
-    request = Request(scope)
+    assert authenticate_request(request) is None
 
-    with patch.object(middleware._security, "decode_access_token", return_value={"sub": "user-1"}):
-        response = await middleware.dispatch(request, call_next)
 
-    assert response.status_code == 200  # noqa: PLR2004
+def test_unauthorized_middleware_allows_public_auth_reset_password_route() -> None:
+    request = _request({"method": "POST", "path": "/api/v1/auth/reset-password"})
 
+    assert authenticate_request(request) is None
 
-@pytest.mark.asyncio
-async def test_unauthorized_middleware_includes_request_id_when_missing_token() -> None:
-    async def call_next(_: Request) -> Response:
-        return Response(status_code=200)
-
-    middleware = UnauthorizedMiddleware(call_next)
-    scope = {
-        "type": "http",
-        "method": "GET",
-        "path": "/private",
-        "headers": [(b"origin", b"http://localhost:3001")],
-    }
-    request = Request(scope)
+
+def test_unauthorized_middleware_returns_401_on_invalid_token() -> None:
+    request = _request(
+        {
+            "method": "GET",
+            "path": "/private",
+            "headers": [(b"authorization", b"Bearer invalid-token")],
+        }
+    )
+
+    with patch.object(security_service, "decode_access_token", side_effect=Exception("bad token")):
+        response = authenticate_request(request)
+
+    assert response is not None
+    assert response.status_code == 401  # noqa: PLR2004
+
+
+def test_unauthorized_middleware_accepts_access_token_cookie() -> None:
+    request = _request(
+        {
+            "method": "GET",
+            "path": "/private",
+            "headers": [(b"cookie", b"rat=valid-token")],
+        }
+    )
+
+    with patch.object(security_service, "decode_access_token", return_value={"sub": "user-1"}):
+        response = authenticate_request(request)
+
+    assert response is None
+    assert request.state.user == {"sub": "user-1"}
+
+
+def test_unauthorized_middleware_includes_request_id_when_missing_token() -> None:
+    request = _request(
+        {
+            "method": "GET",
+            "path": "/private",
+            "headers": [(b"origin", b"http://localhost:3001")],
+        }
+    )
     request.state.request_id = "rid-1"
 
-    response = await middleware.dispatch(request, call_next)
+    response = authenticate_request(request)
 
+    assert response is not None
     assert response.status_code == 401  # noqa: PLR2004
     assert b'"request_id":"rid-1"' in response.body
 
 
-@pytest.mark.asyncio
-async def test_unauthorized_middleware_includes_request_id_when_token_invalid() -> None:
-    async def call_next(_: Request) -> Response:
-        return Response(status_code=200)
-
-    middleware = UnauthorizedMiddleware(call_next)
-    scope = {
-        "type": "http",
-        "method": "GET",
-        "path": "/private",
-        "headers": [(b"authorization", b"Bearer bad-token")],
-    }
-    request = Request(scope)
+def test_unauthorized_middleware_includes_request_id_when_token_invalid() -> None:
+    request = _request(
+        {
+            "method": "GET",
+            "path": "/private",
+            "headers": [(b"authorization", b"Bearer bad-token")],
+        }
+    )
     request.state.request_id = "rid-2"
 
-    with patch.object(
-        middleware._security, "decode_access_token", side_effect=Exception("bad token")
-    ):
-        response = await middleware.dispatch(request, call_next)
+    with patch.object(security_service, "decode_access_token", side_effect=Exception("bad token")):
+        response = authenticate_request(request)
 
+    assert response is not None
     assert response.status_code == 401  # noqa: PLR2004
     assert b'"request_id":"rid-2"' in response.body
 
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core.foundation.infra.config import settings
+from core.foundation.object_storage import (
+    MemoryObjectStorageBackend,
+    MinioObjectStorageBackend,
+    ObjectStorage,
+    build_object_storage,
+    public_read_policy,
+)
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_round_trip_and_latency_stats() -> None:
+    storage = ObjectStorage(MemoryObjectStorageBackend("media"), max_workers=2)
+    try:
+        assert await storage.bucket_exists() is False
+        await storage.ensure_public_bucket()
+        assert await storage.bucket_exists() is True
+
+        await storage.put_bytes("menu-items/t/a.png", b"abc", "image/png")
+        await storage.put_bytes("menu-items/t/b.png", b"de", "image/png")
+        assert await storage.stat_size("menu-items/t/a.png") == 3  # noqa: PLR2004
+        assert await storage.get_bytes("menu-items/t/b.png") == b"de"
+        assert await storage.list_keys("menu-items/t/") == [
+            "menu-items/t/a.png",
+            "menu-items/t/b.png",
+        ]
+
+        await storage.remove("menu-items/t/a.png")
+        with pytest.raises(KeyError):
+            await storage.get_bytes("menu-items/t/a.png")
+
+        expires = timedelta(minutes=15)
+        assert await storage.presigned_put_url("tmp/a b", expires) == (
+            "memory://media/tmp/a%20b?expires=900"
+        )
+        assert await storage.presigned_get_url("x", expires) == "memory://media/x?expires=900"
+
+        stats = storage.stats()
+        assert stats.max_workers == 2  # noqa: PLR2004
+        assert stats.operations["put_bytes"].calls == 2  # noqa: PLR2004
+        assert stats.operations["get_bytes"].calls == 2  # noqa: PLR2004
+        assert stats.operations["get_bytes"].errors == 1
+        assert stats.operations["get_bytes"].max_ms >= 0
+    finally:
+        storage.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_bucket_is_provisioned_once_until_invalidated() -> None:
+    storage = ObjectStorage(MemoryObjectStorageBackend(), max_workers=1)
+    try:
+        await storage.ensure_bucket_ready()
+        await storage.ensure_bucket_ready()
+        assert storage.stats().operations["ensure_public_bucket"].calls == 1
+        assert storage.stats().bucket_ready is True
+
+        storage.invalidate_bucket()
+        await storage.ensure_bucket_ready()
+        await storage.ensure_bucket_ready(force=True)
+        assert storage.stats().operations["ensure_public_bucket"].calls == 3  # noqa: PLR2004
+    finally:
+        storage.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_bootstrap_bucket_retries_with_backoff() -> None:
+    backend = MagicMock()
+    backend.ensure_public_bucket.side_effect = [OSError("down"), OSError("down"), None]
+    storage = ObjectStorage(backend, bootstrap_attempts=3, bootstrap_backoff_seconds=0.01)
+    try:
+        with patch("core.foundation.object_storage.asyncio.sleep") as sleep:
+            assert await storage.bootstrap_bucket() is True
+    finally:
+        storage.shutdown()
+
+    assert [c.args[0] for c in sleep.await_args_list] == [0.01, 0.02]
+    assert storage.bucket_ready is True
+
+
+@pytest.mark.asyncio
+async def test_bootstrap_bucket_gives_up_and_leaves_bucket_unverified() -> None:
+    backend = MagicMock()
+    backend.ensure_public_bucket.side_effect = OSError("down")
+    storage = ObjectStorage(backend, bootstrap_attempts=2, bootstrap_backoff_seconds=0)
+    try:
+        assert await storage.bootstrap_bucket() is False
+    finally:
+        storage.shutdown()
+
+    assert backend.ensure_public_bucket.call_count == 2  # noqa: PLR2004
+    assert storage.bucket_ready is False
+
+
+@pytest.mark.asyncio
+async def test_missing_bucket_error_invalidates_ready_state() -> None:
+    class _NoSuchBucketError(Exception):
+        code = "NoSuchBucket"
+
+    backend = MagicMock()
+    backend.put_bytes.side_effect = [_NoSuchBucketError(), OSError("other")]
+    storage = ObjectStorage(backend, max_workers=1)
+    try:
+        await storage.ensure_bucket_ready()
+        with pytest.raises(_NoSuchBucketError):
+            await storage.put_bytes("k", b"x", "image/png")
+        assert storage.bucket_ready is False
+
+        await storage.ensure_bucket_ready()
+        with pytest.raises(OSError, match="other"):
+            await storage.put_bytes("k", b"x", "image/png")
+        assert storage.bucket_ready is True
+    finally:
+        storage.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_shutdown_is_idempotent_and_pool_restarts_on_next_call() -> None:
+    storage = ObjectStorage(MemoryObjectStorageBackend(), max_workers=1)
+    storage.shutdown()
+    await storage.ensure_public_bucket()
+    storage.shutdown()
+    storage.shutdown()
+
+    assert await storage.bucket_exists() is True
+    storage.shutdown()
+
+
+def test_minio_backend_translates_calls_to_one_bucket() -> None:
+    internal, public = MagicMock(), MagicMock()
+    internal.bucket_exists.return_value = False
+    internal.stat_object.return_value = SimpleNamespace(size="7")
+    response = MagicMock()
+    response.read.return_value = b"data"
+    internal.get_object.return_value = response
+    internal.list_objects.return_value = [SimpleNamespace(object_name="p/a")]
+    public.presigned_put_object.return_value = "put-url"
+    public.presigned_get_object.return_value = "get-url"
+    backend = MinioObjectStorageBackend(internal, public, "media")
+    expires = timedelta(seconds=60)
+
+    backend.ensure_public_bucket()
+    assert backend.bucket_exists() is False
+    assert backend.stat_size("k") == 7  # noqa: PLR2004
+    assert backend.get_bytes("k") == b"data"
+    backend.put_bytes("k", b"xy", "image/png")
+    backend.remove("k")
+
+    internal.make_bucket.assert_called_once_with("media")
+    internal.set_bucket_policy.assert_called_once_with("media", public_read_policy("media"))
+    response.close.assert_called_once()
+    response.release_conn.assert_called_once()
+    args = internal.put_object.call_args
+    assert args.args[0:2] == ("media", "k")
+    assert args.args[3] == 2  # noqa: PLR2004
+    assert args.kwargs == {"content_type": "image/png"}
+    internal.remove_object.assert_called_once_with("media", "k")
+    assert backend.list_keys("p/") == ["p/a"]
+    internal.list_objects.assert_called_once_with("media", prefix="p/", recursive=True)
+    now = datetime.now(UTC)
+    internal.list_objects.return_value = [
+        SimpleNamespace(object_name="p/old", last_modified=now - timedelta(hours=2)),
+        SimpleNamespace(object_name="p/new", last_modified=now),
+        SimpleNamespace(object_name="p/unknown", last_modified=None),
+    ]
+    assert backend.list_keys_modified_before("p/", now - timedelta(hours=1)) == ["p/old"]
+    assert backend.presigned_put_url("k", expires) == "put-url"
+    assert backend.presigned_get_url("k", expires) == "get-url"
+    public.presigned_put_object.assert_called_once_with("media", "k", expires=expires)
+
+
+def test_minio_clients_share_one_connection_pool() -> None:
+    with (
+        patch.object(settings, "MINIO_PUBLIC_SECURE", True),
+        patch("core.foundation.object_storage.Minio") as minio_cls,
+    ):
+        MinioObjectStorageBackend.from_settings(settings)
+
+    internal_kwargs = minio_cls.call_args_list[0].kwargs
+    public_kwargs = minio_cls.call_args_list[1].kwargs
+    assert internal_kwargs["secure"] is settings.MINIO_SECURE
+    assert public_kwargs["secure"] is True
+    assert internal_kwargs["http_client"] is public_kwargs["http_client"]
+
+
+def test_public_read_policy_lists_public_prefixes() -> None:
+    policy = json.loads(public_read_policy("media"))
+
+    assert policy["Statement"][1]["Resource"] == [
+        "arn:aws:s3:::media/tenant-logos/*",
+        "arn:aws:s3:::media/tenant-mobile-favicons/*",
+        "arn:aws:s3:::media/menu-items/*",
+    ]
+
+
+def test_build_object_storage_selects_backend() -> None:
+    memory = build_object_storage(settings.model_copy(update={"OBJECT_STORAGE_BACKEND": "memory"}))
+    assert isinstance(memory.backend, MemoryObjectStorageBackend)
+
+    with patch("core.foundation.object_storage.Minio"):
+        minio = build_object_storage(
+            settings.model_copy(update={"OBJECT_STORAGE_BACKEND": "minio"})
+        )
+    assert isinstance(minio.backend, MinioObjectStorageBackend)
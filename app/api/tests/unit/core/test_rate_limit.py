@@ -1,7 +1,8 @@
-from fastapi import Request, Response, status
-import pytest
+from fastapi import Request, status
+from redis.exceptions import ConnectionError as RedisConnectionError
 
 from core.foundation.client_ip import get_client_ip
+from core.foundation.infra.config import Settings
 from core.middleware import rate_limit as rl
 
 
@@ -18,8 +19,18 @@ def _request(path: str, method: str = "GET", headers=None, client=None) -> Reque
 
 
 def test_match_rule_for_known_prefix_suffix_and_none() -> None:
-    assert rl._match_rule("/api/v1/auth/login") == rl.RATE_LIMITED_PATHS["/api/v1/auth/login"]
-    assert rl._match_rule("/api/v1/tenants/abc/profile/logo/presign") == rl._PRESIGN_RULE
+    assert rl._match_rule("/api/v1/auth/login") == (
+        "/api/v1/auth/login",
+        rl.RATE_LIMITED_PATHS["/api/v1/auth/login"],
+    )
+    assert rl._match_rule("/api/v1/auth/resend-activation/abc") == (
+        "/api/v1/auth/resend-activation",
+        rl.RATE_LIMITED_PATHS["/api/v1/auth/resend-activation"],
+    )
+    assert rl._match_rule("/api/v1/tenants/abc/profile/logo/presign") == (
+        "/profile/logo/presign",
+        rl._PRESIGN_RULE,
+    )
     assert rl._match_rule("/not-limited") is None
 
 
@@ -33,32 +44,32 @@ def test_client_ip_forwarded_and_unknown() -> None:
     assert get_client_ip(req_unknown) == "unknown"
 
 
-def test_inmemory_backend_blocks_after_limit(monkeypatch) -> None:
+async def test_inmemory_backend_blocks_after_limit(monkeypatch) -> None:
     max_requests = 2
     monotonic_values = iter([100.0, 101.0, 102.0])
-    monkeypatch.setattr(rl.time, "monotonic", lambda: next(monotonic_values))
+    monkeypatch.setattr(rl, "monotonic", lambda: next(monotonic_values))
 
     backend = rl.InMemoryBackend()
     rule = rl.RateRule(max_requests=max_requests, window_seconds=60)
 
-    limited, remaining = backend.is_rate_limited("k", rule)
+    limited, remaining = await backend.is_rate_limited("k", rule)
     assert limited is False
     assert remaining == 1
 
-    limited, remaining = backend.is_rate_limited("k", rule)
+    limited, remaining = await backend.is_rate_limited("k", rule)
     assert limited is False
     assert remaining == 0
 
-    limited, remaining = backend.is_rate_limited("k", rule)
+    limited, remaining = await backend.is_rate_limited("k", rule)
     assert limited is True
-    assert remaining == max_requests
+    assert remaining == 0
 
 
 def test_set_backend_swaps_global_backend() -> None:
     original = rl._backend
 
     class DummyBackend:
-        def is_rate_limited(self, _key, _rule):
+        async def is_rate_limited(self, _key, _rule):
             return False, 5
 
     dummy = DummyBackend()
@@ -70,31 +81,17 @@ def test_set_backend_swaps_global_backend() -> None:
         rl.set_backend(original)
 
 
-@pytest.mark.asyncio
 async def test_rate_limit_middleware_options_and_unmatched_passthrough() -> None:
-    async def call_next(_: Request) -> Response:
-        return Response(content="ok", status_code=status.HTTP_204_NO_CONTENT)
-
-    middleware = rl.RateLimitMiddleware(call_next)
-
-    options_response = await middleware.dispatch(_request("/any", method="OPTIONS"), call_next)
-    assert options_response.status_code == status.HTTP_204_NO_CONTENT
-
-    response = await middleware.dispatch(_request("/not-limited"), call_next)
-    assert response.status_code == status.HTTP_204_NO_CONTENT
+    options = _request("/api/v1/auth/login", method="OPTIONS")
+    assert await rl.check_rate_limit(options) == (None, {})
+    assert await rl.check_rate_limit(_request("/not-limited")) == (None, {})
 
 
-@pytest.mark.asyncio
 async def test_rate_limit_middleware_limited_response_includes_headers_and_request_id(
     monkeypatch,
 ) -> None:
-    async def call_next(_: Request) -> Response:
-        return Response(content="ok", status_code=status.HTTP_200_OK)
-
-    middleware = rl.RateLimitMiddleware(call_next)
-
     class DummyBackend:
-        def is_rate_limited(self, _key, _rule):
+        async def is_rate_limited(self, _key, _rule):
             return True, 0
 
     monkeypatch.setattr(rl, "_backend", DummyBackend())
@@ -107,8 +104,10 @@ async def test_rate_limit_middleware_limited_response_includes_headers_and_reque
     request = _request("/api/v1/auth/login", client=("198.51.100.10", 1234))
     request.state.request_id = "rid-123"
 
-    response = await middleware.dispatch(request, call_next)
+    response, headers = await rl.check_rate_limit(request)
 
+    assert response is not None
+    assert headers == {}
     assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
     assert response.headers["Retry-After"] == "60"
     assert response.headers["X-RateLimit-Limit"] == "10"
@@ -118,22 +117,131 @@ async def test_rate_limit_middleware_limited_response_includes_headers_and_reque
     assert audited
 
 
-@pytest.mark.asyncio
 async def test_rate_limit_middleware_success_sets_rate_headers(monkeypatch) -> None:
-    async def call_next(_: Request) -> Response:
-        return Response(content="ok", status_code=status.HTTP_200_OK)
-
-    middleware = rl.RateLimitMiddleware(call_next)
-
     class DummyBackend:
-        def is_rate_limited(self, _key, _rule):
+        async def is_rate_limited(self, _key, _rule):
             return False, 7
 
     monkeypatch.setattr(rl, "_backend", DummyBackend())
 
     request = _request("/api/v1/auth/login", client=("198.51.100.10", 1234))
-    response = await middleware.dispatch(request, call_next)
+    response, headers = await rl.check_rate_limit(request)
 
-    assert response.status_code == status.HTTP_200_OK
-    assert response.headers["X-RateLimit-Limit"] == "10"
-    assert response.headers["X-RateLimit-Remaining"] == "7"
+    assert response is None
+    assert headers["X-RateLimit-Limit"] == "10"
+    assert headers["X-RateLimit-Remaining"] == "7"
+
+
+class _FakeRedis:
+    def __init__(self, result=None, error: Exception | None = None) -> None:
+        self.result = result
+        self.error = error
+        self.calls: list[dict] = []
+
+    def register_script(self, source: str):
+        assert "ZREMRANGEBYSCORE" in source
+
+        async def script(*, keys, args):
+            self.calls.append({"keys": keys, "args": args})
+            if self.error is not None:
+                raise self.error
+            return self.result
+
+        return script
+
+
+async def test_redis_backend_evaluates_window_in_one_call() -> None:
+    client = _FakeRedis(result=[0, 4])
+    backend = rl.RedisBackend(client)
+    rule = rl.RateRule(max_requests=5, window_seconds=60)
+
+    limited, remaining = await backend.is_rate_limited("rl:/login:1.2.3.4", rule)
+
+    assert (limited, remaining) == (False, 4)
+    assert client.calls[0]["keys"] == ["rl:/login:1.2.3.4"]
+    assert client.calls[0]["args"][:2] == [60_000, 5]
+
+
+async def test_redis_backend_reports_limited_result() -> None:
+    backend = rl.RedisBackend(_FakeRedis(result=[1, 0]))
+
+    assert await backend.is_rate_limited("k", rl.RateRule(5, 60)) == (True, 0)
+
+
+def test_sliding_window_script_leaves_nothing_remaining_when_limited() -> None:
+    limited_branch = rl._SLIDING_WINDOW_SCRIPT.split("if count >= limit then", 1)[1]
+
+    assert limited_branch.split("end", 1)[0].strip() == "return {1, 0}"
+
+
+async def test_redis_backend_falls_back_and_skips_redis_until_retry(monkeypatch) -> None:
+    clock = iter([100.0, 110.0, 140.0])
+    monkeypatch.setattr(rl, "monotonic", lambda: next(clock))
+    client = _FakeRedis(error=RedisConnectionError("down"))
+
+    class LocalBackend:
+        async def is_rate_limited(self, _key, _rule):
+            return False, 9
+
+    backend = rl.RedisBackend(client, fallback=LocalBackend(), retry_seconds=30)
+    rule = rl.RateRule(10, 60)
+
+    assert await backend.is_rate_limited("k", rule) == (False, 9)
+    assert await backend.is_rate_limited("k", rule) == (False, 9)
+    assert len(client.calls) == 1
+
+    client.error = None
+    client.result = [0, 3]
+    assert await backend.is_rate_limited("k", rule) == (False, 3)
+    assert len(client.calls) == 2  # noqa: PLR2004
+
+
+def test_configure_backend_selects_backend_from_settings(monkeypatch) -> None:
+    original = rl._backend
+    monkeypatch.setattr(rl, "get_redis_client", _FakeRedis)
+
+    try:
+        rl.configure_backend(Settings(RATE_LIMIT_BACKEND="redis"))
+        assert isinstance(rl._backend, rl.RedisBackend)
+
+        rl.configure_backend(Settings(RATE_LIMIT_BACKEND="memory"))
+        assert isinstance(rl._backend, rl.InMemoryBackend)
+    finally:
+        rl.set_backend(original)
+
+
+async def test_inmemory_backend_reports_key_table_stats() -> None:
+    backend = rl.InMemoryBackend(max_keys=1)
+    rule = rl.RateRule(max_requests=5, window_seconds=60)
+
+    await backend.is_rate_limited("rl:/a:1.1.1.1", rule)
+
+    assert await backend.is_rate_limited("rl:/a:2.2.2.2", rule) == (False, 4)
+    stats = backend.stats()
+    assert stats.keys == 1
+    assert stats.evictions == 1
+
+
+async def test_path_flood_from_one_ip_does_not_lock_out_other_clients(monkeypatch) -> None:
+    now = [1_000.0]
+    backend = rl.InMemoryBackend(max_keys=100)
+    monkeypatch.setattr(backend._limiter, "_clock", lambda: now[0])
+    monkeypatch.setattr(rl, "_backend", backend)
+    monkeypatch.setattr(rl.audit, "rate_limited", lambda **_: None)
+
+    for n in range(1_000):
+        now[0] += 1 / 530
+        await rl.check_rate_limit(
+            _request(f"/api/v1/auth/resend-activation/{n}", client=("6.6.6.6", 1))
+        )
+
+    assert backend.stats().keys == 1
+
+    for n in range(200):
+        await rl.check_rate_limit(
+            _request("/api/v1/auth/resend-activation", client=(f"10.0.{n // 256}.{n % 256}", 1))
+        )
+
+    assert backend.stats().keys == 100  # noqa: PLR2004
+    response, _ = await rl.check_rate_limit(_request("/api/v1/auth/login", client=("9.9.9.9", 1)))
+    assert response is None
@@ -0,0 +1,100 @@
+from core.foundation.rate_limiter import GcraRateLimiter, RateLimiterStats
+
+
+class _Clock:
+    def __init__(self, now: float = 1000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_gcra_allows_burst_up_to_limit_then_blocks() -> None:
+    clock = _Clock()
+    limiter = GcraRateLimiter(clock=clock)
+
+    results = [limiter.hit("k", limit=3, window_seconds=60) for _ in range(4)]
+
+    assert results == [(False, 2), (False, 1), (False, 0), (True, 0)]
+
+
+def test_gcra_refills_one_request_per_emission_interval() -> None:
+    clock = _Clock()
+    limiter = GcraRateLimiter(clock=clock)
+    for _ in range(3):
+        limiter.hit("k", limit=3, window_seconds=60)
+
+    clock.now += 19.9
+    assert limiter.hit("k", limit=3, window_seconds=60) == (True, 0)
+
+    clock.now += 0.1
+    assert limiter.hit("k", limit=3, window_seconds=60) == (False, 0)
+
+    clock.now += 60
+    assert limiter.hit("k", limit=3, window_seconds=60) == (False, 2)
+
+
+def test_gcra_handles_intervals_that_do_not_divide_evenly() -> None:
+    limiter = GcraRateLimiter(clock=_Clock())
+
+    results = [limiter.hit("k", limit=7, window_seconds=60)[0] for _ in range(8)]
+
+    assert results == [False] * 7 + [True]
+
+
+def test_gcra_evicts_least_recently_used_key_when_table_is_full() -> None:
+    clock = _Clock()
+    limiter = GcraRateLimiter(max_keys=2, clock=clock)
+
+    limiter.hit("a", limit=1, window_seconds=10)
+    limiter.hit("b", limit=1, window_seconds=10)
+
+    assert limiter.hit("c", limit=1, window_seconds=10) == (False, 0)
+    assert limiter.stats() == RateLimiterStats(keys=2, evictions=1, expirations=0)
+
+    clock.now += 10
+    assert limiter.hit("d", limit=1, window_seconds=10) == (False, 0)
+
+    assert limiter.stats() == RateLimiterStats(keys=2, evictions=1, expirations=1)
+
+
+def test_gcra_drops_refilled_keys_before_evicting_throttled_ones() -> None:
+    clock = _Clock()
+    limiter = GcraRateLimiter(max_keys=3, clock=clock)
+    limiter.hit("throttled", limit=1, window_seconds=60)
+    limiter.hit("refilled", limit=1, window_seconds=1)
+    limiter.hit("other", limit=1, window_seconds=60)
+    clock.now += 1
+    limiter.hit("throttled", limit=1, window_seconds=60)
+
+    assert limiter.hit("new", limit=1, window_seconds=60) == (False, 0)
+    assert limiter.hit("throttled", limit=1, window_seconds=60) == (True, 0)
+    assert limiter.stats() == RateLimiterStats(keys=3, evictions=0, expirations=1)
+
+
+def test_gcra_limited_hits_keep_key_recently_used() -> None:
+    clock = _Clock()
+    limiter = GcraRateLimiter(max_keys=2, clock=clock)
+    limiter.hit("a", limit=1, window_seconds=60)
+    limiter.hit("b", limit=1, window_seconds=60)
+    limiter.hit("a", limit=1, window_seconds=60)
+
+    assert limiter.hit("c", limit=1, window_seconds=60) == (False, 0)
+    assert limiter.hit("a", limit=1, window_seconds=60) == (True, 0)
+    assert limiter.stats() == RateLimiterStats(keys=2, evictions=1, expirations=0)
+
+
+def test_gcra_sweep_and_clear() -> None:
+    clock = _Clock()
+    limiter = GcraRateLimiter(clock=clock)
+    limiter.hit("a", limit=1, window_seconds=10)
+    limiter.hit("b", limit=1, window_seconds=30)
+
+    clock.now += 10
+
+    assert limiter.sweep() == 1
+    assert limiter.stats().keys == 1
+
+    limiter.clear()
+
+    assert limiter.stats().keys == 0
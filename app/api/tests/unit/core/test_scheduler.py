@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from core.foundation.infra.config import settings
+from core.foundation.scheduler import (
+    CronTrigger,
+    IntervalTrigger,
+    LocalLeaderLock,
+    PostgresLeaderLock,
+    Scheduler,
+    build_leader_lock,
+)
+
+
+def _at(*args: int) -> datetime:
+    return datetime(*args, tzinfo=UTC)
+
+
+def test_interval_trigger_adds_period() -> None:
+    trigger = IntervalTrigger(90)
+
+    assert trigger.next_after(_at(2026, 1, 1, 12, 0)) == _at(2026, 1, 1, 12, 1, 30)
+    assert str(trigger) == "every 90s"
+
+
+@pytest.mark.parametrize(
+    ("expression", "after", "expected"),
+    [
+        ("*/15 * * * *", _at(2026, 3, 1, 10, 7, 30), _at(2026, 3, 1, 10, 15)),
+        ("0 3 * * *", _at(2026, 3, 1, 3, 0), _at(2026, 3, 2, 3, 0)),
+        ("30 9 * * 1-5", _at(2026, 10, 17, 12, 0), _at(2026, 10, 19, 9, 30)),
+        ("0 0 1 1,7 *", _at(2026, 2, 10, 0, 0), _at(2026, 7, 1, 0, 0)),
+        ("0 12 13 * 5", _at(2026, 10, 10, 0, 0), _at(2026, 10, 13, 12, 0)),
+        ("0 0 * * 7", _at(2026, 10, 14, 0, 0), _at(2026, 10, 18, 0, 0)),
+        ("5-10/5 23 31 12 *", _at(2026, 12, 31, 23, 5), _at(2026, 12, 31, 23, 10)),
+    ],
+)
+def test_cron_trigger_finds_next_matching_minute(
+    expression: str, after: datetime, expected: datetime
+) -> None:
+    assert CronTrigger.parse(expression).next_after(after) == expected
+
+
+@pytest.mark.parametrize(
+    "expression", ["* * * *", "60 * * * *", "*/0 * * * *", "a * * * *", "5-1 * * * *"]
+)
+def test_cron_trigger_rejects_invalid_expressions(expression: str) -> None:
+    with pytest.raises(ValueError, match=r"[Cc]ron"):
+        CronTrigger.parse(expression)
+
+
+def test_cron_trigger_that_never_fires_raises() -> None:
+    trigger = CronTrigger.parse("0 0 30 2 *")
+
+    with pytest.raises(ValueError, match="never fires"):
+        trigger.next_after(_at(2026, 1, 1))
+    assert str(trigger) == "cron 0 0 30 2 *"
+
+
+@pytest.mark.asyncio
+async def test_scheduler_runs_jobs_with_jitter_and_records_outcomes() -> None:
+    jitters: list[float] = []
+    ran = asyncio.Event()
+    failing = AsyncMock(side_effect=RuntimeError("boom"))
+
+    async def job() -> None:
+        ran.set()
+
+    scheduler = Scheduler(jitter=lambda bound: jitters.append(bound) or 0.0)
+    scheduler.add_job("tick", job, IntervalTrigger(0.001), jitter_seconds=2.5)
+    scheduler.add_job("broken", failing, IntervalTrigger(0.001))
+    with pytest.raises(ValueError, match="already scheduled"):
+        scheduler.add_job("tick", job, IntervalTrigger(1))
+
+    scheduler.start()
+    scheduler.start()
+    await asyncio.wait_for(ran.wait(), timeout=1)
+    while not failing.await_count:
+        await asyncio.sleep(0.001)
+    running = scheduler.stats()
+    await scheduler.stop()
+
+    assert running.running is True
+    assert scheduler.stats().running is False
+    assert jitters[0] == 2.5  # noqa: PLR2004
+    tick = scheduler.stats().jobs["tick"]
+    assert tick.successes >= 1
+    assert tick.failures == 0
+    assert tick.last_success_at is not None
+    assert tick.next_run_at is not None
+    assert tick.trigger == "every 0.001s"
+    broken = scheduler.stats().jobs["broken"]
+    assert broken.failures >= 1
+    assert broken.last_error == "boom"
+    assert broken.last_duration_ms is not None
+    assert broken.running is False
+
+
+@pytest.mark.asyncio
+async def test_leader_only_jobs_are_skipped_on_followers() -> None:
+    leader = MagicMock()
+    leader.is_leader = AsyncMock(return_value=False)
+    leader.release = AsyncMock()
+    shared, local = AsyncMock(), AsyncMock()
+    scheduler = Scheduler(leader=leader)
+    scheduler.add_job("shared", shared, IntervalTrigger(60))
+    scheduler.add_job("local", local, IntervalTrigger(60), leader_only=False)
+
+    assert await scheduler.run_job("shared") is False
+    assert await scheduler.run_job("local") is True
+    await scheduler.stop()
+
+    shared.assert_not_awaited()
+    local.assert_awaited_once()
+    assert scheduler.stats().jobs["shared"].skipped == 1
+    assert scheduler.stats().jobs["local"].runs == 1
+    leader.release.assert_awaited_once()
+
+
+def _connection(*, acquired: bool = True) -> MagicMock:
+    connection = MagicMock()
+    result = MagicMock()
+    result.scalar.return_value = acquired
+    connection.execute = AsyncMock(return_value=result)
+    connection.execution_options = AsyncMock()
+    connection.close = AsyncMock()
+    return connection
+
+
+@pytest.mark.asyncio
+async def test_postgres_leader_lock_holds_advisory_lock_on_one_connection() -> None:
+    connection = _connection()
+    engine = MagicMock()
+    engine.connect = AsyncMock(return_value=connection)
+    lock = PostgresLeaderLock(engine, 42)
+
+    assert await lock.is_leader() is True
+    assert await lock.is_leader() is True
+    await lock.release()
+    await lock.release()
+
+    engine.connect.assert_awaited_once()
+    connection.execution_options.assert_awaited_once_with(isolation_level="AUTOCOMMIT")
+    statements = [str(c.args[0]) for c in connection.execute.await_args_list]
+    assert statements == [
+        "SELECT pg_try_advisory_lock(:lock_id)",
+        "SELECT 1",
+        "SELECT pg_advisory_unlock(:lock_id)",
+    ]
+    connection.close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_postgres_leader_lock_follower_and_lost_connection() -> None:
+    engine = MagicMock()
+    taken = _connection(acquired=False)
+    engine.connect = AsyncMock(side_effect=[taken, OSError("down")])
+    lock = PostgresLeaderLock(engine, 42)
+
+    assert await lock.is_leader() is False
+    taken.close.assert_awaited_once()
+    assert await lock.is_leader() is False
+
+    held = _connection()
+    engine.connect = AsyncMock(return_value=held)
+    assert await lock.is_leader() is True
+    held.execute.side_effect = OSError("connection reset")
+    broken = _connection()
+    broken.execute.side_effect = OSError("still down")
+    engine.connect = AsyncMock(return_value=broken)
+
+    assert await lock.is_leader() is False
+    held.close.assert_awaited_once()
+    broken.close.assert_awaited_once()
+
+
+def test_build_leader_lock_selects_backend() -> None:
+    engine = MagicMock()
+
+    postgres = build_leader_lock(
+        settings.model_copy(update={"SCHEDULER_LEADER_LOCK": "postgres"}), engine
+    )
+    local = build_leader_lock(
+        settings.model_copy(update={"SCHEDULER_LEADER_LOCK": "local"}), engine
+    )
+
+    assert isinstance(postgres, PostgresLeaderLock)
+    assert isinstance(local, LocalLeaderLock)
+    assert postgres._lock_id == settings.SCHEDULER_LEADER_LOCK_ID  # type: ignore[attr-defined]
+    reconcile = build_leader_lock(
+        settings.model_copy(update={"SCHEDULER_LEADER_LOCK": "postgres"}), engine, 7
+    )
+    assert reconcile._lock_id == 7  # type: ignore[attr-defined]  # noqa: PLR2004
@@ -0,0 +1,117 @@
+from uuid import uuid4
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from core.foundation.tenant_cache import RedisTenantCache, TenantCache, as_text
+from tests.unit.conftest import FakeClock, FakeRedis
+
+
+def _redis_cache(client: FakeRedis, ttl_seconds: int = 30) -> RedisTenantCache[str]:
+    return RedisTenantCache(
+        client,  # type: ignore[arg-type]
+        ttl_seconds=ttl_seconds,
+        key_prefix="test:",
+        encode=str,
+        decode=as_text,
+        name="Test",
+    )
+
+
+@pytest.mark.asyncio
+async def test_memory_cache_expires_entries_after_ttl() -> None:
+    clock = FakeClock()
+    cache: TenantCache[str] = TenantCache(ttl_seconds=60, clock=clock)
+    await cache.set(uuid4(), ["a", "b"], "value")
+
+    clock.now = 59.0
+    assert await cache.get("a") == "value"
+    clock.now = 60.0
+    assert await cache.get("a") is None
+    assert await cache.get("b") is None
+    assert cache._keys_by_tenant == {}
+
+
+@pytest.mark.asyncio
+async def test_memory_cache_evicts_least_recently_used() -> None:
+    cache: TenantCache[str] = TenantCache(ttl_seconds=60, max_entries=2)
+    tenant_id = uuid4()
+    await cache.set(tenant_id, ["first"], "1")
+    await cache.set(tenant_id, ["second"], "2")
+    await cache.get("first")
+
+    await cache.set(uuid4(), ["third"], "3")
+
+    assert await cache.get("second") is None
+    assert await cache.get("first") == "1"
+    assert await cache.get("third") == "3"
+
+
+@pytest.mark.asyncio
+async def test_memory_cache_invalidates_matching_keys_of_one_tenant() -> None:
+    cache: TenantCache[str] = TenantCache(ttl_seconds=60)
+    tenant_id, other_tenant_id = uuid4(), uuid4()
+    await cache.set(tenant_id, ["a:1", "a:2"], "tenant")
+    await cache.set(other_tenant_id, ["b:1"], "other")
+
+    await cache.invalidate(tenant_id, lambda key: key.endswith(":1"))
+    assert await cache.get("a:1") is None
+    assert await cache.get("a:2") == "tenant"
+
+    await cache.invalidate(tenant_id)
+    await cache.invalidate(uuid4())
+    assert await cache.get("a:2") is None
+    assert await cache.get("b:1") == "other"
+
+    await cache.clear()
+    assert await cache.get("b:1") is None
+
+
+@pytest.mark.asyncio
+async def test_redis_cache_stores_entries_with_ttl_and_tenant_index() -> None:
+    client = FakeRedis()
+    cache = _redis_cache(client)
+    tenant_id = uuid4()
+
+    await cache.set(tenant_id, ["a", "b"], "value")
+
+    assert await cache.get("a") == "value"
+    assert await cache.get("missing") is None
+    assert client.ttls == {"test:a": 30, "test:b": 30, f"test:tenant:{tenant_id}": 30}
+    assert client.sets[f"test:tenant:{tenant_id}"] == {"test:a", "test:b"}
+
+
+@pytest.mark.asyncio
+async def test_redis_cache_invalidates_matching_keys_and_drops_empty_index() -> None:
+    client = FakeRedis()
+    cache = _redis_cache(client)
+    tenant_id = uuid4()
+    await cache.set(tenant_id, ["a:1", "a:2"], "value")
+
+    await cache.invalidate(tenant_id, lambda key: key == "a:1")
+    assert await cache.get("a:1") is None
+    assert await cache.get("a:2") == "value"
+
+    await cache.invalidate(tenant_id)
+    await cache.invalidate(uuid4())
+    await cache.clear()
+    assert await cache.get("a:2") is None
+    assert client.sets == {}
+
+
+@pytest.mark.asyncio
+async def test_redis_cache_errors_read_as_misses() -> None:
+    client = FakeRedis()
+    client.error = RedisConnectionError("down")
+    cache = _redis_cache(client)
+    tenant_id = uuid4()
+
+    await cache.set(tenant_id, ["a"], "value")
+    await cache.invalidate(tenant_id)
+
+    assert await cache.get("a") is None
+
+
+def test_as_text_decodes_bytes() -> None:
+    assert as_text(b"value") == "value"
+    assert as_text("value") == "value"
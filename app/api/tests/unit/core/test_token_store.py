@@ -1,6 +1,17 @@
 import time
 
-from core.foundation.token_store import RefreshTokenStore, generate_family, generate_jti
+import pytest
+
+from core.foundation import token_store
+from core.foundation.infra.config import Settings
+from core.foundation.token_store import (
+    RedisRefreshTokenStore,
+    RefreshTokenRotation,
+    RefreshTokenStore,
+    build_refresh_token_store,
+    generate_family,
+    generate_jti,
+)
 
 
 def test_generate_identifiers_are_non_empty() -> None:
@@ -8,37 +19,157 @@ def test_generate_identifiers_are_non_empty() -> None:
     assert generate_family()
 
 
-def test_revoke_and_check_revocation() -> None:
+async def test_revoke_and_check_revocation() -> None:
     store = RefreshTokenStore()
 
-    assert store.is_revoked("family-1", "jti-1") is False
+    assert await store.is_revoked("family-1", "jti-1") is False
 
-    store.revoke("family-1", "jti-1")
+    await store.revoke("family-1", "jti-1")
 
-    assert store.is_revoked("family-1", "jti-1") is True
-    assert store.is_revoked("family-1", "jti-2") is False
+    assert await store.is_revoked("family-1", "jti-1") is True
+    assert await store.is_revoked("family-1", "jti-2") is False
 
 
-def test_revoke_family_marks_family_revoked() -> None:
+async def test_revoke_family_marks_family_revoked() -> None:
     store = RefreshTokenStore()
 
-    assert store.is_family_revoked("family-1") is False
+    assert await store.is_family_revoked("family-1") is False
+
+    await store.revoke_family("family-1")
+
+    assert await store.is_family_revoked("family-1") is True
 
-    store.revoke_family("family-1")
 
-    assert store.is_family_revoked("family-1") is True
+async def test_rotate_detects_reuse_and_revoked_families() -> None:
+    store = RefreshTokenStore()
+
+    assert await store.rotate("family-1", "jti-1") is RefreshTokenRotation.ROTATED
+    assert await store.rotate("family-1", "jti-2") is RefreshTokenRotation.ROTATED
+    assert await store.rotate("family-1", "jti-1") is RefreshTokenRotation.REUSED
+    assert await store.is_family_revoked("family-1") is True
+    assert await store.rotate("family-1", "jti-3") is RefreshTokenRotation.FAMILY_REVOKED
 
 
-def test_cleanup_expired_removes_old_families(monkeypatch) -> None:
+async def test_cleanup_expired_removes_old_families(monkeypatch) -> None:
     store = RefreshTokenStore(family_ttl_seconds=10)
 
-    store.revoke("fresh", "jti-a")
-    store.revoke("expired", "jti-b")
+    await store.revoke("fresh", "jti-a")
+    await store.revoke("expired", "jti-b")
     store._families["fresh"].created_at = 100.0
     store._families["expired"].created_at = 0.0
 
     monkeypatch.setattr(time, "monotonic", lambda: 105.0)
-    store.cleanup_expired()
+    await store.cleanup_expired()
 
     assert "fresh" in store._families
     assert "expired" not in store._families
+
+
+class _FakePipeline:
+    def __init__(self, redis: "_FakeRedis") -> None:
+        self._redis = redis
+        self._commands: list[tuple] = []
+
+    async def __aenter__(self) -> "_FakePipeline":
+        return self
+
+    async def __aexit__(self, *_exc) -> None:
+        return None
+
+    def sadd(self, key: str, member: str) -> None:
+        self._commands.append(("sadd", key, member))
+
+    def delete(self, key: str) -> None:
+        self._commands.append(("delete", key))
+
+    def expire(self, key: str, ttl: int) -> None:
+        self._commands.append(("expire", key, ttl))
+
+    async def execute(self) -> None:
+        for command, key, *args in self._commands:
+            if command == "sadd":
+                self._redis.sets.setdefault(key, set()).add(args[0])
+            elif command == "delete":
+                self._redis.sets.pop(key, None)
+            else:
+                self._redis.ttls[key] = args[0]
+        self._redis.round_trips += 1
+
+
+class _FakeRedis:
+    """Minimal Redis double that mirrors the rotate script semantics."""
+
+    def __init__(self) -> None:
+        self.sets: dict[str, set[str]] = {}
+        self.ttls: dict[str, int] = {}
+        self.round_trips = 0
+
+    def register_script(self, source: str):
+        assert "SISMEMBER" in source
+
+        async def rotate(*, keys, args):
+            self.round_trips += 1
+            key, (jti, marker, ttl) = keys[0], args
+            members = self.sets.setdefault(key, set())
+            if marker in members:
+                return 2
+            self.ttls[key] = ttl
+            if jti in members:
+                self.sets[key] = {marker}
+                return 1
+            members.add(jti)
+            return 0
+
+        return rotate
+
+    def pipeline(self, *, transaction: bool) -> _FakePipeline:
+        assert transaction is True
+        return _FakePipeline(self)
+
+    async def sismember(self, key: str, member: str) -> int:
+        self.round_trips += 1
+        return int(member in self.sets.get(key, set()))
+
+
+async def test_redis_store_rotates_in_a_single_round_trip_with_family_ttl() -> None:
+    redis = _FakeRedis()
+    store = RedisRefreshTokenStore(redis, family_ttl_seconds=3600)
+
+    assert await store.rotate("fam", "jti-1") is RefreshTokenRotation.ROTATED
+    assert redis.round_trips == 1
+    assert redis.ttls["rt:family:fam"] == 3600  # noqa: PLR2004
+
+    assert await store.rotate("fam", "jti-1") is RefreshTokenRotation.REUSED
+    assert await store.rotate("fam", "jti-2") is RefreshTokenRotation.FAMILY_REVOKED
+    assert await store.is_family_revoked("fam") is True
+
+
+async def test_redis_store_revocation_helpers() -> None:
+    redis = _FakeRedis()
+    store = RedisRefreshTokenStore(redis, family_ttl_seconds=60)
+
+    await store.revoke("fam", "jti-1")
+    assert await store.is_revoked("fam", "jti-1") is True
+    assert await store.is_revoked("fam", "jti-2") is False
+    assert await store.is_family_revoked("fam") is False
+
+    await store.revoke_family("fam")
+    assert redis.sets["rt:family:fam"] == {"*"}
+    assert redis.ttls["rt:family:fam"] == 60  # noqa: PLR2004
+
+    await store.cleanup_expired()
+
+
+@pytest.mark.parametrize(
+    ("backend", "expected"),
+    [("memory", RefreshTokenStore), ("redis", RedisRefreshTokenStore)],
+)
+def test_build_refresh_token_store_follows_settings(monkeypatch, backend, expected) -> None:
+    monkeypatch.setattr(token_store, "get_redis_client", _FakeRedis)
+
+    store = build_refresh_token_store(
+        Settings(REFRESH_TOKEN_STORE=backend, REFRESH_TOKEN_EXPIRE_DAYS=2)
+    )
+
+    assert isinstance(store, expected)
+    assert store._family_ttl == 2 * 24 * 3600
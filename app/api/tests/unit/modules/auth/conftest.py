@@ -15,6 +15,7 @@ class FakeAsyncSession:
         self.tenants: list[Tenant] = []
         self.activation_links: list[ActivationLink] = []
         self.added_objects: list[object] = []
+        self.info: dict[str, object] = {}
 
     async def scalar(self, query: object) -> object | None:
         query_str = str(query)
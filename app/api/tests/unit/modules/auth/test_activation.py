@@ -1,4 +1,5 @@
 from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, patch
 from uuid import uuid4
 
 import pytest
@@ -13,6 +14,7 @@ from core.models.activation_link import ActivationLink
 from core.models.enums import TenantStatus
 from core.models.tenant import Tenant
 from core.models.user import User
+from tests.unit.conftest import commit_session
 from tests.unit.modules.auth.conftest import FakeAsyncSession, auth_service
 
 EXPECTED_NEW_LINK_COUNT = 2
@@ -167,15 +169,24 @@ async def test_activate_account_success_activates_user_and_tenant() -> None:
     )
     session.activation_links.append(link)
 
-    result_tenant, already = await auth_service.activate_account(
-        session=session, activation_id=link.id
-    )
+    with (
+        patch("services.auth_service.authorization_context_cache", new=AsyncMock()) as cache,
+        patch("services.auth_service.tenant_identity_cache", new=AsyncMock()) as identities,
+    ):
+        result_tenant, already = await auth_service.activate_account(
+            session=session, activation_id=link.id
+        )
+        cache.invalidate_tenant.assert_not_awaited()
+        identities.invalidate.assert_not_awaited()
+        await commit_session(session)
 
     assert result_tenant.id == tenant.id
     assert already is False
     assert user.is_active is True
     assert tenant.status == TenantStatus.ACTIVE
     assert link.used_at is not None
+    cache.invalidate_tenant.assert_awaited_once_with(tenant.id)
+    identities.invalidate.assert_awaited_once_with(tenant.id)
 
 
 @pytest.mark.asyncio
@@ -1,3 +1,4 @@
+import asyncio
 from datetime import timedelta
 from types import SimpleNamespace
 from unittest.mock import AsyncMock, patch
@@ -11,6 +12,7 @@ from core.foundation.database.database import get_db_session
 from core.foundation.dependencies import get_auth_service, get_email_service, get_security_service
 from core.foundation.infra.config import settings
 from core.foundation.security import security_service as global_security
+from core.foundation.token_store import RefreshTokenStore
 from core.models.enums import AccountType, TenantStatus
 from core.models.tenant import Tenant
 from core.models.tenant_role import TenantRole
@@ -167,18 +169,21 @@ def test_auth_refresh_token_route() -> None:
         "email": "o@e.com",
     }
     token = global_security.create_access_token(body, expires_delta=timedelta(days=1))
-    with patch("routes.v1.auth.refresh_token_store") as rts, patch("routes.v1.auth.audit"):
-        rts.is_family_revoked.return_value = False
-        rts.is_revoked.return_value = False
+    store = RefreshTokenStore()
+    with patch("routes.v1.auth.refresh_token_store", store), patch("routes.v1.auth.audit"):
         _set_refresh_token_cookie(client, token)
         r = client.post(f"{settings.API_V1_PREFIX}/auth/refresh")
     assert r.status_code == status.HTTP_200_OK
     assert r.json()["message"] == "Token refreshed"
+    assert asyncio.run(store.is_revoked(fam, jti)) is True
 
 
 def test_auth_logout_route() -> None:
     client, _ = _refresh_app()
-    with patch("routes.v1.auth.refresh_token_store") as rts, patch("routes.v1.auth.audit"):
+    with (
+        patch("routes.v1.auth.refresh_token_store", new_callable=AsyncMock) as rts,
+        patch("routes.v1.auth.audit"),
+    ):
         _set_refresh_token_cookie(client, "nope")
         r = client.post(f"{settings.API_V1_PREFIX}/auth/logout")
     assert r.status_code == status.HTTP_200_OK
@@ -269,8 +274,9 @@ def test_auth_refresh_fails_when_family_is_revoked() -> None:
         "family": "fam-bad",
     }
     token = global_security.create_access_token(body, expires_delta=timedelta(days=1))
-    with patch("routes.v1.auth.refresh_token_store") as rts, patch("routes.v1.auth.audit"):
-        rts.is_family_revoked.return_value = True
+    store = RefreshTokenStore()
+    asyncio.run(store.revoke_family("fam-bad"))
+    with patch("routes.v1.auth.refresh_token_store", store), patch("routes.v1.auth.audit"):
         _set_refresh_token_cookie(client, token)
         r = client.post(f"{settings.API_V1_PREFIX}/auth/refresh")
     assert r.status_code == status.HTTP_401_UNAUTHORIZED
@@ -286,10 +292,33 @@ def test_auth_refresh_fails_when_jti_is_revoked() -> None:
         "family": fam,
     }
     token = global_security.create_access_token(body, expires_delta=timedelta(days=1))
-    with patch("routes.v1.auth.refresh_token_store") as rts, patch("routes.v1.auth.audit"):
-        rts.is_family_revoked.return_value = False
-        rts.is_revoked.return_value = True
+    store = RefreshTokenStore()
+    asyncio.run(store.revoke(fam, "j-old"))
+    with patch("routes.v1.auth.refresh_token_store", store), patch("routes.v1.auth.audit"):
         _set_refresh_token_cookie(client, token)
         r = client.post(f"{settings.API_V1_PREFIX}/auth/refresh")
     assert r.status_code == status.HTTP_401_UNAUTHORIZED
-    rts.revoke_family.assert_called_once_with(fam)
+    assert asyncio.run(store.is_family_revoked(fam)) is True
+
+
+def test_auth_refresh_without_jti_checks_family_revocation_only() -> None:
+    client, user_id = _refresh_app()
+    store = RefreshTokenStore()
+    asyncio.run(store.revoke_family("fam-legacy"))
+    revoked = global_security.create_access_token(
+        {"sub": str(user_id), "type": "refresh", "family": "fam-legacy"},
+        expires_delta=timedelta(days=1),
+    )
+    legacy = global_security.create_access_token(
+        {"sub": str(user_id), "type": "refresh"},
+        expires_delta=timedelta(days=1),
+    )
+
+    with patch("routes.v1.auth.refresh_token_store", store), patch("routes.v1.auth.audit"):
+        _set_refresh_token_cookie(client, revoked)
+        rejected = client.post(f"{settings.API_V1_PREFIX}/auth/refresh")
+        _set_refresh_token_cookie(client, legacy)
+        accepted = client.post(f"{settings.API_V1_PREFIX}/auth/refresh")
+
+    assert rejected.status_code == status.HTTP_401_UNAUTHORIZED
+    assert accepted.status_code == status.HTTP_200_OK
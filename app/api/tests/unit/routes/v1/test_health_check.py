@@ -5,7 +5,16 @@ from unittest.mock import AsyncMock, MagicMock, patch
 import pytest
 from starlette import status
 
-from routes.v1.health import health_check, liveness
+from routes.v1.health import (
+    health_check,
+    image_processing_stats,
+    liveness,
+    log_queue_stats,
+    object_storage_stats,
+    payment_reconciliation_stats,
+    scheduler_stats,
+    websocket_stats,
+)
 
 
 @pytest.mark.asyncio
@@ -15,6 +24,56 @@ async def test_liveness_returns_200() -> None:
     assert r.status_code == status.HTTP_200_OK
 
 
+@pytest.mark.asyncio
+async def test_websocket_stats_reports_broadcast_metrics() -> None:
+    r = await websocket_stats()
+
+    assert r.status_code == status.HTTP_200_OK
+    assert b'"connections"' in r.body
+    assert b'"send_latency_max_ms"' in r.body
+
+
+@pytest.mark.asyncio
+async def test_log_queue_stats_reports_drop_counter() -> None:
+    r = await log_queue_stats()
+
+    assert r.status_code == status.HTTP_200_OK
+    assert b'"dropped"' in r.body
+
+
+@pytest.mark.asyncio
+async def test_object_storage_stats_reports_operation_latency() -> None:
+    r = await object_storage_stats()
+
+    assert r.status_code == status.HTTP_200_OK
+    assert b'"operations"' in r.body
+
+
+@pytest.mark.asyncio
+async def test_image_processing_stats_reports_pool_limits() -> None:
+    r = await image_processing_stats()
+
+    assert r.status_code == status.HTTP_200_OK
+    assert b'"max_pending"' in r.body
+
+
+@pytest.mark.asyncio
+async def test_payment_reconciliation_stats_reports_run_counters() -> None:
+    r = await payment_reconciliation_stats()
+
+    assert r.status_code == status.HTTP_200_OK
+    assert b'"last_status"' in r.body
+
+
+@pytest.mark.asyncio
+async def test_scheduler_stats_reports_jobs() -> None:
+    r = await scheduler_stats()
+
+    assert r.status_code == status.HTTP_200_OK
+    assert b'"expire-table-sessions"' in r.body
+    assert b'"last_success_at"' in r.body
+
+
 @pytest.mark.asyncio
 async def test_health_check_all_backends_ok() -> None:
     mdb = MagicMock()
@@ -26,17 +85,35 @@ async def test_health_check_all_backends_ok() -> None:
     cm.__aexit__ = AsyncMock(return_value=None)
     engine = MagicMock()
     engine.connect = MagicMock(return_value=cm)
-    minio = MagicMock()
-    minio.bucket_exists.return_value = True
+    storage = MagicMock()
+    storage.bucket_exists = AsyncMock(return_value=True)
 
     with (
         patch("routes.v1.health.get_mongo_db", return_value=mdb),
         patch("routes.v1.health.engine", engine),
-        patch("routes.v1.health.Minio", return_value=minio),
+        patch("routes.v1.health.object_storage", storage),
     ):
         r = await health_check()
 
     assert r.status_code == status.HTTP_200_OK
+    storage.invalidate_bucket.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_health_check_reprovisions_missing_bucket_on_next_upload() -> None:
+    mdb = MagicMock()
+    mdb.command = AsyncMock()
+    storage = MagicMock()
+    storage.bucket_exists = AsyncMock(return_value=False)
+
+    with (
+        patch("routes.v1.health.get_mongo_db", return_value=mdb),
+        patch("routes.v1.health.engine"),
+        patch("routes.v1.health.object_storage", storage),
+    ):
+        await health_check()
+
+    storage.invalidate_bucket.assert_called_once_with()
 
 
 @pytest.mark.asyncio
@@ -47,7 +124,7 @@ async def test_health_check_mongo_failure_returns_503() -> None:
     with (
         patch("routes.v1.health.get_mongo_db", return_value=mdb),
         patch("routes.v1.health.engine"),
-        patch("routes.v1.health.Minio"),
+        patch("routes.v1.health.object_storage"),
     ):
         r = await health_check()
 
@@ -58,13 +135,13 @@ async def test_health_check_mongo_failure_returns_503() -> None:
 async def test_health_check_minio_failure_returns_503() -> None:
     mdb = MagicMock()
     mdb.command = AsyncMock()
-    minio = MagicMock()
-    minio.bucket_exists.side_effect = RuntimeError("no minio")
+    storage = MagicMock()
+    storage.bucket_exists = AsyncMock(side_effect=RuntimeError("no minio"))
 
     with (
         patch("routes.v1.health.get_mongo_db", return_value=mdb),
         patch("routes.v1.health.engine"),
-        patch("routes.v1.health.Minio", return_value=minio),
+        patch("routes.v1.health.object_storage", storage),
     ):
         r = await health_check()
 
@@ -75,15 +152,15 @@ async def test_health_check_minio_failure_returns_503() -> None:
 async def test_health_check_postgres_failure_returns_503() -> None:
     mdb = MagicMock()
     mdb.command = AsyncMock()
-    minio = MagicMock()
-    minio.bucket_exists.return_value = True
+    storage = MagicMock()
+    storage.bucket_exists = AsyncMock(return_value=True)
     engine = MagicMock()
     engine.connect = MagicMock(side_effect=RuntimeError("pg"))
 
     with (
         patch("routes.v1.health.get_mongo_db", return_value=mdb),
         patch("routes.v1.health.engine", engine),
-        patch("routes.v1.health.Minio", return_value=minio),
+        patch("routes.v1.health.object_storage", storage),
     ):
         r = await health_check()
 
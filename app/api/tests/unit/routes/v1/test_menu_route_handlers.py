@@ -25,6 +25,7 @@ from services.mongo_menu_service import (
     MENU_COLLECTION,
     normalize_mongo_menu_categories,
 )
+from services.public_menu_cache import public_menu_cache
 
 
 class _MongoWithCollection:
@@ -163,6 +164,7 @@ async def test_upsert_tenant_menu() -> None:
             MenuCategoryInputDTO(name="A", order=0, items=[MenuItemInputDTO(name="B", price=1)])
         ]
     )
+    public_menu_cache.store("tpub1", None, b"{}")
     with patch("routes.v1.tenants.menu.datetime") as dt:
         fixed = datetime(2026, 1, 1, tzinfo=UTC)
         dt.now.return_value = fixed
@@ -174,6 +176,7 @@ async def test_upsert_tenant_menu() -> None:
         )
     assert "saved" in r.message
     assert r.data.menu
+    assert public_menu_cache.get("tpub1", None) is None
 
 
 @pytest.mark.asyncio
@@ -246,6 +249,7 @@ async def test_toggle_item_availability_success() -> None:
     coll.update_one = AsyncMock()
     db = _MongoWithCollection(coll)
 
+    public_menu_cache.store("t1", None, b"{}")
     with patch("routes.v1.tenants.menu.datetime") as dt:
         fixed = datetime(2026, 1, 2, tzinfo=UTC)
         dt.now.return_value = fixed
@@ -258,13 +262,16 @@ async def test_toggle_item_availability_success() -> None:
             uuid4(),
         )
     assert "updated" in r.message
+    assert public_menu_cache.get("t1", None) is None
 
 
 @pytest.mark.asyncio
 async def test_presign_and_finalize_image_routes() -> None:
     storage = MagicMock()
-    storage.create_presigned_upload.return_value = ("u", "k1")
-    storage.finalize_upload.return_value = SimpleNamespace(public_url="https://img")
+    storage.create_presigned_upload = AsyncMock(return_value=("u", "k1"))
+    storage.finalize_upload = AsyncMock(
+        return_value=SimpleNamespace(public_url="https://img", variants={128: "https://img/128"})
+    )
 
     pr = await menu_routes.presign_menu_item_image(
         uuid4(),
@@ -279,3 +286,4 @@ async def test_presign_and_finalize_image_routes() -> None:
         storage,
     )
     assert fr.data.image_url == "https://img"
+    assert fr.data.image_variants == {128: "https://img/128"}
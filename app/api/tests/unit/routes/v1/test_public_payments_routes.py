@@ -106,7 +106,7 @@ def _p24_ok_from_kwargs(
 async def test_create_public_order_payment_happy() -> None:
     t = _tenant()
     tsvc = MagicMock()
-    tsvc.get_tenant_by_slug = AsyncMock(return_value=t)
+    tsvc.get_tenant_identity_by_slug = AsyncMock(return_value=t)
     p24 = MagicMock()
     p24.validate_tenant_p24_credentials = MagicMock()
     ext = MagicMock()
@@ -157,7 +157,7 @@ async def test_create_public_order_payment_happy() -> None:
 async def test_create_public_order_payment_rejects_zero_total() -> None:
     t = _tenant()
     tsvc = MagicMock()
-    tsvc.get_tenant_by_slug = AsyncMock(return_value=t)
+    tsvc.get_tenant_identity_by_slug = AsyncMock(return_value=t)
     p24 = MagicMock()
     p24.validate_tenant_p24_credentials = MagicMock()
     dto = PublicCreateOrderPaymentDTO.model_validate(
@@ -185,7 +185,7 @@ async def test_create_public_order_payment_rejects_zero_total() -> None:
 async def test_create_public_order_payment_fails_without_p24_token() -> None:
     t = _tenant()
     tsvc = MagicMock()
-    tsvc.get_tenant_by_slug = AsyncMock(return_value=t)
+    tsvc.get_tenant_identity_by_slug = AsyncMock(return_value=t)
     p24 = MagicMock()
     p24.validate_tenant_p24_credentials = MagicMock()
     tss = MagicMock()
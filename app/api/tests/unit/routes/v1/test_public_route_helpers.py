@@ -3,25 +3,12 @@ from datetime import UTC, datetime
 from fastapi import Request
 
 from routes.v1.public.public import (
-    _coerce_float,
-    _coerce_optional_int,
     _extract_client_fingerprint,
     _public_table_session_response,
 )
 from services.payment_service import mongo_payment_status_from_transaction
 
 
-def test_coerce_float() -> None:
-    assert _coerce_float(3) == 3.0  # noqa: PLR2004
-    assert _coerce_float("x") == 0.0
-
-
-def test_coerce_optional_int() -> None:
-    assert _coerce_optional_int(5) == 5  # noqa: PLR2004
-    assert _coerce_optional_int("42") == 42  # noqa: PLR2004
-    assert _coerce_optional_int("4.2") is None
-
-
 def test_extract_client_fingerprint() -> None:
     scope = {
         "type": "http",
@@ -1,24 +1,40 @@
 from __future__ import annotations
 
 from datetime import UTC, datetime
+import json
 from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, patch
 from uuid import uuid4
 
+from fastapi.encoders import jsonable_encoder
 import pytest
 from starlette import status
 from starlette.requests import Request
 
+from core.dto.v1.menus import TenantMenuResponseDTO
 from core.dto.v1.public import (
     PublicAcquireTableSessionDTO,
     PublicRefreshTableSessionDTO,
     PublicReleaseTableSessionDTO,
 )
 from core.exceptions import NotFoundResponse
+from core.foundation.http.responses import SuccessResponse
 from core.models.enums import TenantStatus
 from core.models.tenant import Tenant
 from routes.v1.public import public as public_routes
-from services.mongo_menu_service import MENU_COLLECTION
+from services.mongo_menu_service import MENU_COLLECTION, normalize_mongo_menu_categories
+from services.public_favicon_cache import public_favicon_cache
+from services.public_menu_cache import public_menu_cache
+from services.table_status_index import CanvasLayout, TenantTableState, parse_table_elements
+
+
+def _get_request(
+    *, if_none_match: str | None = None, if_modified_since: str | None = None
+) -> Request:
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    if if_modified_since:
+        headers.append((b"if-modified-since", if_modified_since.encode()))
+    return Request({"type": "http", "method": "GET", "path": "/x", "headers": headers})
 
 
 def _tenant() -> Tenant:
@@ -35,7 +51,7 @@ def _tenant() -> Tenant:
 async def test_get_public_tenant_info() -> None:
     t = _tenant()
     svc = MagicMock()
-    svc.get_tenant_by_slug = AsyncMock(return_value=t)
+    svc.get_tenant_identity_by_slug = AsyncMock(return_value=t)
     session = MagicMock()
     mc = SimpleNamespace(
         page_title="P", landing_content=None, theme_override=None, favicon_object_key="k"
@@ -50,7 +66,7 @@ async def test_get_public_tenant_info() -> None:
 async def test_get_public_tenant_info_with_landing_dict() -> None:
     t = _tenant()
     svc = MagicMock()
-    svc.get_tenant_by_slug = AsyncMock(return_value=t)
+    svc.get_tenant_identity_by_slug = AsyncMock(return_value=t)
     session = MagicMock()
     mc = SimpleNamespace(
         page_title="T",
@@ -69,7 +85,7 @@ async def test_get_public_tenant_info_with_landing_dict() -> None:
 async def test_get_public_tenant_menu_non_dict_menu_treated_as_empty() -> None:
     t = _tenant()
     svc = MagicMock()
-    svc.get_tenant_by_slug = AsyncMock(return_value=t)
+    svc.get_tenant_identity_by_slug = AsyncMock(return_value=t)
     coll = MagicMock()
     coll.find_one = AsyncMock(
         return_value={"menu": "bad", "categories": [], "updatedAt": "2020-01-01T00:00:00Z"}
@@ -82,41 +98,80 @@ async def test_get_public_tenant_menu_non_dict_menu_treated_as_empty() -> None:
 
     db = _DB()
     session = MagicMock()
-    r = await public_routes.get_public_tenant_menu("r1", session, svc, db)  # type: ignore[arg-type]
-    assert r.data.menu == {}
+    r = await public_routes.get_public_tenant_menu("r1", _get_request(), session, svc, db)  # type: ignore[arg-type]
+    assert json.loads(r.body)["data"]["menu"] == {}
+
+
+def _favicon_config(updated_at: datetime) -> SimpleNamespace:
+    return SimpleNamespace(
+        favicon_object_key="key/fav.ico",
+        updated_at=updated_at,
+        landing_content=None,
+        page_title=None,
+        theme_override=None,
+    )
 
 
 @pytest.mark.asyncio
-async def test_get_public_tenant_favicon_stream() -> None:
+async def test_get_public_tenant_favicon_reads_storage_once() -> None:
     t = _tenant()
     svc = MagicMock()
-    svc.get_tenant_by_slug = AsyncMock(return_value=t)
-    stream = MagicMock()
-    stream.read.return_value = b"ico"
+    svc.get_tenant_identity_by_slug = AsyncMock(return_value=t)
     st = MagicMock()
-    st.get_object_stream.return_value = stream
+    st.read_object = AsyncMock(return_value=b"ico")
     session = MagicMock()
-    mc = SimpleNamespace(
-        favicon_object_key="key/fav.ico", landing_content=None, page_title=None, theme_override=None
-    )
-    with patch("routes.v1.public.public.tenant_mobile_config_service") as mcs:
-        mcs.get_by_tenant_id = AsyncMock(return_value=mc)
-        res = await public_routes.get_public_tenant_favicon("r1", session, svc, st)  # type: ignore[arg-type]
-    assert res.status_code == status.HTTP_200_OK
-    stream.close.assert_called_once()
+    mc = _favicon_config(datetime(2026, 3, 1, 12, 0, 0, 500, tzinfo=UTC))
+    public_favicon_cache.clear()
+    try:
+        with patch("routes.v1.public.public.tenant_mobile_config_service") as mcs:
+            mcs.get_by_tenant_id = AsyncMock(return_value=mc)
+            first = await public_routes.get_public_tenant_favicon(
+                "r1", _get_request(), session, svc, st
+            )
+            again = await public_routes.get_public_tenant_favicon(
+                "r1", _get_request(), session, svc, st
+            )
+            by_etag = await public_routes.get_public_tenant_favicon(
+                "r1", _get_request(if_none_match=first.headers["etag"]), session, svc, st
+            )
+            by_date = await public_routes.get_public_tenant_favicon(
+                "r1",
+                _get_request(if_modified_since="Sun, 01 Mar 2026 12:00:00 GMT"),
+                session,
+                svc,
+                st,
+            )
+            mc.updated_at = datetime(2026, 3, 2, tzinfo=UTC)
+            replaced = await public_routes.get_public_tenant_favicon(
+                "r1", _get_request(if_none_match=first.headers["etag"]), session, svc, st
+            )
+    finally:
+        public_favicon_cache.clear()
+
+    assert first.status_code == status.HTTP_200_OK
+    assert first.body == b"ico"
+    assert first.media_type == "image/x-icon"
+    assert first.headers["last-modified"] == "Sun, 01 Mar 2026 12:00:00 GMT"
+    assert again.body == b"ico"
+    assert by_etag.status_code == status.HTTP_304_NOT_MODIFIED
+    assert by_etag.body == b""
+    assert by_date.status_code == status.HTTP_304_NOT_MODIFIED
+    assert replaced.status_code == status.HTTP_304_NOT_MODIFIED
+    assert replaced.headers["last-modified"] == "Mon, 02 Mar 2026 00:00:00 GMT"
+    assert st.read_object.await_count == 2  # noqa: PLR2004
 
 
 @pytest.mark.asyncio
 async def test_get_public_tenant_favicon_404() -> None:
     t = _tenant()
     svc = MagicMock()
-    svc.get_tenant_by_slug = AsyncMock(return_value=t)
+    svc.get_tenant_identity_by_slug = AsyncMock(return_value=t)
     session = MagicMock()
     with patch("routes.v1.public.public.tenant_mobile_config_service") as mcs:
         mcs.get_by_tenant_id = AsyncMock(return_value=None)
         with pytest.raises(NotFoundResponse):
             await public_routes.get_public_tenant_favicon(  # type: ignore[call-arg]
-                "r1", session, svc, MagicMock()
+                "r1", _get_request(), session, svc, MagicMock()
             )
 
 
@@ -124,7 +179,7 @@ async def test_get_public_tenant_favicon_404() -> None:
 async def test_get_public_tenant_menu_empty() -> None:
     t = _tenant()
     svc = MagicMock()
-    svc.get_tenant_by_slug = AsyncMock(return_value=t)
+    svc.get_tenant_identity_by_slug = AsyncMock(return_value=t)
     coll = MagicMock()
     coll.find_one = AsyncMock(return_value=None)
 
@@ -135,24 +190,77 @@ async def test_get_public_tenant_menu_empty() -> None:
 
     db = _DB()
     session = MagicMock()
-    r = await public_routes.get_public_tenant_menu("r1", session, svc, db)  # type: ignore[arg-type]
-    assert "not yet" in r.message
+    r = await public_routes.get_public_tenant_menu("r1", _get_request(), session, svc, db)  # type: ignore[arg-type]
+    assert "not yet" in json.loads(r.body)["message"]
+    assert "etag" not in r.headers
+    coll.find_one.assert_awaited_once()
 
 
-class _Sess:
-    def __init__(self) -> None:
-        self.tid = uuid4()
-        self.expires = datetime(2026, 1, 1, tzinfo=UTC)
-        self.table_ref = "t-1"
-        self.origin = SimpleNamespace(value="customer")
+def _menu_db(document: dict) -> MagicMock:
+    coll = MagicMock()
+    coll.find_one = AsyncMock(return_value=document)
+    db = MagicMock()
+    db.__getitem__.return_value = coll
+    return db
+
+
+@pytest.mark.asyncio
+async def test_get_public_tenant_menu_reuses_serialized_body_until_updated_at_changes() -> None:
+    public_menu_cache.clear()
+    t = _tenant()
+    svc = MagicMock()
+    svc.get_tenant_identity_by_slug = AsyncMock(return_value=t)
+    document = {
+        "menu": {"1": {"__meta__": {"name": "Soups", "order": 1}}},
+        "updatedAt": datetime(2026, 5, 1, tzinfo=UTC),
+    }
+    db = _menu_db(document)
+    coll = db[MENU_COLLECTION]
+
+    first = await public_routes.get_public_tenant_menu("r1", _get_request(), MagicMock(), svc, db)  # type: ignore[arg-type]
+    second = await public_routes.get_public_tenant_menu("r1", _get_request(), MagicMock(), svc, db)  # type: ignore[arg-type]
+
+    assert coll.find_one.await_count == 3  # noqa: PLR2004
+    assert second.body == first.body
+    assert first.headers["etag"] == second.headers["etag"]
+    expected = jsonable_encoder(
+        SuccessResponse(
+            message="Menu retrieved",
+            data=TenantMenuResponseDTO(
+                menu=document["menu"],
+                categories=normalize_mongo_menu_categories(
+                    document["menu"], active_items_only=True
+                ),
+                updatedAt=document["updatedAt"],
+            ),
+        )
+    )
+    assert json.loads(first.body) == expected
 
-    @property
-    def lock_token(self) -> str:
-        return "lt"
+    document["updatedAt"] = datetime(2026, 5, 2, tzinfo=UTC)
+    third = await public_routes.get_public_tenant_menu("r1", _get_request(), MagicMock(), svc, db)  # type: ignore[arg-type]
+
+    assert third.headers["etag"] != first.headers["etag"]
+    public_menu_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_get_public_tenant_menu_answers_matching_if_none_match_with_304() -> None:
+    public_menu_cache.clear()
+    t = _tenant()
+    svc = MagicMock()
+    svc.get_tenant_identity_by_slug = AsyncMock(return_value=t)
+    db = _menu_db({"menu": {}, "updatedAt": datetime(2026, 5, 1, tzinfo=UTC)})
+    first = await public_routes.get_public_tenant_menu("r1", _get_request(), MagicMock(), svc, db)  # type: ignore[arg-type]
+
+    revalidated = await public_routes.get_public_tenant_menu(  # type: ignore[arg-type]
+        "r1", _get_request(if_none_match=first.headers["etag"]), MagicMock(), svc, db
+    )
 
-    @property
-    def expires_at(self) -> datetime:
-        return self.expires
+    assert revalidated.status_code == status.HTTP_304_NOT_MODIFIED
+    assert revalidated.body == b""
+    assert revalidated.headers["etag"] == first.headers["etag"]
+    public_menu_cache.clear()
 
 
 @pytest.mark.asyncio
@@ -160,33 +268,39 @@ async def test_get_public_tables_overview() -> None:
     t = _tenant()
     t.id = uuid4()
     svc = MagicMock()
-    svc.get_tenant_by_slug = AsyncMock(return_value=t)
+    svc.get_tenant_identity_by_slug = AsyncMock(return_value=t)
     ts = MagicMock()
-    srow = _Sess()
-    ts.list_active_sessions = AsyncMock(return_value=[srow])
-    ts.list_table_refs_with_active_kitchen_orders = AsyncMock(return_value=set())
-    canvas = SimpleNamespace(
-        name="C",
-        width=1,
-        height=1,
-        elements=[
-            {
-                "type": "table",
-                "id": " t-1 ",
-                "tableNumber": 1,
-                "x": 0,
-                "y": 0,
-                "w": 1,
-                "h": 1,
-                "label": " L ",
-                "seats": 2,
-            }
-        ],
+    ts.get_table_status = AsyncMock(
+        return_value=TenantTableState(
+            tenant_id=t.id,
+            canvases=[
+                CanvasLayout(
+                    canvas_id=uuid4(),
+                    version=1,
+                    name="C",
+                    width=1,
+                    height=1,
+                    tables=parse_table_elements(
+                        [
+                            {
+                                "type": "table",
+                                "id": " t-1 ",
+                                "tableNumber": 1,
+                                "x": 0,
+                                "y": 0,
+                                "w": 1,
+                                "h": 1,
+                                "label": " L ",
+                                "seats": 2,
+                            }
+                        ]
+                    ),
+                )
+            ],
+            session_expiry={"t-1": datetime(2026, 1, 1, tzinfo=UTC)},
+        )
     )
-    r_exec = MagicMock()
-    r_exec.scalars.return_value.all.return_value = [canvas]
     session = MagicMock()
-    session.execute = AsyncMock(return_value=r_exec)
     db = MagicMock()
 
     r = await public_routes.get_public_tables_overview(  # type: ignore[call-arg]
@@ -240,7 +354,7 @@ async def test_release_public_table_session() -> None:
 async def test_acquire_public_table_session() -> None:
     t = _tenant()
     tsvc = MagicMock()
-    tsvc.get_tenant_by_slug = AsyncMock(return_value=t)
+    tsvc.get_tenant_identity_by_slug = AsyncMock(return_value=t)
     tss = MagicMock()
     tss.acquire_mobile_session = AsyncMock(return_value=_ts())
     coll = MagicMock()
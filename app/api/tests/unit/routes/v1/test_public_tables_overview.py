@@ -1,35 +1,75 @@
+from datetime import UTC, datetime, timedelta
 from unittest.mock import AsyncMock, MagicMock
 from uuid import uuid4
 
 import pytest
 
 from routes.v1.public.public import get_public_tables_overview
+from services.table_status_index import CanvasLayout, TenantTableState, parse_table_elements
 
 _CANVAS_W = 400
 _CANVAS_H = 300
 _TABLE_COUNT = 2
 _TABLE_TWO = 2
 
-
-@pytest.mark.asyncio
-async def test_tables_overview_returns_empty_canvases_when_no_floor_data() -> None:
-    tenant_id = uuid4()
+_ELEMENTS = [
+    {
+        "type": "table",
+        "id": "table-ref-1",
+        "tableNumber": 1,
+        "label": "Window",
+        "x": 10,
+        "y": 20,
+        "w": 60,
+        "h": 50,
+        "seats": 2,
+    },
+    {
+        "type": "table",
+        "id": "table-ref-2",
+        "tableNumber": 2,
+        "x": 100,
+        "y": 20,
+        "w": 60,
+        "h": 50,
+    },
+    {"type": "wall", "id": "w1"},
+]
+
+
+def _services(
+    state: TenantTableState,
+) -> tuple[MagicMock, MagicMock, MagicMock]:
     tenant = MagicMock()
-    tenant.id = tenant_id
-    tenant.slug = "cafe"
+    tenant.id = state.tenant_id
+    tenant.slug = "bistro"
+    tenant.public_id = "pub-bistro"
 
     tenant_service = MagicMock()
-    tenant_service.get_tenant_by_slug = AsyncMock(return_value=tenant)
+    tenant_service.get_tenant_identity_by_slug = AsyncMock(return_value=tenant)
 
     table_session_service = MagicMock()
-    table_session_service.list_active_sessions = AsyncMock(return_value=[])
-    table_session_service.list_table_refs_with_active_kitchen_orders = AsyncMock(return_value=set())
+    table_session_service.get_table_status = AsyncMock(return_value=state)
+    return tenant, tenant_service, table_session_service
+
+
+def _state(**kwargs: object) -> TenantTableState:
+    canvas = CanvasLayout(
+        canvas_id=uuid4(),
+        version=1,
+        name="Main",
+        width=_CANVAS_W,
+        height=_CANVAS_H,
+        tables=parse_table_elements(_ELEMENTS),
+    )
+    return TenantTableState(tenant_id=uuid4(), canvases=[canvas], **kwargs)
 
-    result_mock = MagicMock()
-    result_mock.scalars.return_value.all.return_value = []
-    session = AsyncMock()
-    session.execute = AsyncMock(return_value=result_mock)
 
+@pytest.mark.asyncio
+async def test_tables_overview_returns_empty_canvases_when_no_floor_data() -> None:
+    state = TenantTableState(tenant_id=uuid4(), canvases=[])
+    tenant, tenant_service, table_session_service = _services(state)
+    session = AsyncMock()
     db = MagicMock()
 
     response = await get_public_tables_overview(
@@ -42,66 +82,21 @@ async def test_tables_overview_returns_empty_canvases_when_no_floor_data() -> No
 
     assert response.message == "Tables overview retrieved"
     assert response.data.canvases == []
+    table_session_service.get_table_status.assert_awaited_once_with(session, db, tenant=tenant)
 
 
 @pytest.mark.asyncio
 async def test_tables_overview_marks_locked_tables_closed() -> None:
-    tenant_id = uuid4()
-    tenant = MagicMock()
-    tenant.id = tenant_id
-    tenant.slug = "bistro"
-    tenant.public_id = "pub-bistro"
-
-    tenant_service = MagicMock()
-    tenant_service.get_tenant_by_slug = AsyncMock(return_value=tenant)
-
-    locked = MagicMock()
-    locked.table_ref = "table-ref-1"
-    table_session_service = MagicMock()
-    table_session_service.list_active_sessions = AsyncMock(return_value=[locked])
-    table_session_service.list_table_refs_with_active_kitchen_orders = AsyncMock(return_value=set())
-
-    floor = MagicMock()
-    floor.name = "Main"
-    floor.width = _CANVAS_W
-    floor.height = _CANVAS_H
-    floor.elements = [
-        {
-            "type": "table",
-            "id": "table-ref-1",
-            "tableNumber": 1,
-            "label": "Window",
-            "x": 10,
-            "y": 20,
-            "w": 60,
-            "h": 50,
-            "seats": 2,
-        },
-        {
-            "type": "table",
-            "id": "table-ref-2",
-            "tableNumber": 2,
-            "x": 100,
-            "y": 20,
-            "w": 60,
-            "h": 50,
-        },
-        {"type": "wall", "id": "w1"},
-    ]
-
-    result_mock = MagicMock()
-    result_mock.scalars.return_value.all.return_value = [floor]
-    session = AsyncMock()
-    session.execute = AsyncMock(return_value=result_mock)
-
-    db = MagicMock()
+    expires_at = datetime.now(UTC) + timedelta(minutes=5)
+    state = _state(session_expiry={"table-ref-1": expires_at})
+    _, tenant_service, table_session_service = _services(state)
 
     response = await get_public_tables_overview(
         "bistro",
-        session,
+        AsyncMock(),
         tenant_service,
         table_session_service,
-        db,
+        MagicMock(),
     )
 
     assert len(response.data.canvases) == 1
@@ -113,126 +108,45 @@ async def test_tables_overview_marks_locked_tables_closed() -> None:
 
     by_id = {t.id: t for t in canvas.tables}
     assert by_id["table-ref-1"].status == "closed"
+    assert by_id["table-ref-1"].reserved_until == expires_at
     assert by_id["table-ref-1"].table_number == 1
     assert by_id["table-ref-1"].label == "Window"
     assert by_id["table-ref-2"].status == "open"
+    assert by_id["table-ref-2"].reserved_until is None
     assert by_id["table-ref-2"].table_number == _TABLE_TWO
 
 
 @pytest.mark.asyncio
 async def test_tables_overview_marks_kitchen_order_tables_closed_without_postgres_session() -> None:
-    tenant_id = uuid4()
-    tenant = MagicMock()
-    tenant.id = tenant_id
-    tenant.slug = "bistro"
-    tenant.public_id = "pub-x"
-
-    tenant_service = MagicMock()
-    tenant_service.get_tenant_by_slug = AsyncMock(return_value=tenant)
-
-    table_session_service = MagicMock()
-    table_session_service.list_active_sessions = AsyncMock(return_value=[])
-    table_session_service.list_table_refs_with_active_kitchen_orders = AsyncMock(
-        return_value={"table-ref-1"}
-    )
-
-    floor = MagicMock()
-    floor.name = "Main"
-    floor.width = _CANVAS_W
-    floor.height = _CANVAS_H
-    floor.elements = [
-        {
-            "type": "table",
-            "id": "table-ref-1",
-            "tableNumber": 1,
-            "x": 10,
-            "y": 20,
-            "w": 60,
-            "h": 50,
-        },
-        {
-            "type": "table",
-            "id": "table-ref-2",
-            "tableNumber": 2,
-            "x": 100,
-            "y": 20,
-            "w": 60,
-            "h": 50,
-        },
-    ]
-
-    result_mock = MagicMock()
-    result_mock.scalars.return_value.all.return_value = [floor]
-    session = AsyncMock()
-    session.execute = AsyncMock(return_value=result_mock)
-
-    db = MagicMock()
+    state = _state(active_orders={"K-1": "table-ref-1"})
+    _, tenant_service, table_session_service = _services(state)
+    before = datetime.now(UTC)
 
     response = await get_public_tables_overview(
         "bistro",
-        session,
+        AsyncMock(),
         tenant_service,
         table_session_service,
-        db,
+        MagicMock(),
     )
 
     by_id = {t.id: t for t in response.data.canvases[0].tables}
     assert by_id["table-ref-1"].status == "closed"
+    assert by_id["table-ref-1"].reserved_until > before
     assert by_id["table-ref-2"].status == "open"
 
 
 @pytest.mark.asyncio
-async def test_tables_overview_skips_non_dict_non_table_and_bad_ids() -> None:
-    tenant_id = uuid4()
-    tenant = MagicMock()
-    tenant.id = tenant_id
-    tenant.slug = "cafe"
-    tenant.public_id = "pub-c"
-
-    tenant_service = MagicMock()
-    tenant_service.get_tenant_by_slug = AsyncMock(return_value=tenant)
-
-    table_session_service = MagicMock()
-    table_session_service.list_active_sessions = AsyncMock(return_value=[])
-    table_session_service.list_table_refs_with_active_kitchen_orders = AsyncMock(return_value=set())
-
-    floor = MagicMock()
-    floor.name = "F"
-    floor.width = 100
-    floor.height = 100
-    floor.elements = [
-        "not-a-dict",
-        {"type": "wall", "id": "w1"},
-        {"type": "table", "id": 99},
-        {"type": "table", "id": "   "},
-        {
-            "type": "table",
-            "id": " ok ",
-            "tableNumber": 1,
-            "x": 0,
-            "y": 0,
-            "w": 1,
-            "h": 1,
-            "label": 42,
-            "rotation": 0,
-        },
-    ]
-
-    result_mock = MagicMock()
-    result_mock.scalars.return_value.all.return_value = [floor]
-    session = AsyncMock()
-    session.execute = AsyncMock(return_value=result_mock)
-    db = MagicMock()
+async def test_tables_overview_opens_tables_whose_session_expired() -> None:
+    state = _state(session_expiry={"table-ref-1": datetime.now(UTC) - timedelta(seconds=1)})
+    _, tenant_service, table_session_service = _services(state)
 
     response = await get_public_tables_overview(
-        "cafe",
-        session,
+        "bistro",
+        AsyncMock(),
         tenant_service,
         table_session_service,
-        db,
+        MagicMock(),
     )
 
-    assert len(response.data.canvases) == 1
-    assert len(response.data.canvases[0].tables) == 1
-    assert response.data.canvases[0].tables[0].id == "ok"
-    assert response.data.canvases[0].tables[0].label is None
+    assert {t.status for t in response.data.canvases[0].tables} == {"open"}
@@ -168,7 +168,7 @@ async def test_create_order_with_table_and_waiter(_bc: AsyncMock) -> None:
         status=TenantStatus.ACTIVE,
     )
     ts = MagicMock()
-    ts.get_tenant_by_public_id = AsyncMock(return_value=t)
+    ts.get_tenant_identity_by_public_id = AsyncMock(return_value=t)
     tss = MagicMock()
     tss.acquire_waiter_session = AsyncMock()
     svc = MagicMock()
@@ -221,7 +221,7 @@ async def test_create_order_invalid_sub_skips_waiter(_bc: AsyncMock) -> None:
         status=TenantStatus.ACTIVE,
     )
     ts = MagicMock()
-    ts.get_tenant_by_public_id = AsyncMock(return_value=t)
+    ts.get_tenant_identity_by_public_id = AsyncMock(return_value=t)
     tss = MagicMock()
     tss.acquire_waiter_session = AsyncMock()
     svc = MagicMock()
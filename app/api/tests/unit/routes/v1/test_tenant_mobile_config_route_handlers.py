@@ -126,7 +126,7 @@ async def test_update_tenant_mobile_config_with_theme_and_landing_content() -> N
 async def test_presign_tenant_mobile_favicon() -> None:
     tid = uuid4()
     st = MagicMock()
-    st.create_presigned_upload.return_value = ("https://u", "key-1")
+    st.create_presigned_upload = AsyncMock(return_value=("https://u", "key-1"))
     r = await mobile_routes.presign_tenant_mobile_favicon(
         tid,
         TenantMobileFaviconPresignRequestDTO(content_type="image/png"),
@@ -145,19 +145,21 @@ async def test_finalize_tenant_mobile_favicon() -> None:
         favicon_object_key="k",
     )
     st = MagicMock()
-    st.finalize_upload = MagicMock(return_value="f/k")
+    st.finalize_upload = AsyncMock(return_value="f/k")
     svc = MagicMock()
     svc.set_favicon_key = AsyncMock(return_value=row)
     session = MagicMock()
     session.commit = AsyncMock()
-    r = await mobile_routes.finalize_tenant_mobile_favicon(
-        tid,
-        TenantMobileFaviconFinalizeRequestDTO(object_key="f/k"),
-        session,
-        st,
-        svc,
-    )  # type: ignore[arg-type]
+    with patch("routes.v1.tenants.mobile_config.public_favicon_cache") as cache:
+        r = await mobile_routes.finalize_tenant_mobile_favicon(
+            tid,
+            TenantMobileFaviconFinalizeRequestDTO(object_key="f/k"),
+            session,
+            st,
+            svc,
+        )  # type: ignore[arg-type]
     assert "saved" in r.message
+    cache.invalidate.assert_called_once_with("f/k")
 
 
 @pytest.mark.asyncio
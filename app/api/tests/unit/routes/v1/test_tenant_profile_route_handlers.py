@@ -69,7 +69,7 @@ def _profile_row(tenant_id, dto: CreateTenantProfileDTO) -> SimpleNamespace:
 @pytest.mark.asyncio
 async def test_create_tenant_logo_upload() -> None:
     st = MagicMock()
-    st.create_presigned_upload.return_value = ("https://u", "k")
+    st.create_presigned_upload = AsyncMock(return_value=("https://u", "k"))
     r = await profile_routes.create_tenant_logo_upload(
         uuid4(),
         st,
@@ -82,7 +82,7 @@ async def test_create_tenant_logo_upload() -> None:
 @pytest.mark.asyncio
 async def test_create_tenant_logo_view() -> None:
     st = MagicMock()
-    st.create_presigned_view.return_value = "https://view"
+    st.create_presigned_view = AsyncMock(return_value="https://view")
     r = await profile_routes.create_tenant_logo_view(uuid4(), st)  # type: ignore[arg-type]
     assert r.data.url == "https://view"
 
@@ -149,13 +149,13 @@ async def test_upsert_tenant_profile_with_logo_key() -> None:
         updated_at=now,
     )
     st = MagicMock()
-    st.finalize_upload.return_value = SimpleNamespace(url="https://logo")
+    st.finalize_upload = AsyncMock(return_value=SimpleNamespace(url="https://logo"))
     svc = MagicMock()
     svc.upsert = AsyncMock(return_value=(row, True))
     session = MagicMock()
     r = await profile_routes.upsert_tenant_profile(tid, p, session, st, svc)  # type: ignore[arg-type]
     assert "created" in r.message
-    st.finalize_upload.assert_called_once()
+    st.finalize_upload.assert_awaited_once()
 
 
 @pytest.mark.asyncio
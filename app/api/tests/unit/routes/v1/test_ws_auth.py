@@ -159,7 +159,7 @@ async def test_kitchen_websocket_disconnect_calls_manager() -> None:
     w.receive_text = AsyncMock(side_effect=WebSocketDisconnect)
     mgr = MagicMock()
     mgr.connect = AsyncMock()
-    mgr.disconnect = MagicMock()
+    mgr.disconnect = AsyncMock()
     with (
         patch.object(
             ws_mod.security_service, "decode_access_token", return_value={"tenant_ids": ["rid1"]}
@@ -169,7 +169,7 @@ async def test_kitchen_websocket_disconnect_calls_manager() -> None:
     ):
         await ws_mod.kitchen_websocket(w, "rid1")
     mgr.connect.assert_awaited_once()
-    mgr.disconnect.assert_called_once()
+    mgr.disconnect.assert_awaited_once()
 
 
 @pytest.mark.asyncio
@@ -178,7 +178,7 @@ async def test_kitchen_websocket_exception_disconnects() -> None:
     w.receive_text = AsyncMock(side_effect=RuntimeError("recv"))
     mgr = MagicMock()
     mgr.connect = AsyncMock()
-    mgr.disconnect = MagicMock()
+    mgr.disconnect = AsyncMock()
     with (
         patch.object(
             ws_mod.security_service, "decode_access_token", return_value={"tenant_ids": ["rid1"]}
@@ -187,4 +187,12 @@ async def test_kitchen_websocket_exception_disconnects() -> None:
         patch.object(ws_mod, "ws_manager", mgr),
     ):
         await ws_mod.kitchen_websocket(w, "rid1")
-    mgr.disconnect.assert_called_once()
+    mgr.disconnect.assert_awaited_once()
+
+
+@pytest.mark.parametrize(
+    ("query", "expected"),
+    [(b"token=t&since=42", 42), (b"token=t", None), (b"since=-1", None), (b"since=abc", None)],
+)
+def test_resume_sequence_from_query(query: bytes, expected: int | None) -> None:
+    assert ws_mod._resume_sequence(_make_ws(_connect_scope(query))) == expected
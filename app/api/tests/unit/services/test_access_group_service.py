@@ -1,4 +1,4 @@
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 from uuid import uuid4
 
 import pytest
@@ -7,6 +7,7 @@ from core.authorization.actions import AuthorizationAction
 from core.exceptions import BadRequestError
 from core.models.enums import AccountType
 from services.access_group_service import AccessGroupService
+from tests.unit.conftest import commit_session
 
 
 def test_rejects_non_delegable_capabilities() -> None:
@@ -61,6 +62,7 @@ async def test_assignment_is_bound_to_the_current_tenant_membership() -> None:
     service._get_group = AsyncMock(return_value=MagicMock())  # type: ignore[method-assign]
     session = AsyncMock()
     session.add = MagicMock()
+    session.info = {}
     session.scalar.return_value = MagicMock(account_type=AccountType.WAITER)
     session.get.return_value = None
     tenant_id = uuid4()
@@ -74,3 +76,30 @@ async def test_assignment_is_bound_to_the_current_tenant_membership() -> None:
     assert assignment.group_id == group_id
     assert assignment.account_id == account_id
     session.flush.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_membership_and_group_changes_invalidate_authorization_context() -> None:
+    service = AccessGroupService()
+    service._get_group = AsyncMock(return_value=MagicMock())  # type: ignore[method-assign]
+    session = AsyncMock()
+    session.add = MagicMock()
+    session.info = {}
+    session.scalar.return_value = MagicMock(account_type=AccountType.WAITER)
+    session.get.return_value = None
+    tenant_id = uuid4()
+    account_id = uuid4()
+
+    with patch(
+        "services.access_group_service.authorization_context_cache", new=AsyncMock()
+    ) as cache:
+        await service.assign_member(session, tenant_id, uuid4(), account_id)
+        session.get.return_value = MagicMock()
+        await service.unassign_member(session, tenant_id, uuid4(), account_id)
+        await service.delete_group(session, tenant_id, uuid4())
+        cache.invalidate_account.assert_not_awaited()
+        await commit_session(session)
+
+    assert cache.invalidate_account.await_count == 2  # noqa: PLR2004
+    cache.invalidate_account.assert_awaited_with(tenant_id, account_id)
+    cache.invalidate_tenant.assert_awaited_once_with(tenant_id)
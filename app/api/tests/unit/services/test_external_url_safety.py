@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import socket
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -7,7 +8,17 @@ import pytest
 
 from core.exceptions import ExternalAPIError
 from services import external_client_service as ecs
-from services.external_client_service import ExternalClient, _is_private_ip
+from services.external_client_service import (
+    ExternalClient,
+    ExternalHttpClients,
+    HostResolver,
+    _is_private_ip,
+)
+from tests.unit.conftest import FakeClock
+
+
+def _client() -> ExternalClient:
+    return ExternalClient(ExternalHttpClients(), HostResolver())
 
 
 def test_is_private_ip_detects() -> None:
@@ -16,39 +27,97 @@ def test_is_private_ip_detects() -> None:
     assert _is_private_ip("not-an-ip") is False
 
 
-def test_assert_url_safe_rejects_schema() -> None:
+@pytest.mark.asyncio
+async def test_assert_url_safe_rejects_schema() -> None:
     with pytest.raises(ExternalAPIError, match="scheme"):
-        ecs._assert_url_safe("ftp://api.pwnedpasswords.com/x")
+        await ecs._assert_url_safe("ftp://api.pwnedpasswords.com/x")
 
 
-def test_assert_url_safe_rejects_no_hostname() -> None:
+@pytest.mark.asyncio
+async def test_assert_url_safe_rejects_no_hostname() -> None:
     with pytest.raises(ExternalAPIError, match="hostname"):
-        ecs._assert_url_safe("https:///path")
+        await ecs._assert_url_safe("https:///path")
 
 
-def test_assert_url_safe_rejects_localhost() -> None:
+@pytest.mark.asyncio
+async def test_assert_url_safe_rejects_localhost() -> None:
     with pytest.raises(ExternalAPIError, match="localhost"):
-        ecs._assert_url_safe("https://127.0.0.1/x")
+        await ecs._assert_url_safe("https://127.0.0.1/x")
     with pytest.raises(ExternalAPIError, match="localhost"):
-        ecs._assert_url_safe("https://localhost/x")
+        await ecs._assert_url_safe("https://localhost/x")
 
 
-def test_assert_url_safe_rejects_private_hostname() -> None:
+@pytest.mark.asyncio
+async def test_assert_url_safe_rejects_private_hostname() -> None:
     with pytest.raises(ExternalAPIError, match="private"):
-        ecs._assert_url_safe("https://10.0.0.1/x")
+        await ecs._assert_url_safe("https://10.0.0.1/x")
 
 
-def test_assert_url_resolves_to_private() -> None:
+@pytest.mark.asyncio
+async def test_assert_url_resolves_to_private() -> None:
+    resolver = HostResolver()
     with (
-        patch.object(ecs.socket, "getaddrinfo", return_value=[(0, 0, 0, 0, ("10.0.0.2", 443))]),
+        patch.object(resolver, "resolve", AsyncMock(return_value=("93.184.216.34", "10.0.0.2"))),
         pytest.raises(ExternalAPIError, match="resolves to private"),
     ):
-        ecs._assert_url_safe("https://example.com/x")
+        await ecs._assert_url_safe("https://example.com/x", resolver)
+
+
+@pytest.mark.asyncio
+async def test_assert_url_skips_dns_for_allowed_hosts() -> None:
+    resolver = MagicMock()
+    await ecs._assert_url_safe("https://secure.przelewy24.pl/api", resolver)
+    resolver.resolve.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_resolver_caches_answers_until_ttl_expires() -> None:
+    clock = FakeClock()
+    resolver = HostResolver(ttl_seconds=60, clock=clock)
+    loop = asyncio.get_running_loop()
+    infos = [(0, 0, 0, "", ("93.184.216.34", 0)), (0, 0, 0, "", ("93.184.216.34", 0))]
+    with patch.object(loop, "getaddrinfo", AsyncMock(return_value=infos)) as lookup:
+        assert await resolver.resolve("example.com") == ("93.184.216.34",)
+        clock.now += 59
+        assert await resolver.resolve("example.com") == ("93.184.216.34",)
+        assert lookup.await_count == 1
+
+        clock.now += 1
+        await resolver.resolve("example.com")
+        assert lookup.await_count == 2  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_resolver_caches_failures_and_evicts_oldest_host() -> None:
+    resolver = HostResolver(max_hosts=1)
+    loop = asyncio.get_running_loop()
+    with patch.object(loop, "getaddrinfo", AsyncMock(side_effect=socket.gaierror)) as lookup:
+        assert await resolver.resolve("a.invalid") == ()
+        assert await resolver.resolve("a.invalid") == ()
+        await resolver.resolve("b.invalid")
+        await resolver.resolve("a.invalid")
+
+    assert lookup.await_count == 3  # noqa: PLR2004
+    resolver.clear()
+
+
+@pytest.mark.asyncio
+async def test_http_clients_pool_one_client_per_origin() -> None:
+    clients = ExternalHttpClients(max_connections=4)
+    p24 = clients.for_url("https://secure.przelewy24.pl/api/v1/transaction/register")
+    assert clients.for_url("https://SECURE.przelewy24.pl/api/v1/transaction/verify") is p24
+    assert clients.for_url("https://api.pwnedpasswords.com/range/ABCDE") is not p24
+    assert clients.origins == ["https://api.pwnedpasswords.com", "https://secure.przelewy24.pl"]
+
+    await clients.aclose()
+    assert p24.is_closed
+    assert clients.origins == []
 
 
-def test_assert_url_gaierror_passes() -> None:
-    with patch.object(ecs.socket, "getaddrinfo", side_effect=socket.gaierror):
-        ecs._assert_url_safe("https://example.com/x")
+def test_http2_falls_back_when_h2_is_missing() -> None:
+    with patch.object(ecs.importlib.util, "find_spec", return_value=None):
+        clients = ExternalHttpClients(http2=True)
+    assert clients._http2 is False
 
 
 @pytest.mark.asyncio
@@ -58,9 +127,8 @@ async def test_external_get_pwned_success() -> None:
     mock_resp.raise_for_status = MagicMock()
     mock_resp.text = "ok"
     with patch("services.external_client_service.httpx.AsyncClient") as c:
-        c.return_value.__aenter__.return_value.get = AsyncMock(return_value=mock_resp)
-        c.return_value.__aexit__ = AsyncMock(return_value=None)
-        out = await ExternalClient().external_get(u, service_name="Pwned")
+        c.return_value.get = AsyncMock(return_value=mock_resp)
+        out = await _client().external_get(u, service_name="Pwned")
     assert out == "ok"
 
 
@@ -71,7 +139,6 @@ async def test_external_get_json_not_dict() -> None:
     mock_resp.raise_for_status = MagicMock()
     mock_resp.json.return_value = [1, 2, 3]
     with patch("services.external_client_service.httpx.AsyncClient") as c:
-        c.return_value.__aenter__.return_value.get = AsyncMock(return_value=mock_resp)
-        c.return_value.__aexit__ = AsyncMock(return_value=None)
+        c.return_value.get = AsyncMock(return_value=mock_resp)
         with pytest.raises(ExternalAPIError, match="invalid response"):
-            await ExternalClient().external_get_json(u, service_name="Pwned")
+            await _client().external_get_json(u, service_name="Pwned")
@@ -226,9 +226,11 @@ async def test_delete_canvas() -> None:
     r1.scalar_one_or_none = MagicMock(return_value=canvas)
     session, _ = _session_exec_chain(r1)
     svc = FloorCanvasService()
-    await svc.delete_canvas(session, tid, cid)
+    with patch("services.floor_canvas_service.table_identity_index") as identities:
+        await svc.delete_canvas(session, tid, cid)
     session.delete.assert_awaited_once()
     session.commit.assert_awaited_once()
+    identities.layout_changed.assert_called_once_with(tid)
 
 
 @pytest.mark.asyncio
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from core.foundation.infra.config import settings
+from core.foundation.object_storage import MemoryObjectStorageBackend, ObjectStorage
+from core.foundation.scheduler import LocalLeaderLock
+from services.maintenance_jobs import (
+    build_scheduler,
+    cleanup_refresh_tokens,
+    expire_table_sessions,
+    flush_table_session_heartbeats,
+    reconcile_payments,
+    sweep_tmp_uploads,
+)
+
+
+@pytest.mark.asyncio
+async def test_expire_table_sessions_commits_one_sweep_over_all_tenants() -> None:
+    session = MagicMock()
+    session.__aenter__ = AsyncMock(return_value=session)
+    session.__aexit__ = AsyncMock(return_value=None)
+    session.commit = AsyncMock()
+    service = MagicMock()
+    service.expire_stale_sessions = AsyncMock(side_effect=[2, 0])
+
+    assert await expire_table_sessions(lambda: session, service) == 2  # noqa: PLR2004
+    assert await expire_table_sessions(lambda: session, service) == 0
+
+    service.expire_stale_sessions.assert_awaited_with(session)
+    assert session.commit.await_count == 2  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_flush_table_session_heartbeats_flushes_buffer() -> None:
+    heartbeats = MagicMock()
+    heartbeats.flush = AsyncMock(return_value=3)
+
+    assert await flush_table_session_heartbeats(heartbeats) == 3  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_reconcile_payments_waits_for_run_over_all_tenants() -> None:
+    reconciler = MagicMock()
+    reconciler.wait = AsyncMock()
+
+    await reconcile_payments(reconciler)
+
+    reconciler.start.assert_called_once_with()
+    reconciler.wait.assert_awaited_once_with(run=reconciler.start.return_value)
+
+
+@pytest.mark.asyncio
+async def test_sweep_tmp_uploads_removes_only_old_temporary_objects() -> None:
+    backend = MemoryObjectStorageBackend()
+    storage = ObjectStorage(backend, max_workers=1)
+    try:
+        await storage.put_bytes("tmp/tenant-logos/t/old", b"x", "image/png")
+        await storage.put_bytes("tmp/tenant-logos/t/new", b"x", "image/png")
+        await storage.put_bytes("tenant-logos/t/final.png", b"x", "image/png")
+        hour_ago = datetime.now(UTC) - timedelta(hours=1)
+        for key in ("tmp/tenant-logos/t/old", "tenant-logos/t/final.png"):
+            data, content_type, _ = backend._objects[key]
+            backend._objects[key] = (data, content_type, hour_ago)
+
+        assert await sweep_tmp_uploads(storage, max_age_seconds=600) == 1
+        assert await sweep_tmp_uploads(storage, max_age_seconds=600) == 0
+
+        assert await storage.list_keys("") == ["tenant-logos/t/final.png", "tmp/tenant-logos/t/new"]
+    finally:
+        storage.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_cleanup_refresh_tokens_prunes_store() -> None:
+    store = MagicMock()
+    store.cleanup_expired = AsyncMock()
+
+    await cleanup_refresh_tokens(store)
+
+    store.cleanup_expired.assert_awaited_once()
+
+
+def test_build_scheduler_registers_maintenance_jobs() -> None:
+    local = settings.model_copy(update={"SCHEDULER_LEADER_LOCK": "local"})
+
+    jobs = build_scheduler(local).stats().jobs
+    without_reconcile = build_scheduler(
+        local.model_copy(
+            update={"P24_RECONCILE_INTERVAL_SECONDS": 0, "TABLE_SESSION_HEARTBEAT_FLUSH_SECONDS": 0}
+        )
+    ).stats()
+
+    assert set(jobs) == {
+        "expire-table-sessions",
+        "flush-table-session-heartbeats",
+        "reconcile-payments",
+        "sweep-tmp-uploads",
+        "cleanup-refresh-tokens",
+    }
+    assert jobs["cleanup-refresh-tokens"].leader_only is False
+    assert jobs["flush-table-session-heartbeats"].leader_only is False
+    assert jobs["sweep-tmp-uploads"].trigger == f"cron {settings.UPLOAD_TMP_SWEEP_CRON}"
+    assert "reconcile-payments" not in without_reconcile.jobs
+    assert "flush-table-session-heartbeats" not in without_reconcile.jobs
+    with patch("services.maintenance_jobs.build_leader_lock", return_value=LocalLeaderLock()):
+        assert build_scheduler(settings).stats().running is False
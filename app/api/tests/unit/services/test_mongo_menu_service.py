@@ -51,3 +51,28 @@ def test_normalize_non_digit_keys_sort_lexicographically() -> None:
     }
     cats = normalize_mongo_menu_categories(raw)
     assert [c.name for c in cats] == ["A", "B"]
+
+
+def test_normalize_adds_variants_for_derivative_backed_images() -> None:
+    base = "https://cdn.example.com/media/menu-items/t-1/" + "a" * 32
+    raw = {
+        "1": {
+            CATEGORY_META_KEY: {"name": "A"},
+            "New": {"price": 1, "imageUrl": f"{base}/original.jpg"},
+            "Legacy": {
+                "price": 1,
+                "imageUrl": "https://cdn.example.com/media/menu-items/t-1/x.jpg",
+            },
+            "None": {"price": 1},
+        }
+    }
+    items = {item.name: item for item in normalize_mongo_menu_categories(raw)[0].items}
+
+    assert items["New"].image_variants == {
+        128: f"{base}/128.webp",
+        256: f"{base}/256.webp",
+        512: f"{base}/512.webp",
+        1024: f"{base}/1024.webp",
+    }
+    assert items["Legacy"].image_variants is None
+    assert items["None"].image_variants is None
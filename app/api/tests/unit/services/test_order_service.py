@@ -1,5 +1,6 @@
 from datetime import UTC, datetime, timedelta
 from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
 
 import pytest
 
@@ -14,6 +15,7 @@ from services.order_service import (
     _serialize_order,
     _to_iso,
 )
+from services.table_status_index import table_status_index
 
 
 def test_to_iso_converts_utc_datetime_to_requested_timezone() -> None:
@@ -408,6 +410,35 @@ async def test_delete_order_removes_and_returns_snapshot() -> None:
     coll.delete_one.assert_awaited_once()
 
 
+@pytest.mark.asyncio
+async def test_order_writes_update_table_status_index() -> None:
+    state = table_status_index.store(
+        "r1", tenant_id=uuid4(), canvases=[], session_expiry={}, active_orders={}
+    )
+    coll = _mongo_orders_coll()
+    coll.insert_one = AsyncMock()
+    coll.update_one = AsyncMock()
+    coll.delete_one = AsyncMock()
+    db = _db_with_coll(coll)
+    svc = OrderService()
+
+    try:
+        created = await svc.create_order(db, "r1", {"id": "K-1", "tableId": "t1"})
+        assert state.active_orders == {"K-1": "t1"}
+
+        doc = {**created, "_id": "K-1", "restaurantId": "r1", "tableId": "t1"}
+        coll.find_one = AsyncMock(side_effect=[doc, {**doc, "status": "rejected"}])
+        await svc.update_status(db, "r1", "K-1", new_status="rejected", rejection_reason="x")
+        assert state.active_orders == {}
+
+        state.active_orders["K-1"] = "t1"
+        coll.find_one = AsyncMock(return_value=doc)
+        await svc.delete_order(db, "r1", "K-1")
+        assert state.active_orders == {}
+    finally:
+        table_status_index.clear()
+
+
 @pytest.mark.asyncio
 async def test_get_order_for_archive_rejects_wrong_status() -> None:
     doc = {
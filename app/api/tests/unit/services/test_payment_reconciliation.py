@@ -0,0 +1,354 @@
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import UUID, uuid4
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from core.exceptions import ConflictError
+from core.foundation.infra.config import Settings
+from core.models.enums import TenantStatus
+from services.payment_reconciliation import (
+    InMemoryReconciliationRunStore,
+    PaymentReconciler,
+    RedisReconciliationRunStore,
+    build_reconciliation_run_store,
+)
+from tests.unit.conftest import FakeRedis
+
+_EFFECTS = "services.payment_reconciliation.apply_mobile_payment_mongo_and_session_effects"
+
+
+class _Savepoint:
+    def __init__(self, session: _Session) -> None:
+        self._session = session
+
+    async def __aenter__(self) -> None:
+        self._session.savepoints += 1
+
+    async def __aexit__(self, exc_type: object, *_: object) -> bool:
+        if exc_type is not None:
+            self._session.savepoint_rollbacks += 1
+        return False
+
+
+class _Session:
+    def __init__(self, tenants: list[SimpleNamespace], *, commit_error: bool = False) -> None:
+        self.tenants = tenants
+        self.commit_error = commit_error
+        self.queries = 0
+        self.savepoints = 0
+        self.savepoint_rollbacks = 0
+        self.commits = 0
+        self.rollbacks = 0
+
+    async def __aenter__(self) -> _Session:
+        return self
+
+    async def __aexit__(self, *_: object) -> None:
+        return None
+
+    async def execute(self, _stmt: object) -> MagicMock:
+        self.queries += 1
+        result = MagicMock()
+        result.scalars.return_value = self.tenants
+        return result
+
+    def begin_nested(self) -> _Savepoint:
+        return _Savepoint(self)
+
+    async def flush(self) -> None:
+        return None
+
+    async def commit(self) -> None:
+        if self.commit_error:
+            raise OSError
+        self.commits += 1
+
+    async def rollback(self) -> None:
+        self.rollbacks += 1
+
+
+def _tenant() -> SimpleNamespace:
+    tenant_id = uuid4()
+    return SimpleNamespace(
+        id=tenant_id,
+        public_id=f"pub-{tenant_id.hex[:6]}",
+        slug="slug",
+        name="Tenant",
+        status=TenantStatus.ACTIVE,
+        p24_merchantid=1,
+        p24_api="key",
+        p24_crc="crc",
+    )
+
+
+def _transaction(tenant_id: UUID) -> SimpleNamespace:
+    return SimpleNamespace(
+        session_id=uuid4(), tenant_id=tenant_id, amount=100, currency="PLN", status=0
+    )
+
+
+class _P24:
+    """Lookups that sleep briefly and record how many run at once."""
+
+    def __init__(self, pending: list[SimpleNamespace]) -> None:
+        self.get_transactions_pending_reconcile = AsyncMock(return_value=pending)
+        self.in_flight: Counter[UUID] = Counter()
+        self.peak_tenant = 0
+        self.peak_overall = 0
+        self.failing_lookups: set[UUID] = set()
+        self.failing_applies: set[UUID] = set()
+        self.gate: asyncio.Event | None = None
+
+    async def lookup_p24_transaction(
+        self, _client: object, *, transaction: Any, tenant: Any
+    ) -> tuple[dict[str, Any], int]:
+        self.in_flight[tenant.id] += 1
+        self.peak_tenant = max(self.peak_tenant, self.in_flight[tenant.id])
+        self.peak_overall = max(self.peak_overall, sum(self.in_flight.values()))
+        try:
+            if self.gate is not None:
+                await self.gate.wait()
+            await asyncio.sleep(0.005)
+        finally:
+            self.in_flight[tenant.id] -= 1
+        if transaction.session_id in self.failing_lookups:
+            raise ConflictError(message="Transaction amount does not match Przelewy24 data")
+        return {"status": 1}, 200
+
+    def apply_p24_lookup_data(self, transaction: Any, data: dict[str, Any]) -> None:
+        if transaction.session_id in self.failing_applies:
+            raise RuntimeError
+        transaction.status = data["status"]
+
+
+def _reconciler(p24: _P24, session: _Session, **kwargs: Any) -> PaymentReconciler:
+    return PaymentReconciler(
+        p24_service=p24,  # type: ignore[arg-type]
+        client=MagicMock(),
+        table_sessions=MagicMock(),
+        session_factory=lambda: session,  # type: ignore[arg-type]
+        mongo=MagicMock,
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_run_bounds_lookups_and_commits_once_per_batch() -> None:
+    tenants = [_tenant() for _ in range(3)]
+    pending = [_transaction(tenant.id) for tenant in tenants for _ in range(4)]
+    p24 = _P24(pending)
+    session = _Session(tenants)
+    reconciler = _reconciler(p24, session, max_concurrency=2, tenant_concurrency=1, batch_size=5)
+
+    with patch(_EFFECTS, new_callable=AsyncMock) as effects:
+        run = reconciler.start()
+        await reconciler.wait()
+
+    assert run.status == "completed"
+    assert run.finished_at is not None
+    assert p24.peak_tenant == 1
+    assert p24.peak_overall == 2  # noqa: PLR2004
+    assert session.queries == 1
+    assert session.commits == 3  # noqa: PLR2004
+    assert session.savepoints == 12  # noqa: PLR2004
+    assert effects.await_count == 12  # noqa: PLR2004
+    assert all(tx.status == 1 for tx in pending)
+    for tenant in tenants:
+        assert run.counts(tenant.id).scanned == 4  # noqa: PLR2004
+        assert run.counts(tenant.id).updated == 4  # noqa: PLR2004
+    assert run.counts().updated == 12  # noqa: PLR2004
+    p24.get_transactions_pending_reconcile.assert_awaited_once_with(
+        session, None, hours_max_age=72, limit=500
+    )
+
+
+@pytest.mark.asyncio
+async def test_failed_transaction_does_not_undo_rest_of_batch() -> None:
+    tenant = _tenant()
+    ok, bad_lookup, bad_apply = (_transaction(tenant.id) for _ in range(3))
+    orphan = _transaction(uuid4())
+    p24 = _P24([ok, bad_lookup, bad_apply, orphan])
+    p24.failing_lookups.add(bad_lookup.session_id)
+    p24.failing_applies.add(bad_apply.session_id)
+    session = _Session([tenant])
+    reconciler = _reconciler(p24, session)
+
+    with patch(_EFFECTS, new_callable=AsyncMock):
+        run = reconciler.start(tenant.id)
+        await reconciler.wait()
+
+    assert run.status == "completed"
+    assert run.counts(tenant.id).scanned == 3  # noqa: PLR2004
+    assert run.counts(tenant.id).updated == 1
+    assert run.counts(tenant.id).failed == 2  # noqa: PLR2004
+    assert session.savepoint_rollbacks == 1
+    assert session.commits == 1
+    reasons = {failure.session_id: failure.reason for failure in run.failures}
+    assert reasons[bad_lookup.session_id] == "Transaction amount does not match Przelewy24 data"
+    assert reasons[bad_apply.session_id] == "RuntimeError"
+    assert reasons[orphan.session_id] == "Tenant not found"
+
+
+@pytest.mark.asyncio
+async def test_commit_failure_fails_batch_and_ends_run() -> None:
+    tenant = _tenant()
+    p24 = _P24([_transaction(tenant.id), _transaction(tenant.id)])
+    session = _Session([tenant], commit_error=True)
+    reconciler = _reconciler(p24, session)
+
+    with patch(_EFFECTS, new_callable=AsyncMock):
+        run = reconciler.start()
+        await reconciler.wait()
+
+    assert run.status == "failed"
+    assert session.rollbacks == 1
+    assert run.counts(tenant.id).failed == 2  # noqa: PLR2004
+    assert run.counts(tenant.id).updated == 0
+    stats = reconciler.stats()
+    assert stats.running is False
+    assert stats.failed == 2  # noqa: PLR2004
+    assert stats.last_status == "failed"
+    assert stats.last_finished_at is not None
+
+
+@pytest.mark.asyncio
+async def test_start_reuses_covering_run_and_queues_other_tenants() -> None:
+    tenant, other = _tenant(), _tenant()
+    p24 = _P24([_transaction(tenant.id)])
+    p24.gate = asyncio.Event()
+    reconciler = _reconciler(p24, _Session([tenant]))
+    assert await reconciler.latest() is None
+    await reconciler.wait()
+
+    with patch(_EFFECTS, new_callable=AsyncMock):
+        run = reconciler.start(tenant.id)
+        assert reconciler.start(tenant.id) is run
+        queued = reconciler.start(other.id)
+        await reconciler.wait(timeout=0.01)
+        assert queued is not run
+        assert (run.status, queued.status) == ("running", "queued")
+        assert reconciler.stats().running is True
+        assert reconciler.running is run
+
+        p24.gate.set()
+        await reconciler.wait(run=queued)
+
+    assert run.counts(tenant.id).updated == 1
+    assert queued.status == "completed"
+    assert await reconciler.latest(tenant.id) is run
+    assert await reconciler.latest(other.id) is queued
+    assert await reconciler.latest() is queued
+    assert reconciler.stats().runs == 2  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_run_for_all_tenants_covers_tenant_requests() -> None:
+    tenant = _tenant()
+    p24 = _P24([_transaction(tenant.id)])
+    p24.gate = asyncio.Event()
+    reconciler = _reconciler(p24, _Session([tenant]))
+
+    with patch(_EFFECTS, new_callable=AsyncMock):
+        run = reconciler.start()
+        assert reconciler.start(tenant.id) is run
+        p24.gate.set()
+        await reconciler.wait()
+
+    assert await reconciler.latest(tenant.id) is run
+
+
+class _HeldLock:
+    """An advisory lock another worker holds for the first ``held`` attempts."""
+
+    def __init__(self, held: int) -> None:
+        self.held = held
+        self.attempts = 0
+        self.release = AsyncMock()
+
+    async def is_leader(self) -> bool:
+        self.attempts += 1
+        return self.attempts > self.held
+
+
+@pytest.mark.asyncio
+async def test_run_waits_for_the_lock_held_by_another_worker() -> None:
+    tenant = _tenant()
+    lock = _HeldLock(held=2)
+    reconciler = _reconciler(
+        _P24([_transaction(tenant.id)]), _Session([tenant]), lock=lock, lock_retry_seconds=0.01
+    )
+
+    with patch(_EFFECTS, new_callable=AsyncMock):
+        run = reconciler.start()
+        await asyncio.sleep(0)
+        assert run.status == "queued"
+        await reconciler.wait()
+
+    assert run.status == "completed"
+    assert lock.attempts == 3  # noqa: PLR2004
+    lock.release.assert_awaited_once_with()
+
+
+@pytest.mark.asyncio
+async def test_any_worker_reports_runs_shared_through_redis() -> None:
+    tenant, other = _tenant(), _tenant()
+    redis = FakeRedis()
+    p24 = _P24([_transaction(tenant.id), _transaction(uuid4())])
+    worker = _reconciler(p24, _Session([tenant]), store=RedisReconciliationRunStore(redis))  # type: ignore[arg-type]
+    reader = _reconciler(p24, _Session([]), store=RedisReconciliationRunStore(redis))  # type: ignore[arg-type]
+
+    with patch(_EFFECTS, new_callable=AsyncMock):
+        run = worker.start(tenant.id)
+        await worker.wait()
+
+    shared = await reader.latest(tenant.id)
+    assert shared is not None
+    assert shared is not run
+    assert (shared.id, shared.status, shared.finished_at) == (run.id, "completed", run.finished_at)
+    assert shared.counts(tenant.id).updated == 1
+    assert shared.failures == run.failures
+    assert await reader.latest() == shared
+    assert await reader.latest(other.id) is None
+    assert set(redis.ttls.values()) == {7 * 24 * 3600}
+
+    redis.error = RedisConnectionError()
+    await RedisReconciliationRunStore(redis).save(run)  # type: ignore[arg-type]
+    assert await reader.latest(tenant.id) is None
+    assert await worker.latest(tenant.id) is run
+
+
+def test_build_reconciliation_run_store_selects_backend(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("services.payment_reconciliation.get_redis_client", MagicMock)
+
+    assert isinstance(
+        build_reconciliation_run_store(Settings(P24_RECONCILE_RUN_STORE="redis")),
+        RedisReconciliationRunStore,
+    )
+    assert isinstance(
+        build_reconciliation_run_store(Settings(P24_RECONCILE_RUN_STORE="memory")),
+        InMemoryReconciliationRunStore,
+    )
+
+
+@pytest.mark.asyncio
+async def test_stop_cancels_run_in_progress() -> None:
+    tenant = _tenant()
+    p24 = _P24([_transaction(tenant.id)])
+    p24.gate = asyncio.Event()
+    reconciler = _reconciler(p24, _Session([tenant]))
+    await reconciler.stop()
+
+    run = reconciler.start()
+    await reconciler.wait(timeout=0.01)
+    await reconciler.stop()
+
+    assert run.status == "cancelled"
+    assert run.finished_at is not None
+    assert reconciler.running is None
@@ -427,6 +427,18 @@ async def test_get_transactions_pending_reconcile_returns_rows() -> None:
     session.execute.assert_awaited_once()
 
 
+@pytest.mark.asyncio
+async def test_get_transactions_pending_reconcile_for_all_tenants_skips_tenant_filter() -> None:
+    result = MagicMock(spec=Result)
+    result.scalars.return_value.all.return_value = []
+    session = AsyncMock()
+    session.execute = AsyncMock(return_value=result)
+
+    await P24Service().get_transactions_pending_reconcile(session, None)
+
+    assert "transactions.tenant_id =" not in str(session.execute.await_args.args[0])
+
+
 def test_p24_notification_status_url_uses_frontend_base(monkeypatch: pytest.MonkeyPatch) -> None:
     monkeypatch.setattr(settings, "API_BASE_URL", "")
     monkeypatch.setattr(settings, "FRONTEND_URL", "https://app.example.com")
@@ -0,0 +1,69 @@
+from datetime import UTC, datetime
+
+from core.foundation.http.conditional import http_date, not_modified
+from services.public_favicon_cache import PublicFaviconCache
+
+_T1 = datetime(2026, 1, 1, tzinfo=UTC)
+_T2 = datetime(2026, 1, 2, tzinfo=UTC)
+
+
+def test_get_drops_entry_stored_for_another_config_version() -> None:
+    cache = PublicFaviconCache()
+    stored = cache.store("k", _T1, b"ico")
+
+    assert cache.get("k", _T1) is stored
+    assert stored.etag.startswith('"')
+    assert cache.get("k", _T2) is None
+    assert cache.get("k", _T1) is None
+
+
+def test_store_evicts_least_recently_used_by_count_and_size() -> None:
+    cache = PublicFaviconCache(max_entries=2, max_bytes=5)
+    cache.store("a", _T1, b"aa")
+    cache.store("b", _T1, b"bb")
+    cache.get("a", _T1)
+    cache.store("c", _T1, b"cc")
+    assert cache.get("b", _T1) is None
+
+    cache.store("d", _T1, b"dddd")
+    assert cache.get("a", _T1) is None
+    assert cache.get("c", _T1) is None
+    assert cache.get("d", _T1) is not None
+
+
+def test_oversized_body_is_returned_but_not_kept() -> None:
+    cache = PublicFaviconCache(max_bytes=2)
+    entry = cache.store("k", _T1, b"too-big")
+
+    assert entry.body == b"too-big"
+    assert cache.get("k", _T1) is None
+
+
+def test_invalidate_and_clear() -> None:
+    cache = PublicFaviconCache(max_bytes=4)
+    cache.store("a", _T1, b"aa")
+    cache.invalidate("a")
+    cache.invalidate("missing")
+    cache.store("b", _T1, b"bbbb")
+    assert cache.get("b", _T1) is not None
+
+    cache.clear()
+    assert cache.get("b", _T1) is None
+    cache.store("c", _T1, b"cccc")
+    assert cache.get("c", _T1) is not None
+
+
+def test_not_modified_prefers_if_none_match_over_if_modified_since() -> None:
+    modified = datetime(2026, 1, 1, 8, 30, 15, 999, tzinfo=UTC)
+    date = http_date(modified)
+
+    assert date == "Thu, 01 Jan 2026 08:30:15 GMT"
+    assert not_modified(None, date, etag='"a"', last_modified=modified)
+    assert not_modified(None, "Thu, 01 Jan 2026 08:30:15", etag='"a"', last_modified=modified)
+    assert not not_modified(
+        None, "Thu, 01 Jan 2026 08:30:14 GMT", etag='"a"', last_modified=modified
+    )
+    assert not not_modified('"b"', date, etag='"a"', last_modified=modified)
+    assert not_modified('"a"', None, etag='"a"', last_modified=modified)
+    assert not not_modified(None, "not a date", etag='"a"', last_modified=modified)
+    assert not not_modified(None, None, etag='"a"', last_modified=modified)
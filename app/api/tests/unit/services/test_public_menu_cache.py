@@ -0,0 +1,42 @@
+from datetime import UTC, datetime
+
+from core.foundation.http.conditional import etag_matches, strong_etag
+from services.public_menu_cache import PublicMenuCache
+
+_MAY_1 = datetime(2026, 5, 1, tzinfo=UTC)
+_MAY_2 = datetime(2026, 5, 2, tzinfo=UTC)
+
+
+def test_entry_is_served_only_for_the_updated_at_it_was_built_from() -> None:
+    cache = PublicMenuCache()
+    entry = cache.store("pub-a", _MAY_1, b'{"data":1}')
+
+    assert entry.etag == strong_etag(b'{"data":1}')
+    assert cache.get("pub-a", _MAY_1) is entry
+    assert cache.get("pub-a", _MAY_2) is None
+    assert cache.get("pub-a", _MAY_1) is None
+
+
+def test_cache_evicts_least_recently_used_tenant_and_invalidates() -> None:
+    cache = PublicMenuCache(max_entries=2)
+    cache.store("pub-a", _MAY_1, b"a")
+    cache.store("pub-b", _MAY_1, b"b")
+    cache.get("pub-a", _MAY_1)
+
+    cache.store("pub-c", _MAY_1, b"c")
+    cache.invalidate("pub-a")
+    cache.invalidate("pub-missing")
+
+    assert cache.get("pub-a", _MAY_1) is None
+    assert cache.get("pub-b", _MAY_1) is None
+    assert cache.get("pub-c", _MAY_1) is not None
+
+
+def test_etag_matches_uses_weak_comparison_over_candidate_lists() -> None:
+    etag = strong_etag(b"menu")
+
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
@@ -0,0 +1,94 @@
+from uuid import uuid4
+
+from services.table_identity_index import (
+    CanvasTables,
+    ResolvedTableIdentity,
+    TableIdentityIndex,
+    compile_table_identities,
+)
+from services.table_status_index import parse_table_elements
+from tests.unit.conftest import FakeClock
+
+_RESYNC_SECONDS = 30
+
+
+def _tables(*elements: dict[str, object], version: int = 1) -> CanvasTables:
+    return CanvasTables(version=version, tables=parse_table_elements(list(elements)))
+
+
+def test_compile_maps_refs_and_marks_ambiguous_numbers() -> None:
+    identities = compile_table_identities(
+        {
+            uuid4(): _tables(
+                {"type": "table", "id": "a", "tableNumber": 1, "label": " Patio "},
+                {"type": "table", "id": "b", "tableNumber": 2},
+                {"type": "table", "id": "c"},
+            ),
+            uuid4(): _tables({"type": "table", "id": "d", "tableNumber": 2}),
+        }
+    )
+
+    assert identities.by_ref["a"] == ResolvedTableIdentity("a", 1, "Patio")
+    assert identities.by_ref["c"] == ResolvedTableIdentity("c", None, None)
+    assert identities.by_number[1] == ResolvedTableIdentity("a", 1, "Patio")
+    assert identities.by_number[2] is None
+    assert identities.knows(table_number=2, table_ref=None) is True
+    assert identities.knows(table_number=None, table_ref="d") is True
+    assert identities.knows(table_number=3, table_ref="x") is False
+
+
+def test_compiled_number_without_label_gets_default_label() -> None:
+    identities = compile_table_identities(
+        {uuid4(): _tables({"type": "table", "id": "a", "tableNumber": 7})}
+    )
+
+    assert identities.by_number[7].table_label == "Table 7"  # type: ignore[union-attr]
+    assert identities.by_ref["a"].table_label is None
+
+
+def test_get_expires_after_resync_and_on_layout_change() -> None:
+    clock = FakeClock()
+    index = TableIdentityIndex(resync_seconds=_RESYNC_SECONDS, clock=clock)
+    tenant_id, canvas_id = uuid4(), uuid4()
+    stored = index.store(tenant_id, {canvas_id: _tables({"type": "table", "id": "a"})})
+
+    assert index.get(tenant_id) is stored
+    clock.now += _RESYNC_SECONDS
+    assert index.get(tenant_id) is None
+
+    stored = index.store(tenant_id, stored.canvases)
+    index.layout_changed(tenant_id)
+    index.layout_changed(uuid4())
+    assert index.get(tenant_id) is None
+    assert index.tables(tenant_id, canvas_id, 1) is stored.canvases[canvas_id]
+    assert index.tables(tenant_id, canvas_id, 2) is None
+    assert index.tables(uuid4(), canvas_id, 1) is None
+
+    index.clear()
+    assert index.tables(tenant_id, canvas_id, 1) is None
+
+
+def test_store_evicts_least_recently_used_tenant() -> None:
+    index = TableIdentityIndex(max_tenants=2, clock=FakeClock())
+    first, second, third = uuid4(), uuid4(), uuid4()
+    index.store(first, {})
+    index.store(second, {})
+    index.get(first)
+
+    index.store(third, {})
+
+    assert index.get(second) is None
+    assert index.get(first) is not None
+    assert index.get(third) is not None
+
+
+def test_knows_requires_a_ref_hit_when_a_ref_is_given() -> None:
+    identities = compile_table_identities(
+        {uuid4(): _tables({"type": "table", "id": "a", "tableNumber": 1})}
+    )
+
+    assert identities.knows(table_number=1, table_ref="a")
+    assert identities.knows(table_number=1, table_ref=None)
+    assert not identities.knows(table_number=1, table_ref="new")
+    assert not identities.knows(table_number=2, table_ref=None)
+    assert not identities.knows(table_number=None, table_ref=None)
@@ -0,0 +1,78 @@
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from services.table_session_heartbeats import Heartbeat, TableSessionHeartbeats
+
+
+def _heartbeat(minutes: int = 10, ip_hash: str | None = None) -> Heartbeat:
+    now = datetime.now(UTC)
+    return Heartbeat(
+        last_seen_at=now,
+        expires_at=now + timedelta(minutes=minutes),
+        ip_hash=ip_hash,
+        client_fingerprint_hash=None,
+    )
+
+
+def _session_factory() -> tuple[MagicMock, MagicMock]:
+    session = MagicMock()
+    session.__aenter__ = AsyncMock(return_value=session)
+    session.__aexit__ = AsyncMock(return_value=None)
+    session.execute = AsyncMock()
+    session.commit = AsyncMock()
+    return MagicMock(return_value=session), session
+
+
+def test_grace_covers_a_late_flush_and_is_zero_when_disabled() -> None:
+    assert TableSessionHeartbeats(flush_seconds=5).grace == timedelta(seconds=10)
+    assert TableSessionHeartbeats(flush_seconds=0).enabled is False
+    assert TableSessionHeartbeats(flush_seconds=0).grace == timedelta(0)
+
+
+@pytest.mark.asyncio
+async def test_flush_writes_latest_heartbeat_per_session_in_one_batch() -> None:
+    factory, session = _session_factory()
+    heartbeats = TableSessionHeartbeats(flush_seconds=5, session_factory=factory)
+    first, second, released = uuid4(), uuid4(), uuid4()
+    heartbeats.record(first, _heartbeat(minutes=9))
+    latest = _heartbeat(minutes=10, ip_hash="ip")
+    heartbeats.record(first, latest)
+    heartbeats.record(second, _heartbeat())
+    heartbeats.record(released, _heartbeat())
+    heartbeats.discard(released)
+
+    assert await heartbeats.flush() == 2  # noqa: PLR2004
+    assert await heartbeats.flush() == 0
+
+    statement, params = session.execute.await_args.args
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert "table_sessions.expires_at < %(b_expires_at)s" in sql
+    assert "coalesce(%(b_ip_hash)s, table_sessions.ip_hash)" in sql
+    assert {row["b_id"]: row["b_expires_at"] for row in params}[first] == latest.expires_at
+    session.commit.assert_awaited_once()
+    assert heartbeats.pending(first) is None
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_heartbeats_without_overwriting_newer_ones() -> None:
+    factory, session = _session_factory()
+    heartbeats = TableSessionHeartbeats(flush_seconds=5, session_factory=factory)
+    table_session_id = uuid4()
+    heartbeats.record(table_session_id, _heartbeat(minutes=9))
+    newer = _heartbeat(minutes=10)
+
+    async def fail(*_: object) -> None:
+        heartbeats.record(table_session_id, newer)
+        raise OSError
+
+    session.execute.side_effect = fail
+
+    with pytest.raises(OSError):  # noqa: PT011
+        await heartbeats.flush()
+    await heartbeats.close()
+
+    assert heartbeats.pending(table_session_id) is newer
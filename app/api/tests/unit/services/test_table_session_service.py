@@ -1,26 +1,43 @@
 from datetime import UTC, datetime, timedelta
 from types import SimpleNamespace
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 from uuid import uuid4
 
 import pytest
+from sqlalchemy import inspect
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.engine import Result
 
 from core.exceptions import BadRequestError, ConflictError, NotFoundResponse
-from core.models import AuditLog, TableSessionOrigin, TableSessionStatus
+from core.models import AuditLog, TableSession, TableSessionOrigin, TableSessionStatus
+from services.table_identity_index import ResolvedTableIdentity, table_identity_index
+from services.table_session_heartbeats import (
+    Heartbeat,
+    TableSessionHeartbeats,
+    table_session_heartbeats,
+)
 from services.table_session_service import TableSessionService
+from services.table_status_index import table_status_index
+from tests.unit.conftest import commit_session
+
+
+def _canvas_results(*element_rows: object) -> list[MagicMock]:
+    """Results of loading a tenant's table index: canvas versions, then their elements."""
+    canvases = [(uuid4(), 1, elements) for elements in element_rows]
+    versions = MagicMock(spec=Result)
+    versions.all.return_value = [(canvas_id, version) for canvas_id, version, _ in canvases]
+    if not canvases:
+        return [versions]
+    elements = MagicMock(spec=Result)
+    elements.all.return_value = canvases
+    return [versions, elements]
 
 
 def _sql_session_from_elements(
-    *element_rows: list[object],
+    *element_rows: object,
 ) -> AsyncMock:
-    mock_result = MagicMock(spec=Result)
-    mock_scalars = MagicMock()
-    mock_scalars.all.return_value = list(element_rows)
-    mock_result.scalars.return_value = mock_scalars
-
     sa = AsyncMock()
-    sa.execute = AsyncMock(return_value=mock_result)
+    sa.execute = AsyncMock(side_effect=_canvas_results(*element_rows))
     return sa
 
 
@@ -39,6 +56,27 @@ def _result_with(
     return m
 
 
+_INSERTED = object()
+
+
+def _replay(*results: object) -> AsyncMock:
+    """``session.execute`` returning ``results`` in order.
+
+    ``_INSERTED`` answers an ``INSERT ... RETURNING`` with the row it inserts.
+    """
+    pending = list(results)
+
+    async def execute(statement: object, *_: object) -> object:
+        result = pending.pop(0)
+        if result is not _INSERTED:
+            return result
+        params = statement.compile(dialect=postgresql.dialect()).params  # type: ignore[attr-defined]
+        row = TableSession(**{k: v for k, v in params.items() if k in TableSession.__table__.c})
+        return _result_with(scalar_id="use-scalar", scalar=row)
+
+    return AsyncMock(side_effect=execute)
+
+
 def _make_tenant() -> SimpleNamespace:
     tid = uuid4()
     return SimpleNamespace(
@@ -79,6 +117,7 @@ def _ts_mock(
         id=uuid4(),
         status=status,
         origin=origin,
+        tenant_public_id="pub-rest-1",
         table_ref=table_ref,
         table_number=table_number,
         lock_token=lock_token,
@@ -94,6 +133,7 @@ def _ts_mock(
 def _sql_session() -> MagicMock:
     s = MagicMock()
     s.flush = AsyncMock()
+    s.info = {}
     return s
 
 
@@ -209,87 +249,292 @@ async def test_resolve_table_identity_not_found_for_number() -> None:
 
 
 @pytest.mark.asyncio
-async def test_list_active_sessions() -> None:
+async def test_resolve_table_identity_recompiles_for_unknown_ref_with_known_number() -> None:
+    tid, main = uuid4(), uuid4()
+    versions = MagicMock(spec=Result)
+    versions.all.return_value = [(main, 1)]
+    elements = MagicMock(spec=Result)
+    elements.all.return_value = [(main, 1, [{"type": "table", "id": "old", "tableNumber": 4}])]
+    added_versions = MagicMock(spec=Result)
+    added_versions.all.return_value = [(main, 2)]
+    added_elements = MagicMock(spec=Result)
+    added_elements.all.return_value = [
+        (main, 2, [{"type": "table", "id": "new", "tableNumber": 4, "label": "Terrace"}])
+    ]
+    session = AsyncMock()
+    session.execute = AsyncMock(side_effect=[versions, elements, added_versions, added_elements])
+    svc = TableSessionService()
+
+    try:
+        old = await svc.resolve_table_identity(session, tid, table_number=4)
+        # Another worker replaced the table; this worker's index is stale but still fresh.
+        scanned = await svc.resolve_table_identity(session, tid, table_number=4, table_ref="new")
+    finally:
+        table_identity_index.clear()
+
+    assert old.table_ref == "old"
+    assert scanned == ResolvedTableIdentity("new", 4, "Terrace")
+    assert session.execute.await_count == 4  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_resolve_table_identity_serves_compiled_index_until_layout_changes() -> None:
+    tid, main, patio = uuid4(), uuid4(), uuid4()
+    versions = MagicMock(spec=Result)
+    versions.all.return_value = [(main, 1), (patio, 1)]
+    elements = MagicMock(spec=Result)
+    elements.all.return_value = [
+        (main, 1, [{"type": "table", "id": "m-1", "tableNumber": 1}]),
+        (patio, 1, [{"type": "table", "id": "p-2", "tableNumber": 2}]),
+    ]
+    changed_versions = MagicMock(spec=Result)
+    changed_versions.all.return_value = [(main, 1), (patio, 2)]
+    changed_elements = MagicMock(spec=Result)
+    changed_elements.all.return_value = [
+        (patio, 2, [{"type": "table", "id": "p-3", "tableNumber": 3}]),
+    ]
+    session = AsyncMock()
+    session.execute = AsyncMock(
+        side_effect=[versions, elements, changed_versions, changed_elements, changed_versions]
+    )
+    svc = TableSessionService()
+
+    try:
+        first = await svc.resolve_table_identity(session, tid, table_number=2)
+        cached = await svc.resolve_table_identity(session, tid, table_ref="m-1")
+        assert session.execute.await_count == 2  # noqa: PLR2004
+
+        table_identity_index.layout_changed(tid)
+        added = await svc.resolve_table_identity(session, tid, table_number=3)
+        with pytest.raises(NotFoundResponse):
+            await svc.resolve_table_identity(session, tid, table_number=2)
+    finally:
+        table_identity_index.clear()
+
+    assert first.table_ref == "p-2"
+    assert cached.table_number == 1
+    assert added.table_ref == "p-3"
+    reloaded = str(session.execute.await_args_list[3].args[0].compile())
+    assert "floor_canvases.id IN" in reloaded
+    assert session.execute.await_count == 5  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_list_active_sessions_skips_lapsed_locks_without_writing() -> None:
     tid = uuid4()
-    r_expire = _result_with(all_rows=[])
     r_list = _result_with(all_rows=[_ts_mock()])
 
     session = _sql_session()
-    session.execute = AsyncMock(side_effect=[r_expire, r_list])
+    session.execute = AsyncMock(return_value=r_list)
     session.flush = AsyncMock()
 
     svc = TableSessionService()
     out = await svc.list_active_sessions(session, tid)
 
     assert len(out) == 1
+    statement = session.execute.await_args.args[0]
+    assert "table_sessions.expires_at >" in str(statement)
+    session.flush.assert_not_awaited()
+    # Held through the same heartbeat grace that acquire waits before expiring it.
+    cutoff = statement.compile(dialect=postgresql.dialect()).params["expires_at_1"]
+    assert cutoff <= datetime.now(UTC) - table_session_heartbeats.grace
+    assert table_session_heartbeats.grace > timedelta(0)
 
 
 @pytest.mark.asyncio
-async def test_list_active_sessions_expires_stale() -> None:
-    tid = uuid4()
-    past = datetime.now(UTC) - timedelta(minutes=5)
-    stale = _ts_mock(expires_at=past, lock_token="x")
+async def test_expire_stale_sessions_is_one_update_returning_released_tables() -> None:
+    result = MagicMock(spec=Result)
+    result.all.return_value = [("pub-1", "t-1"), ("pub-2", "t-9")]
+    session = _sql_session()
+    session.execute = AsyncMock(return_value=result)
+    session.flush = AsyncMock()
+
+    with patch("services.table_session_service.table_status_index") as index:
+        expired = await TableSessionService().expire_stale_sessions(session)
+        index.session_changed.assert_not_called()
+        await commit_session(session)
+
+    assert expired == 2  # noqa: PLR2004
+    session.execute.assert_awaited_once()
+    session.flush.assert_not_awaited()
+    sql = str(session.execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+    assert sql.startswith("UPDATE table_sessions SET status=")
+    assert "table_sessions.expires_at <=" in sql
+    assert "table_sessions.tenant_id" not in sql
+    assert sql.endswith("RETURNING table_sessions.tenant_public_id, table_sessions.table_ref")
+    assert [c.args for c in index.session_changed.call_args_list] == [
+        ("pub-1", "t-1", None),
+        ("pub-2", "t-9", None),
+    ]
 
-    r_expire = _result_with(all_rows=[stale])
-    r_list = _result_with(all_rows=[])
 
+@pytest.mark.asyncio
+async def test_expire_stale_sessions_of_one_table() -> None:
+    result = MagicMock(spec=Result)
+    result.all.return_value = []
     session = _sql_session()
-    session.execute = AsyncMock(side_effect=[r_expire, r_list])
-    session.flush = AsyncMock()
+    session.execute = AsyncMock(return_value=result)
+
+    expired = await TableSessionService().expire_stale_sessions(
+        session, tenant_id=uuid4(), table_ref="t-1"
+    )
+
+    assert expired == 0
+    sql = str(session.execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "table_sessions.tenant_id = " in sql
+    assert "table_sessions.table_ref = " in sql
+
+
+def _rows(*rows: object) -> MagicMock:
+    m = MagicMock(spec=Result)
+    m.all.return_value = list(rows)
+    return m
 
+
+def _kitchen_db(*docs: dict) -> MagicMock:
+    async def adocs() -> object:
+        for doc in docs:
+            yield doc
+
+    coll = MagicMock()
+    coll.find.side_effect = lambda *_args: adocs()
+    db = MagicMock()
+    db.__getitem__.return_value = coll
+    return db
+
+
+@pytest.mark.asyncio
+async def test_get_table_status_loads_once_and_reuses_canvas_geometry() -> None:
+    tenant = _make_tenant()
+    now = datetime.now(UTC)
+    earlier = _ts_mock(table_ref="t-1", expires_at=now + timedelta(minutes=1))
+    later = _ts_mock(table_ref="t-1", expires_at=now + timedelta(minutes=9))
+    canvas_id = uuid4()
+    canvas_row = SimpleNamespace(id=canvas_id, version=2, name="Main", width=10, height=20)
+
+    session = _sql_session()
+    session.execute = AsyncMock(
+        side_effect=[
+            _result_with(all_rows=[earlier, later]),
+            _rows(canvas_row),
+            _rows((canvas_id, _table_row(table_ref="t-1") + _table_row(table_ref="t-2"))),
+        ]
+    )
+    db = _kitchen_db({"_id": "K-1", "tableId": "t-2"})
     svc = TableSessionService()
-    out = await svc.list_active_sessions(session, tid)
 
-    assert out == []
-    assert session.flush.await_count >= 1
+    try:
+        state = await svc.get_table_status(session, db, tenant=tenant)
+
+        assert state.tenant_id == tenant.id
+        assert state.session_expiry == {"t-1": later.expires_at}
+        assert state.active_orders == {"K-1": "t-2"}
+        assert state.lock_grace == table_session_heartbeats.grace
+        (canvas,) = state.canvases
+        assert (canvas.name, canvas.width, canvas.height) == ("Main", 10, 20)
+        assert [t.id for t in canvas.tables] == ["t-1", "t-2"]
+
+        assert await svc.get_table_status(session, db, tenant=tenant) is state
+        assert session.execute.await_count == 3  # noqa: PLR2004
+
+        table_status_index.layout_changed(tenant.id)
+        session.execute = AsyncMock(
+            side_effect=[
+                _result_with(all_rows=[]),
+                _rows(SimpleNamespace(id=canvas_id, version=2, name="Patio", width=10, height=20)),
+            ]
+        )
+        reloaded = await svc.get_table_status(session, db, tenant=tenant)
+
+        assert session.execute.await_count == 2  # noqa: PLR2004
+        assert reloaded.canvases[0].name == "Patio"
+        assert reloaded.canvases[0].tables is canvas.tables
+        assert reloaded.session_expiry == {}
+    finally:
+        table_status_index.clear()
 
 
 @pytest.mark.asyncio
 async def test_acquire_mobile_session_creates_new() -> None:
     tenant = _make_tenant()
-    floor = _result_with(all_rows=[_table_row()])
+    floor = _canvas_results(_table_row())
     expire = _result_with(all_rows=[])
     get_active = _result_with(scalar_id="use-scalar", scalar=None)
 
     session = _sql_session()
-    session.execute = AsyncMock(side_effect=[floor, expire, get_active])
-    session.flush = AsyncMock()
+    session.execute = _replay(*floor, expire, get_active, _INSERTED)
 
     coll = AsyncMock()
     coll.find_one = AsyncMock(return_value=None)
     db = MagicMock()
     db.__getitem__.return_value = coll
 
-    svc = TableSessionService()
-    got = await svc.acquire_mobile_session(
-        session,
-        db,
-        tenant=tenant,
-        table_number=1,
-        table_ref=None,
-        lock_token=None,
-        session_id="sid-1",
-        client_ip="1.1.1.1",
-        client_fingerprint="fp",
+    state = table_status_index.store(
+        tenant.public_id,
+        tenant_id=tenant.id,
+        canvases=[],
+        session_expiry={},
+        active_orders={},
     )
+    svc = TableSessionService()
+    try:
+        got = await svc.acquire_mobile_session(
+            session,
+            db,
+            tenant=tenant,
+            table_number=1,
+            table_ref=None,
+            lock_token=None,
+            session_id="sid-1",
+            client_ip="1.1.1.1",
+            client_fingerprint="fp",
+        )
+        assert state.session_expiry == {}
+        await commit_session(session)
+    finally:
+        table_status_index.clear()
 
     assert got.table_ref == "t-1"
     assert got.origin == TableSessionOrigin.MOBILE
     assert got.session_id == "sid-1"
-    session.add.assert_called_once()
-    session.flush.assert_awaited()
+    assert state.session_expiry == {"t-1": got.expires_at}
+    inserted = str(session.execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (tenant_id, table_ref) WHERE status = 'active' DO NOTHING" in inserted
+    session.add.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_insert_active_session_targets_the_one_active_session_per_table_index() -> None:
+    index = next(
+        index
+        for index in TableSession.__table__.indexes
+        if index.name == "uq_table_sessions_active_tenant_table"
+    )
+    session = _sql_session()
+    session.execute = AsyncMock(return_value=_result_with(scalar_id="use-scalar", scalar=None))
+
+    created = await TableSessionService()._insert_active_session(
+        session, tenant=_make_tenant(), table_ref="t-1", lock_token="tok"
+    )
+
+    assert created is None
+    inserted = str(session.execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (tenant_id, table_ref) WHERE status = 'active' DO NOTHING" in inserted
+    assert index.unique
+    assert [column.name for column in index.columns] == ["tenant_id", "table_ref"]
+    assert str(index.dialect_options["postgresql"]["where"]) == "status = 'active'"
 
 
 @pytest.mark.asyncio
 async def test_acquire_mobile_session_waiter_active_raises() -> None:
     tenant = _make_tenant()
-    floor = _result_with(all_rows=[_table_row()])
+    floor = _canvas_results(_table_row())
     expire = _result_with(all_rows=[])
     wait = _ts_mock(origin=TableSessionOrigin.WAITER)
     get_active = _result_with(scalar_id="use-scalar", scalar=wait)
 
     session = _sql_session()
-    session.execute = AsyncMock(side_effect=[floor, expire, get_active])
+    session.execute = AsyncMock(side_effect=[*floor, expire, get_active])
 
     db = MagicMock()
     db.__getitem__.return_value = AsyncMock()
@@ -313,12 +558,12 @@ async def test_acquire_mobile_session_waiter_active_raises() -> None:
 async def test_acquire_mobile_session_refresh_same_lock() -> None:
     tenant = _make_tenant()
     mobile = _ts_mock(lock_token="same", table_ref="t-1")
-    floor = _result_with(all_rows=[_table_row()])
+    floor = _canvas_results(_table_row())
     expire = _result_with(all_rows=[])
     get_active = _result_with(scalar_id="use-scalar", scalar=mobile)
 
     session = _sql_session()
-    session.execute = AsyncMock(side_effect=[floor, expire, get_active])
+    session.execute = AsyncMock(side_effect=[*floor, expire, get_active])
     session.flush = AsyncMock()
 
     db = MagicMock()
@@ -347,12 +592,12 @@ async def test_acquire_mobile_session_refresh_same_lock() -> None:
 async def test_acquire_mobile_session_other_mobile_lock_raises() -> None:
     tenant = _make_tenant()
     mobile = _ts_mock(lock_token="a", table_ref="t-1")
-    floor = _result_with(all_rows=[_table_row()])
+    floor = _canvas_results(_table_row())
     expire = _result_with(all_rows=[])
     get_active = _result_with(scalar_id="use-scalar", scalar=mobile)
 
     session = _sql_session()
-    session.execute = AsyncMock(side_effect=[floor, expire, get_active])
+    session.execute = AsyncMock(side_effect=[*floor, expire, get_active])
     db = MagicMock()
     db.__getitem__.return_value = AsyncMock()
 
@@ -374,12 +619,12 @@ async def test_acquire_mobile_session_other_mobile_lock_raises() -> None:
 @pytest.mark.asyncio
 async def test_acquire_mobile_session_kitchen_order_blocks() -> None:
     tenant = _make_tenant()
-    floor = _result_with(all_rows=[_table_row()])
+    floor = _canvas_results(_table_row())
     expire = _result_with(all_rows=[])
     get_active = _result_with(scalar_id="use-scalar", scalar=None)
 
     session = _sql_session()
-    session.execute = AsyncMock(side_effect=[floor, expire, get_active])
+    session.execute = AsyncMock(side_effect=[*floor, expire, get_active])
     coll = AsyncMock()
     coll.find_one = AsyncMock(return_value={"_id": "k1"})
     db = MagicMock()
@@ -401,7 +646,80 @@ async def test_acquire_mobile_session_kitchen_order_blocks() -> None:
 
 
 @pytest.mark.asyncio
-async def test_refresh_mobile_session() -> None:
+@pytest.mark.parametrize(("winner_token", "refreshed"), [("mine", True), ("theirs", False)])
+async def test_acquire_mobile_session_after_losing_insert_race(
+    winner_token: str, refreshed: bool
+) -> None:
+    tenant = _make_tenant()
+    winner = _ts_mock(lock_token=winner_token, table_ref="t-1")
+    none = _result_with(scalar_id="use-scalar", scalar=None)
+    session = _sql_session()
+    session.execute = AsyncMock(
+        side_effect=[
+            *_canvas_results(_table_row()),
+            _result_with(all_rows=[]),
+            none,
+            none,
+            none,
+            _result_with(scalar_id="use-scalar", scalar=winner),
+        ]
+    )
+    coll = AsyncMock()
+    coll.find_one = AsyncMock(return_value=None)
+    db = MagicMock()
+    db.__getitem__.return_value = coll
+
+    svc = TableSessionService()
+    acquire = svc.acquire_mobile_session(
+        session,
+        db,
+        tenant=tenant,
+        table_number=1,
+        table_ref=None,
+        lock_token="mine",
+        session_id=None,
+        client_ip=None,
+        client_fingerprint=None,
+    )
+    if refreshed:
+        assert await acquire is winner
+    else:
+        with pytest.raises(ConflictError, match="unavailable"):
+            await acquire
+
+
+@pytest.mark.asyncio
+async def test_acquire_mobile_session_gives_up_when_lock_keeps_changing_hands() -> None:
+    tenant = _make_tenant()
+    none = _result_with(scalar_id="use-scalar", scalar=None)
+    session = _sql_session()
+    session.execute = AsyncMock(
+        side_effect=[*_canvas_results(_table_row()), _result_with(all_rows=[]), *[none] * 6]
+    )
+    coll = AsyncMock()
+    coll.find_one = AsyncMock(return_value=None)
+    db = MagicMock()
+    db.__getitem__.return_value = coll
+
+    svc = TableSessionService()
+    with pytest.raises(ConflictError, match="unavailable"):
+        await svc.acquire_mobile_session(
+            session,
+            db,
+            tenant=tenant,
+            table_number=1,
+            table_ref=None,
+            lock_token=None,
+            session_id=None,
+            client_ip=None,
+            client_fingerprint=None,
+        )
+
+    assert session.execute.await_count == 9  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_refresh_mobile_session_writes_through_without_buffer() -> None:
     lock = "lt-x"
     mobile = _ts_mock(lock_token=lock)
     r1 = _result_with(scalar_id="use-scalar", scalar=mobile)
@@ -411,14 +729,78 @@ async def test_refresh_mobile_session() -> None:
     session.flush = AsyncMock()
 
     svc = TableSessionService()
-    out = await svc.refresh_mobile_session(
-        session, lock_token=lock, client_ip="1.1.1.1", client_fingerprint="f"
-    )
+    with patch(
+        "services.table_session_service.table_session_heartbeats",
+        TableSessionHeartbeats(flush_seconds=0),
+    ):
+        out = await svc.refresh_mobile_session(
+            session, lock_token=lock, client_ip="1.1.1.1", client_fingerprint="f"
+        )
 
     assert out is mobile
     session.flush.assert_awaited()
 
 
+@pytest.mark.asyncio
+async def test_refresh_mobile_session_buffers_heartbeat_without_writing() -> None:
+    lock = "lt-x"
+    before = datetime.now(UTC) + timedelta(minutes=1)
+    mobile = TableSession(
+        id=uuid4(),
+        tenant_public_id="pub-rest-1",
+        table_ref="t-1",
+        lock_token=lock,
+        origin=TableSessionOrigin.MOBILE,
+        status=TableSessionStatus.ACTIVE,
+        expires_at=before,
+        ip_hash="old-ip",
+    )
+    session = _sql_session()
+    session.execute = AsyncMock(side_effect=[_result_with(scalar_id="use-scalar", scalar=mobile)])
+    heartbeats = TableSessionHeartbeats(flush_seconds=5)
+
+    with patch("services.table_session_service.table_session_heartbeats", heartbeats):
+        out = await TableSessionService().refresh_mobile_session(
+            session, lock_token=lock, client_ip=None, client_fingerprint="f"
+        )
+
+    pending = heartbeats.pending(mobile.id)
+    assert pending is not None
+    assert out is mobile
+    assert out.expires_at == pending.expires_at > before
+    assert out.ip_hash == "old-ip"
+    assert out.client_fingerprint_hash == pending.client_fingerprint_hash
+    assert not inspect(out).attrs.expires_at.history.has_changes()
+    session.flush.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_lock_lapses_only_after_heartbeat_grace() -> None:
+    now = datetime.now(UTC)
+    recent = _ts_mock(expires_at=now - timedelta(seconds=3))
+    buffered = _ts_mock(expires_at=now - timedelta(minutes=5))
+    lapsed = _ts_mock(expires_at=now - timedelta(seconds=30))
+    heartbeats = TableSessionHeartbeats(flush_seconds=5)
+    heartbeats.record(
+        buffered.id,
+        Heartbeat(
+            last_seen_at=now,
+            expires_at=now + timedelta(minutes=10),
+            ip_hash=None,
+            client_fingerprint_hash=None,
+        ),
+    )
+    session = _sql_session()
+
+    with patch("services.table_session_service.table_session_heartbeats", heartbeats):
+        for table_session in (recent, buffered, lapsed):
+            await TableSessionService()._expire_session_if_needed(session, table_session)
+
+    assert recent.status == TableSessionStatus.ACTIVE
+    assert buffered.status == TableSessionStatus.ACTIVE
+    assert lapsed.status == TableSessionStatus.EXPIRED
+
+
 @pytest.mark.asyncio
 async def test_refresh_mobile_session_not_active() -> None:
     lock = "lt-x"
@@ -460,10 +842,23 @@ async def test_release_mobile_session() -> None:
     session.execute = AsyncMock(return_value=r1)
     session.flush = AsyncMock()
 
+    state = table_status_index.store(
+        "pub-rest-1",
+        tenant_id=uuid4(),
+        canvases=[],
+        session_expiry={"t-1": mobile.expires_at},
+        active_orders={},
+    )
     svc = TableSessionService()
-    out = await svc.release_mobile_session(session, lock_token=lock)
+    try:
+        out = await svc.release_mobile_session(session, lock_token=lock)
+        assert state.session_expiry == {"t-1": mobile.expires_at}
+        await commit_session(session)
+    finally:
+        table_status_index.clear()
 
     assert out.status == TableSessionStatus.RELEASED
+    assert state.session_expiry == {}
     session.flush.assert_awaited()
 
 
@@ -529,8 +924,7 @@ async def test_acquire_waiter_session_creates() -> None:
     r0 = _result_with(all_rows=[])
     r1 = _result_with(scalar_id="use-scalar", scalar=None)
     session = _sql_session()
-    session.execute = AsyncMock(side_effect=[r0, r1])
-    session.flush = AsyncMock()
+    session.execute = _replay(r0, r1, _INSERTED)
 
     svc = TableSessionService()
     out = await svc.acquire_waiter_session(
@@ -544,8 +938,29 @@ async def test_acquire_waiter_session_creates() -> None:
 
     assert out.table_ref == "n1"
     assert out.origin == TableSessionOrigin.WAITER
-    session.add.assert_called_once()
-    session.flush.assert_awaited()
+    assert out.table_number == 2  # noqa: PLR2004
+    session.add.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_acquire_waiter_session_losing_race_to_guest_raises() -> None:
+    tenant = _make_tenant()
+    mobile = _ts_mock(origin=TableSessionOrigin.MOBILE, table_ref="tb")
+    session = _sql_session()
+    session.execute = AsyncMock(
+        side_effect=[
+            _result_with(all_rows=[]),
+            _result_with(scalar_id="use-scalar", scalar=None),
+            _result_with(scalar_id="use-scalar", scalar=None),
+            _result_with(scalar_id="use-scalar", scalar=mobile),
+        ]
+    )
+
+    svc = TableSessionService()
+    with pytest.raises(ConflictError, match="locked by a mobile"):
+        await svc.acquire_waiter_session(
+            session, tenant=tenant, table_ref="tb", table_label="L", waiter_user_id=None
+        )
 
 
 @pytest.mark.asyncio
@@ -658,11 +1073,11 @@ async def test_resolve_new_lock_token_preferred_taken() -> None:
 
 
 @pytest.mark.asyncio
-async def test_list_table_refs_with_active_kitchen_orders() -> None:
+async def test_list_active_kitchen_orders() -> None:
     async def adocs() -> object:
-        yield {"tableId": "a"}
-        yield {"tableId": "  "}
-        yield {"tableId": "b"}
+        yield {"_id": "K-1", "tableId": "a"}
+        yield {"_id": "K-2", "tableId": "  "}
+        yield {"_id": "K-3", "tableId": "b"}
 
     coll = MagicMock()
     coll.find.return_value = adocs()
@@ -670,8 +1085,8 @@ async def test_list_table_refs_with_active_kitchen_orders() -> None:
     db.__getitem__.return_value = coll
 
     svc = TableSessionService()
-    refs = await svc.list_table_refs_with_active_kitchen_orders(db, tenant_public_id="r1")
-    assert refs == {"a", "b"}
+    orders = await svc.list_active_kitchen_orders(db, tenant_public_id="r1")
+    assert orders == {"K-1": "a", "K-3": "b"}
 
 
 @pytest.mark.asyncio
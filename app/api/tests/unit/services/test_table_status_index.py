@@ -0,0 +1,194 @@
+from datetime import UTC, datetime, timedelta
+from uuid import uuid4
+
+from services.table_status_index import (
+    CanvasLayout,
+    TableStatusIndex,
+    TenantTableState,
+    _coerce_float,
+    _coerce_optional_int,
+    parse_table_elements,
+)
+from tests.unit.conftest import FakeClock
+
+_RESYNC_SECONDS = 30
+
+
+def _index(clock: FakeClock, **kwargs: object) -> TableStatusIndex:
+    return TableStatusIndex(resync_seconds=_RESYNC_SECONDS, clock=clock, **kwargs)
+
+
+def _canvas(version: int = 1) -> CanvasLayout:
+    return CanvasLayout(
+        canvas_id=uuid4(),
+        version=version,
+        name="Main",
+        width=100,
+        height=100,
+        tables=parse_table_elements([{"type": "table", "id": "t-1", "tableNumber": 1}]),
+    )
+
+
+def _store(index: TableStatusIndex, public_id: str = "pub-1", **kwargs: object) -> TenantTableState:
+    defaults: dict[str, object] = {
+        "tenant_id": uuid4(),
+        "canvases": [_canvas()],
+        "session_expiry": {},
+        "active_orders": {},
+    }
+    return index.store(public_id, **{**defaults, **kwargs})
+
+
+def test_coerce_float() -> None:
+    assert _coerce_float(3) == 3.0  # noqa: PLR2004
+    assert _coerce_float("x") == 0.0
+
+
+def test_coerce_optional_int() -> None:
+    assert _coerce_optional_int(5) == 5  # noqa: PLR2004
+    assert _coerce_optional_int("42") == 42  # noqa: PLR2004
+    assert _coerce_optional_int("4.2") is None
+
+
+def test_parse_table_elements_skips_non_tables_and_bad_ids() -> None:
+    tables = parse_table_elements(
+        [
+            "not-a-dict",
+            {"type": "wall", "id": "w1"},
+            {"type": "table", "id": 99},
+            {"type": "table", "id": "   "},
+            {
+                "type": "table",
+                "id": "ok",
+                "tableNumber": "2",
+                "x": 5,
+                "w": 0,
+                "label": 42,
+                "rotation": 90,
+                "seats": 4,
+            },
+        ]
+    )
+
+    assert len(tables) == 1
+    table = tables[0]
+    assert table.id == "ok"
+    assert table.table_number == 2  # noqa: PLR2004
+    assert table.label is None
+    assert table.x == 5.0  # noqa: PLR2004
+    assert table.w == 1.0
+    assert table.rotation == 90.0  # noqa: PLR2004
+    assert table.seats == 4  # noqa: PLR2004
+    assert parse_table_elements(None) == ()
+
+
+def test_get_returns_state_until_resync_is_due() -> None:
+    clock = FakeClock()
+    index = _index(clock)
+    assert index.get("pub-1") is None
+
+    state = _store(index)
+    assert index.get("pub-1") is state
+
+    clock.now += _RESYNC_SECONDS
+    assert index.get("pub-1") is None
+
+
+def test_geometry_is_reused_for_the_same_canvas_version_even_when_stale() -> None:
+    clock = FakeClock()
+    index = _index(clock)
+    canvas = _canvas(version=3)
+    _store(index, canvases=[canvas])
+    clock.now += _RESYNC_SECONDS
+
+    assert index.geometry("pub-1", canvas.canvas_id, 3) is canvas.tables
+    assert index.geometry("pub-1", canvas.canvas_id, 4) is None
+    assert index.geometry("pub-other", canvas.canvas_id, 3) is None
+
+
+def test_store_evicts_least_recently_used_tenant() -> None:
+    index = _index(FakeClock(), max_tenants=2)
+    _store(index, "pub-1")
+    _store(index, "pub-2")
+    index.get("pub-1")
+    _store(index, "pub-3")
+
+    assert index.get("pub-1") is not None
+    assert index.get("pub-2") is None
+    assert index.get("pub-3") is not None
+
+
+def test_session_changed_locks_and_releases_table() -> None:
+    index = _index(FakeClock())
+    expires_at = datetime.now(UTC) + timedelta(minutes=10)
+    index.session_changed("pub-1", "t-1", expires_at)
+    state = _store(index)
+
+    index.session_changed("pub-1", "t-1", expires_at)
+    assert state.session_expiry == {"t-1": expires_at}
+
+    index.session_changed("pub-1", "t-1", None)
+    assert state.session_expiry == {}
+
+
+def test_order_changed_tracks_active_orders_only() -> None:
+    index = _index(FakeClock())
+    index.order_changed({"_id": "K-0", "restaurantId": "pub-1", "tableId": "t-1", "status": "new"})
+    state = _store(index)
+
+    index.order_changed({"_id": "K-1", "restaurantId": "pub-1", "tableId": "t-1", "status": "new"})
+    index.order_changed({"_id": "K-2", "restaurantId": "pub-1", "tableId": " ", "status": "new"})
+    assert state.active_orders == {"K-1": "t-1"}
+
+    index.order_changed({"_id": "K-1", "restaurantId": "pub-1", "tableId": "t-1", "status": "paid"})
+    assert state.active_orders == {}
+
+    index.order_changed({"_id": "K-3", "restaurantId": "pub-1", "tableId": "t-2", "status": "new"})
+    index.order_removed("pub-1", "K-3")
+    index.order_removed("pub-other", "K-3")
+    assert state.active_orders == {}
+
+
+def test_layout_changed_forces_reload_of_that_tenant() -> None:
+    index = _index(FakeClock())
+    tenant_id = uuid4()
+    _store(index, "pub-1", tenant_id=tenant_id)
+    _store(index, "pub-2")
+
+    index.layout_changed(tenant_id)
+
+    assert index.get("pub-1") is None
+    assert index.get("pub-2") is not None
+    index.clear()
+    assert index.get("pub-2") is None
+
+
+def test_reserved_until_prefers_session_expiry_over_kitchen_fallback() -> None:
+    now = datetime.now(UTC)
+    fallback = timedelta(seconds=90)
+    state = TenantTableState(
+        tenant_id=uuid4(),
+        canvases=[],
+        session_expiry={"t-1": now + timedelta(minutes=5), "t-2": now - timedelta(seconds=1)},
+        active_orders={"K-1": "t-1", "K-2": "t-3"},
+    )
+
+    assert state.reserved_until(now, fallback) == {
+        "t-1": now + timedelta(minutes=5),
+        "t-3": now + fallback,
+    }
+
+
+def test_reserved_until_holds_session_locks_through_the_grace() -> None:
+    now = datetime.now(UTC)
+    grace = timedelta(seconds=10)
+    state = TenantTableState(
+        tenant_id=uuid4(),
+        canvases=[],
+        session_expiry={"t-1": now - timedelta(seconds=5), "t-2": now - grace},
+        lock_grace=grace,
+    )
+
+    assert state.reserved_until(now, timedelta(seconds=90)) == {
+        "t-1": now - timedelta(seconds=5) + grace
+    }
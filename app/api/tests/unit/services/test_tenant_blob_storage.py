@@ -14,7 +14,9 @@ from core.exceptions import (
     ServiceUnavailableError,
     TooManyRequestsError,
 )
+from core.foundation.image_processing import ImageProcessor
 from core.foundation.infra.config import settings
+from core.foundation.object_storage import MinioObjectStorageBackend, ObjectStorage
 from services.tenant_logo_storage_service import TenantLogoStorageService
 from services.tenant_menu_image_storage_service import TenantMenuImageStorageService
 from services.tenant_mobile_favicon_storage_service import TenantMobileFaviconStorageService
@@ -55,84 +57,91 @@ class _ObjectStream:
         return
 
 
+def _storage(internal: MagicMock, public: MagicMock) -> ObjectStorage:
+    return ObjectStorage(
+        MinioObjectStorageBackend(internal, public, settings.MINIO_BUCKET), max_workers=2
+    )
+
+
 def _new_logo_service(internal: MagicMock, public: MagicMock) -> TenantLogoStorageService:
-    with patch("services.tenant_logo_storage_service.Minio", side_effect=[internal, public]):
-        return TenantLogoStorageService()
+    return TenantLogoStorageService(_storage(internal, public), ImageProcessor(max_workers=0))
 
 
 def _new_menu_image_service(
     internal: MagicMock, public: MagicMock
 ) -> TenantMenuImageStorageService:
-    with patch("services.tenant_menu_image_storage_service.Minio", side_effect=[internal, public]):
-        return TenantMenuImageStorageService()
+    return TenantMenuImageStorageService(_storage(internal, public), ImageProcessor(max_workers=0))
 
 
 def _new_favicon_service(
     internal: MagicMock, public: MagicMock
 ) -> TenantMobileFaviconStorageService:
-    with patch(
-        "services.tenant_mobile_favicon_storage_service.Minio", side_effect=[internal, public]
-    ):
-        return TenantMobileFaviconStorageService()
+    return TenantMobileFaviconStorageService(_storage(internal, public))
 
 
 @pytest.fixture(autouse=True)
 def _clear_class_rate_limits() -> None:
-    TenantLogoStorageService._presign_usage.clear()
-    TenantMenuImageStorageService._presign_usage.clear()
-    TenantMobileFaviconStorageService._presign_usage.clear()
+    TenantLogoStorageService._presign_limiter.clear()
+    TenantMenuImageStorageService._presign_limiter.clear()
+    TenantMobileFaviconStorageService._presign_limiter.clear()
     yield
-    TenantLogoStorageService._presign_usage.clear()
-    TenantMenuImageStorageService._presign_usage.clear()
-    TenantMobileFaviconStorageService._presign_usage.clear()
+    TenantLogoStorageService._presign_limiter.clear()
+    TenantMenuImageStorageService._presign_limiter.clear()
+    TenantMobileFaviconStorageService._presign_limiter.clear()
 
 
-def test_logo_create_presigned_rejects_type() -> None:
+@pytest.mark.asyncio
+async def test_logo_create_presigned_rejects_type() -> None:
     i, p = MagicMock(), MagicMock()
     svc = _new_logo_service(i, p)
     with pytest.raises(BadRequestError, match="Logo must be"):
-        svc.create_presigned_upload(uuid4(), "image/gif")
+        await svc.create_presigned_upload(uuid4(), "image/gif")
 
 
-def test_logo_create_presigned_success() -> None:
+@pytest.mark.asyncio
+async def test_logo_create_presigned_success() -> None:
     i, p = MagicMock(), MagicMock()
     i.bucket_exists.return_value = True
     p.presigned_put_object.return_value = "https://u"
     svc = _new_logo_service(i, p)
-    url, key = svc.create_presigned_upload(uuid4(), "image/png")
+    url, key = await svc.create_presigned_upload(uuid4(), "image/png")
     assert url == "https://u"
     assert "tmp/tenant-logos" in key
 
 
-def test_logo_create_presigned_rate_limited() -> None:
+@pytest.mark.asyncio
+async def test_logo_create_presigned_rate_limited() -> None:
     i, p = MagicMock(), MagicMock()
     i.bucket_exists.return_value = True
     p.presigned_put_object.return_value = "u"
     tid = uuid4()
     svc = _new_logo_service(i, p)
     for _ in range(10):
-        svc.create_presigned_upload(tid, "image/png")
+        await svc.create_presigned_upload(tid, "image/png")
     with pytest.raises(TooManyRequestsError):
-        svc.create_presigned_upload(tid, "image/png")
+        await svc.create_presigned_upload(tid, "image/png")
 
 
-def test_logo_create_presigned_storage_unavailable() -> None:
+@pytest.mark.asyncio
+async def test_logo_create_presigned_storage_unavailable() -> None:
     i, p = MagicMock(), MagicMock()
     i.bucket_exists.return_value = True
     p.presigned_put_object.side_effect = OSError("x")
     svc = _new_logo_service(i, p)
     with pytest.raises(ServiceUnavailableError, match="unavailable"):
-        svc.create_presigned_upload(uuid4(), "image/png")
+        await svc.create_presigned_upload(uuid4(), "image/png")
 
 
-def test_logo_finalize_rejects_key() -> None:
+@pytest.mark.asyncio
+async def test_logo_finalize_rejects_key() -> None:
     i, p = MagicMock(), MagicMock()
     svc = _new_logo_service(i, p)
     with pytest.raises(BadRequestError, match="invalid"):
-        svc.finalize_upload(uuid4(), "wrong/prefix/x")
+        await svc.finalize_upload(uuid4(), "wrong/prefix/x")
 
 
-def test_logo_finalize_happy_path() -> None:
+@pytest.mark.asyncio
+async def test_logo_finalize_happy_path() -> None:
     tid = uuid4()
     data = _make_png()
     i, p = MagicMock(), MagicMock()
@@ -145,7 +154,7 @@ def test_logo_finalize_happy_path() -> None:
 
     key = f"tmp/tenant-logos/{tid}/abc"
     svc = _new_logo_service(i, p)
-    out = svc.finalize_upload(tid, key)
+    out = await svc.finalize_upload(tid, key)
     assert isinstance(out.url, str)
     exp = 10
     assert out.width == exp
@@ -154,7 +163,8 @@ def test_logo_finalize_happy_path() -> None:
     i.remove_object.assert_called()
 
 
-def test_logo_finalize_read_failure_wrapped() -> None:
+@pytest.mark.asyncio
+async def test_logo_finalize_read_failure_wrapped() -> None:
     tid = uuid4()
     i, p = MagicMock(), MagicMock()
     i.bucket_exists.return_value = True
@@ -162,10 +172,11 @@ def test_logo_finalize_read_failure_wrapped() -> None:
     key = f"tmp/tenant-logos/{tid}/k"
     svc = _new_logo_service(i, p)
     with pytest.raises(BadRequestError, match="invalid"):
-        svc.finalize_upload(tid, key)
+        await svc.finalize_upload(tid, key)
 
 
-def test_logo_finalize_not_valid_image() -> None:
+@pytest.mark.asyncio
+async def test_logo_finalize_not_valid_image() -> None:
     tid = uuid4()
     i, p = MagicMock(), MagicMock()
     i.bucket_exists.return_value = True
@@ -175,18 +186,20 @@ def test_logo_finalize_not_valid_image() -> None:
     key = f"tmp/tenant-logos/{tid}/k"
     svc = _new_logo_service(i, p)
     with pytest.raises(BadRequestError):
-        svc.finalize_upload(tid, key)
+        await svc.finalize_upload(tid, key)
 
 
-def test_logo_read_rejects_too_large() -> None:
+@pytest.mark.asyncio
+async def test_logo_read_rejects_too_large() -> None:
     i, p = MagicMock(), MagicMock()
     i.stat_object.return_value = SimpleNamespace(size=99_000_000)
     svc = _new_logo_service(i, p)
     with pytest.raises(BadRequestError, match="too large"):
-        svc._read_uploaded_object("k")
+        await svc._read_uploaded_object("k")
 
 
-def test_logo_finalize_put_failed() -> None:
+@pytest.mark.asyncio
+async def test_logo_finalize_put_failed() -> None:
     tid = uuid4()
     data = _make_png()
     i, p = MagicMock(), MagicMock()
@@ -198,46 +211,51 @@ def test_logo_finalize_put_failed() -> None:
     key = f"tmp/tenant-logos/{tid}/k"
     svc = _new_logo_service(i, p)
     with pytest.raises(ServiceUnavailableError):
-        svc.finalize_upload(tid, key)
+        await svc.finalize_upload(tid, key)
 
 
-def test_logo_create_view_not_found() -> None:
+@pytest.mark.asyncio
+async def test_logo_create_view_not_found() -> None:
     i, p = MagicMock(), MagicMock()
     i.bucket_exists.return_value = True
     i.stat_object.side_effect = OSError("missing")
     svc = _new_logo_service(i, p)
     with pytest.raises(NotFoundResponse):
-        svc.create_presigned_view(uuid4())
+        await svc.create_presigned_view(uuid4())
 
 
-def test_logo_create_view_success() -> None:
+@pytest.mark.asyncio
+async def test_logo_create_view_success() -> None:
     i, p = MagicMock(), MagicMock()
     i.bucket_exists.return_value = True
     i.stat_object.return_value = SimpleNamespace(size=1)
     p.presigned_get_object.return_value = "https://v"
     svc = _new_logo_service(i, p)
-    assert svc.create_presigned_view(uuid4()) == "https://v"
+    assert await svc.create_presigned_view(uuid4()) == "https://v"
 
 
-def test_logo_create_view_presign_fails() -> None:
+@pytest.mark.asyncio
+async def test_logo_create_view_presign_fails() -> None:
     i, p = MagicMock(), MagicMock()
     i.bucket_exists.return_value = True
     i.stat_object.return_value = SimpleNamespace(size=1)
     p.presigned_get_object.side_effect = OSError("e")
     svc = _new_logo_service(i, p)
     with pytest.raises(ServiceUnavailableError):
-        svc.create_presigned_view(uuid4())
+        await svc.create_presigned_view(uuid4())
 
 
-def test_logo_ensure_bucket_creates() -> None:
+@pytest.mark.asyncio
+async def test_logo_ensure_bucket_creates() -> None:
     i, p = MagicMock(), MagicMock()
     i.bucket_exists.return_value = False
     svc = _new_logo_service(i, p)
-    svc._ensure_bucket()
+    await svc._ensure_bucket()
     i.make_bucket.assert_called()
 
 
-def test_logo_finalize_removes_previous_final_objects() -> None:
+@pytest.mark.asyncio
+async def test_logo_finalize_removes_previous_final_objects() -> None:
     tid = uuid4()
     data = _make_png()
     i, p = MagicMock(), MagicMock()
@@ -248,12 +266,13 @@ def test_logo_finalize_removes_previous_final_objects() -> None:
     i.list_objects.return_value = iter((old,))
     key = f"tmp/tenant-logos/{tid}/abc"
     svc = _new_logo_service(i, p)
-    svc.finalize_upload(tid, key)
+    await svc.finalize_upload(tid, key)
     min_removals = 2
     assert i.remove_object.call_count >= min_removals
 
 
-def test_logo_normalize_rejects_gif_format() -> None:
+@pytest.mark.asyncio
+async def test_logo_normalize_rejects_gif_format() -> None:
     tid = uuid4()
     img = Image.new("RGB", (100, 100), (255, 0, 0))
     buf = BytesIO()
@@ -266,7 +285,7 @@ def test_logo_normalize_rejects_gif_format() -> None:
     key = f"tmp/tenant-logos/{tid}/k"
     svc = _new_logo_service(i, p)
     with pytest.raises(BadRequestError, match="Logo must be"):
-        svc.finalize_upload(tid, key)
+        await svc.finalize_upload(tid, key)
 
 
 def _ctx_verify_only() -> Mock:
@@ -290,7 +309,8 @@ def _ctx_huge_png() -> Mock:
     return cm
 
 
-def test_logo_normalize_rejects_too_many_pixels() -> None:
+@pytest.mark.asyncio
+async def test_logo_normalize_rejects_too_many_pixels() -> None:
     tid = uuid4()
     data = _make_png(10, 10)
     i, p = MagicMock(), MagicMock()
@@ -302,13 +322,14 @@ def test_logo_normalize_rejects_too_many_pixels() -> None:
     svc = _new_logo_service(i, p)
     m_open = Mock(side_effect=[_ctx_verify_only(), _ctx_huge_png()])
     with (
-        patch("services.tenant_logo_storage_service.Image.open", m_open),
+        patch("core.foundation.image_processing.Image.open", m_open),
         pytest.raises(BadRequestError, match="too large"),
     ):
-        svc.finalize_upload(tid, key)
+        await svc.finalize_upload(tid, key)
 
 
-def test_logo_normalize_oserror() -> None:
+@pytest.mark.asyncio
+async def test_logo_normalize_oserror() -> None:
     tid = uuid4()
     data = _make_png(10, 10)
     i, p = MagicMock(), MagicMock()
@@ -320,22 +341,24 @@ def test_logo_normalize_oserror() -> None:
     svc = _new_logo_service(i, p)
     m_open = Mock(side_effect=[_ctx_verify_only(), OSError("e")])
     with (
-        patch("services.tenant_logo_storage_service.Image.open", m_open),
+        patch("core.foundation.image_processing.Image.open", m_open),
         pytest.raises(BadRequestError, match="valid image"),
     ):
-        svc.finalize_upload(tid, key)
+        await svc.finalize_upload(tid, key)
 
 
-def test_logo_ensure_bucket_policy_error() -> None:
+@pytest.mark.asyncio
+async def test_logo_ensure_bucket_policy_error() -> None:
     i, p = MagicMock(), MagicMock()
     i.bucket_exists.return_value = True
     i.set_bucket_policy.side_effect = RuntimeError("p")
     svc = _new_logo_service(i, p)
     with pytest.raises(ServiceUnavailableError):
-        svc._ensure_bucket()
+        await svc._ensure_bucket()
 
 
-def test_menu_image_presigned_and_jpeg_final() -> None:
+@pytest.mark.asyncio
+async def test_menu_image_presigned_and_jpeg_final() -> None:
     tid = uuid4()
     i, p = MagicMock(), MagicMock()
     i.bucket_exists.return_value = True
@@ -345,13 +368,24 @@ def test_menu_image_presigned_and_jpeg_final() -> None:
     i.get_object.return_value = _ObjectStream(jpg)
     key = f"tmp/menu-items/{tid}/x"
     svc = _new_menu_image_service(i, p)
-    out = svc.finalize_upload(tid, key)
-    assert "menu-items" in out.object_key
-    assert i.put_object.call_args is not None
-    assert i.put_object.call_args.kwargs.get("content_type") == "image/jpeg"
-
-
-def test_menu_image_rejects_nonsquare() -> None:
+    out = await svc.finalize_upload(tid, key)
+    assert out.object_key.startswith(f"menu-items/{tid}/")
+    assert out.object_key.endswith("/original.jpg")
+    assert sorted(out.variants) == [128, 256, 512, 1024]
+    content_types = {c.args[1]: c.kwargs["content_type"] for c in i.put_object.call_args_list}
+    base = out.object_key.rsplit("/", 1)[0]
+    assert content_types == {
+        out.object_key: "image/jpeg",
+        f"{base}/128.webp": "image/webp",
+        f"{base}/256.webp": "image/webp",
+        f"{base}/512.webp": "image/webp",
+        f"{base}/1024.webp": "image/webp",
+    }
+    i.remove_object.assert_called_once_with(settings.MINIO_BUCKET, key)
+
+
+@pytest.mark.asyncio
+async def test_menu_image_rejects_nonsquare() -> None:
     tid = uuid4()
     wide = _make_png(200, 10)
     i, p = MagicMock(), MagicMock()
@@ -361,10 +395,11 @@ def test_menu_image_rejects_nonsquare() -> None:
     key = f"tmp/menu-items/{tid}/x"
     svc = _new_menu_image_service(i, p)
     with pytest.raises(BadRequestError, match="square"):
-        svc.finalize_upload(tid, key)
+        await svc.finalize_upload(tid, key)
 
 
-def test_menu_image_webp_branch() -> None:
+@pytest.mark.asyncio
+async def test_menu_image_webp_branch() -> None:
     tid = uuid4()
     w = _make_square_webp()
     i, p = MagicMock(), MagicMock()
@@ -373,45 +408,50 @@ def test_menu_image_webp_branch() -> None:
     i.get_object.return_value = _ObjectStream(w)
     key = f"tmp/menu-items/{tid}/x"
     svc = _new_menu_image_service(i, p)
-    svc.finalize_upload(tid, key)
+    await svc.finalize_upload(tid, key)
     assert i.put_object.called
 
 
-def test_menu_image_create_presigned_bad_type() -> None:
+@pytest.mark.asyncio
+async def test_menu_image_create_presigned_bad_type() -> None:
     i, p = MagicMock(), MagicMock()
     svc = _new_menu_image_service(i, p)
     with pytest.raises(BadRequestError, match="Menu image"):
-        svc.create_presigned_upload(uuid4(), "text/plain")
+        await svc.create_presigned_upload(uuid4(), "text/plain")
 
 
-def test_menu_image_presign_rate_limited() -> None:
+@pytest.mark.asyncio
+async def test_menu_image_presign_rate_limited() -> None:
     i, p = MagicMock(), MagicMock()
     i.bucket_exists.return_value = True
     p.presigned_put_object.return_value = "u"
     tid = uuid4()
     svc = _new_menu_image_service(i, p)
     for _ in range(20):
-        svc.create_presigned_upload(tid, "image/png")
+        await svc.create_presigned_upload(tid, "image/png")
     with pytest.raises(TooManyRequestsError):
-        svc.create_presigned_upload(tid, "image/png")
+        await svc.create_presigned_upload(tid, "image/png")
 
 
-def test_menu_image_presign_minio_fails() -> None:
+@pytest.mark.asyncio
+async def test_menu_image_presign_minio_fails() -> None:
     i, p = MagicMock(), MagicMock()
     i.bucket_exists.return_value = True
     p.presigned_put_object.side_effect = OSError("n")
     svc = _new_menu_image_service(i, p)
     with pytest.raises(ServiceUnavailableError):
-        svc.create_presigned_upload(uuid4(), "image/png")
+        await svc.create_presigned_upload(uuid4(), "image/png")
 
 
-def test_menu_image_finalize_rejects_key() -> None:
+@pytest.mark.asyncio
+async def test_menu_image_finalize_rejects_key() -> None:
     svc = _new_menu_image_service(MagicMock(), MagicMock())
     with pytest.raises(BadRequestError, match="invalid"):
-        svc.finalize_upload(uuid4(), "other/x")
+        await svc.finalize_upload(uuid4(), "other/x")
 
 
-def test_menu_image_read_failure_wrapped() -> None:
+@pytest.mark.asyncio
+async def test_menu_image_read_failure_wrapped() -> None:
     tid = uuid4()
     i, p = MagicMock(), MagicMock()
     i.bucket_exists.return_value = True
@@ -419,10 +459,11 @@ def test_menu_image_read_failure_wrapped() -> None:
     key = f"tmp/menu-items/{tid}/k"
     svc = _new_menu_image_service(i, p)
     with pytest.raises(BadRequestError, match="invalid"):
-        svc.finalize_upload(tid, key)
+        await svc.finalize_upload(tid, key)
 
 
-def test_menu_image_too_many_pixels() -> None:
+@pytest.mark.asyncio
+async def test_menu_image_too_many_pixels() -> None:
     tid = uuid4()
     data = _make_png(10, 10)
     i, p = MagicMock(), MagicMock()
@@ -440,13 +481,14 @@ def test_menu_image_too_many_pixels() -> None:
     cm2.__exit__ = Mock(return_value=False)
     m_open = Mock(side_effect=[_ctx_verify_only(), cm2])
     with (
-        patch("services.tenant_menu_image_storage_service.Image.open", m_open),
+        patch("core.foundation.image_processing.Image.open", m_open),
         pytest.raises(BadRequestError, match="too large"),
     ):
-        svc.finalize_upload(tid, key)
+        await svc.finalize_upload(tid, key)
 
 
-def test_menu_image_unidentified() -> None:
+@pytest.mark.asyncio
+async def test_menu_image_unidentified() -> None:
     tid = uuid4()
     i, p = MagicMock(), MagicMock()
     i.bucket_exists.return_value = True
@@ -456,10 +498,11 @@ def test_menu_image_unidentified() -> None:
     key = f"tmp/menu-items/{tid}/k"
     svc = _new_menu_image_service(i, p)
     with pytest.raises(BadRequestError, match="valid image"):
-        svc.finalize_upload(tid, key)
+        await svc.finalize_upload(tid, key)
 
 
-def test_menu_image_oserror_normalize() -> None:
+@pytest.mark.asyncio
+async def test_menu_image_oserror_normalize() -> None:
     tid = uuid4()
     data = _make_png(10, 10)
     i, p = MagicMock(), MagicMock()
@@ -470,21 +513,23 @@ def test_menu_image_oserror_normalize() -> None:
     svc = _new_menu_image_service(i, p)
     m_open = Mock(side_effect=[_ctx_verify_only(), OSError("e")])
     with (
-        patch("services.tenant_menu_image_storage_service.Image.open", m_open),
+        patch("core.foundation.image_processing.Image.open", m_open),
         pytest.raises(BadRequestError, match="valid image"),
     ):
-        svc.finalize_upload(tid, key)
+        await svc.finalize_upload(tid, key)
 
 
-def test_menu_image_read_too_large() -> None:
+@pytest.mark.asyncio
+async def test_menu_image_read_too_large() -> None:
     i, p = MagicMock(), MagicMock()
     i.stat_object.return_value = SimpleNamespace(size=settings.TENANT_MENU_IMAGE_MAX_BYTES + 1)
     svc = _new_menu_image_service(i, p)
     with pytest.raises(BadRequestError, match="too large"):
-        svc._read_uploaded_object("k")
+        await svc._read_uploaded_object("k")
 
 
-def test_menu_image_square_png_path() -> None:
+@pytest.mark.asyncio
+async def test_menu_image_square_png_path() -> None:
     tid = uuid4()
     square = _make_png(80, 80)
     i, p = MagicMock(), MagicMock()
@@ -493,11 +538,13 @@ def test_menu_image_square_png_path() -> None:
     i.get_object.return_value = _ObjectStream(square)
     key = f"tmp/menu-items/{tid}/x"
     svc = _new_menu_image_service(i, p)
-    svc.finalize_upload(tid, key)
-    assert i.put_object.call_args.kwargs.get("content_type") == "image/png"
+    out = await svc.finalize_upload(tid, key)
+    original = next(c for c in i.put_object.call_args_list if c.args[1] == out.object_key)
+    assert original.kwargs.get("content_type") == "image/png"
 
 
-def test_menu_image_put_fails() -> None:
+@pytest.mark.asyncio
+async def test_menu_image_put_fails() -> None:
     tid = uuid4()
     square = _make_png(40, 40)
     i, p = MagicMock(), MagicMock()
@@ -508,19 +555,21 @@ def test_menu_image_put_fails() -> None:
     key = f"tmp/menu-items/{tid}/x"
     svc = _new_menu_image_service(i, p)
     with pytest.raises(ServiceUnavailableError):
-        svc.finalize_upload(tid, key)
+        await svc.finalize_upload(tid, key)
 
 
-def test_menu_image_ensure_bucket_policy_fails() -> None:
+@pytest.mark.asyncio
+async def test_menu_image_ensure_bucket_policy_fails() -> None:
     i, p = MagicMock(), MagicMock()
     i.bucket_exists.return_value = True
     i.set_bucket_policy.side_effect = RuntimeError("e")
     svc = _new_menu_image_service(i, p)
     with pytest.raises(ServiceUnavailableError):
-        svc._ensure_bucket()
+        await svc._ensure_bucket()
 
 
-def test_menu_image_rejects_gif_format() -> None:
+@pytest.mark.asyncio
+async def test_menu_image_rejects_gif_format() -> None:
     tid = uuid4()
     img = Image.new("RGB", (100, 100), (0, 255, 0))
     buf = BytesIO()
@@ -533,14 +582,15 @@ def test_menu_image_rejects_gif_format() -> None:
     key = f"tmp/menu-items/{tid}/k"
     svc = _new_menu_image_service(i, p)
     with pytest.raises(BadRequestError, match="Menu image must be"):
-        svc.finalize_upload(tid, key)
+        await svc.finalize_upload(tid, key)
 
 
-def test_menu_image_ensure_bucket_creates() -> None:
+@pytest.mark.asyncio
+async def test_menu_image_ensure_bucket_creates() -> None:
     i, p = MagicMock(), MagicMock()
     i.bucket_exists.return_value = False
     svc = _new_menu_image_service(i, p)
-    svc._ensure_bucket()
+    await svc._ensure_bucket()
     i.make_bucket.assert_called_once()
 
 
@@ -551,7 +601,8 @@ def _minimal_ico_bytes() -> bytes:
     return b.getvalue()
 
 
-def test_favicon_happy() -> None:
+@pytest.mark.asyncio
+async def test_favicon_happy() -> None:
     tid = uuid4()
     ico = _minimal_ico_bytes()
     i, p = MagicMock(), MagicMock()
@@ -560,62 +611,67 @@ def test_favicon_happy() -> None:
     i.get_object.return_value = _ObjectStream(ico)
     key = f"tmp/tenant-mobile-favicons/{tid}/x.ico"
     svc = _new_favicon_service(i, p)
-    fk = svc.finalize_upload(tid, key)
+    fk = await svc.finalize_upload(tid, key)
     assert "favicon" in fk
 
 
-def test_favicon_get_stream_and_stat() -> None:
+@pytest.mark.asyncio
+async def test_favicon_read_object_and_stat() -> None:
     i, p = MagicMock(), MagicMock()
     i.get_object.return_value = _ObjectStream(b"x")
     stat_size = 2
     i.stat_object.return_value = SimpleNamespace(size=stat_size)
     svc = _new_favicon_service(i, p)
-    assert svc.stat_object("k") == stat_size
-    o = svc.get_object_stream("k")
-    assert o.read() == b"x"
+    assert await svc.stat_object("k") == stat_size
+    assert await svc.read_object("k") == b"x"
 
 
-def test_favicon_ensure_creates_bucket() -> None:
+@pytest.mark.asyncio
+async def test_favicon_ensure_creates_bucket() -> None:
     i, p = MagicMock(), MagicMock()
     i.bucket_exists.return_value = False
     svc = _new_favicon_service(i, p)
-    svc._ensure_bucket()
+    await svc._ensure_bucket()
     i.make_bucket.assert_called()
 
 
-def test_favicon_presign_rejects_content_type() -> None:
+@pytest.mark.asyncio
+async def test_favicon_presign_rejects_content_type() -> None:
     i, p = MagicMock(), MagicMock()
     svc = _new_favicon_service(i, p)
     with pytest.raises(BadRequestError, match="ICO"):
-        svc.create_presigned_upload(uuid4(), "image/png")
+        await svc.create_presigned_upload(uuid4(), "image/png")
 
 
-def test_favicon_presign_rate_limit() -> None:
+@pytest.mark.asyncio
+async def test_favicon_presign_rate_limit() -> None:
     i, p = MagicMock(), MagicMock()
     i.bucket_exists.return_value = True
     p.presigned_put_object.return_value = "https://u"
     svc = _new_favicon_service(i, p)
     tid = uuid4()
     for _ in range(10):
-        svc.create_presigned_upload(tid, "image/x-icon")
+        await svc.create_presigned_upload(tid, "image/x-icon")
     with pytest.raises(TooManyRequestsError):
-        svc.create_presigned_upload(tid, "image/x-icon")
+        await svc.create_presigned_upload(tid, "image/x-icon")
 
 
-def test_favicon_presign_public_minio_error() -> None:
+@pytest.mark.asyncio
+async def test_favicon_presign_public_minio_error() -> None:
     i, p = MagicMock(), MagicMock()
     i.bucket_exists.return_value = True
     p.presigned_put_object.side_effect = OSError("down")
     svc = _new_favicon_service(i, p)
     with pytest.raises(ServiceUnavailableError):
-        svc.create_presigned_upload(uuid4(), "image/x-icon")
+        await svc.create_presigned_upload(uuid4(), "image/x-icon")
 
 
-def test_favicon_finalize_invalid_key_prefix() -> None:
+@pytest.mark.asyncio
+async def test_favicon_finalize_invalid_key_prefix() -> None:
     i, p = MagicMock(), MagicMock()
     svc = _new_favicon_service(i, p)
     with pytest.raises(BadRequestError, match="invalid"):
-        svc.finalize_upload(uuid4(), "tmp/other/ico.ico")
+        await svc.finalize_upload(uuid4(), "tmp/other/ico.ico")
 
 
 def _ico_disallowed_size_bytes() -> bytes:
@@ -625,7 +681,8 @@ def _ico_disallowed_size_bytes() -> bytes:
     return buf.getvalue()
 
 
-def test_favicon_finalize_rejects_disallowed_dimensions() -> None:
+@pytest.mark.asyncio
+async def test_favicon_finalize_rejects_disallowed_dimensions() -> None:
     tid = uuid4()
     raw = _ico_disallowed_size_bytes()
     i, p = MagicMock(), MagicMock()
@@ -635,10 +692,11 @@ def test_favicon_finalize_rejects_disallowed_dimensions() -> None:
     key = f"tmp/tenant-mobile-favicons/{tid}/x.ico"
     svc = _new_favicon_service(i, p)
     with pytest.raises(BadRequestError, match="16x16"):
-        svc.finalize_upload(tid, key)
+        await svc.finalize_upload(tid, key)
 
 
-def test_favicon_finalize_not_ico_format() -> None:
+@pytest.mark.asyncio
+async def test_favicon_finalize_not_ico_format() -> None:
     tid = uuid4()
     raw = _make_png(32, 32)
     i, p = MagicMock(), MagicMock()
@@ -648,10 +706,11 @@ def test_favicon_finalize_not_ico_format() -> None:
     key = f"tmp/tenant-mobile-favicons/{tid}/x.ico"
     svc = _new_favicon_service(i, p)
     with pytest.raises(BadRequestError, match="valid ICO"):
-        svc.finalize_upload(tid, key)
+        await svc.finalize_upload(tid, key)
 
 
-def test_favicon_finalize_image_open_oserror() -> None:
+@pytest.mark.asyncio
+async def test_favicon_finalize_image_open_oserror() -> None:
     tid = uuid4()
     ico = _minimal_ico_bytes()
     i, p = MagicMock(), MagicMock()
@@ -666,10 +725,11 @@ def test_favicon_finalize_image_open_oserror() -> None:
         ),
         pytest.raises(BadRequestError, match="valid ICO"),
     ):
-        svc.finalize_upload(tid, key)
+        await svc.finalize_upload(tid, key)
 
 
-def test_favicon_finalize_unidentified_image() -> None:
+@pytest.mark.asyncio
+async def test_favicon_finalize_unidentified_image() -> None:
     tid = uuid4()
     raw = b"not an image at all"
     i, p = MagicMock(), MagicMock()
@@ -679,10 +739,11 @@ def test_favicon_finalize_unidentified_image() -> None:
     key = f"tmp/tenant-mobile-favicons/{tid}/x.ico"
     svc = _new_favicon_service(i, p)
     with pytest.raises(BadRequestError, match="valid ICO"):
-        svc.finalize_upload(tid, key)
+        await svc.finalize_upload(tid, key)
 
 
-def test_favicon_finalize_put_object_unavailable() -> None:
+@pytest.mark.asyncio
+async def test_favicon_finalize_put_object_unavailable() -> None:
     tid = uuid4()
     ico = _minimal_ico_bytes()
     i, p = MagicMock(), MagicMock()
@@ -693,42 +754,59 @@ def test_favicon_finalize_put_object_unavailable() -> None:
     key = f"tmp/tenant-mobile-favicons/{tid}/x.ico"
     svc = _new_favicon_service(i, p)
     with pytest.raises(ServiceUnavailableError):
-        svc.finalize_upload(tid, key)
+        await svc.finalize_upload(tid, key)
 
 
-def test_favicon_get_object_stream_error() -> None:
+@pytest.mark.asyncio
+async def test_favicon_read_object_error() -> None:
     i, p = MagicMock(), MagicMock()
     i.get_object.side_effect = RuntimeError("x")
     svc = _new_favicon_service(i, p)
     with pytest.raises(ServiceUnavailableError):
-        svc.get_object_stream("k")
+        await svc.read_object("k")
 
 
-def test_favicon_stat_object_error() -> None:
+@pytest.mark.asyncio
+async def test_favicon_read_object_releases_connection_when_read_fails() -> None:
+    i, p = MagicMock(), MagicMock()
+    stream = MagicMock()
+    stream.read.side_effect = RuntimeError("x")
+    i.get_object.return_value = stream
+    svc = _new_favicon_service(i, p)
+    with pytest.raises(ServiceUnavailableError):
+        await svc.read_object("k")
+    stream.close.assert_called_once()
+    stream.release_conn.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_favicon_stat_object_error() -> None:
     i, p = MagicMock(), MagicMock()
     i.stat_object.side_effect = RuntimeError("x")
     svc = _new_favicon_service(i, p)
     with pytest.raises(ServiceUnavailableError):
-        svc.stat_object("k")
+        await svc.stat_object("k")
 
 
-def test_favicon_read_upload_rejects_oversized_file() -> None:
+@pytest.mark.asyncio
+async def test_favicon_read_upload_rejects_oversized_file() -> None:
     i, p = MagicMock(), MagicMock()
     i.stat_object.return_value = SimpleNamespace(
         size=TenantMobileFaviconStorageService._MAX_BYTES + 1
     )
     svc = _new_favicon_service(i, p)
     with pytest.raises(BadRequestError, match="too large"):
-        svc._read_uploaded_object("k")
+        await svc._read_uploaded_object("k")
 
 
-def test_favicon_ensure_bucket_set_policy_fails() -> None:
+@pytest.mark.asyncio
+async def test_favicon_ensure_bucket_set_policy_fails() -> None:
     i, p = MagicMock(), MagicMock()
     i.bucket_exists.return_value = True
     i.set_bucket_policy.side_effect = RuntimeError("policy")
     svc = _new_favicon_service(i, p)
     with pytest.raises(ServiceUnavailableError):
-        svc._ensure_bucket()
+        await svc._ensure_bucket()
 
 
 def test_favicon_build_public_url_quotes_key() -> None:
@@ -739,18 +817,6 @@ def test_favicon_build_public_url_quotes_key() -> None:
     assert u.startswith("http")
 
 
-def test_menu_service_uses_public_secure_for_public_client() -> None:
-    i, p = MagicMock(), MagicMock()
-    with (
-        patch.object(settings, "MINIO_PUBLIC_SECURE", True),
-        patch("services.tenant_menu_image_storage_service.Minio", side_effect=[i, p]) as minio_cls,
-    ):
-        TenantMenuImageStorageService()
-
-    assert minio_cls.call_args_list[0].kwargs["secure"] is settings.MINIO_SECURE
-    assert minio_cls.call_args_list[1].kwargs["secure"] is True
-
-
 def test_favicon_build_public_url_uses_public_secure_scheme() -> None:
     i, p = MagicMock(), MagicMock()
     with patch.object(settings, "MINIO_PUBLIC_SECURE", True):
@@ -761,7 +827,8 @@ def test_favicon_build_public_url_uses_public_secure_scheme() -> None:
     assert u.startswith("https://")
 
 
-def test_favicon_finalize_read_fails_before_open() -> None:
+@pytest.mark.asyncio
+async def test_favicon_finalize_read_fails_before_open() -> None:
     tid = uuid4()
     i, p = MagicMock(), MagicMock()
     i.bucket_exists.return_value = True
@@ -770,4 +837,28 @@ def test_favicon_finalize_read_fails_before_open() -> None:
     key = f"tmp/tenant-mobile-favicons/{tid}/x.ico"
     svc = _new_favicon_service(i, p)
     with pytest.raises(BadRequestError, match="invalid"):
-        svc.finalize_upload(tid, key)
+        await svc.finalize_upload(tid, key)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("kind", ["logo", "menu"])
+async def test_finalize_keeps_upload_when_image_processing_is_busy(kind: str) -> None:
+    tid = uuid4()
+    data = _make_png(40, 40)
+    i, p = MagicMock(), MagicMock()
+    i.bucket_exists.return_value = True
+    i.stat_object.return_value = SimpleNamespace(size=len(data))
+    i.get_object.return_value = _ObjectStream(data)
+    busy = ImageProcessor(max_workers=0, max_pending=0)
+    if kind == "logo":
+        svc = TenantLogoStorageService(_storage(i, p), busy)
+        key = f"tmp/tenant-logos/{tid}/k"
+    else:
+        svc = TenantMenuImageStorageService(_storage(i, p), busy)
+        key = f"tmp/menu-items/{tid}/k"
+
+    with pytest.raises(ServiceUnavailableError, match="busy"):
+        await svc.finalize_upload(tid, key)
+
+    i.remove_object.assert_not_called()
+    i.put_object.assert_not_called()
@@ -0,0 +1,101 @@
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+
+from core.models.enums import TenantStatus
+from services import tenant_identity_cache as tic
+from services.tenant_identity_cache import (
+    RedisTenantIdentityCache,
+    TenantIdentity,
+    TenantIdentityCache,
+)
+from tests.unit.conftest import FakeRedis
+
+
+def _identity(slug: str = "bistro", public_id: str = "pub-bistro") -> TenantIdentity:
+    return TenantIdentity(
+        id=uuid4(),
+        public_id=public_id,
+        slug=slug,
+        name="Bistro",
+        status=TenantStatus.ACTIVE,
+        p24_merchantid=12345,
+        p24_api="api-key",
+        p24_crc="crc",
+    )
+
+
+def test_identity_round_trips_through_json() -> None:
+    identity = _identity()
+    unconfigured = TenantIdentity(
+        identity.id, "pub-x", "x", "X", TenantStatus.SUSPENDED, None, None, None
+    )
+
+    assert TenantIdentity.from_json(identity.to_json()) == identity
+    assert TenantIdentity.from_json(unconfigured.to_json().encode()) == unconfigured
+
+
+@pytest.mark.asyncio
+async def test_memory_cache_invalidation_drops_both_keys_of_one_tenant() -> None:
+    cache = TenantIdentityCache()
+    renamed, other = _identity(), _identity("other", "pub-other")
+    await cache.set(renamed)
+    await cache.set(other)
+
+    await cache.invalidate(renamed.id)
+    await cache.invalidate(uuid4())
+
+    assert await cache.get_by_slug("bistro") is None
+    assert await cache.get_by_public_id("pub-bistro") is None
+    assert await cache.get_by_slug("other") == other
+
+    await cache.clear()
+    assert await cache.get_by_public_id("pub-other") is None
+
+
+@pytest.mark.asyncio
+async def test_redis_cache_stores_both_keys_with_ttl_and_tenant_index() -> None:
+    client = FakeRedis()
+    cache = RedisTenantIdentityCache(client, ttl_seconds=30)
+    identity = _identity()
+
+    await cache.set(identity)
+
+    assert await cache.get_by_slug("bistro") == identity
+    assert await cache.get_by_public_id("pub-bistro") == identity
+    assert client.ttls["tenant:identity:slug:bistro"] == 30  # noqa: PLR2004
+    assert client.sets[f"tenant:identity:tenant:{identity.id}"] == {
+        "tenant:identity:slug:bistro",
+        "tenant:identity:public_id:pub-bistro",
+    }
+    assert await cache.get_by_slug("unknown") is None
+
+
+@pytest.mark.asyncio
+async def test_redis_cache_invalidation_drops_entries_and_index() -> None:
+    client = FakeRedis()
+    cache = RedisTenantIdentityCache(client)
+    identity = _identity()
+    await cache.set(identity)
+
+    await cache.invalidate(identity.id)
+    await cache.clear()
+
+    assert await cache.get_by_slug("bistro") is None
+    assert await cache.get_by_public_id("pub-bistro") is None
+    assert client.sets == {}
+
+
+def test_build_cache_selects_backend(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(tic, "get_redis_client", FakeRedis)
+
+    memory = tic.build_tenant_identity_cache(
+        MagicMock(TENANT_IDENTITY_CACHE="memory", TENANT_IDENTITY_CACHE_TTL_SECONDS=300)
+    )
+    redis_cache = tic.build_tenant_identity_cache(
+        MagicMock(TENANT_IDENTITY_CACHE=" Redis ", TENANT_IDENTITY_CACHE_TTL_SECONDS=300)
+    )
+
+    assert isinstance(memory, TenantIdentityCache)
+    assert isinstance(redis_cache, RedisTenantIdentityCache)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from datetime import UTC, datetime
 from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock
 from uuid import uuid4
@@ -99,12 +100,14 @@ async def test_set_favicon_creates() -> None:
 @pytest.mark.asyncio
 async def test_set_favicon_updates_existing() -> None:
     tid = uuid4()
+    previous = datetime(2026, 1, 1, tzinfo=UTC)
     existing = SimpleNamespace(
         tenant_id=tid,
         favicon_object_key="old",
         page_title="T",
         theme_override=None,
         landing_content=None,
+        updated_at=previous,
     )
     r1 = MagicMock()
     r1.scalar_one_or_none = MagicMock(return_value=existing)
@@ -113,6 +116,7 @@ async def test_set_favicon_updates_existing() -> None:
     s.flush = AsyncMock()
     out = await TenantMobileConfigService().set_favicon_key(s, tid, "k2")
     assert out.favicon_object_key == "k2"
+    assert out.updated_at > previous
     s.add.assert_not_called()
     s.flush.assert_awaited_once()
 
@@ -10,6 +10,7 @@ from core.exceptions import NotFoundResponse
 from core.models.enums import AccountType, TenantStatus
 from core.models.tenant import Tenant
 from core.models.tenant_role import TenantRole
+from services.tenant_identity_cache import TenantIdentity, TenantIdentityCache
 from services.tenant_service import TenantService
 
 
@@ -262,3 +263,53 @@ async def test_delete_tenant_not_found() -> None:
     session = _session_scalar_result(None)
     with pytest.raises(NotFoundResponse):
         await TenantService().delete_tenant(session, uuid4())  # type: ignore[arg-type]
+
+
+@pytest.mark.asyncio
+async def test_get_tenant_identity_by_slug_loads_once_then_hits_cache(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr("services.tenant_service.tenant_identity_cache", TenantIdentityCache())
+    t = Tenant(id=uuid4(), public_id="pub-a", name="A", slug="a", status=TenantStatus.ACTIVE)
+    session = _session_scalar_result(t)
+    service = TenantService()
+
+    first = await service.get_tenant_identity_by_slug(session, "a")  # type: ignore[arg-type]
+    by_public_id = await service.get_tenant_identity_by_public_id(session, "pub-a")  # type: ignore[arg-type]
+
+    assert first == TenantIdentity.from_tenant(t)
+    assert by_public_id is first
+    session.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_get_tenant_identity_by_public_id_loads_without_relations(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr("services.tenant_service.tenant_identity_cache", TenantIdentityCache())
+    t = Tenant(id=uuid4(), public_id="pub-a", name="A", slug="a", status=TenantStatus.ACTIVE)
+    session = _session_scalar_result(t)
+
+    identity = await TenantService().get_tenant_identity_by_public_id(session, "pub-a")  # type: ignore[arg-type]
+
+    assert identity.id == t.id
+    assert "floor_canvases" not in str(session.execute.await_args.args[0])
+
+    with pytest.raises(NotFoundResponse):
+        await TenantService().get_tenant_identity_by_public_id(  # type: ignore[arg-type]
+            _session_scalar_result(None), "missing"
+        )
+
+
+@pytest.mark.asyncio
+async def test_update_tenant_drops_cached_identity(monkeypatch: pytest.MonkeyPatch) -> None:
+    cache = TenantIdentityCache()
+    monkeypatch.setattr("services.tenant_service.tenant_identity_cache", cache)
+    t = Tenant(id=uuid4(), public_id="pub-a", name="A", slug="a", status=TenantStatus.ACTIVE)
+    await cache.set(TenantIdentity.from_tenant(t))
+    session = _session_scalar_result(t)
+
+    await TenantService().update_tenant(session, t.id, UpdateTenantDTO(slug="b"))  # type: ignore[arg-type]
+
+    assert await cache.get_by_slug("a") is None
+    assert await cache.get_by_public_id("pub-a") is None
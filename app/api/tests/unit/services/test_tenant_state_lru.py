@@ -0,0 +1,40 @@
+from dataclasses import dataclass
+
+from services.tenant_state_lru import TenantStateLRU
+from tests.unit.conftest import FakeClock
+
+_RESYNC_SECONDS = 30
+
+
+@dataclass
+class _State:
+    name: str
+    loaded_at: float = 0.0
+
+
+def test_get_serves_state_until_resync_then_peek_still_returns_it() -> None:
+    clock = FakeClock()
+    lru: TenantStateLRU[str, _State] = TenantStateLRU(resync_seconds=_RESYNC_SECONDS, clock=clock)
+    state = lru.put("a", _State("a"))
+
+    clock.now += _RESYNC_SECONDS - 1
+    assert lru.get("a") is state
+    clock.now += 1
+    assert lru.get("a") is None
+    assert lru.peek("a") is state
+
+
+def test_mark_stale_forces_reload_and_put_evicts_least_recently_used() -> None:
+    lru: TenantStateLRU[str, _State] = TenantStateLRU(max_tenants=2, clock=FakeClock())
+    lru.put("a", _State("a"))
+    lru.put("b", _State("b"))
+    lru.get("a")
+    lru.mark_stale("missing")
+    lru.mark_stale("a")
+
+    lru.put("c", _State("c"))
+
+    assert lru.get("a") is None
+    assert [key for key, _ in lru.states()] == ["a", "c"]
+    lru.clear()
+    assert list(lru.states()) == []
@@ -1,8 +1,83 @@
+import asyncio
 from unittest.mock import AsyncMock, MagicMock
 
+from fastapi import status
 import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
 
-from services.ws_manager import ConnectionManager
+from services import ws_manager as ws_mod
+from services.ws_manager import ConnectionManager, LocalBroadcastBus, RedisBroadcastBus
+
+
+class _FakePubSub:
+    def __init__(self) -> None:
+        self.channels: set[str] = set()
+        self.messages: asyncio.Queue[dict] = asyncio.Queue()
+        self.closed = False
+        self.error: Exception | None = None
+
+    async def subscribe(self, channel: str) -> None:
+        if self.error is not None:
+            raise self.error
+        self.channels.add(channel)
+
+    async def unsubscribe(self, channel: str) -> None:
+        if self.error is not None:
+            raise self.error
+        self.channels.discard(channel)
+
+    async def get_message(self, *, timeout: float, **_kwargs):
+        try:
+            return await asyncio.wait_for(self.messages.get(), timeout)
+        except TimeoutError:
+            return None
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.pubsub_instance = _FakePubSub()
+        self.published: list[tuple[str, str]] = []
+        self.counters: dict[str, int] = {}
+        self.error: Exception | None = None
+
+    def pubsub(self, **_kwargs) -> _FakePubSub:
+        return self.pubsub_instance
+
+    async def incr(self, key: str) -> int:
+        if self.error is not None:
+            raise self.error
+        self.counters[key] = self.counters.get(key, 0) + 1
+        return self.counters[key]
+
+    async def get(self, key: str) -> bytes | None:
+        if self.error is not None:
+            raise self.error
+        value = self.counters.get(key)
+        return None if value is None else str(value).encode()
+
+    async def publish(self, channel: str, payload: str) -> int:
+        if self.error is not None:
+            raise self.error
+        self.published.append((channel, payload))
+        if channel in self.pubsub_instance.channels:
+            await self.pubsub_instance.messages.put(
+                {"type": "message", "channel": channel.encode(), "data": payload.encode()}
+            )
+        return 1
+
+
+async def _drain() -> None:
+    await asyncio.sleep(0.01)
+
+
+def _blocking_send(release: asyncio.Event | None = None):
+    async def send_text(_payload: str) -> None:
+        await (release or asyncio.Event()).wait()
+
+    return send_text
 
 
 @pytest.mark.asyncio
@@ -12,17 +87,23 @@ async def test_connect_accept_and_track() -> None:
     await mgr.connect("rest-1", ws)
 
     ws.accept.assert_awaited_once()
-    assert mgr._connections["rest-1"] == [ws]
+    assert list(mgr._connections["rest-1"]) == [ws]
+    await mgr.close()
 
 
-def test_disconnect_removes_empty_restaurant_key() -> None:
+@pytest.mark.asyncio
+async def test_disconnect_removes_empty_restaurant_key() -> None:
     mgr = ConnectionManager()
-    ws = MagicMock()
-    mgr._connections["rest-1"] = [ws]
+    ws = AsyncMock()
+    await mgr.connect("rest-1", ws)
+    writer = mgr._connections["rest-1"][ws].writer
 
-    mgr.disconnect("rest-1", ws)
+    await mgr.disconnect("rest-1", ws)
+    await mgr.disconnect("rest-1", ws)
+    await _drain()
 
     assert "rest-1" not in mgr._connections
+    assert writer.cancelled()
 
 
 @pytest.mark.asyncio
@@ -31,10 +112,371 @@ async def test_broadcast_removes_stale_websockets() -> None:
     good = AsyncMock()
     bad = AsyncMock()
     bad.send_text.side_effect = RuntimeError("closed")
+    await mgr.connect("rest-1", good)
+    await mgr.connect("rest-1", bad)
+
+    await mgr.broadcast("rest-1", {"event": "ping"})
+    await _drain()
+
+    good.send_text.assert_awaited_with('{"event": "ping", "seq": 1}')
+    assert bad not in mgr._connections.get("rest-1", {})
+    assert mgr.stats().evicted == 1
+    await mgr.close()
+
+
+@pytest.mark.asyncio
+async def test_broadcast_does_not_wait_for_slow_sockets() -> None:
+    mgr = ConnectionManager()
+    release = asyncio.Event()
+    slow = AsyncMock()
+    slow.send_text.side_effect = _blocking_send(release)
+    fast = AsyncMock()
+    await mgr.connect("rest-1", slow)
+    await mgr.connect("rest-1", fast)
+
+    await asyncio.wait_for(mgr.broadcast("rest-1", {"n": 1}), timeout=0.1)
+    await mgr.broadcast("rest-1", {"n": 2})
+    await _drain()
+
+    assert fast.send_text.await_count == 3  # noqa: PLR2004
+    assert mgr.stats().queued == 2  # noqa: PLR2004
+    release.set()
+    await _drain()
+    assert mgr.stats().sent == 6  # noqa: PLR2004
+    await mgr.close()
+
+
+@pytest.mark.asyncio
+async def test_queue_overflow_evicts_slow_consumer() -> None:
+    mgr = ConnectionManager(queue_size=2)
+    slow = AsyncMock()
+    slow.send_text.side_effect = _blocking_send()
+    await mgr.connect("rest-1", slow)
+
+    for n in range(4):
+        await mgr.broadcast("rest-1", {"n": n})
+    await _drain()
+
+    stats = mgr.stats()
+    assert (stats.dropped, stats.evicted, stats.connections) == (1, 1, 0)
+    slow.close.assert_awaited_once_with(code=status.WS_1013_TRY_AGAIN_LATER)
+    assert "rest-1" not in mgr._connections
+    await mgr.close()
+
+
+@pytest.mark.asyncio
+async def test_stalled_send_times_out_and_evicts() -> None:
+    mgr = ConnectionManager(send_timeout_seconds=0.01)
+    stalled = AsyncMock()
+    stalled.send_text.side_effect = _blocking_send()
+    await mgr.connect("rest-1", stalled)
+
+    await mgr.broadcast("rest-1", {"event": "ping"})
+    await asyncio.sleep(0.05)
+
+    assert mgr.stats().evicted == 1
+    assert "rest-1" not in mgr._connections
+
+
+@pytest.mark.asyncio
+async def test_fresh_connect_is_told_the_current_sequence() -> None:
+    mgr = ConnectionManager()
+    await mgr.connect("rest-1", AsyncMock())
+    for n in range(3):
+        await mgr.broadcast("rest-1", {"n": n})
+    ws = AsyncMock()
+
+    await mgr.connect("rest-1", ws)
+    await _drain()
+
+    ws.send_text.assert_awaited_once_with('{"type": "hello", "seq": 3}')
+    await mgr.close()
+
+
+async def _connect_with_history(mgr: ConnectionManager, events: int) -> None:
+    await mgr.connect("rest-1", AsyncMock())
+    for n in range(events):
+        await mgr.broadcast("rest-1", {"n": n})
+
+
+@pytest.mark.asyncio
+async def test_reconnect_replays_only_missed_events() -> None:
+    mgr = ConnectionManager()
+    await _connect_with_history(mgr, 5)
+    ws = AsyncMock()
+
+    await mgr.connect("rest-1", ws, since=3)
+    await _drain()
+
+    assert [c.args[0] for c in ws.send_text.await_args_list] == [
+        '{"type": "hello", "seq": 3}',
+        '{"n": 3, "seq": 4}',
+        '{"n": 4, "seq": 5}',
+    ]
+    assert mgr.stats().replayed == 2  # noqa: PLR2004
+    await mgr.close()
+
+
+@pytest.mark.asyncio
+async def test_reconnect_up_to_date_receives_only_hello() -> None:
+    mgr = ConnectionManager()
+    await _connect_with_history(mgr, 2)
+    ws = AsyncMock()
+
+    await mgr.connect("rest-1", ws, since=2)
+    await _drain()
+
+    ws.send_text.assert_awaited_once_with('{"type": "hello", "seq": 2}')
+    await mgr.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("since", [0, 9])
+async def test_reconnect_outside_buffer_requires_resync(since: int) -> None:
+    mgr = ConnectionManager(replay_size=3)
+    await _connect_with_history(mgr, 5)
+    ws = AsyncMock()
+
+    await mgr.connect("rest-1", ws, since=since)
+    await _drain()
+
+    ws.send_text.assert_awaited_once_with('{"type": "resync_required", "seq": 5}')
+    assert mgr.stats().resyncs == 1
+    await mgr.close()
+
+
+@pytest.mark.asyncio
+async def test_reconnect_requires_resync_when_replay_exceeds_queue() -> None:
+    mgr = ConnectionManager(queue_size=2, replay_size=10)
+    await _connect_with_history(mgr, 2)
+    await mgr.broadcast("rest-1", {"n": 2})
+    ws = AsyncMock()
+
+    await mgr.connect("rest-1", ws, since=0)
+    await _drain()
+
+    ws.send_text.assert_awaited_once_with('{"type": "resync_required", "seq": 3}')
+    await mgr.close()
+
+
+@pytest.mark.asyncio
+async def test_replay_buffer_resets_on_sequence_gap() -> None:
+    client = _FakeRedis()
+    bus = RedisBroadcastBus(client)
+    mgr = ConnectionManager(bus)
+    await mgr._deliver("rest-1", 1, "a")
+    await mgr._deliver("rest-1", 2, "b")
+    client.counters["ws:kitchen:seq:rest-1"] = 4
+    await mgr._deliver("rest-1", 4, "d")
+    ws = AsyncMock()
+
+    await mgr.connect("rest-1", ws, since=2)
+    await _drain()
+
+    ws.send_text.assert_awaited_once_with('{"type": "resync_required", "seq": 4}')
+    await mgr.close()
+
+
+@pytest.mark.asyncio
+async def test_redis_bus_numbers_locally_when_redis_is_down() -> None:
+    client = _FakeRedis()
+    client.error = RedisConnectionError("down")
+    bus = RedisBroadcastBus(client)
+
+    assert await bus.next_sequence("rest-1") == 1
+    assert await bus.current_sequence("rest-1") == 1
+
+
+def test_stats_empty_manager() -> None:
+    stats = ConnectionManager().stats()
+
+    assert stats.connections == 0
+    assert stats.send_latency_avg_ms == 0.0
+    assert stats.max_queue_depth == 0
+
+
+@pytest.mark.asyncio
+async def test_subscribes_on_first_socket_and_unsubscribes_on_last() -> None:
+    bus = AsyncMock(spec=LocalBroadcastBus)
+    bus.current_sequence.return_value = 0
+    mgr = ConnectionManager(bus)
+    first, second = AsyncMock(), AsyncMock()
+
+    await mgr.connect("rest-1", first)
+    await mgr.connect("rest-1", second)
+    await mgr.disconnect("rest-1", first)
+    bus.unsubscribe.assert_not_awaited()
+    await mgr.disconnect("rest-1", second)
+
+    bus.subscribe.assert_awaited_once_with("rest-1")
+    bus.unsubscribe.assert_awaited_once_with("rest-1")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_first_connects_subscribe_once() -> None:
+    bus = AsyncMock(spec=LocalBroadcastBus)
+    bus.current_sequence.return_value = 0
+    mgr = ConnectionManager(bus)
+
+    await asyncio.gather(mgr.connect("rest-1", AsyncMock()), mgr.connect("rest-1", AsyncMock()))
+
+    bus.subscribe.assert_awaited_once_with("rest-1")
+    assert len(mgr._connections["rest-1"]) == 2  # noqa: PLR2004
+    await mgr.close()
+
+
+@pytest.mark.asyncio
+async def test_last_socket_leaving_during_a_connect_keeps_the_subscription() -> None:
+    bus = AsyncMock(spec=LocalBroadcastBus)
+    bus.current_sequence.return_value = 0
+    mgr = ConnectionManager(bus)
+    leaving, joining = AsyncMock(), AsyncMock()
+    await mgr.connect("rest-1", leaving)
+    reading_head = asyncio.Event()
+    release_head = asyncio.Event()
+
+    async def slow_head(_restaurant_id: str) -> int:
+        reading_head.set()
+        await release_head.wait()
+        return 0
+
+    bus.current_sequence.side_effect = slow_head
+    connecting = asyncio.create_task(mgr.connect("rest-1", joining))
+    await reading_head.wait()
+    await mgr.disconnect("rest-1", leaving)
+    release_head.set()
+    await connecting
+
+    bus.unsubscribe.assert_not_awaited()
+    assert mgr._subscribed == {"rest-1"}
+    assert list(mgr._connections["rest-1"]) == [joining]
+
+    await mgr.disconnect("rest-1", joining)
+    bus.unsubscribe.assert_awaited_once_with("rest-1")
+    assert mgr._subscribed == set()
+
+
+@pytest.mark.asyncio
+async def test_redis_bus_delivers_published_events_to_subscribed_restaurants() -> None:
+    client = _FakeRedis()
+    mgr = ConnectionManager(RedisBroadcastBus(client))
+    ws = AsyncMock()
+    await mgr.connect("rest-1", ws)
+
+    await mgr.broadcast("rest-1", {"event": "order_created"})
+    await mgr.broadcast("rest-2", {"event": "order_created"})
+    await asyncio.sleep(0.01)
+    await mgr.close()
+
+    assert client.published[0] == ("ws:kitchen:rest-1", '1:{"event": "order_created", "seq": 1}')
+    assert [c.args[0] for c in ws.send_text.await_args_list] == [
+        '{"type": "hello", "seq": 0}',
+        '{"event": "order_created", "seq": 1}',
+    ]
+    assert client.counters == {"ws:kitchen:seq:rest-1": 1, "ws:kitchen:seq:rest-2": 1}
+    assert client.pubsub_instance.channels == {"ws:kitchen:rest-1"}
+    assert client.pubsub_instance.closed
+
+
+@pytest.mark.asyncio
+async def test_redis_bus_unsubscribes_when_last_socket_leaves() -> None:
+    client = _FakeRedis()
+    mgr = ConnectionManager(RedisBroadcastBus(client))
+    ws = AsyncMock()
+    await mgr.connect("rest-1", ws)
+
+    await mgr.disconnect("rest-1", ws)
+    await mgr.close()
 
-    mgr._connections["rest-1"] = [good, bad]
+    assert client.pubsub_instance.channels == set()
+
+
+@pytest.mark.asyncio
+async def test_redis_bus_falls_back_to_local_delivery_when_publish_fails() -> None:
+    client = _FakeRedis()
+    client.error = RedisConnectionError("down")
+    mgr = ConnectionManager(RedisBroadcastBus(client))
+    ws = AsyncMock()
+    await mgr.connect("rest-1", ws)
 
     await mgr.broadcast("rest-1", {"event": "ping"})
+    await _drain()
+    await mgr.close()
+
+    assert [c.args[0] for c in ws.send_text.await_args_list] == [
+        '{"type": "hello", "seq": 0}',
+        '{"event": "ping", "seq": 1}',
+    ]
+
+
+@pytest.mark.asyncio
+async def test_redis_bus_tolerates_subscription_errors() -> None:
+    client = _FakeRedis()
+    client.pubsub_instance.error = RedisConnectionError("down")
+    bus = RedisBroadcastBus(client)
+
+    await bus.subscribe("rest-1")
+    await bus.unsubscribe("rest-1")
+
+    assert bus._listener is None
+
+
+@pytest.mark.asyncio
+async def test_redis_bus_listener_retries_after_connection_errors(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    client = _FakeRedis()
+    bus = RedisBroadcastBus(client)
+    delivered: list[tuple[str, int, str]] = []
+
+    async def deliver(restaurant_id: str, seq: int, payload: str) -> None:
+        delivered.append((restaurant_id, seq, payload))
+
+    bus.bind(deliver)
+    responses: list = [
+        RedisConnectionError("lost"),
+        {"type": "message", "channel": "other:rest-1", "data": "x"},
+        {"type": "message", "channel": "ws:kitchen:rest-1", "data": "7:ok"},
+    ]
+
+    async def get_message(**_kwargs):
+        if responses:
+            item = responses.pop(0)
+            if isinstance(item, Exception):
+                raise item
+            return item
+        await asyncio.sleep(0.01)
+        return None
+
+    monkeypatch.setattr(client.pubsub_instance, "get_message", get_message)
+    monkeypatch.setattr(RedisBroadcastBus, "_RETRY_DELAY_SECONDS", 0)
+    await bus.subscribe("rest-1")
+    await asyncio.sleep(0.01)
+    await bus.close()
+
+    assert delivered == [("rest-1", 7, "ok")]
+
+
+@pytest.mark.asyncio
+async def test_redis_bus_listener_survives_delivery_errors() -> None:
+    client = _FakeRedis()
+    bus = RedisBroadcastBus(client)
+    bus.bind(AsyncMock(side_effect=RuntimeError("boom")))
+
+    await bus.subscribe("rest-1")
+    await client.publish("ws:kitchen:rest-1", "1:{}")
+    await asyncio.sleep(0.01)
+
+    assert not bus._listener.done()
+    await bus.close()
+
+
+def test_build_broadcast_bus_selects_backend(monkeypatch: pytest.MonkeyPatch) -> None:
+    client = _FakeRedis()
+    monkeypatch.setattr(ws_mod, "get_redis_client", lambda: client)
+
+    local = ws_mod.build_broadcast_bus(MagicMock(WS_BROADCAST_BUS="local"))
+    redis_bus = ws_mod.build_broadcast_bus(MagicMock(WS_BROADCAST_BUS=" Redis "))
 
-    good.send_text.assert_awaited()
-    assert bad not in mgr._connections.get("rest-1", [])
+    assert isinstance(local, LocalBroadcastBus)
+    assert isinstance(redis_bus, RedisBroadcastBus)
@@ -1,6 +1,9 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+
 import pytest
 
-from main import app, create_application
+from main import app, create_application, lifespan
 
 
 def test_root_returns_json() -> None:
@@ -23,3 +26,104 @@ def test_create_application_adds_proxy_headers_when_enabled(
         middleware.cls.__name__ == "ProxyHeadersMiddleware"
         for middleware in application.user_middleware
     )
+
+
+def _patch_lifespan(
+    monkeypatch: pytest.MonkeyPatch, calls: list[str], bootstrap: Callable[[], Awaitable[bool]]
+) -> None:
+    async def fake_close() -> None:
+        calls.append("close")
+
+    monkeypatch.setattr(
+        "main.configure_rate_limit_backend", lambda _settings: calls.append("configure")
+    )
+
+    async def fake_ws_close() -> None:
+        calls.append("ws_close")
+
+    monkeypatch.setattr("main.DatabaseConnections.close_redis_client", fake_close)
+
+    async def fake_http_close() -> None:
+        calls.append("http")
+
+    monkeypatch.setattr("main.external_http_clients.aclose", fake_http_close)
+    monkeypatch.setattr("main.ws_manager.set_bus", lambda _bus: calls.append("bus"))
+    monkeypatch.setattr("main.ws_manager.close", fake_ws_close)
+
+    monkeypatch.setattr("main.object_storage.bootstrap_bucket", bootstrap)
+    monkeypatch.setattr("main.object_storage.shutdown", lambda: calls.append("storage"))
+    monkeypatch.setattr("main.image_processor.shutdown", lambda: calls.append("images"))
+    monkeypatch.setattr("main.shutdown_logging", lambda: calls.append("logging"))
+
+    async def fake_reconcile_stop() -> None:
+        calls.append("reconcile_stop")
+
+    async def fake_scheduler_stop() -> None:
+        calls.append("scheduler_stop")
+
+    monkeypatch.setattr("main.scheduler.start", lambda: calls.append("scheduler"))
+    monkeypatch.setattr("main.scheduler.stop", fake_scheduler_stop)
+    monkeypatch.setattr("main.payment_reconciler.stop", fake_reconcile_stop)
+
+    async def fake_heartbeats_close() -> None:
+        calls.append("heartbeats_flush")
+
+    monkeypatch.setattr("main.table_session_heartbeats.close", fake_heartbeats_close)
+
+
+@pytest.mark.asyncio
+async def test_lifespan_configures_rate_limiting_and_closes_redis(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    calls: list[str] = []
+
+    async def fake_bootstrap() -> bool:
+        calls.append("bucket")
+        return True
+
+    _patch_lifespan(monkeypatch, calls, fake_bootstrap)
+
+    async with lifespan(app):
+        assert calls == ["configure", "bus", "scheduler"]
+        await asyncio.sleep(0)
+
+    assert calls == [
+        "configure",
+        "bus",
+        "scheduler",
+        "bucket",
+        "scheduler_stop",
+        "heartbeats_flush",
+        "reconcile_stop",
+        "ws_close",
+        "close",
+        "http",
+        "storage",
+        "images",
+        "logging",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_lifespan_does_not_wait_for_bucket_bootstrap(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    calls: list[str] = []
+
+    async def hanging_bootstrap() -> bool:
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            await asyncio.sleep(0)
+            calls.append("bucket_cancelled")
+            raise
+        return True
+
+    _patch_lifespan(monkeypatch, calls, hanging_bootstrap)
+
+    async with lifespan(app):
+        await asyncio.sleep(0)
+        assert "scheduler" in calls
+
+    assert calls.index("bucket_cancelled") < calls.index("scheduler_stop")
+    assert calls.index("storage") > calls.index("bucket_cancelled")
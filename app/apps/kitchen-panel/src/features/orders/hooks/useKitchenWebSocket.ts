@@ -1,9 +1,9 @@
-import type { KitchenOrderEvent } from "@restorio/types";
+import type { KitchenHelloEvent, KitchenOrderEvent, KitchenResyncEvent } from "@restorio/types";
 import { resolveApiBaseUrl } from "@restorio/utils";
 import { useQueryClient } from "@tanstack/react-query";
 import { useCallback, useEffect, useRef, useState } from "react";
 
-const buildKitchenWebSocketUrl = (restaurantId: string): string => {
+const buildKitchenWebSocketUrl = (restaurantId: string, since: number | null): string => {
   const apiBase = resolveApiBaseUrl({ preferRelativeInBrowser: true });
   const absolute =
     apiBase.startsWith("/") && typeof window !== "undefined" ? `${window.location.origin}${apiBase}` : apiBase;
@@ -11,11 +11,15 @@ const buildKitchenWebSocketUrl = (restaurantId: string): string => {
   const wsProto = parsed.protocol === "https:" ? "wss:" : "ws:";
   const path = parsed.pathname.replace(/\/$/, "");
 
-  return `${wsProto}//${parsed.host}${path}/ws/kitchen/${restaurantId}`;
+  const query = since === null ? "" : `?since=${since}`;
+
+  return `${wsProto}//${parsed.host}${path}/ws/kitchen/${restaurantId}${query}`;
 };
 
 type WsStatus = "connected" | "disconnected" | "reconnecting";
 
+type KitchenSocketMessage = KitchenHelloEvent | KitchenOrderEvent | KitchenResyncEvent;
+
 const BASE_RECONNECT_DELAY = 1000;
 const MAX_RECONNECT_DELAY = 30000;
 
@@ -27,13 +31,22 @@ export const useKitchenWebSocket = (restaurantId: string | null): UseKitchenWebS
   const [status, setStatus] = useState<WsStatus>("disconnected");
   const wsRef = useRef<WebSocket | null>(null);
   const retryCountRef = useRef(0);
+  const lastSeqRef = useRef<number | null>(null);
   const queryClient = useQueryClient();
 
   const handleEvent = useCallback(
-    (event: KitchenOrderEvent): void => {
+    (event: KitchenSocketMessage): void => {
       if (!restaurantId) {
         return;
       }
+      if (typeof event.seq === "number") {
+        lastSeqRef.current = event.seq;
+      }
+      // The server opens every connection with the seq it continues after, so the
+      // next reconnect resumes from there even if no event arrived in between.
+      if (event.type === "hello") {
+        return;
+      }
       void queryClient.invalidateQueries({ queryKey: ["orders", restaurantId] });
 
       if (event.type === "order_created") {
@@ -53,8 +66,10 @@ export const useKitchenWebSocket = (restaurantId: string | null): UseKitchenWebS
     let shouldReconnect = true;
     let timeoutId: ReturnType<typeof setTimeout>;
 
+    lastSeqRef.current = null;
+
     const connect = (): void => {
-      const url = buildKitchenWebSocketUrl(restaurantId);
+      const url = buildKitchenWebSocketUrl(restaurantId, lastSeqRef.current);
 
       const ws = new WebSocket(url);
 
@@ -67,7 +82,7 @@ export const useKitchenWebSocket = (restaurantId: string | null): UseKitchenWebS
 
       ws.onmessage = (messageEvent): void => {
         try {
-          const data = JSON.parse(messageEvent.data as string) as KitchenOrderEvent;
+          const data = JSON.parse(messageEvent.data as string) as KitchenSocketMessage;
 
           handleEvent(data);
         } catch {
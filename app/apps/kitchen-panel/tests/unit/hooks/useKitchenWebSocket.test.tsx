@@ -0,0 +1,91 @@
+import { QueryClient, QueryClientProvider } from "@tanstack/react-query";
+import { act, renderHook } from "@testing-library/react";
+import React, { type PropsWithChildren } from "react";
+import { afterEach, beforeEach, describe, expect, it, vi } from "vitest";
+
+vi.mock("@restorio/utils", () => ({
+  resolveApiBaseUrl: (): string => "http://api.test/api/v1",
+}));
+
+import { useKitchenWebSocket } from "../../../src/features/orders/hooks/useKitchenWebSocket";
+
+class FakeWebSocket {
+  static instances: FakeWebSocket[] = [];
+
+  onopen: (() => void) | null = null;
+  onmessage: ((event: { data: string }) => void) | null = null;
+  onclose: (() => void) | null = null;
+  onerror: (() => void) | null = null;
+
+  constructor(public readonly url: string) {
+    FakeWebSocket.instances.push(this);
+  }
+
+  receive(message: object): void {
+    this.onmessage?.({ data: JSON.stringify(message) });
+  }
+
+  close(): void {
+    this.onclose?.();
+  }
+}
+
+const createWrapper = (queryClient: QueryClient) =>
+  function Wrapper({ children }: PropsWithChildren): React.JSX.Element {
+    return <QueryClientProvider client={queryClient}>{children}</QueryClientProvider>;
+  };
+
+describe("useKitchenWebSocket", () => {
+  beforeEach(() => {
+    vi.useFakeTimers();
+    FakeWebSocket.instances = [];
+    vi.stubGlobal("WebSocket", FakeWebSocket);
+  });
+
+  afterEach(() => {
+    vi.unstubAllGlobals();
+    vi.useRealTimers();
+  });
+
+  it("resumes from the hello seq when the socket drops before any event", () => {
+    const queryClient = new QueryClient();
+    const invalidate = vi.spyOn(queryClient, "invalidateQueries");
+    const { unmount } = renderHook(() => useKitchenWebSocket("rest-1"), { wrapper: createWrapper(queryClient) });
+
+    const [first] = FakeWebSocket.instances;
+
+    expect(first.url).toBe("ws://api.test/api/v1/ws/kitchen/rest-1");
+
+    act(() => {
+      first.onopen?.();
+      first.receive({ type: "hello", seq: 7 });
+      first.close();
+    });
+    act(() => {
+      vi.advanceTimersByTime(1000);
+    });
+
+    expect(FakeWebSocket.instances[1].url).toBe("ws://api.test/api/v1/ws/kitchen/rest-1?since=7");
+    expect(invalidate).not.toHaveBeenCalled();
+    unmount();
+  });
+
+  it("resumes from the last event seq after events arrive", () => {
+    const queryClient = new QueryClient();
+    const { unmount } = renderHook(() => useKitchenWebSocket("rest-1"), { wrapper: createWrapper(queryClient) });
+
+    const [first] = FakeWebSocket.instances;
+
+    act(() => {
+      first.receive({ type: "hello", seq: 7 });
+      first.receive({ type: "order_updated", seq: 8 });
+      first.close();
+    });
+    act(() => {
+      vi.advanceTimersByTime(1000);
+    });
+
+    expect(FakeWebSocket.instances[1].url).toBe("ws://api.test/api/v1/ws/kitchen/rest-1?since=8");
+    unmount();
+  });
+});
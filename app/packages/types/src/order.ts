@@ -90,6 +90,17 @@ export type KitchenOrderEventType = "order_created" | "order_updated" | "order_a
 export interface KitchenOrderEvent {
   type: KitchenOrderEventType;
   order: Order;
+  seq?: number;
+}
+
+export interface KitchenResyncEvent {
+  type: "resync_required";
+  seq: number;
+}
+
+export interface KitchenHelloEvent {
+  type: "hello";
+  seq: number;
 }
 
 export interface RestaurantKitchenConfig {
@@ -15,7 +15,13 @@ export interface TransactionListItem {
 
 export type TransactionListData = PaginatedResponse<TransactionListItem>;
 
+export type TransactionsReconcileStatus = "running" | "completed" | "failed" | "cancelled";
+
 export interface TransactionsReconcileResult {
+  run_id: string;
+  status: TransactionsReconcileStatus;
+  started_at: string;
+  finished_at: string | null;
   scanned: number;
   updated: number;
   failed: number;